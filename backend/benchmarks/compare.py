@@ -0,0 +1,107 @@
+"""
+Benchmark Comparison
+
+Compares two result files written by benchmarks.run, case by case, on
+median wall time and peak RSS:
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.10
+
+Exits with status 1 when any case got slower (or used more memory) than the
+threshold allows, so it can gate a CI job.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# Sub-20 ms differences are scheduler noise, whatever the percentage
+MIN_TIME_CHANGE_S = 0.02
+
+
+def _load(path: Path) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    report = json.loads(path.read_text())
+    return report.get("meta", {}), {result["case"]: result for result in report["results"]}
+
+
+def _change(before: float, after: float) -> float:
+    return (after - before) / before if before else 0.0
+
+
+def _status(result) -> str:
+    return result["status"] if result else "missing"
+
+
+def compare(
+    baseline: Dict[str, Dict[str, Any]],
+    candidate: Dict[str, Dict[str, Any]],
+    threshold: float,
+    memory_threshold: float
+) -> Tuple[List[List[str]], List[str]]:
+    """Table rows for every case plus the names of regressed cases"""
+    rows = []
+    regressions = []
+    for name in sorted(set(baseline) | set(candidate)):
+        before, after = baseline.get(name), candidate.get(name)
+        if not before or not after or before["status"] != "ok" or after["status"] != "ok":
+            rows.append([name, "-", "-", "-", "-", f"{_status(before)} -> {_status(after)}"])
+            continue
+
+        time_change = _change(before["wall_s"]["median"], after["wall_s"]["median"])
+        if abs(after["wall_s"]["median"] - before["wall_s"]["median"]) < MIN_TIME_CHANGE_S:
+            time_change = 0.0
+        memory_change = _change(before["peak_rss_bytes"], after["peak_rss_bytes"])
+        verdict = "ok"
+        if time_change > threshold:
+            verdict = "SLOWER"
+        elif memory_change > memory_threshold:
+            verdict = "MORE MEMORY"
+        elif time_change < -threshold:
+            verdict = "faster"
+        if verdict in ("SLOWER", "MORE MEMORY"):
+            regressions.append(name)
+
+        rows.append([
+            name,
+            f"{before['wall_s']['median']:.3f}",
+            f"{after['wall_s']['median']:.3f}",
+            f"{time_change:+.1%}",
+            f"{memory_change:+.1%}",
+            verdict,
+        ])
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Allowed median wall time increase (default: 0.10 = 10%%)")
+    parser.add_argument("--memory-threshold", type=float, default=0.20,
+                        help="Allowed peak RSS increase (default: 0.20 = 20%%)")
+    args = parser.parse_args()
+
+    baseline_meta, baseline = _load(args.baseline)
+    candidate_meta, candidate = _load(args.candidate)
+
+    for meta_key in ("corpus_scale", "corpus_seed"):
+        if baseline_meta.get(meta_key) != candidate_meta.get(meta_key):
+            print(f"Warning: {meta_key} differs ({baseline_meta.get(meta_key)} vs "
+                  f"{candidate_meta.get(meta_key)}); results are not comparable", file=sys.stderr)
+
+    rows, regressions = compare(baseline, candidate, args.threshold, args.memory_threshold)
+    header = ["case", "base s", "new s", "time", "peak rss", "verdict"]
+    widths = [max(len(str(row[i])) for row in rows + [header]) for i in range(len(header))]
+    for row in [header] + rows:
+        print("  ".join(str(cell).ljust(width) for cell, width in zip(row, widths)))
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
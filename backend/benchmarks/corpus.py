@@ -0,0 +1,247 @@
+"""
+Synthetic Benchmark Corpus
+
+Generates a deterministic set of input files for the benchmark suite:
+
+- text PDFs with many pages of flowing text
+- table-heavy PDFs (ruled grids, the kind camelot/pdfplumber extract)
+- scanned PDFs (every page is a rasterised image, as produced by a scanner)
+- large DOCX, XLSX and PPTX documents
+- high-resolution photographs (noise + gradients, so they do not compress away)
+
+The same seed and scale always produce the same content (PDFs are written
+in reportlab's invariant mode), so results from different commits are
+measured on the same inputs.
+
+Usage:
+    python -m benchmarks.corpus --output /tmp/filelab-corpus --scale 1
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Dict
+
+from docx import Document
+from openpyxl import Workbook
+from PIL import Image, ImageDraw, ImageFont
+from pptx import Presentation
+from pptx.util import Inches, Pt
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Table, TableStyle
+from reportlab.pdfgen import canvas
+
+DEFAULT_SEED = 1234
+
+WORDS = (
+    "invoice quarterly revenue contract shipment warehouse balance account delivery "
+    "customer supplier report annual statement payment order schedule budget forecast "
+    "analysis summary region product service total amount period margin growth"
+).split()
+
+MANIFEST_NAME = "manifest.json"
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _paragraph(rng: random.Random, sentences: int = 6) -> str:
+    return " ".join(_sentence(rng, rng.randint(8, 16)) for _ in range(sentences))
+
+
+def make_text_pdf(path: Path, rng: random.Random, pages: int):
+    """Multi-page PDF of flowing text"""
+    styles = getSampleStyleSheet()
+    story = []
+    for page in range(pages):
+        story.append(Paragraph(f"Section {page + 1}", styles["Heading1"]))
+        for _ in range(5):
+            story.append(Paragraph(_paragraph(rng), styles["BodyText"]))
+        story.append(PageBreak())
+    SimpleDocTemplate(str(path), pagesize=letter, invariant=1).build(story)
+
+
+def make_table_pdf(path: Path, rng: random.Random, pages: int, rows: int = 30, cols: int = 6):
+    """PDF with one ruled table per page"""
+    story = []
+    styles = getSampleStyleSheet()
+    for page in range(pages):
+        data = [[f"Col {c + 1}" for c in range(cols)]]
+        for r in range(rows):
+            data.append(
+                [f"R{page}-{r}"] + [f"{rng.uniform(0, 100000):.2f}" for _ in range(cols - 1)]
+            )
+        table = Table(data)
+        table.setStyle(TableStyle([
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+            ("FONTSIZE", (0, 0), (-1, -1), 8),
+        ]))
+        story.append(Paragraph(f"Ledger page {page + 1}", styles["Heading2"]))
+        story.append(table)
+        story.append(PageBreak())
+    SimpleDocTemplate(str(path), pagesize=letter, invariant=1).build(story)
+
+
+def _render_text_image(rng: random.Random, width: int, height: int, lines: int) -> Image.Image:
+    image = Image.new("L", (width, height), color=255)
+    draw = ImageDraw.Draw(image)
+    try:
+        font = ImageFont.truetype("DejaVuSans.ttf", 28)
+    except OSError:
+        font = ImageFont.load_default()
+    y = 80
+    for _ in range(lines):
+        draw.text((80, y), _sentence(rng, rng.randint(6, 10)), fill=0, font=font)
+        y += 48
+        if y > height - 80:
+            break
+    return image
+
+
+def make_scanned_pdf(path: Path, rng: random.Random, pages: int):
+    """PDF whose pages are 200 DPI grayscale images of text (no text layer)"""
+    width, height = 1700, 2200  # letter at 200 DPI
+    pdf = canvas.Canvas(str(path), pagesize=letter, invariant=1)
+    page_width, page_height = letter
+    for page in range(pages):
+        image_path = path.with_suffix(f".page{page}.png")
+        _render_text_image(rng, width, height, 40).save(image_path)
+        pdf.drawImage(str(image_path), 0, 0, width=page_width, height=page_height)
+        pdf.showPage()
+        image_path.unlink()
+    pdf.save()
+
+
+def make_text_image(path: Path, rng: random.Random):
+    """Single page of text as a PNG, for OCR"""
+    _render_text_image(rng, 1700, 1100, 18).save(path)
+
+
+def make_photo(path: Path, rng: random.Random, width: int, height: int):
+    """High-resolution photo-like JPEG (gradient plus noise)"""
+    gradient = Image.linear_gradient("L").resize((width, height))
+    # PIL's effect_noise is not seedable; build the noise from the seeded generator
+    noise = Image.frombytes("L", (width, height), rng.randbytes(width * height))
+    red = Image.blend(gradient, noise, 0.5)
+    green = Image.blend(gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT), noise, 0.3)
+    blue = Image.blend(gradient.transpose(Image.Transpose.FLIP_TOP_BOTTOM), noise, 0.7)
+    Image.merge("RGB", (red, green, blue)).save(path, "JPEG", quality=92)
+
+
+def make_docx(path: Path, rng: random.Random, paragraphs: int):
+    document = Document()
+    for index in range(paragraphs):
+        if index % 20 == 0:
+            document.add_heading(f"Chapter {index // 20 + 1}", level=1)
+        document.add_paragraph(_paragraph(rng))
+    table = document.add_table(rows=20, cols=5)
+    for row in table.rows:
+        for cell in row.cells:
+            cell.text = f"{rng.randint(0, 99999)}"
+    document.save(path)
+
+
+def make_xlsx(path: Path, rng: random.Random, rows: int, cols: int = 12):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Data"
+    sheet.append([f"Metric {c + 1}" for c in range(cols)])
+    for _ in range(rows):
+        sheet.append([round(rng.uniform(0, 10000), 2) for _ in range(cols)])
+    workbook.save(path)
+
+
+def make_pptx(path: Path, rng: random.Random, slides: int):
+    presentation = Presentation()
+    layout = presentation.slide_layouts[1]
+    for index in range(slides):
+        slide = presentation.slides.add_slide(layout)
+        slide.shapes.title.text = f"Slide {index + 1}: {_sentence(rng, 4)}"
+        body = slide.placeholders[1].text_frame
+        body.text = _sentence(rng, 10)
+        for _ in range(4):
+            paragraph = body.add_paragraph()
+            paragraph.text = _sentence(rng, 8)
+            paragraph.font.size = Pt(18)
+        box = slide.shapes.add_textbox(Inches(0.5), Inches(6.5), Inches(9), Inches(0.5))
+        box.text_frame.text = f"Footer {index + 1}"
+    presentation.save(path)
+
+
+def generate_corpus(output_dir: Path, scale: int = 1, seed: int = DEFAULT_SEED) -> Dict[str, str]:
+    """Generate the corpus (skipping files that already exist for this seed and scale).
+
+    Args:
+        output_dir: Directory to write the files to
+        scale: Multiplies page/row/slide counts; 1 runs in minutes on a laptop
+        seed: Random seed for the generated content
+
+    Returns:
+        Dict mapping corpus keys (e.g. "text_pdf") to file paths
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / MANIFEST_NAME
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+        if (
+            manifest.get("seed") == seed
+            and manifest.get("scale") == scale
+            and all(Path(path).exists() for path in manifest["files"].values())
+        ):
+            return manifest["files"]
+
+    # Every file gets its own generator so adding a file does not change the others
+    def rng(name: str) -> random.Random:
+        return random.Random(f"{seed}:{name}")
+
+    files = {
+        "text_pdf": output_dir / "text.pdf",
+        "text_pdf_b": output_dir / "text_b.pdf",
+        "table_pdf": output_dir / "tables.pdf",
+        "scanned_pdf": output_dir / "scanned.pdf",
+        "text_image": output_dir / "text_page.png",
+        "photo": output_dir / "photo.jpg",
+        "logo": output_dir / "logo.png",
+        "text_file": output_dir / "notes.txt",
+        "docx": output_dir / "document.docx",
+        "xlsx": output_dir / "workbook.xlsx",
+        "pptx": output_dir / "slides.pptx",
+    }
+
+    make_text_pdf(files["text_pdf"], rng("text_pdf"), pages=20 * scale)
+    make_text_pdf(files["text_pdf_b"], rng("text_pdf_b"), pages=5 * scale)
+    make_table_pdf(files["table_pdf"], rng("table_pdf"), pages=3 * scale)
+    make_scanned_pdf(files["scanned_pdf"], rng("scanned_pdf"), pages=2 * scale)
+    make_text_image(files["text_image"], rng("text_image"))
+    make_photo(files["photo"], rng("photo"), 4000 * scale, 3000 * scale)
+    Image.new("RGBA", (400, 200), (200, 30, 30, 255)).save(files["logo"])
+    files["text_file"].write_text(
+        "\n\n".join(_paragraph(rng("text_file")) for _ in range(200 * scale)), encoding="utf-8"
+    )
+    make_docx(files["docx"], rng("docx"), paragraphs=200 * scale)
+    make_xlsx(files["xlsx"], rng("xlsx"), rows=2000 * scale)
+    make_pptx(files["pptx"], rng("pptx"), slides=30 * scale)
+
+    paths = {key: str(path) for key, path in files.items()}
+    manifest_path.write_text(json.dumps({"seed": seed, "scale": scale, "files": paths}, indent=2))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the synthetic benchmark corpus")
+    parser.add_argument("--output", type=Path, required=True, help="Directory for the corpus")
+    parser.add_argument("--scale", type=int, default=1, help="Size multiplier (default: 1)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    for key, path in generate_corpus(args.output, args.scale, args.seed).items():
+        print(f"{key:12s} {path} ({Path(path).stat().st_size // 1024} KB)")
+
+
+if __name__ == "__main__":
+    main()
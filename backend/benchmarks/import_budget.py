@@ -0,0 +1,140 @@
+"""
+Import-Time Budget
+
+Imports server.py in a fresh interpreter and fails (exit status 1) when the
+import is slower or larger than the budget, or when it pulls in a conversion
+library that should only be imported on first use:
+
+    python -m benchmarks.import_budget --budget-seconds 1.5 --budget-mb 150
+
+The slowest imports (from python -X importtime) are listed so a regression
+points at the module that caused it. Run it in CI next to benchmarks.compare.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Must stay out of sys.modules after "import server" (imported on first use)
+LAZY_MODULES = (
+    "pytesseract",
+    "pandas",
+    "numpy",
+    "camelot",
+    "cv2",
+    "fitz",
+    "pdf2docx",
+    "pdfplumber",
+    "openpyxl",
+    "xlsx2pdf",
+    "pptx",
+    "docx",
+    "pdf2image",
+    "docx2pdf",
+)
+
+# Peak RSS needs the resource module, which Windows lacks; it is reported as null there
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import server
+elapsed = time.perf_counter() - started
+try:
+    import resource
+except ImportError:
+    peak_rss_mb = None
+else:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = (peak if sys.platform == "darwin" else peak * 1024) / (1024 * 1024)
+print("IMPORT_BUDGET " + json.dumps({
+    "seconds": elapsed,
+    "peak_rss_mb": peak_rss_mb,
+    "modules": sorted(sys.modules),
+}))
+"""
+
+
+def slowest_imports(importtime_output: str, top: int) -> List[Tuple[str, float]]:
+    """Modules imported directly by server.py with the highest cumulative import time (seconds)"""
+    totals: Dict[str, float] = {}
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name_column = line[len("import time:"):].split("|")
+        # Nesting is shown as two spaces per level after the separator's own space
+        depth = (len(name_column) - len(name_column.lstrip()) - 1) // 2
+        if depth != 1 or not cumulative.strip().isdigit():
+            continue
+        name = name_column.strip()
+        totals[name] = max(totals.get(name, 0), int(cumulative) / 1e6)
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def measure(runs: int) -> Tuple[Dict[str, object], str]:
+    """Import server in fresh interpreters; returns the fastest run and its importtime log"""
+    env = dict(os.environ)
+    env.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    env.setdefault("DB_NAME", "filelab_import_budget")
+    env.setdefault("JOB_STORE", "memory")
+    env.setdefault("TEMP_DIR", str(Path(tempfile.gettempdir()) / "filelab-import-budget"))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(BACKEND_DIR), env.get("PYTHONPATH")]))
+
+    best = None
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", PROBE],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+        )
+        lines = [line for line in completed.stdout.splitlines() if line.startswith("IMPORT_BUDGET ")]
+        if completed.returncode != 0 or not lines:
+            sys.stderr.write(completed.stderr[-4000:])
+            raise SystemExit("Importing server.py failed")
+        result = json.loads(lines[-1][len("IMPORT_BUDGET "):])
+        if best is None or result["seconds"] < best[0]["seconds"]:
+            best = (result, completed.stderr)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import time and size of server.py")
+    parser.add_argument("--budget-seconds", type=float, default=1.5, help="Maximum import wall time")
+    parser.add_argument("--budget-mb", type=float, default=150, help="Maximum peak RSS after import")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to try (fastest counts)")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    result, importtime_log = measure(args.runs)
+
+    print(f"Import time: {result['seconds']:.3f} s (budget {args.budget_seconds} s)")
+    if result["peak_rss_mb"] is not None:
+        print(f"Peak RSS:    {result['peak_rss_mb']:.0f} MB (budget {args.budget_mb:.0f} MB)")
+    else:
+        print("Peak RSS:    not measured on this platform")
+    print("\nSlowest imports:")
+    for name, seconds in slowest_imports(importtime_log, args.top):
+        print(f"  {seconds:7.3f} s  {name}")
+
+    failures = []
+    if result["seconds"] > args.budget_seconds:
+        failures.append(f"import took {result['seconds']:.3f} s")
+    if result["peak_rss_mb"] is not None and result["peak_rss_mb"] > args.budget_mb:
+        failures.append(f"peak RSS was {result['peak_rss_mb']:.0f} MB")
+    imported = [name for name in LAZY_MODULES if name in result["modules"]]
+    if imported:
+        failures.append(f"imported at startup: {', '.join(imported)}")
+
+    if failures:
+        print(f"\nOver budget: {'; '.join(failures)}")
+        sys.exit(1)
+    print("\nWithin budget")
+
+
+if __name__ == "__main__":
+    main()
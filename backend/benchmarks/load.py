@@ -0,0 +1,362 @@
+"""
+HTTP Load Test
+
+Drives the API with a configurable mix of endpoints at increasing concurrency
+and reports throughput and p50/p95/p99 latency per route, to find the
+concurrency at which one backend container stops keeping up:
+
+    # In-process (ASGI transport, no network, no MongoDB)
+    python -m benchmarks.load --mix default --concurrency 1,2,4,8,16 --duration 30
+
+    # Real HTTP against a uvicorn server started with the in-memory MongoDB stand-in
+    python -m benchmarks.load --uvicorn --concurrency 4,8,16,32
+
+    # An already running backend (e.g. the docker compose stack)
+    python -m benchmarks.load --url http://localhost:8001 --mix pdf
+
+In-process runs share one event loop between client and server, which is
+fine for relative comparisons; use --uvicorn or --url for absolute numbers.
+
+Request bodies come from the benchmark corpus (benchmarks.corpus). The
+conversion cache is disabled for in-process and --uvicorn runs so repeated
+uploads of the same file are converted every time (--cache keeps it on).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from benchmarks.corpus import DEFAULT_SEED, generate_corpus
+from benchmarks.run import missing_executables
+
+CONTENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".txt": "text/plain",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+@dataclass
+class Endpoint:
+    """One request in the mix; files are (form field, corpus key) pairs"""
+    method: str
+    path: str
+    files: Sequence[Tuple[str, str]] = ()
+    data: Dict[str, Any] = field(default_factory=dict)
+    requires: Sequence[str] = ()
+
+
+ENDPOINTS: Dict[str, Endpoint] = {
+    "pdf/merge": Endpoint("POST", "/api/pdf/merge", [("files", "text_pdf_b"), ("files", "table_pdf")]),
+    "pdf/split": Endpoint("POST", "/api/pdf/split", [("file", "text_pdf_b")], {"page_ranges": "1-2,3-5"}),
+    "pdf/lock": Endpoint("POST", "/api/pdf/lock", [("file", "text_pdf_b")], {"password": "secret"}),
+    "pdf-to-txt": Endpoint("POST", "/api/pdf-to-txt", [("file", "text_pdf_b")]),
+    "pdf-to-docx": Endpoint("POST", "/api/convert/pdf-to-docx", [("file", "text_pdf_b")]),
+    "txt-to-pdf": Endpoint("POST", "/api/txt-to-pdf", [("file", "text_file")]),
+    "docx-to-pdf": Endpoint("POST", "/api/docx-to-pdf", [("file", "docx")], requires=["soffice"]),
+    "image-to-pdf": Endpoint("POST", "/api/image-to-pdf", [("file", "text_image")]),
+    "images/resize": Endpoint(
+        "POST", "/api/images/resize", [("files", "photo")], {"target_width": 1280, "target_height": 960}
+    ),
+    "ocr/extract": Endpoint("POST", "/api/ocr/extract", [("file", "text_image")], {"language": "eng"},
+                            requires=["tesseract"]),
+    "search/pdf": Endpoint("POST", "/api/search/pdf", [("file", "text_pdf")], {"search_term": "revenue"}),
+    "watermark/pdf/text": Endpoint(
+        "POST", "/api/watermark/pdf/text", [("file", "text_pdf_b")], {"text": "CONFIDENTIAL"}
+    ),
+    "health": Endpoint("GET", "/api/health"),
+    "history": Endpoint("GET", "/api/history?limit=50"),
+}
+
+# Relative weights of each endpoint
+MIXES: Dict[str, Dict[str, int]] = {
+    "default": {
+        "pdf/merge": 3, "pdf/split": 2, "pdf-to-txt": 3, "images/resize": 2, "ocr/extract": 2,
+        "search/pdf": 2, "watermark/pdf/text": 2, "txt-to-pdf": 1, "history": 1,
+    },
+    "pdf": {"pdf/merge": 2, "pdf/split": 2, "pdf/lock": 1, "pdf-to-txt": 2, "pdf-to-docx": 1, "search/pdf": 2},
+    "office": {"docx-to-pdf": 2, "pdf-to-docx": 2, "txt-to-pdf": 1},
+    "images": {"images/resize": 3, "image-to-pdf": 2, "ocr/extract": 1},
+    "light": {"health": 5, "history": 2, "pdf/lock": 1},
+}
+
+
+def parse_mix(spec: str) -> Dict[str, int]:
+    """A preset name or "route=weight,route=weight" """
+    if spec in MIXES:
+        return dict(MIXES[spec])
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint {name!r}; choose from: {', '.join(ENDPOINTS)}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def percentile(sorted_values: List[float], quantile: float) -> Optional[float]:
+    """Nearest-rank percentile of already sorted values"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(quantile * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples: List[Tuple[str, int, float]], elapsed: float) -> Dict[str, Any]:
+    """Per-route and overall throughput/latency from (route, status, seconds) samples"""
+    by_route: Dict[str, List[Tuple[int, float]]] = {}
+    for route, status, latency in samples:
+        by_route.setdefault(route, []).append((status, latency))
+    by_route["all"] = [(status, latency) for _, status, latency in samples]
+
+    routes = {}
+    for route, results in by_route.items():
+        latencies = sorted(latency * 1000 for status, latency in results if 0 < status < 400)
+        # 429s are admission control shedding load (services/admission_service.py), not failures
+        rejected = sum(1 for status, _ in results if status == 429)
+        errors = sum(1 for status, _ in results if not 0 < status < 400) - rejected
+        routes[route] = {
+            "requests": len(results),
+            "errors": errors,
+            "rejected": rejected,
+            "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+            "p50_ms": _round(percentile(latencies, 0.50)),
+            "p95_ms": _round(percentile(latencies, 0.95)),
+            "p99_ms": _round(percentile(latencies, 0.99)),
+            "max_ms": _round(latencies[-1] if latencies else None),
+        }
+    return routes
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 1) if value is not None else None
+
+
+class LoadGenerator:
+    """Closed-loop load: each virtual user sends its next request when the previous one finishes"""
+
+    def __init__(self, client: httpx.AsyncClient, mix: Dict[str, int], corpus: Dict[str, str], seed: int):
+        self.client = client
+        self.routes = list(mix)
+        self.weights = [mix[route] for route in self.routes]
+        self.random = random.Random(seed)
+        keys = {key for route in self.routes for _, key in ENDPOINTS[route].files}
+        self.bodies = {key: Path(corpus[key]).read_bytes() for key in keys}
+        self.corpus = corpus
+        self.errors: Dict[str, str] = {}
+
+    async def send(self, route: str) -> int:
+        endpoint = ENDPOINTS[route]
+        files = [
+            (field_name, (Path(self.corpus[key]).name, self.bodies[key],
+                          CONTENT_TYPES.get(Path(self.corpus[key]).suffix, "application/octet-stream")))
+            for field_name, key in endpoint.files
+        ]
+        try:
+            response = await self.client.request(
+                endpoint.method, endpoint.path,
+                files=files or None,
+                data={name: str(value) for name, value in endpoint.data.items()} or None,
+            )
+        except httpx.HTTPError as e:
+            self.errors.setdefault(route, f"{type(e).__name__}: {e}")
+            return 0
+        if response.status_code >= 400 and response.status_code != 429:
+            self.errors.setdefault(route, f"HTTP {response.status_code}: {response.text[:200]}")
+        return response.status_code
+
+    async def _user(self, deadline: float, samples: List[Tuple[str, int, float]]):
+        while time.perf_counter() < deadline:
+            route = self.random.choices(self.routes, self.weights)[0]
+            started = time.perf_counter()
+            status = await self.send(route)
+            samples.append((route, status, time.perf_counter() - started))
+
+    async def run_level(self, concurrency: int, duration: float, warmup: float) -> Dict[str, Any]:
+        if warmup:
+            await asyncio.gather(*(self._user(time.perf_counter() + warmup, []) for _ in range(concurrency)))
+        samples: List[Tuple[str, int, float]] = []
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(self._user(deadline, samples) for _ in range(concurrency)))
+        # Requests in flight at the deadline finish late; count the real elapsed time
+        elapsed = time.perf_counter() - started
+        return {"concurrency": concurrency, "elapsed_s": round(elapsed, 2), "routes": summarize(samples, elapsed)}
+
+
+def print_level(level: Dict[str, Any]):
+    print(f"\nConcurrency {level['concurrency']} ({level['elapsed_s']} s)", file=sys.stderr)
+    header = ["route", "requests", "errors", "429", "rps", "p50 ms", "p95 ms", "p99 ms", "max ms"]
+    rows = [
+        [route, stats["requests"], stats["errors"], stats["rejected"], stats["throughput_rps"],
+         stats["p50_ms"], stats["p95_ms"], stats["p99_ms"], stats["max_ms"]]
+        for route, stats in sorted(level["routes"].items(), key=lambda item: item[0] == "all")
+    ]
+    widths = [max(len(str(row[i])) for row in rows + [header]) for i in range(len(header))]
+    for row in [header] + rows:
+        print("  " + "  ".join(str(cell).rjust(width) for cell, width in zip(row, widths)), file=sys.stderr)
+
+
+# ============== Targets ==============
+
+def _prepare_environment(temp_dir: Path, cache: bool):
+    """Settings for a backend running on the in-memory MongoDB stand-in"""
+    os.environ.setdefault("MONGO_URL", "mongodb://in-memory")
+    os.environ.setdefault("DB_NAME", "filelab_load")
+    os.environ.setdefault("JOB_STORE", "memory")
+    os.environ["TEMP_DIR"] = str(temp_dir)
+    if not cache:
+        os.environ["CONVERSION_CACHE_ENABLED"] = "false"
+    backend_dir = Path(__file__).resolve().parent.parent
+    if str(backend_dir) not in sys.path:
+        sys.path.insert(0, str(backend_dir))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(port: int):
+    """Run the backend under uvicorn with the in-memory MongoDB stand-in (used by --uvicorn)"""
+    import uvicorn
+
+    from benchmarks.memory_motor import install
+
+    install()
+    import server
+
+    uvicorn.run(server.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+async def _wait_until_healthy(url: str, timeout: float = 120):
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=url) as client:
+        while time.perf_counter() < deadline:
+            try:
+                if (await client.get("/api/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise SystemExit(f"Backend at {url} did not become healthy within {timeout:.0f} s")
+
+
+async def run_load(args, corpus: Dict[str, str], mix: Dict[str, int]) -> List[Dict[str, Any]]:
+    levels = [int(level) for level in args.concurrency.split(",")]
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    timeout = httpx.Timeout(args.timeout)
+
+    async def drive(client: httpx.AsyncClient) -> List[Dict[str, Any]]:
+        generator = LoadGenerator(client, mix, corpus, args.seed)
+        results = []
+        for concurrency in levels:
+            level = await generator.run_level(concurrency, args.duration, args.warmup)
+            print_level(level)
+            results.append(level)
+        for route, error in generator.errors.items():
+            print(f"First error for {route}: {error}", file=sys.stderr)
+        return results
+
+    if args.url or args.uvicorn:
+        await _wait_until_healthy(args.url)
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout) as client:
+            return await drive(client)
+
+    from benchmarks.memory_motor import install
+
+    install()
+    import server
+
+    async with server.app.router.lifespan_context(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout) as client:
+            return await drive(client)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API with a mix of endpoints")
+    parser.add_argument("--mix", default="default",
+                        help=f"Preset ({', '.join(MIXES)}) or route=weight list, e.g. 'pdf/merge=3,health=1'")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Comma separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=2, help="Unmeasured seconds before each level")
+    parser.add_argument("--timeout", type=float, default=300, help="Per-request timeout in seconds")
+    parser.add_argument("--url", help="Load test a running backend instead of an in-process app")
+    parser.add_argument("--uvicorn", action="store_true",
+                        help="Start the backend under uvicorn with the in-memory MongoDB stand-in")
+    parser.add_argument("--cache", action="store_true", help="Keep the conversion cache enabled")
+    parser.add_argument("--corpus", type=Path, default=Path(tempfile.gettempdir()) / "filelab-corpus")
+    parser.add_argument("--scale", type=int, default=1, help="Corpus size multiplier")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--output", type=Path, help="Write JSON results here")
+    parser.add_argument("--serve", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+        return
+
+    mix = parse_mix(args.mix)
+    for route in list(mix):
+        missing = missing_executables(ENDPOINTS[route].requires)
+        if missing and not args.url:
+            print(f"Skipping {route}: missing {', '.join(missing)}", file=sys.stderr)
+            del mix[route]
+    if not mix:
+        raise SystemExit("Nothing to run")
+
+    corpus = generate_corpus(args.corpus, args.scale, args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="filelab-load-") as temp_dir:
+        server_process = None
+        if not args.url:
+            _prepare_environment(Path(temp_dir), args.cache)
+        if args.uvicorn:
+            port = _free_port()
+            args.url = f"http://127.0.0.1:{port}"
+            server_process = subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.load", "--serve", str(port)],
+                cwd=Path(__file__).resolve().parent.parent
+            )
+        try:
+            levels = asyncio.run(run_load(args, corpus, mix))
+        finally:
+            if server_process is not None:
+                server_process.terminate()
+                server_process.wait(timeout=30)
+
+    if args.output:
+        report = {
+            "meta": {
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "target": "uvicorn" if args.uvicorn else (args.url or "in-process"),
+                "mix": mix,
+                "duration_s": args.duration,
+                "corpus_scale": args.scale,
+                "cpu_count": os.cpu_count(),
+            },
+            "levels": levels,
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nResults written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
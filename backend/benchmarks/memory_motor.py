@@ -0,0 +1,432 @@
+"""
+In-Memory Motor Stand-In
+
+A small asyncio replacement for motor's AsyncIOMotorClient, so the backend can
+be load tested without a MongoDB server. It implements the subset of the
+collection API the services use (inserts, find with projection/sort/limit,
+update_one/update_many/bulk_write/find_one_and_update with $set/$inc/
+$setOnInsert, deletes, index management as no-ops) with MongoDB's query
+semantics for the operators that appear in the code ($in, $gte, $lt, $or,
+$type, ...).
+
+Like BSON, datetimes are stored as naive UTC and documents are copied on the
+way in and out, so callers see what they would see from a real server.
+
+Install it before server.py is imported:
+
+    from benchmarks.memory_motor import install
+    install()
+    import server
+"""
+
+import asyncio
+import copy
+import itertools
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from bson import ObjectId
+
+_MISSING = object()
+
+
+def _to_bson(value: Any) -> Any:
+    """Copy a value the way a BSON round trip would (aware datetimes become naive UTC)"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+    if isinstance(value, dict):
+        return {key: _to_bson(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_bson(item) for item in value]
+    return value
+
+
+def _get(doc: Dict[str, Any], path: str) -> Any:
+    value: Any = doc
+    for part in path.split("."):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        else:
+            return _MISSING
+    return value
+
+
+def _set(doc: Dict[str, Any], path: str, value: Any):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+def _unset(doc: Dict[str, Any], path: str):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(parts[-1], None)
+
+
+_TYPE_NAMES = {
+    "string": str,
+    "date": datetime,
+    "bool": bool,
+    "int": int,
+    "double": float,
+    "object": dict,
+    "array": list,
+}
+
+
+def _compare(value: Any, operator: str, operand: Any) -> bool:
+    operand = _to_bson(operand)
+    if operator == "$eq":
+        return value == operand
+    if operator == "$ne":
+        return value != operand
+    if operator == "$in":
+        return value in operand
+    if operator == "$nin":
+        return value not in operand
+    if operator == "$exists":
+        return (value is not _MISSING) == bool(operand)
+    if operator == "$type":
+        expected = _TYPE_NAMES.get(operand)
+        return expected is not None and isinstance(value, expected)
+    if operator in ("$gt", "$gte", "$lt", "$lte"):
+        if value is _MISSING or value is None:
+            return False
+        try:
+            if operator == "$gt":
+                return value > operand
+            if operator == "$gte":
+                return value >= operand
+            if operator == "$lt":
+                return value < operand
+            return value <= operand
+        except TypeError:
+            # MongoDB never matches across BSON types
+            return False
+    raise NotImplementedError(f"Query operator {operator} is not supported by the in-memory stand-in")
+
+
+def matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """True if doc satisfies a MongoDB query filter"""
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, clause) for clause in condition):
+                return False
+            continue
+        if key == "$and":
+            if not all(matches(doc, clause) for clause in condition):
+                return False
+            continue
+        value = _get(doc, key)
+        if isinstance(condition, dict) and condition and all(op.startswith("$") for op in condition):
+            if not all(_compare(value, op, operand) for op, operand in condition.items()):
+                return False
+        elif (None if value is _MISSING else value) != _to_bson(condition):
+            return False
+    return True
+
+
+def _project(doc: Dict[str, Any], projection: Optional[Any]) -> Dict[str, Any]:
+    if not projection:
+        return copy.deepcopy(doc)
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+    include_id = projection.get("_id", 1)
+    included = [field for field, flag in projection.items() if flag and field != "_id"]
+    if included:
+        result = {}
+        for field in included:
+            value = _get(doc, field)
+            if value is not _MISSING:
+                _set(result, field, copy.deepcopy(value))
+        if include_id and "_id" in doc:
+            result["_id"] = doc["_id"]
+        return result
+    result = copy.deepcopy(doc)
+    for field, flag in projection.items():
+        if not flag:
+            _unset(result, field)
+    return result
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    # Missing/None sort first, like in MongoDB
+    if value is _MISSING or value is None:
+        return (0, 0)
+    return (1, value)
+
+
+def _apply_update(doc: Dict[str, Any], update: Any, inserting: bool):
+    if isinstance(update, list):
+        # Aggregation pipeline update; only $set stages with $toDate are needed here
+        for stage in update:
+            for field, expression in stage.get("$set", {}).items():
+                if isinstance(expression, dict) and "$toDate" in expression:
+                    source = _get(doc, expression["$toDate"].lstrip("$"))
+                    if isinstance(source, str):
+                        source = _to_bson(datetime.fromisoformat(source))
+                    _set(doc, field, source)
+                else:
+                    _set(doc, field, _to_bson(expression))
+        return
+    for operator, fields in update.items():
+        if operator == "$set" or (operator == "$setOnInsert" and inserting):
+            for field, value in fields.items():
+                _set(doc, field, _to_bson(value))
+        elif operator == "$setOnInsert":
+            continue
+        elif operator == "$inc":
+            for field, amount in fields.items():
+                current = _get(doc, field)
+                _set(doc, field, (0 if current is _MISSING else current) + amount)
+        elif operator == "$unset":
+            for field in fields:
+                _unset(doc, field)
+        else:
+            raise NotImplementedError(f"Update operator {operator} is not supported by the in-memory stand-in")
+
+
+class MemoryCursor:
+    """Lazy query result supporting sort/skip/limit, to_list and async iteration"""
+
+    def __init__(self, collection: "MemoryCollection", query: Dict[str, Any], projection: Optional[Any]):
+        self._collection = collection
+        self._query = query or {}
+        self._projection = projection
+        self._sort: List[Tuple[str, int]] = []
+        self._skip = 0
+        self._limit = 0
+        self._results: Optional[Iterator[Dict[str, Any]]] = None
+
+    def sort(self, key_or_list, direction: int = 1) -> "MemoryCursor":
+        if isinstance(key_or_list, str):
+            self._sort = [(key_or_list, direction)]
+        else:
+            self._sort = list(key_or_list)
+        return self
+
+    def skip(self, count: int) -> "MemoryCursor":
+        self._skip = count
+        return self
+
+    def limit(self, count: int) -> "MemoryCursor":
+        self._limit = count
+        return self
+
+    def _evaluate(self) -> List[Dict[str, Any]]:
+        docs = [doc for doc in self._collection._docs if matches(doc, self._query)]
+        for field, direction in reversed(self._sort):
+            docs.sort(key=lambda doc: _sort_key(_get(doc, field)), reverse=direction < 0)
+        docs = docs[self._skip:]
+        if self._limit:
+            docs = docs[:self._limit]
+        return [_project(doc, self._projection) for doc in docs]
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        await asyncio.sleep(0)
+        results = self._evaluate()
+        return results[:length] if length else results
+
+    def __aiter__(self):
+        self._results = iter(self._evaluate())
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        try:
+            return next(self._results)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class MemoryCollection:
+    """In-memory collection with the async API of motor's AsyncIOMotorCollection"""
+
+    def __init__(self, database: "MemoryDatabase", name: str):
+        self.database = database
+        self.name = name
+        self._docs: List[Dict[str, Any]] = []
+        self._indexes: Dict[str, Dict[str, Any]] = {"_id_": {"key": [("_id", 1)]}}
+
+    async def insert_one(self, document: Dict[str, Any]):
+        await asyncio.sleep(0)
+        document.setdefault("_id", ObjectId())
+        self._docs.append(_to_bson(document))
+        return SimpleNamespace(inserted_id=document["_id"], acknowledged=True)
+
+    async def insert_many(self, documents: List[Dict[str, Any]], ordered: bool = True):
+        await asyncio.sleep(0)
+        for document in documents:
+            document.setdefault("_id", ObjectId())
+            self._docs.append(_to_bson(document))
+        return SimpleNamespace(inserted_ids=[document["_id"] for document in documents], acknowledged=True)
+
+    def find(self, filter: Optional[Dict[str, Any]] = None, projection: Optional[Any] = None) -> MemoryCursor:
+        return MemoryCursor(self, filter or {}, projection)
+
+    async def find_one(self, filter: Optional[Dict[str, Any]] = None, projection: Optional[Any] = None):
+        results = await self.find(filter, projection).limit(1).to_list(1)
+        return results[0] if results else None
+
+    async def count_documents(self, filter: Dict[str, Any]) -> int:
+        await asyncio.sleep(0)
+        return sum(1 for doc in self._docs if matches(doc, filter))
+
+    def _update(self, filter: Dict[str, Any], update: Any, upsert: bool, many: bool):
+        matched = modified = 0
+        for doc in self._docs:
+            if matches(doc, filter):
+                before = copy.deepcopy(doc)
+                _apply_update(doc, update, inserting=False)
+                matched += 1
+                modified += doc != before
+                if not many:
+                    break
+        upserted_id = None
+        if not matched and upsert:
+            doc = {
+                key: _to_bson(value) for key, value in filter.items()
+                if not key.startswith("$") and not isinstance(value, dict)
+            }
+            _apply_update(doc, update, inserting=True)
+            doc.setdefault("_id", ObjectId())
+            upserted_id = doc["_id"]
+            self._docs.append(doc)
+        return matched, modified, upserted_id
+
+    async def update_one(self, filter: Dict[str, Any], update: Any, upsert: bool = False):
+        await asyncio.sleep(0)
+        matched, modified, upserted_id = self._update(filter, update, upsert, many=False)
+        return SimpleNamespace(matched_count=matched, modified_count=modified, upserted_id=upserted_id)
+
+    async def update_many(self, filter: Dict[str, Any], update: Any, upsert: bool = False):
+        await asyncio.sleep(0)
+        matched, modified, upserted_id = self._update(filter, update, upsert, many=True)
+        return SimpleNamespace(matched_count=matched, modified_count=modified, upserted_id=upserted_id)
+
+    async def find_one_and_update(
+        self,
+        filter: Dict[str, Any],
+        update: Any,
+        projection: Optional[Any] = None,
+        sort: Optional[List[Tuple[str, int]]] = None,
+        return_document: bool = False
+    ):
+        """Update the first match in sort order; returns it as it was (or, with return_document=True, is)"""
+        await asyncio.sleep(0)
+        docs = [doc for doc in self._docs if matches(doc, filter or {})]
+        for field, direction in reversed(sort or []):
+            docs.sort(key=lambda doc: _sort_key(_get(doc, field)), reverse=direction < 0)
+        if not docs:
+            return None
+        before = _project(docs[0], projection)
+        _apply_update(docs[0], update, inserting=False)
+        return _project(docs[0], projection) if return_document else before
+
+    async def bulk_write(self, requests: List[Any], ordered: bool = True):
+        """Apply pymongo UpdateOne/UpdateMany/InsertOne requests"""
+        await asyncio.sleep(0)
+        inserted = matched = modified = upserted = 0
+        for request in requests:
+            kind = type(request).__name__
+            if kind == "InsertOne":
+                await self.insert_one(request._doc)
+                inserted += 1
+            elif kind in ("UpdateOne", "UpdateMany"):
+                result = self._update(request._filter, request._doc, request._upsert, many=kind == "UpdateMany")
+                matched += result[0]
+                modified += result[1]
+                upserted += result[2] is not None
+            else:
+                raise NotImplementedError(f"{kind} is not supported by the in-memory stand-in")
+        return SimpleNamespace(
+            inserted_count=inserted, matched_count=matched, modified_count=modified, upserted_count=upserted
+        )
+
+    async def delete_one(self, filter: Dict[str, Any]):
+        await asyncio.sleep(0)
+        for index, doc in enumerate(self._docs):
+            if matches(doc, filter):
+                del self._docs[index]
+                return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+
+    async def delete_many(self, filter: Dict[str, Any]):
+        await asyncio.sleep(0)
+        kept = [doc for doc in self._docs if not matches(doc, filter)]
+        deleted = len(self._docs) - len(kept)
+        self._docs = kept
+        return SimpleNamespace(deleted_count=deleted)
+
+    async def create_index(self, keys, name: Optional[str] = None, **options) -> str:
+        # Indexes are recorded but not enforced (no uniqueness or TTL expiry)
+        if isinstance(keys, str):
+            keys = [(keys, 1)]
+        name = name or "_".join(f"{field}_{direction}" for field, direction in keys)
+        self._indexes[name] = dict(options, key=list(keys))
+        return name
+
+    async def drop_index(self, name: str):
+        self._indexes.pop(name, None)
+
+    async def index_information(self) -> Dict[str, Dict[str, Any]]:
+        return copy.deepcopy(self._indexes)
+
+
+class MemoryDatabase:
+    """Database handle; collections are created on first access"""
+
+    def __init__(self, client: "MemoryMotorClient", name: str):
+        self.client = client
+        self.name = name
+        self._collections: Dict[str, MemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(self, name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def command(self, command: str, *args, **kwargs) -> Dict[str, Any]:
+        # collMod, ping, ... succeed without doing anything
+        return {"ok": 1.0}
+
+
+class MemoryMotorClient:
+    """Drop-in replacement for AsyncIOMotorClient(url)"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, *args, **kwargs):
+        self.id = next(self._ids)
+        self._databases: Dict[str, MemoryDatabase] = {}
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        if name not in self._databases:
+            self._databases[name] = MemoryDatabase(self, name)
+        return self._databases[name]
+
+    def __getattr__(self, name: str) -> MemoryDatabase:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def close(self):
+        pass
+
+
+def install():
+    """Make motor.motor_asyncio.AsyncIOMotorClient the in-memory stand-in (call before importing server)"""
+    import motor.motor_asyncio
+
+    motor.motor_asyncio.AsyncIOMotorClient = MemoryMotorClient
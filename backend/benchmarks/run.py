@@ -0,0 +1,296 @@
+"""
+Conversion Engine Benchmarks
+
+Runs every conversion engine function directly (no HTTP, no MongoDB) on the
+synthetic corpus and records wall time, peak RSS and output size as JSON:
+
+    python -m benchmarks.run --corpus /tmp/filelab-corpus --output results.json
+
+Each run happens in a forked child of a process that has already imported
+the engine modules, so import cost is excluded and peak RSS belongs to that single
+conversion. Cases whose external tools (soffice, tesseract, pdftoppm) are
+missing are reported as "skipped" rather than silently falling back.
+
+Compare two result files with benchmarks.compare.
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import re
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from benchmarks.corpus import DEFAULT_SEED, generate_corpus
+
+RESULTS_FORMAT_VERSION = 1
+
+# A case input is a corpus key, or a list of keys for functions taking several files
+CaseInput = Union[str, List[str]]
+
+
+@dataclass
+class Case:
+    """One benchmarked function call"""
+    name: str
+    group: str
+    function: str                 # "module:attribute"
+    inputs: Sequence[CaseInput]   # positional file arguments (corpus keys)
+    args: Sequence[Any] = ()      # further positional arguments
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    requires: Sequence[str] = ()  # executables that must be on PATH
+
+
+CASES: List[Case] = [
+    # Document conversions
+    Case("pdf_to_docx", "convert", "engines.pdf:convert_pdf_to_docx", ["text_pdf_b"]),
+    Case("pdf_to_text", "convert", "engines.pdf:convert_pdf_to_text", ["text_pdf"]),
+    Case("pdf_to_excel_precise", "convert", "engines.pdf:convert_pdf_to_excel", ["table_pdf"], kwargs={"quality": "precise"}),
+    Case("pdf_to_excel_fast", "convert", "engines.pdf:convert_pdf_to_excel", ["table_pdf"], kwargs={"quality": "fast"}),
+    Case("pdf_to_pptx", "convert", "engines.pdf:convert_pdf_to_pptx", ["text_pdf_b"], requires=["pdftoppm"]),
+    Case("docx_to_pdf", "convert", "engines.office:convert_docx_to_pdf", ["docx"], requires=["soffice"]),
+    Case("excel_to_pdf", "convert", "engines.office:convert_excel_to_pdf", ["xlsx"], requires=["soffice"]),
+    Case("pptx_to_pdf", "convert", "engines.office:convert_pptx_to_pdf", ["pptx"], requires=["soffice"]),
+    Case("text_to_pdf", "convert", "engines.pdf:convert_text_to_pdf", ["text_file"]),
+    Case("text_to_docx", "convert", "engines.office:convert_text_to_docx", ["text_file"]),
+    # Images
+    Case("image_to_pdf", "image", "engines.image:convert_image_to_pdf", ["photo"]),
+    Case("images_to_pdf", "image", "engines.image:convert_multiple_images_to_pdf", [["photo", "text_image"]]),
+    Case("image_jpg_to_png", "image", "engines.image:convert_image_format", ["photo"], args=["png"]),
+    Case("image_resize", "image", "engines.image:resize_image", ["photo"], args=[1920, 1080]),
+    # Watermarks
+    Case("watermark_text", "watermark", "services.watermark_service:add_text_watermark", ["text_pdf"], args=["CONFIDENTIAL"]),
+    Case("watermark_image", "watermark", "services.watermark_service:add_image_watermark", ["text_pdf", "logo"]),
+    # OCR
+    Case("ocr_image", "ocr", "engines.ocr:ocr_image", ["text_image"], requires=["tesseract"]),
+    Case("ocr_detect_language", "ocr", "engines.ocr:detect_language_from_image", ["text_image"], requires=["tesseract"]),
+    # PDF tools
+    Case("pdf_merge", "pdf_tools", "engines.pdf:merge_pdfs", [["text_pdf", "text_pdf_b", "table_pdf"]]),
+    Case("pdf_split", "pdf_tools", "engines.pdf:split_pdf", ["text_pdf"], args=["1-5,6-10,11-20"]),
+    Case("pdf_lock", "pdf_tools", "engines.pdf:lock_pdf", ["text_pdf"], args=["secret"]),
+    # Search
+    Case("pdf_search", "search", "engines.search:search_in_pdf", ["text_pdf"], args=["revenue"]),
+    Case("pdf_search_scanned", "search", "engines.search:search_in_pdf", ["scanned_pdf"], args=["revenue"]),
+]
+
+# Executables are looked up under several names
+EXECUTABLE_ALIASES = {
+    "soffice": ("soffice", "libreoffice"),
+    "tesseract": ("tesseract",),
+    "pdftoppm": ("pdftoppm",),
+}
+
+
+def missing_executables(names: Sequence[str]) -> List[str]:
+    """Names of required executables that are not on PATH"""
+    return [
+        name for name in names
+        if not any(shutil.which(alias) for alias in EXECUTABLE_ALIASES.get(name, (name,)))
+    ]
+
+
+def _resolve(function: str):
+    module_name, attribute = function.split(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _output_size(result: Any) -> Optional[int]:
+    if isinstance(result, Path):
+        if result.is_dir():
+            return sum(path.stat().st_size for path in result.rglob("*") if path.is_file())
+        return result.stat().st_size if result.exists() else None
+    if isinstance(result, (list, tuple)):
+        sizes = [_output_size(item) for item in result]
+        return sum(size for size in sizes if size is not None)
+    if isinstance(result, str):
+        return len(result.encode("utf-8"))
+    if isinstance(result, dict):
+        return len(json.dumps(result, default=str).encode("utf-8"))
+    return None
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return 0
+
+
+def _peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _run_in_child(case: Case, corpus: Dict[str, str], connection, quiet: bool):
+    """Child process body: run the case once and send the measurements back"""
+    try:
+        if quiet:
+            devnull = open(os.devnull, "w")
+            os.dup2(devnull.fileno(), 1)
+            os.dup2(devnull.fileno(), 2)
+        func = _resolve(case.function)
+        inputs = [
+            [Path(corpus[key]) for key in item] if isinstance(item, list) else Path(corpus[item])
+            for item in case.inputs
+        ]
+        baseline_rss = _rss_bytes()
+        started = time.perf_counter()
+        result = func(*inputs, *case.args, **case.kwargs)
+        wall = time.perf_counter() - started
+        connection.send({
+            "wall_s": wall,
+            "peak_rss_bytes": _peak_rss_bytes(),
+            "rss_growth_bytes": max(0, _peak_rss_bytes() - baseline_rss),
+            "output_size": _output_size(result),
+        })
+    except BaseException as e:
+        connection.send({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        connection.close()
+
+
+def run_case(case: Case, corpus: Dict[str, str], repeats: int, timeout: float, quiet: bool) -> Dict[str, Any]:
+    """Benchmark one case over several forked runs"""
+    result: Dict[str, Any] = {"case": case.name, "group": case.group, "function": case.function}
+    missing = missing_executables(case.requires)
+    if missing:
+        result.update(status="skipped", reason=f"missing {', '.join(missing)}")
+        return result
+
+    input_keys = [key for item in case.inputs for key in (item if isinstance(item, list) else [item])]
+    result["input_size"] = sum(Path(corpus[key]).stat().st_size for key in input_keys)
+
+    context = multiprocessing.get_context("fork")
+    runs = []
+    for _ in range(repeats):
+        parent_end, child_end = context.Pipe(duplex=False)
+        process = context.Process(target=_run_in_child, args=(case, corpus, child_end, quiet))
+        process.start()
+        child_end.close()
+        if not parent_end.poll(timeout):
+            process.kill()
+            process.join()
+            result.update(status="timeout", reason=f"no result after {timeout:.0f} s")
+            return result
+        measurement = parent_end.recv()
+        process.join()
+        if "error" in measurement:
+            result.update(status="error", reason=measurement["error"])
+            return result
+        runs.append(measurement)
+
+    walls = [run["wall_s"] for run in runs]
+    result.update(
+        status="ok",
+        repeats=repeats,
+        wall_s={
+            "min": round(min(walls), 4),
+            "median": round(statistics.median(walls), 4),
+            "max": round(max(walls), 4),
+        },
+        peak_rss_bytes=max(run["peak_rss_bytes"] for run in runs),
+        rss_growth_bytes=max(run["rss_growth_bytes"] for run in runs),
+        output_size=runs[-1]["output_size"],
+    )
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _prepare_environment(temp_dir: Path):
+    """Point the engines at a scratch temp directory and make them importable"""
+    os.environ["TEMP_DIR"] = str(temp_dir)
+    backend_dir = Path(__file__).resolve().parent.parent
+    if str(backend_dir) not in sys.path:
+        sys.path.insert(0, str(backend_dir))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every conversion engine on a synthetic corpus")
+    parser.add_argument("--corpus", type=Path, default=Path(tempfile.gettempdir()) / "filelab-corpus")
+    parser.add_argument("--scale", type=int, default=1, help="Corpus size multiplier")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per case (median is compared)")
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds before a run is killed")
+    parser.add_argument("--only", help="Regex on case names to run")
+    parser.add_argument("--group", action="append", help="Only run this group (repeatable)")
+    parser.add_argument("--output", type=Path, help="Write JSON results here (default: stdout)")
+    parser.add_argument("--verbose", action="store_true", help="Show converter output")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.corpus, args.scale, args.seed)
+
+    cases = [
+        case for case in CASES
+        if (not args.only or re.search(args.only, case.name))
+        and (not args.group or case.group in args.group)
+    ]
+
+    with tempfile.TemporaryDirectory(prefix="filelab-bench-") as temp_dir:
+        _prepare_environment(Path(temp_dir))
+        # Import once in the parent so forked runs measure conversions, not imports
+        # (conversion libraries are imported lazily, so warm them up too)
+        with contextlib.redirect_stdout(sys.stderr if not args.verbose else sys.stdout):
+            for module_name in sorted({case.function.split(":")[0] for case in cases}):
+                importlib.import_module(module_name)
+            engines = importlib.import_module("engines")
+            importlib.import_module("services.warmup_service").import_engine_modules(engines.engine_libraries())
+
+        results = []
+        for case in cases:
+            print(f"Running {case.name}...", file=sys.stderr)
+            outcome = run_case(case, corpus, args.repeats, args.timeout, quiet=not args.verbose)
+            if outcome["status"] == "ok":
+                summary = f"{outcome['wall_s']['median']:.3f} s, {outcome['peak_rss_bytes'] // (1024 * 1024)} MB peak"
+            else:
+                summary = f"{outcome['status']}: {outcome.get('reason')}"
+            print(f"  {summary}", file=sys.stderr)
+            results.append(outcome)
+
+    report = {
+        "version": RESULTS_FORMAT_VERSION,
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "corpus_scale": args.scale,
+            "corpus_seed": args.seed,
+            "repeats": args.repeats,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
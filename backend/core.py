@@ -0,0 +1,410 @@
+"""
+Application Core
+
+State shared by server.py and the route modules: configuration, the MongoDB
+client, the conversion cache, history recording, the background job manager
+and upload handling. Routes import from here rather than from server.py, so
+the app module can include them without circular imports.
+"""
+
+import asyncio
+import os
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, UploadFile
+from motor.motor_asyncio import AsyncIOMotorClient
+from pydantic import BaseModel, ConfigDict, Field
+from pypdf import PdfReader
+
+from engines import conversion_graph
+from engines.graph import Conversion, ConversionStepError, NoConversionRouteError
+from services.admission_service import EngineBusyError
+from services.cache_service import ConversionCache, CONVERSION_CACHE_METADATA
+from services.executor_service import run_engine
+from services.history_service import (
+    HistoryWriter,
+    ensure_history_indexes,
+    ensure_stats_indexes,
+    migrate_string_timestamps,
+)
+from services.job_service import (
+    InMemoryJobStore,
+    JobManager,
+    MongoJobStore,
+    SQLiteJobStore,
+    JOB_CANCELLED,
+    JOB_COMPLETED,
+    JOB_EXECUTION_LOCAL,
+    JOB_EXECUTION_MODE,
+    JOB_EXECUTION_WORKER,
+)
+from services.limits_service import ResourceLimitError
+from services.profiling_service import profiling_active
+from services.temp_service import TempJanitor, track_request_file, JOBS_DIR_NAME, QUEUE_DIR_NAME
+from services.timing_service import current_timings, record, record_engine, request_elapsed_ms
+from services.upload_service import IngestedFile, UploadTooLargeError, ingest_upload
+
+# ============== FILE SIZE CONSTANTS ==============
+# Maximum file size: 30MB by default (MAX_FILE_SIZE_MB overrides it)
+MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE_MB", "30")) * 1024 * 1024
+
+# Maximum size of each PDF combined by /api/pdf/merge
+MERGE_MAX_FILE_SIZE = 50 * 1024 * 1024
+
+# Per-file limits of the routes that accept larger files than MAX_FILE_SIZE.
+# UploadSizeLimitMiddleware cuts off any file past its limit while it is uploaded.
+MAX_FILE_SIZE_OVERRIDES = {"/api/pdf/merge": MERGE_MAX_FILE_SIZE}
+
+# Maximum size of a whole request body, covering multi-file uploads
+MAX_REQUEST_SIZE = int(os.getenv("MAX_REQUEST_SIZE_MB", "1024")) * 1024 * 1024
+
+# Helper function to format file size for display
+def format_file_size(bytes_size):
+    """Format file size in human-readable format"""
+    if bytes_size == 0:
+        return '0 Bytes'
+    units = ['Bytes', 'KB', 'MB', 'GB']
+    i = 0
+    while bytes_size >= 1024 and i < len(units) - 1:
+        bytes_size /= 1024
+        i += 1
+    return f"{bytes_size:.2f} {units[i]}"
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+# MongoDB connection
+mongo_url = os.environ['MONGO_URL']
+client = AsyncIOMotorClient(mongo_url)
+db = client[os.environ['DB_NAME']]
+
+# Create temp directory for file operations
+# TEMP_DIR = Path("/tmp/file_conversions")
+# TEMP_DIR.mkdir(exist_ok=True)
+# make TEMP_DIR Windows-friendly and auto-create
+TEMP_DIR = Path(os.getenv("TEMP_DIR", Path.cwd() / "tmp" / "file_conversions"))
+TEMP_DIR.mkdir(parents=True, exist_ok=True)
+
+# Content-addressed cache of conversion results (see services/cache_service.py)
+conversion_cache = ConversionCache(
+    TEMP_DIR / "cache",
+    metadata_collection=db.conversion_cache if CONVERSION_CACHE_METADATA else None
+)
+
+
+async def run_cached_engine(engine: str, func, *args, **kwargs):
+    """Run a conversion on its engine pool, serving repeated inputs from the result cache.
+
+    The cache key covers the content of every Path argument plus all other
+    arguments, so the same file with different options is converted again.
+    Profiled requests always convert, since a cache hit has nothing to profile.
+    """
+    key, cached_path = await conversion_cache.lookup(func.__name__, args, kwargs, TEMP_DIR)
+    if cached_path is not None and profiling_active():
+        cached_path.unlink(missing_ok=True)
+        cached_path = None
+    if cached_path is not None:
+        print(f"Serving {func.__name__} result from conversion cache")
+        record_engine("cache")
+        record("output_size", cached_path.stat().st_size)
+        return cached_path
+
+    output_path = await run_engine(engine, func, *args, **kwargs)
+    await conversion_cache.store(key, func.__name__, output_path)
+    return output_path
+
+
+# Define Models
+class ConversionHistory(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    conversion_type: str
+    source_format: str
+    target_format: str
+    filename: str
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    status: str
+    duration_ms: Optional[float] = None
+    # Per-stage measurements (see services/timing_service.py)
+    input_size: Optional[int] = None
+    page_count: Optional[int] = None
+    upload_ms: Optional[float] = None
+    queue_ms: Optional[float] = None
+    conversion_ms: Optional[float] = None
+    output_size: Optional[int] = None
+    engine_used: Optional[str] = None
+    # Resource usage of the engine calls (see services/limits_service.py)
+    cpu_ms: Optional[float] = None
+    peak_memory_mb: Optional[float] = None
+
+class ConversionHistoryCreate(BaseModel):
+    conversion_type: str
+    source_format: str
+    target_format: str
+    filename: str
+    status: str
+
+class ConversionJob(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    id: str
+    operation: str
+    status: str
+    progress: int
+    filename: str
+    source_format: str
+    target_format: str
+    error: Optional[str] = None
+    # Worker process running the job (JOB_EXECUTION_MODE=worker)
+    worker: Optional[str] = None
+    cancel_requested: bool = False
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+# Buffered, batched writer for conversion history (see services/history_service.py)
+history_writer = HistoryWriter(db.conversion_history, stats_collection=db.conversion_stats)
+
+
+async def save_conversion_history(
+    conversion_type: str,
+    source_format: str,
+    target_format: str,
+    filename: str,
+    status: str = "success",
+    error: Optional[str] = None,
+    duration_ms: Optional[float] = None
+):
+    """Record a conversion in the history without waiting on MongoDB.
+
+    duration_ms defaults to the time since the current request started; the
+    stage measurements recorded in the request's timing context are added.
+    """
+    if duration_ms is None:
+        duration_ms = request_elapsed_ms()
+    history = ConversionHistory(
+        conversion_type=conversion_type,
+        source_format=source_format,
+        target_format=target_format,
+        filename=filename,
+        status=status,
+        duration_ms=round(duration_ms, 1) if duration_ms is not None else None,
+        **current_timings()
+    )
+    # Stored as a native date so it can be indexed, range-filtered and expired by TTL
+    doc = history.model_dump()
+    if error is not None:
+        doc["error"] = error
+    await history_writer.write(doc)
+
+
+async def prepare_history_collection():
+    """Create history indexes and migrate legacy string timestamps (runs in the background)"""
+    try:
+        await ensure_history_indexes(db.conversion_history)
+        await ensure_stats_indexes(db.conversion_stats)
+        migrated = await migrate_string_timestamps(db.conversion_history)
+        if migrated:
+            print(f"Migrated {migrated} history records to native timestamps")
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"Failed to prepare conversion history collection: {e}")
+
+
+async def save_job_history(job: dict, error: Optional[str]):
+    """Record a finished background job in the conversion history.
+
+    The job task inherited the submitting request's timing context, so its
+    upload and conversion measurements are included.
+    """
+    # Time spent converting, not waiting in the queue (jobs failing before start count from creation)
+    started_at = job.get("started_at") or job["created_at"]
+    duration_ms = (job["finished_at"] - started_at).total_seconds() * 1000
+    await save_conversion_history(
+        conversion_type="job",
+        source_format=job["source_format"],
+        target_format=job["target_format"],
+        filename=job["filename"],
+        status={JOB_COMPLETED: "success", JOB_CANCELLED: "cancelled"}.get(job["status"], "failed"),
+        error=error,
+        duration_ms=duration_ms
+    )
+
+
+# Background job store: "mongo" (shared between hosts), "sqlite" (shared between
+# the processes of one host) or "memory" (single process)
+JOB_STORE_BACKEND = os.getenv("JOB_STORE", "mongo").lower()
+if JOB_STORE_BACKEND == "memory":
+    job_store = InMemoryJobStore()
+elif JOB_STORE_BACKEND == "sqlite":
+    job_store = SQLiteJobStore(Path(os.getenv("JOB_STORE_PATH", TEMP_DIR / QUEUE_DIR_NAME / "jobs.sqlite3")))
+else:
+    job_store = MongoJobStore(db.conversion_jobs)
+
+# Jobs run in the API process ("local") or in worker.py processes claiming them from the store ("worker")
+job_execution_mode = JOB_EXECUTION_MODE
+if job_execution_mode not in (JOB_EXECUTION_LOCAL, JOB_EXECUTION_WORKER):
+    print(f"Unknown JOB_EXECUTION_MODE '{job_execution_mode}', running jobs locally")
+    job_execution_mode = JOB_EXECUTION_LOCAL
+elif job_execution_mode == JOB_EXECUTION_WORKER and isinstance(job_store, InMemoryJobStore):
+    print("JOB_EXECUTION_MODE=worker needs a shared job store (JOB_STORE=mongo or sqlite), running jobs locally")
+    job_execution_mode = JOB_EXECUTION_LOCAL
+
+# Inputs and results live in TEMP_DIR/jobs, which workers must share with the API
+job_manager = JobManager(
+    job_store,
+    on_finished=save_job_history,
+    runner=run_cached_engine,
+    artifact_dir=TEMP_DIR / JOBS_DIR_NAME,
+    execute_locally=job_execution_mode == JOB_EXECUTION_LOCAL
+)
+
+
+async def prepare_job_store():
+    """Create the job store's indexes; jobs still work without them, only slower"""
+    try:
+        await job_store.ensure_indexes()
+    except Exception as e:
+        print(f"Failed to prepare the job store: {e}")
+
+
+# Background cleanup of expired temp files (see services/temp_service.py); the
+# files of jobs still queued or running, in any process, are kept
+temp_janitor = TempJanitor(TEMP_DIR, active_job_ids=job_manager.active_job_ids)
+
+
+# ============== Format Graph Conversions ==============
+
+# Routes tried per conversion: the cheapest, then the next cheapest without the failed step
+CONVERSION_MAX_ATTEMPTS = 3
+
+
+async def run_conversion_route(input_path: Path, route: List[Conversion]) -> Path:
+    """Run the steps of a format graph route, each on its engine's pool.
+
+    Intermediate files are deleted as soon as the next step has read them.
+    Raises ConversionStepError naming the step that failed.
+    """
+    current_path = input_path
+    for step in route:
+        try:
+            output_path = await run_cached_engine(step.engine, step.function, current_path, *step.args)
+        except (EngineBusyError, ResourceLimitError):
+            # Another route would not make the server less busy, nor the document less heavy
+            raise
+        except Exception as e:
+            raise ConversionStepError(step, e) from e
+        finally:
+            if current_path != input_path:
+                current_path.unlink(missing_ok=True)
+        current_path = output_path
+    return current_path
+
+
+async def convert_format(input_path: Path, source_format: str, target_format: str) -> Path:
+    """Convert input_path along the cheapest route of the format graph.
+
+    When a step fails, the route is planned again without that step, so a
+    more expensive route (another engine, or an intermediate format) serves
+    as the fallback. Raises NoConversionRouteError when no route exists.
+    """
+    graph = conversion_graph()
+    failed_steps = set()
+    last_error = None
+    for _ in range(CONVERSION_MAX_ATTEMPTS):
+        route = graph.plan(source_format, target_format, exclude=failed_steps)
+        if route is None:
+            break
+        try:
+            return await run_conversion_route(input_path, route)
+        except ConversionStepError as e:
+            print(f"Conversion route step failed, trying the next route: {e}")
+            failed_steps.add(e.step)
+            last_error = e.error
+    if last_error is not None:
+        raise last_error
+    raise NoConversionRouteError(f"Conversion from {source_format} to {target_format} is not supported")
+
+
+# ============== Uploads ==============
+
+def _ingest_upload(upload_file: UploadFile, max_size: int, count_pages: bool) -> Tuple[IngestedFile, Optional[int]]:
+    ingested = ingest_upload(upload_file, TEMP_DIR, max_size)
+    page_count = None
+    if count_pages and ingested.detected_format == "pdf":
+        page_count = count_pdf_pages(ingested.path)
+    return ingested, page_count
+
+async def ingest_upload_file(
+    upload_file: UploadFile,
+    max_size: int = MAX_FILE_SIZE,
+    count_pages: bool = False
+) -> IngestedFile:
+    """Stream an uploaded file to the temp directory in chunks, off the event loop.
+
+    The content hash and sniffed file type are computed while writing, and
+    writing stops with 413 as soon as the file grows past max_size. PDF pages
+    are counted (parsing the upload's page tree) only with count_pages, for
+    routes whose cost depends on the page count.
+    """
+    try:
+        ingested, page_count = await asyncio.to_thread(_ingest_upload, upload_file, max_size, count_pages)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    # Uploads are deleted once the response has been sent
+    track_request_file(ingested.path)
+
+    record("input_size", ingested.size)
+    if page_count is not None:
+        record("page_count", page_count)
+    # Receiving and parsing the body happens before the route runs, so the
+    # upload stage is everything from request start until the file is on disk
+    upload_ms = request_elapsed_ms()
+    if upload_ms is not None:
+        record("upload_ms", round(upload_ms, 1))
+    return ingested
+
+def count_pdf_pages(pdf_path: Path) -> Optional[int]:
+    """Page count from the PDF page tree (reads the xref and /Count, not the pages)"""
+    try:
+        return len(PdfReader(str(pdf_path), strict=False).pages)
+    except Exception:
+        return None
+
+async def save_upload_file_tmp(
+    upload_file: UploadFile,
+    max_size: int = MAX_FILE_SIZE,
+    count_pages: bool = False
+) -> Path:
+    """Save uploaded file to temp directory"""
+    return (await ingest_upload_file(upload_file, max_size, count_pages)).path
+
+
+# ============== Media Types ==============
+
+MEDIA_TYPE_PDF = "application/pdf"
+MEDIA_TYPE_DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+MEDIA_TYPE_DOC = "application/msword"
+MEDIA_TYPE_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+MEDIA_TYPE_PPTX = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+# Media types by (normalized) format, for responses whose format varies
+MEDIA_TYPES = {
+    "pdf": MEDIA_TYPE_PDF,
+    "docx": MEDIA_TYPE_DOCX,
+    "doc": MEDIA_TYPE_DOC,
+    "txt": "text/plain",
+    "xlsx": MEDIA_TYPE_XLSX,
+    "pptx": MEDIA_TYPE_PPTX,
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+    "bmp": "image/bmp",
+}
@@ -0,0 +1,152 @@
+"""
+Engine Registry
+
+Each conversion engine is a module with the blocking conversion functions for
+one family of formats (engines/<name>.py) and a router module with its
+endpoints and background job operations (routes/<name>.py). server.py only
+imports and mounts the engines listed in ENABLED_ENGINES, so a worker can be
+started with just the engines it serves, e.g. an OCR-only replica:
+
+    ENABLED_ENGINES=ocr uvicorn server:app
+
+Engine modules import nothing from the app (no MongoDB, no FastAPI), so they
+can also be loaded on their own by the executor pools and the benchmarks.
+An engine module may define start() and shutdown() hooks, which the server
+calls from its lifespan, and a CONVERSIONS list of format graph edges (see
+engines/graph.py), which conversion_graph() routes /convert/document through.
+
+Configuration (environment variables):
+- ENABLED_ENGINES: comma separated engines this process serves (default: all)
+"""
+
+import dataclasses
+import functools
+import importlib
+import logging
+import os
+import shutil
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Dict, List, Tuple
+
+from services.executor_service import (
+    ENGINE_OFFICE,
+    ENGINE_PDF,
+    ENGINE_IMAGE,
+    ENGINE_OCR,
+    ENGINE_WATERMARK,
+    ENGINE_SEARCH,
+    ENGINE_ZIP
+)
+from services.libreoffice_service import find_soffice_binary
+from engines.graph import Conversion, FormatGraph
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class EngineSpec:
+    """Where an engine's conversion functions and routes live"""
+    name: str
+    module: str
+    routes: str
+    # Conversion libraries the engine imports on first use (warmed up ahead of time)
+    libraries: Tuple[str, ...] = ()
+
+
+ENGINES: Dict[str, EngineSpec] = {spec.name: spec for spec in (
+    EngineSpec(ENGINE_OFFICE, "engines.office", "routes.office",
+               ("openpyxl", "xlsx2pdf.transformator", "pptx", "docx", "docx2pdf")),
+    EngineSpec(ENGINE_PDF, "engines.pdf", "routes.pdf",
+               ("pytesseract", "pdf2docx", "openpyxl", "pdfplumber", "pptx", "docx", "pdf2image")),
+    EngineSpec(ENGINE_IMAGE, "engines.image", "routes.image"),
+    EngineSpec(ENGINE_OCR, "engines.ocr", "routes.ocr", ("pytesseract",)),
+    EngineSpec(ENGINE_WATERMARK, "services.watermark_service", "routes.watermark"),
+    EngineSpec(ENGINE_SEARCH, "engines.search", "routes.search"),
+    EngineSpec(ENGINE_ZIP, "engines.zip", "routes.zip"),
+)}
+
+
+class EngineDisabledError(RuntimeError):
+    """Raised when a conversion needs an engine this process does not serve"""
+
+
+def _parse_enabled_engines(value: str) -> Tuple[str, ...]:
+    names = [name.strip().lower() for name in value.split(",") if name.strip()]
+    if not names or "all" in names:
+        return tuple(ENGINES)
+    unknown = [name for name in names if name not in ENGINES]
+    if unknown:
+        logger.warning(f"Ignoring unknown engines in ENABLED_ENGINES: {', '.join(unknown)}")
+    # Registry order, so routes are mounted the same way whatever the env lists
+    return tuple(name for name in ENGINES if name in names)
+
+
+ENABLED_ENGINES = _parse_enabled_engines(os.getenv("ENABLED_ENGINES", "all"))
+
+
+def engine_enabled(name: str) -> bool:
+    """Whether this process serves the engine"""
+    return name in ENABLED_ENGINES
+
+
+def load_engine(name: str) -> ModuleType:
+    """Import an enabled engine's conversion module"""
+    if not engine_enabled(name):
+        raise EngineDisabledError(f"The {name} engine is not enabled on this server")
+    return importlib.import_module(ENGINES[name].module)
+
+
+def load_engine_routes() -> List[ModuleType]:
+    """Import the router modules of the enabled engines"""
+    return [importlib.import_module(ENGINES[name].routes) for name in ENABLED_ENGINES]
+
+
+def engine_libraries() -> Tuple[str, ...]:
+    """Conversion libraries used by the enabled engines, without duplicates"""
+    libraries = []
+    for name in ENABLED_ENGINES:
+        libraries.extend(lib for lib in ENGINES[name].libraries if lib not in libraries)
+    return tuple(libraries)
+
+
+def start_engines():
+    """Call the start() hook of every enabled engine that has one"""
+    for name in ENABLED_ENGINES:
+        hook = getattr(load_engine(name), "start", None)
+        if hook is not None:
+            hook()
+
+
+def shutdown_engines():
+    """Call the shutdown() hook of every enabled engine that has one"""
+    for name in ENABLED_ENGINES:
+        hook = getattr(load_engine(name), "shutdown", None)
+        if hook is not None:
+            hook()
+
+
+@functools.lru_cache(maxsize=None)
+def requirement_met(name: str) -> bool:
+    """Whether an external tool a conversion needs is installed (checked once per process)"""
+    if name == "libreoffice":
+        return find_soffice_binary() is not None
+    return shutil.which(name) is not None
+
+
+def declared_conversions() -> List[Conversion]:
+    """Format graph edges declared by the enabled engines, tagged with their engine"""
+    conversions = []
+    for name in ENABLED_ENGINES:
+        for conversion in getattr(load_engine(name), "CONVERSIONS", []):
+            conversions.append(dataclasses.replace(conversion, engine=name))
+    return conversions
+
+
+@functools.lru_cache(maxsize=None)
+def conversion_graph() -> FormatGraph:
+    """Format graph of the conversions this process can run"""
+    return FormatGraph(
+        conversion for conversion in declared_conversions()
+        if all(requirement_met(tool) for tool in conversion.requires)
+    )
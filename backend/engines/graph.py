@@ -0,0 +1,146 @@
+"""
+Format Graph
+
+Every engine module declares the conversions it offers in a CONVERSIONS list:
+one edge per source/target format pair, with a rough cost estimate and the
+external tools it needs. The registry (engines/__init__.py) collects the
+edges of the enabled engines and drops those whose tools are missing; the
+resulting graph picks the cheapest chain of conversions between two formats
+with Dijkstra's algorithm.
+
+A direct edge is used whenever it is cheaper than a chain (doc -> pdf runs
+LibreOffice once instead of going through docx), and pairs no single engine
+handles are still served through intermediate formats (doc -> txt runs
+doc -> pdf -> txt). When a step fails, plan() is called again without that
+edge, so the next cheapest route acts as the fallback.
+"""
+
+import heapq
+import itertools
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Longest route planned; every extra step is another full conversion of the document
+MAX_ROUTE_STEPS = 2
+
+# Spellings of the same format; graph nodes use the canonical name
+FORMAT_ALIASES = {
+    "jpg": "jpeg",
+    "tif": "tiff",
+    "text": "txt",
+}
+
+
+def normalize_format(name: str) -> str:
+    """Canonical graph node for a format name or file extension"""
+    name = name.lower().lstrip(".")
+    return FORMAT_ALIASES.get(name, name)
+
+
+@dataclass(frozen=True)
+class Conversion:
+    """One edge of the format graph.
+
+    function is called as function(input_path, *args) on the engine's pool
+    and returns the output path. cost is a relative estimate (roughly seconds
+    for a typical document), used only to compare routes. requires lists
+    external tools that must be installed (see engines.requirement_met).
+    chainable is False for lossy edges whose output is no use to a further
+    step (an image wrapped in a PDF has no text layer, extracted text has no
+    layout), so they are only planned as the last step of a route.
+    """
+    source: str
+    target: str
+    function: Callable
+    cost: float
+    requires: Tuple[str, ...] = ()
+    args: Tuple = ()
+    chainable: bool = True
+    # Set by the registry from the engine module that declares the edge
+    engine: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.engine}:{self.function.__name__}"
+
+    def to_dict(self) -> dict:
+        return {
+            "source": self.source,
+            "target": self.target,
+            "engine": self.engine,
+            "function": self.function.__name__,
+            "cost": self.cost,
+            "requires": list(self.requires),
+        }
+
+
+class NoConversionRouteError(ValueError):
+    """Raised when no chain of available conversions leads from source to target"""
+
+
+class ConversionStepError(RuntimeError):
+    """A step of a route failed; carries the step so the route can be planned around it"""
+
+    def __init__(self, step: Conversion, error: Exception):
+        super().__init__(f"{step.source} to {step.target} ({step.name}) failed: {error}")
+        self.step = step
+        self.error = error
+
+
+class FormatGraph:
+    """Directed graph of formats with conversions as weighted edges"""
+
+    def __init__(self, conversions: Iterable[Conversion]):
+        self.edges: Dict[str, List[Conversion]] = {}
+        for conversion in conversions:
+            self.edges.setdefault(conversion.source, []).append(conversion)
+
+    @property
+    def formats(self) -> List[str]:
+        nodes = set(self.edges)
+        for conversions in self.edges.values():
+            nodes.update(conversion.target for conversion in conversions)
+        return sorted(nodes)
+
+    def plan(self, source: str, target: str, exclude: Set[Conversion] = frozenset()) -> Optional[List[Conversion]]:
+        """Cheapest chain of conversions from source to target, or None.
+
+        Ties go to the route with fewer steps, so no intermediate file is
+        written when a direct edge costs the same as a chain.
+        """
+        source, target = normalize_format(source), normalize_format(target)
+        if source == target:
+            return None
+
+        # Entries are (cost, steps, tie breaker, format, route so far). The step
+        # limit makes the step count part of the search state.
+        counter = itertools.count()
+        queue = [(0.0, 0, next(counter), source, [])]
+        settled = set()
+        while queue:
+            cost, steps, _, node, route = heapq.heappop(queue)
+            if node == target:
+                return route
+            if (node, steps) in settled or steps == MAX_ROUTE_STEPS:
+                continue
+            settled.add((node, steps))
+            visited = {source, *(step.target for step in route)}
+            for conversion in self.edges.get(node, []):
+                if conversion in exclude or conversion.target in visited:
+                    continue
+                if not conversion.chainable and conversion.target != target:
+                    continue
+                heapq.heappush(queue, (
+                    cost + conversion.cost, steps + 1, next(counter),
+                    conversion.target, route + [conversion]
+                ))
+        return None
+
+    def reachable(self, source: str) -> Dict[str, float]:
+        """Every format source can be converted to, with the cost of the cheapest route"""
+        costs = {}
+        for target in self.formats:
+            route = self.plan(source, target)
+            if route:
+                costs[target] = round(sum(step.cost for step in route), 2)
+        return costs
@@ -0,0 +1,450 @@
+"""
+Image Engine
+
+PIL based format conversion and resizing, and image to PDF conversion
+(single image, merged PDF, or one PDF per image in a ZIP).
+"""
+
+import uuid
+from pathlib import Path
+from typing import List
+
+from PIL import Image
+
+from engines.graph import Conversion
+from engines.zip import create_zip
+from services.temp_service import temp_file_path
+
+
+def convert_image_format(input_path: Path, output_format: str) -> Path:
+    """Convert image to different format"""
+    img = Image.open(input_path)
+    if img.mode == 'RGBA' and output_format.lower() in ['jpg', 'jpeg']:
+        img = img.convert('RGB')
+    
+    output_path = temp_file_path(f"{uuid.uuid4()}.{output_format.lower()}")
+    img.save(output_path, format=output_format.upper())
+    return output_path
+
+
+# ============== Image Resize Functions ==============
+
+# Resize quality presets (correspond to PIL quality settings)
+RESIZE_QUALITY_PRESETS = {
+    'low': 50,       # 50% quality - smaller file size
+    'medium': 75,    # 75% quality - balanced
+    'high': 90,      # 90% quality - good quality
+    'maximum': 100,  # 100% quality - best quality
+}
+
+
+def resize_image(
+    image_path: Path,
+    target_width: int,
+    target_height: int,
+    maintain_aspect_ratio: bool = True,
+    output_format: str = 'jpeg',
+    quality: str = 'high'
+) -> Path:
+    """Resize an image to specified dimensions.
+    
+    Args:
+        image_path: Path to the input image
+        target_width: Target width in pixels
+        target_height: Target height in pixels
+        maintain_aspect_ratio: If True, maintains aspect ratio (default: True)
+        output_format: Output format (jpeg, png, webp, bmp)
+        quality: Quality preset (low, medium, high, maximum)
+    
+    Returns:
+        Path to the resized image
+    """
+    img = Image.open(image_path)
+    
+    # Get original dimensions
+    orig_width, orig_height = img.size
+    
+    # Calculate new dimensions
+    if maintain_aspect_ratio:
+        # Calculate aspect ratio
+        orig_aspect = orig_width / orig_height if orig_height > 0 else 1
+        target_aspect = target_width / target_height if target_height > 0 else 1
+        
+        if orig_aspect > target_aspect:
+            # Width is the limiting factor
+            new_width = target_width
+            new_height = int(target_width / orig_aspect)
+        else:
+            # Height is the limiting factor
+            new_height = target_height
+            new_width = int(target_height * orig_aspect)
+    else:
+        # Stretch to exact dimensions
+        new_width = target_width
+        new_height = target_height
+    
+    # Ensure minimum dimensions
+    new_width = max(1, new_width)
+    new_height = max(1, new_height)
+    
+    # Resize image using high-quality resampling
+    resized_img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    
+    # Handle transparency for JPEG format
+    if output_format.lower() in ['jpg', 'jpeg'] and resized_img.mode in ('RGBA', 'LA', 'P'):
+        resized_img = resized_img.convert('RGB')
+    
+    # Determine output format name for PIL
+    pil_format = output_format.upper()
+    if pil_format == 'JPG':
+        pil_format = 'JPEG'
+    
+    # Get quality value
+    quality_value = RESIZE_QUALITY_PRESETS.get(quality, RESIZE_QUALITY_PRESETS['high'])
+    
+    # Save resized image
+    output_path = temp_file_path(f"{uuid.uuid4()}.{output_format.lower()}")
+    
+    # For PNG, use compression level; for others use quality
+    if output_format.lower() == 'png':
+        resized_img.save(output_path, format=pil_format, optimize=True)
+    else:
+        resized_img.save(output_path, format=pil_format, quality=quality_value)
+    
+    return output_path
+
+
+def resize_multiple_images(
+    image_paths: List[Path],
+    target_width: int,
+    target_height: int,
+    maintain_aspect_ratio: bool = True,
+    output_format: str = 'jpeg',
+    quality: str = 'high'
+) -> Path:
+    """Resize multiple images and return as ZIP.
+    
+    Args:
+        image_paths: List of paths to input images
+        target_width: Target width in pixels
+        target_height: Target height in pixels
+        maintain_aspect_ratio: If True, maintains aspect ratio
+        output_format: Output format (jpeg, png, webp, bmp)
+        quality: Quality preset
+    
+    Returns:
+        Path to ZIP containing resized images
+    """
+    resized_paths = []
+    
+    for image_path in image_paths:
+        try:
+            resized_path = resize_image(
+                image_path,
+                target_width,
+                target_height,
+                maintain_aspect_ratio,
+                output_format,
+                quality
+            )
+            resized_paths.append(resized_path)
+        except Exception as e:
+            print(f"Failed to resize {image_path}: {e}")
+            continue
+    
+    if not resized_paths:
+        raise Exception("No images could be resized")
+    
+    # Create ZIP with resized images
+    zip_name = f"resized_images_{uuid.uuid4()}"
+    zip_path = create_zip(resized_paths, zip_name)
+    
+    # Clean up individual resized images
+    for path in resized_paths:
+        try:
+            path.unlink()
+        except:
+            pass
+    
+    return zip_path
+
+
+# ============== Image Conversion Functions ==============
+
+# Define supported image formats
+SUPPORTED_IMAGE_FORMATS = {
+    # Raster formats
+    'jpg': 'JPEG',
+    'jpeg': 'JPEG',
+    'png': 'PNG',
+    'gif': 'GIF',
+    'bmp': 'BMP',
+    'tiff': 'TIFF',
+    'tif': 'TIFF',
+    'webp': 'WEBP',
+    'ico': 'ICO',
+    'pcx': 'PCX',
+    'ppm': 'PPM',
+    'pgm': 'PGM',
+    'pbm': 'PBM',
+    # Camera RAW formats (limited support)
+    'cr2': 'RAW',
+    'cr3': 'RAW',
+    'nef': 'RAW',
+    'arw': 'RAW',
+    'dng': 'RAW',
+    # Other formats
+    'svg': 'SVG',
+    'heic': 'HEIC',
+    'heif': 'HEIF',
+}
+
+# PDF Page size options
+PDF_PAGE_SIZES = {
+    'auto': None,  # Auto-detect from image
+    'letter': (612, 792),  # 8.5 x 11 inches in points
+    'a4': (595.28, 841.89),  # A4 in points
+    'legal': (612, 1008),  # 8.5 x 14 inches
+    'tabloid': (792, 1224),  # 11 x 17 inches
+    'a3': (841.89, 1190.55),  # A3 in points
+    'a5': (419.53, 595.28),  # A5 in points
+}
+
+# Quality presets (DPI for output)
+QUALITY_PRESETS = {
+    'low': 72,      # 72 DPI - web quality
+    'medium': 150,  # 150 DPI - screen quality
+    'high': 300,    # 300 DPI - print quality
+    'maximum': 600, # 600 DPI - high quality print
+}
+
+
+def is_supported_image(filename: str) -> bool:
+    """Check if file extension is a supported image format"""
+    ext = Path(filename).suffix.lower().replace('.', '')
+    return ext in SUPPORTED_IMAGE_FORMATS
+
+
+def get_image_format_name(filename: str) -> str:
+    """Get the format name for saving images"""
+    ext = Path(filename).suffix.lower().replace('.', '')
+    if ext == 'jpg':
+        ext = 'jpeg'
+    return SUPPORTED_IMAGE_FORMATS.get(ext, ext.upper())
+
+
+def convert_image_to_pdf(
+    image_path: Path,
+    page_size: str = 'auto',
+    quality: str = 'high',
+    margin: float = 0
+) -> Path:
+    """Convert a single image to PDF with configurable options.
+    
+    Args:
+        image_path: Path to the input image
+        page_size: Page size ('auto', 'letter', 'a4', 'legal', 'tabloid', 'a3', 'a5')
+        quality: Quality preset ('low', 'medium', 'high', 'maximum')
+        margin: Margin in points (default 0)
+    
+    Returns:
+        Path to the generated PDF
+    """
+    img = Image.open(image_path)
+    
+    # Get image dimensions in pixels
+    img_width_px, img_height_px = img.size
+    
+    # Convert to RGB if necessary (required for PDF)
+    if img.mode in ('RGBA', 'LA', 'P'):
+        img = img.convert('RGB')
+    
+    # Determine output page size
+    if page_size == 'auto':
+        # Use image aspect ratio with a reasonable max size
+        # Convert pixels to points (72 DPI baseline)
+        max_width = 612  # Letter width in points
+        scale = max_width / img_width_px
+        page_width = img_width_px * scale
+        page_height = img_height_px * scale
+    else:
+        page_size_tuple = PDF_PAGE_SIZES.get(page_size, PDF_PAGE_SIZES['letter'])
+        page_width, page_height = page_size_tuple
+    
+    # Apply margin
+    content_width = page_width - (2 * margin)
+    content_height = page_height - (2 * margin)
+    
+    # Calculate scaling to fit image in page while maintaining aspect ratio
+    scale_w = content_width / img_width_px if img_width_px > content_width else 1
+    scale_h = content_height / img_height_px if img_height_px > content_height else 1
+    scale = min(scale_w, scale_h)
+    
+    # Calculate final image dimensions on PDF
+    final_width = img_width_px * scale
+    final_height = img_height_px * scale
+    
+    # Calculate position to center the image
+    left = (page_width - final_width) / 2
+    top = (page_height - final_height) / 2
+    
+    # Create PDF with reportlab for better quality control
+    from reportlab.lib.pagesizes import landscape, portrait
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.units import inch
+    
+    output_path = temp_file_path(f"{uuid.uuid4()}.pdf")
+    c = canvas.Canvas(str(output_path), pagesize=(page_width, page_height))
+    
+    # Set quality-based compression
+    quality_dpi = QUALITY_PRESETS.get(quality, QUALITY_PRESETS['high'])
+    
+    # Draw image
+    c.drawImage(
+        str(image_path),
+        left, top,
+        width=final_width,
+        height=final_height,
+        preserveAspectRatio=True,
+        mask='auto'
+    )
+    
+    c.save()
+    
+    return output_path
+
+
+def convert_multiple_images_to_pdf(
+    image_paths: List[Path],
+    page_size: str = 'auto',
+    quality: str = 'high',
+    margin: float = 0,
+    one_image_per_page: bool = True
+) -> Path:
+    """Convert multiple images to a single PDF.
+    
+    Args:
+        image_paths: List of paths to input images (in order)
+        page_size: Page size for all pages
+        quality: Quality preset
+        margin: Margin in points
+        one_image_per_page: If True, each image gets its own page
+    
+    Returns:
+        Path to the generated PDF
+    """
+    from reportlab.lib.pagesizes import landscape, portrait
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.units import inch
+    
+    output_path = temp_file_path(f"{uuid.uuid4()}.pdf")
+    c = canvas.Canvas(str(output_path))
+    
+    for idx, image_path in enumerate(image_paths):
+        if idx > 0:
+            c.showPage()  # New page for each image (except first)
+        
+        img = Image.open(image_path)
+        img_width_px, img_height_px = img.size
+        
+        # Convert to RGB if necessary
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img = img.convert('RGB')
+        
+        # Determine page size
+        if page_size == 'auto':
+            # Use image dimensions as page size
+            # Convert pixels to points (72 DPI baseline)
+            page_width = img_width_px
+            page_height = img_height_px
+        else:
+            page_size_tuple = PDF_PAGE_SIZES.get(page_size, PDF_PAGE_SIZES['letter'])
+            page_width, page_height = page_size_tuple
+        
+        # Set page size
+        c.setPageSize((page_width, page_height))
+        
+        # Apply margin
+        content_width = page_width - (2 * margin)
+        content_height = page_height - (2 * margin)
+        
+        # Calculate scaling to fit image
+        scale_w = content_width / img_width_px if img_width_px > content_width else 1
+        scale_h = content_height / img_height_px if img_height_px > content_height else 1
+        scale = min(scale_w, scale_h)
+        
+        final_width = img_width_px * scale
+        final_height = img_height_px * scale
+        
+        # Center image on page
+        left = (page_width - final_width) / 2
+        top = (page_height - final_height) / 2
+        
+        # Draw image
+        c.drawImage(
+            str(image_path),
+            left, top,
+            width=final_width,
+            height=final_height,
+            preserveAspectRatio=True,
+            mask='auto'
+        )
+    
+    c.save()
+    
+    return output_path
+
+
+def convert_images_to_pdf_zip(
+    image_paths: List[Path],
+    page_size: str = 'auto',
+    quality: str = 'high',
+    margin: float = 0
+) -> Path:
+    """Convert images to individual PDFs and return as ZIP.
+    
+    Each image is converted to a separate PDF file.
+    """
+    pdf_paths = []
+    
+    for image_path in image_paths:
+        try:
+            pdf_path = convert_image_to_pdf(
+                image_path,
+                page_size=page_size,
+                quality=quality,
+                margin=margin
+            )
+            pdf_paths.append(pdf_path)
+        except Exception as e:
+            print(f"Failed to convert {image_path}: {e}")
+            continue
+    
+    if not pdf_paths:
+        raise Exception("No images could be converted")
+    
+    # Create ZIP with individual PDFs
+    zip_name = f"images_to_pdf_{uuid.uuid4()}"
+    zip_path = create_zip(pdf_paths, zip_name)
+    
+    # Clean up individual PDFs
+    for pdf_path in pdf_paths:
+        try:
+            pdf_path.unlink()
+        except:
+            pass
+    
+    return zip_path
+
+
+# ============== Format Graph ==============
+
+# Image formats offered to /convert/document
+GRAPH_IMAGE_FORMATS = ("jpeg", "png", "webp", "bmp")
+
+# Conversions offered to /convert/document (see engines/graph.py)
+CONVERSIONS = [
+    *(Conversion(fmt, "pdf", convert_image_to_pdf, 0.3, chainable=False) for fmt in GRAPH_IMAGE_FORMATS),
+    *(Conversion(source, target, convert_image_format, 0.2, args=(target,))
+      for source in GRAPH_IMAGE_FORMATS for target in GRAPH_IMAGE_FORMATS if source != target),
+]
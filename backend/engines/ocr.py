@@ -0,0 +1,391 @@
+"""
+OCR Engine
+
+Tesseract text extraction and script/language detection. pytesseract (which
+imports pandas) is loaded on first use by load_pytesseract(); the installed
+language packs are listed once per process by get_available_ocr_languages().
+"""
+
+import shutil as tesseract_shutil
+import subprocess
+from pathlib import Path
+from typing import List
+
+from PIL import Image
+
+from services.metrics_service import time_subprocess
+
+
+# Configure Tesseract executable path
+# Uncomment and set the path if Tesseract is not in PATH
+# pytesseract.pytesseract.tesseract_cmd = r'/usr/bin/tesseract'  # Linux
+# pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'  # Windows
+
+# Try to auto-detect Tesseract path
+def find_tesseract_executable():
+    """Find Tesseract executable path"""
+    # Common Linux paths
+    linux_paths = ['/usr/bin/tesseract', '/usr/local/bin/tesseract']
+    # Check if tesseract is in PATH
+    tesseract_path = tesseract_shutil.which('tesseract')
+    if tesseract_path:
+        return tesseract_path
+    # Check common Linux paths
+    for path in linux_paths:
+        if Path(path).exists():
+            return path
+    return None
+
+TESSERACT_PATH = find_tesseract_executable()
+if TESSERACT_PATH:
+    print(f"Tesseract found at: {TESSERACT_PATH}")
+else:
+    print("Tesseract not found in PATH or common locations. OCR may not work.")
+
+def load_pytesseract():
+    """Import pytesseract on first use (it imports pandas) and point it at TESSERACT_PATH"""
+    import pytesseract
+    if TESSERACT_PATH:
+        pytesseract.pytesseract.tesseract_cmd = TESSERACT_PATH
+    return pytesseract
+
+def get_tesseract_languages():
+    """Get list of installed Tesseract language packs"""
+    try:
+        if TESSERACT_PATH:
+            result = subprocess.run(
+                [TESSERACT_PATH, '--list-langs'],
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
+            if result.returncode == 0:
+                # Parse languages from output (skip first line which is "List of available languages:")
+                lines = result.stdout.strip().split('\n')
+                if len(lines) > 1:
+                    return [lang.strip() for lang in lines[1:] if lang.strip()]
+        # Fallback: try with pytesseract
+        return load_pytesseract().get_languages(config='')
+    except Exception as e:
+        print(f"Failed to get Tesseract languages: {e}")
+        return ['eng']  # Return at least English as fallback
+
+# Installed languages are listed on first use or by the startup warm-up
+# (warm_up_engines), not at import, so importing the app runs no subprocess
+AVAILABLE_OCR_LANGUAGES = []
+
+def get_available_ocr_languages() -> List[str]:
+    """Installed Tesseract languages, listed once per process"""
+    global AVAILABLE_OCR_LANGUAGES
+    if not AVAILABLE_OCR_LANGUAGES:
+        AVAILABLE_OCR_LANGUAGES = get_tesseract_languages() or ['eng']
+        print(f"Available OCR languages: {AVAILABLE_OCR_LANGUAGES}")
+    return AVAILABLE_OCR_LANGUAGES
+
+# Define common language names for display
+LANGUAGE_NAMES = {
+    # Script languages
+    'Arabic': 'Arabic',
+    'Armenian': 'Armenian',
+    'Bengali': 'Bengali',
+    'Canadian_Aboriginal': 'Canadian Aboriginal',
+    'Cherokee': 'Cherokee',
+    'Cyrillic': 'Cyrillic',
+    'Devanagari': 'Devanagari',
+    'Ethiopic': 'Ethiopic',
+    'Fraktur': 'Fraktur',
+    'Georgian': 'Georgian',
+    'Greek': 'Greek',
+    'Gujarati': 'Gujarati',
+    'Gurmukhi': 'Gurmukhi',
+    'HanS': 'Chinese Simplified',
+    'HanS_vert': 'Chinese Simplified (Vertical)',
+    'HanT': 'Chinese Traditional',
+    'HanT_vert': 'Chinese Traditional (Vertical)',
+    'Hangul': 'Hangul (Korean)',
+    'Hangul_vert': 'Hangul (Korean, Vertical)',
+    'Hebrew': 'Hebrew',
+    'Japanese': 'Japanese',
+    'Japanese_vert': 'Japanese (Vertical)',
+    'Kannada': 'Kannada',
+    'Khmer': 'Khmer',
+    'Lao': 'Lao',
+    'Latin': 'Latin',
+    'Malayalam': 'Malayalam',
+    'Myanmar': 'Myanmar',
+    'Oriya': 'Oriya',
+    'Sinhala': 'Sinhala',
+    'Syriac': 'Syriac',
+    'Tamil': 'Tamil',
+    'Telugu': 'Telugu',
+    'Thaana': 'Thaana',
+    'Thai': 'Thai',
+    'Tibetan': 'Tibetan',
+    'Vietnamese': 'Vietnamese',
+    
+    # ISO 639 language codes
+    'afr': 'Afrikaans',
+    'amh': 'Amharic',
+    'ara': 'Arabic',
+    'asm': 'Assamese',
+    'aze': 'Azerbaijani',
+    'aze_cyrl': 'Azerbaijani (Cyrillic)',
+    'bel': 'Belarusian',
+    'ben': 'Bengali',
+    'bod': 'Tibetan',
+    'bos': 'Bosnian',
+    'bre': 'Breton',
+    'bul': 'Bulgarian',
+    'cat': 'Catalan',
+    'ceb': 'Cebuano',
+    'ces': 'Czech',
+    'chi_sim': 'Chinese (Simplified)',
+    'chi_sim_vert': 'Chinese Simplified (Vertical)',
+    'chi_tra': 'Chinese (Traditional)',
+    'chi_tra_vert': 'Chinese Traditional (Vertical)',
+    'chr': 'Cherokee',
+    'cos': 'Corsican',
+    'cym': 'Welsh',
+    'dan': 'Danish',
+    'deu': 'German',
+    'div': 'Dhivehi',
+    'dzo': 'Dzongkha',
+    'ell': 'Greek',
+    'eng': 'English',
+    'enm': 'English (Middle)',
+    'epo': 'Esperanto',
+    'est': 'Estonian',
+    'eus': 'Basque',
+    'fao': 'Faroese',
+    'fas': 'Persian',
+    'fil': 'Filipino',
+    'fin': 'Finnish',
+    'fra': 'French',
+    'frk': 'German (Fraktur)',
+    'frm': 'French (Middle)',
+    'fry': 'Frisian',
+    'gla': 'Scottish Gaelic',
+    'gle': 'Irish',
+    'glg': 'Galician',
+    'grc': 'Greek (Ancient)',
+    'guj': 'Gujarati',
+    'hat': 'Haitian Creole',
+    'heb': 'Hebrew',
+    'hin': 'Hindi',
+    'hrv': 'Croatian',
+    'hun': 'Hungarian',
+    'hye': 'Armenian',
+    'iku': 'Inuktitut',
+    'ind': 'Indonesian',
+    'isl': 'Icelandic',
+    'ita': 'Italian',
+    'ita_old': 'Italian (Old)',
+    'jav': 'Javanese',
+    'jpn': 'Japanese',
+    'jpn_vert': 'Japanese (Vertical)',
+    'kan': 'Kannada',
+    'kat': 'Georgian',
+    'kat_old': 'Georgian (Old)',
+    'kaz': 'Kazakh',
+    'khm': 'Khmer',
+    'kir': 'Kyrgyz',
+    'kmr': 'Kurmanji Kurdish',
+    'kor': 'Korean',
+    'kor_vert': 'Korean (Vertical)',
+    'lao': 'Lao',
+    'lat': 'Latin',
+    'lav': 'Latvian',
+    'lit': 'Lithuanian',
+    'ltz': 'Luxembourgish',
+    'mal': 'Malayalam',
+    'mar': 'Marathi',
+    'mkd': 'Macedonian',
+    'mlt': 'Maltese',
+    'mon': 'Mongolian',
+    'mri': 'Maori',
+    'msa': 'Malay',
+    'mya': 'Burmese',
+    'nep': 'Nepali',
+    'nld': 'Dutch',
+    'nor': 'Norwegian',
+    'oci': 'Occitan',
+    'ori': 'Oriya',
+    'osd': 'Orientation and Script Detection',
+    'pan': 'Punjabi',
+    'pol': 'Polish',
+    'por': 'Portuguese',
+    'pus': 'Pashto',
+    'que': 'Quechua',
+    'ron': 'Romanian',
+    'rus': 'Russian',
+    'san': 'Sanskrit',
+    'sin': 'Sinhala',
+    'slk': 'Slovak',
+    'slv': 'Slovenian',
+    'snd': 'Sindhi',
+    'spa': 'Spanish',
+    'spa_old': 'Spanish (Old)',
+    'sqi': 'Albanian',
+    'srp': 'Serbian',
+    'srp_latn': 'Serbian (Latin)',
+    'sun': 'Sundanese',
+    'swa': 'Swahili',
+    'swe': 'Swedish',
+    'syr': 'Syriac',
+    'tam': 'Tamil',
+    'tat': 'Tatar',
+    'tel': 'Telugu',
+    'tgk': 'Tajik',
+    'tha': 'Thai',
+    'tir': 'Tigrinya',
+    'ton': 'Tongan',
+    'tur': 'Turkish',
+    'uig': 'Uyghur',
+    'ukr': 'Ukrainian',
+    'urd': 'Urdu',
+    'uzb': 'Uzbek',
+    'uzb_cyrl': 'Uzbek (Cyrillic)',
+    'vie': 'Vietnamese',
+    'yid': 'Yiddish',
+    'yor': 'Yoruba',
+}
+
+def ocr_image(image_path: Path, language: str = "eng") -> str:
+    """Extract text from image using OCR"""
+    pytesseract = load_pytesseract()
+    try:
+        img = Image.open(image_path)
+        with time_subprocess("tesseract"):
+            text = pytesseract.image_to_string(img, lang=language)
+        return text
+    except Exception as e:
+        error_msg = str(e).lower()
+        if "language" in error_msg or "lang" in error_msg:
+            return f"OCR Error: Language '{language}' not found. Please install the language pack or choose a different language."
+        elif "tesseract" in error_msg or "not found" in error_msg:
+            return "OCR Error: Tesseract is not installed or not found. Please install Tesseract OCR."
+        else:
+            return f"OCR Error: {str(e)}. Make sure Tesseract is installed and language pack is available."
+
+def detect_language_from_image(image_path: Path) -> dict:
+    """Detect language/script from image using Tesseract OSD"""
+    pytesseract = load_pytesseract()
+    # Runs in an OCR pool worker, which lists the languages itself
+    available_languages = get_available_ocr_languages()
+    try:
+        img = Image.open(image_path)
+        
+        # Use Tesseract OSD (Orientation and Script Detection)
+        with time_subprocess("tesseract"):
+            osd_data = pytesseract.image_to_osd(img)
+        
+        # Parse OSD output
+        osd_lines = osd_data.split('\n')
+        detected_script = None
+        detected_orientation = 0
+        confidence = 0
+        
+        for line in osd_lines:
+            if 'Script:' in line:
+                detected_script = line.split(':')[1].strip()
+            elif 'Orientation in degrees:' in line:
+                detected_orientation = int(line.split(':')[1].strip())
+            elif 'Rotate:' in line:
+                # Rotate value
+                pass
+            elif 'Confidence:' in line:
+                try:
+                    confidence = float(line.split(':')[1].strip())
+                except:
+                    pass
+        
+        # Map script to likely language codes
+        suggested_languages = []
+        script_to_languages = {
+            'Latin': ['eng', 'fra', 'deu', 'spa', 'ita', 'por', 'nld', 'pol', 'ces', 'dan', 'fin', 'nor', 'swe', 'ron', 'hun', 'cat', 'glg', 'eusk', 'gle', 'bre', 'lat'],
+            'Cyrillic': ['rus', 'ukr', 'bul', 'bel', 'srp', 'mkd', 'kaz', 'uzb', 'tgk', 'kir'],
+            'Arabic': ['ara', 'fas', 'urd', 'pus', 'div', 'snd'],
+            'Devanagari': ['hin', 'mar', 'nep', 'san', 'bod'],
+            'Bengali': ['ben', 'asm'],
+            'Tamil': ['tam'],
+            'Telugu': ['tel'],
+            'Kannada': ['kan'],
+            'Malayalam': ['mal'],
+            'Gujarati': ['guj'],
+            'Oriya': ['ori'],
+            'Punjabi': ['pan'],
+            'Myanmar': ['mya'],
+            'Thai': ['tha'],
+            'Lao': ['lao'],
+            'Khmer': ['khm'],
+            'Hebrew': ['heb'],
+            'Greek': ['ell'],
+            'Japanese': ['jpn'],
+            'Korean': ['kor'],
+            'Chinese': ['chi_sim', 'chi_tra'],
+            'HanS': ['chi_sim'],
+            'HanT': ['chi_tra'],
+            'Hangul': ['kor'],
+            'Hangul_vert': ['kor'],
+            'HanS_vert': ['chi_sim'],
+            'HanT_vert': ['chi_tra'],
+            'Japanese_vert': ['jpn'],
+        }
+        
+        if detected_script in script_to_languages:
+            suggested_languages = script_to_languages[detected_script]
+        else:
+            # Fallback: try to find partial match
+            for script, langs in script_to_languages.items():
+                if detected_script and (script.lower() in detected_script.lower() or detected_script.lower() in script.lower()):
+                    suggested_languages = langs
+                    break
+            # If still no match, try to find matching available languages
+            if not suggested_languages and detected_script:
+                for lang_code, lang_name in LANGUAGE_NAMES.items():
+                    if isinstance(lang_name, str) and detected_script.lower() in lang_name.lower():
+                        if lang_code not in suggested_languages:
+                            suggested_languages.append(lang_code)
+        
+        # Filter to only available languages
+        available_suggestions = []
+        for lang in suggested_languages:
+            if lang in available_languages:
+                available_suggestions.append(lang)
+        
+        # If no suggestions, return English as fallback
+        if not available_suggestions:
+            if 'eng' in available_languages:
+                available_suggestions = ['eng']
+            elif available_languages:
+                available_suggestions = [available_languages[0]]
+        
+        return {
+            "detected_script": detected_script,
+            "orientation": detected_orientation,
+            "confidence": confidence,
+            "suggested_languages": available_suggestions[:5]  # Return top 5 suggestions
+        }
+    except Exception as e:
+        print(f"Language detection failed: {e}")
+        # Return fallback
+        if 'eng' in available_languages:
+            return {
+                "detected_script": "Unknown",
+                "orientation": 0,
+                "confidence": 0,
+                "suggested_languages": ['eng']
+            }
+        elif available_languages:
+            return {
+                "detected_script": "Unknown",
+                "orientation": 0,
+                "confidence": 0,
+                "suggested_languages": [available_languages[0]]
+            }
+        return {
+            "detected_script": "Unknown",
+            "orientation": 0,
+            "confidence": 0,
+            "suggested_languages": []
+        }
@@ -0,0 +1,538 @@
+"""
+Office Engine
+
+Word, Excel, PowerPoint and plain text conversions. LibreOffice does the
+heavy lifting through the warm worker pool (services/libreoffice_service.py),
+with python-docx, openpyxl/xlsx2pdf and python-pptx based fallbacks when it
+is not installed. The pool is started and stopped through start()/shutdown().
+"""
+
+import glob
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from engines.graph import Conversion
+from services.cancel_service import raise_if_cancelled
+from services.libreoffice_service import (
+    LibreOfficePool,
+    LibreOfficePoolError,
+    LibreOfficeConversionError,
+    find_soffice_binary,
+    run_libreoffice_conversion,
+    run_libreoffice_batch_conversion,
+)
+from services.metrics_service import time_subprocess
+from services.temp_service import TEMP_DIR, LIBREOFFICE_DIR_NAME, temp_file_path
+from services.timing_service import record_engine
+
+
+def find_font_path() -> str:
+    """Find a suitable TrueType font for xlsx2pdf conversion.
+    
+    The Transformer class requires a font file path. This function searches
+    common font locations on Linux systems.
+    
+    Returns:
+        str: Path to a valid font file
+        
+    Raises:
+        FileNotFoundError: If no suitable font is found
+    """
+    # Common Linux font paths
+    font_candidates = [
+        '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+        '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
+        '/usr/share/fonts/truetype/msttcorefonts/Arial.ttf',
+        '/usr/share/fonts/truetype/msttcorefonts/Arial_Bold.ttf',
+        '/usr/share/fonts/truetype/freefont/FreeSans.ttf',
+        '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf',
+        '/usr/share/fonts/truetype/noto/NotoSans-Regular.ttf',
+        '/usr/share/fonts/TTF/DejaVuSans.ttf',
+        '/usr/share/fonts/dejavu/DejaVuSans.ttf',
+        '/System/Library/Fonts/Arial.ttf',  # macOS fallback
+    ]
+    
+    for font_path in font_candidates:
+        if Path(font_path).exists():
+            print(f"Using font: {font_path}")
+            return font_path
+    
+    # Try to find any .ttf file in common font directories
+    font_dirs = [
+        '/usr/share/fonts/**/*.ttf',
+        '/usr/local/share/fonts/**/*.ttf',
+    ]
+    
+    for pattern in font_dirs:
+        fonts = glob.glob(pattern, recursive=True)
+        if fonts:
+            # Return the first found font
+            font_path = fonts[0]
+            print(f"Using discovered font: {font_path}")
+            return font_path
+    
+    raise FileNotFoundError(
+        "No suitable TrueType font found for xlsx2pdf conversion. "
+        "Please install a font package (e.g., fonts-dejavu-core) or "
+        "specify a font path manually."
+    )
+
+# Pool of warm headless LibreOffice instances (see services/libreoffice_service.py)
+libreoffice_pool = LibreOfficePool(TEMP_DIR / LIBREOFFICE_DIR_NAME)
+
+
+def start():
+    """Start the warm LibreOffice workers in the background so health checks pass immediately"""
+    libreoffice_pool.start_in_background()
+
+
+def shutdown():
+    libreoffice_pool.shutdown()
+
+
+# ============== DOCX Conversion Functions ==============
+
+def convert_with_warm_libreoffice(input_path: Path, target_format: str) -> Optional[Path]:
+    """Convert a document on the warm LibreOffice pool.
+
+    Returns None when the pool is not running in this process or the conversion
+    fails, so callers can fall back to launching LibreOffice themselves.
+    """
+    if not libreoffice_pool.is_running:
+        return None
+
+    output_path = temp_file_path(f"{uuid.uuid4()}.{target_format}")
+    try:
+        print(f"Converting {input_path.name} to {target_format} on warm LibreOffice pool")
+        return libreoffice_pool.convert(input_path, target_format, output_path)
+    except LibreOfficePoolError as e:
+        print(f"Warm LibreOffice pool conversion failed: {e}")
+        output_path.unlink(missing_ok=True)
+        return None
+
+
+def convert_with_libreoffice(input_path: Path, target_format: str) -> Path:
+    """Convert a document with LibreOffice, warm pool first, then a one-off soffice.
+
+    The one-off run happens in its own job directory with a private output
+    folder and user profile, so concurrent conversions cannot pick up each
+    other's output or fight over the profile lock.
+    """
+    # Prefer a warm LibreOffice worker over a cold soffice start
+    pooled_path = convert_with_warm_libreoffice(input_path, target_format)
+    if pooled_path is not None:
+        record_engine("libreoffice-pool")
+        return pooled_path
+
+    # The pool gave up because the call was cancelled: do not start a cold soffice
+    raise_if_cancelled()
+    record_engine("libreoffice")
+    output_path = temp_file_path(f"{uuid.uuid4()}.{target_format}")
+    return run_libreoffice_conversion(input_path, target_format, output_path, TEMP_DIR / "libreoffice")
+
+
+def convert_docx_to_pdf_libreoffice(docx_path: Path) -> Path:
+    """Convert DOCX to PDF using LibreOffice in headless mode.
+    
+    This is the preferred method on Linux as it works natively without Wine.
+    Command: libreoffice --headless --convert-to pdf --outdir /output /input.docx
+    """
+    try:
+        return convert_with_libreoffice(docx_path, "pdf")
+    except Exception as e:
+        raise Exception(f"LibreOffice conversion failed: {str(e)}")
+
+
+def convert_docx_to_doc(docx_path: Path) -> Path:
+    """Convert DOCX to DOC using LibreOffice in headless mode.
+    
+    This uses LibreOffice which is already installed in the system.
+    Command: libreoffice --headless --convert-to doc --outdir /output /input.docx
+    """
+    try:
+        return convert_with_libreoffice(docx_path, "doc")
+    except Exception as e:
+        raise Exception(f"LibreOffice conversion failed: {str(e)}")
+
+
+def convert_doc_to_docx(doc_path: Path) -> Path:
+    """Convert DOC to DOCX using LibreOffice in headless mode.
+    
+    This uses LibreOffice which is already installed in the system.
+    Command: libreoffice --headless --convert-to docx --outdir /output /input.doc
+    """
+    try:
+        return convert_with_libreoffice(doc_path, "docx")
+    except Exception as e:
+        raise Exception(f"LibreOffice conversion failed: {str(e)}")
+
+
+def convert_docx_to_pdf(docx_path: Path) -> Path:
+    """Convert DOCX to PDF using LibreOffice (preferred), docx2pdf, or reportlab fallback.
+    
+    Conversion priority:
+    1. LibreOffice - Best for Linux, native support without Wine
+    2. docx2pdf - Works on Windows with MS Word or Linux with Wine
+    3. reportlab - Basic text-only fallback
+    """
+    from docx import Document
+    from docx2pdf import convert as docx2pdf_convert
+    output_path = temp_file_path(f"{uuid.uuid4()}.pdf")
+    
+    # Method 1: Try LibreOffice first (best for Linux)
+    try:
+        print("Attempting DOCX to PDF conversion using LibreOffice...")
+        return convert_docx_to_pdf_libreoffice(docx_path)
+    
+    except Exception as e:
+        print(f"LibreOffice conversion failed: {e}")
+    
+    # Method 2: Try docx2pdf
+    try:
+        print("Attempting DOCX to PDF conversion using docx2pdf...")
+        record_engine("docx2pdf")
+        with time_subprocess("docx2pdf"):
+            docx2pdf_convert(str(docx_path), str(output_path))
+        
+        # Verify the output was created
+        if output_path.exists() and output_path.stat().st_size > 0:
+            print("docx2pdf conversion successful")
+            return output_path
+        else:
+            raise Exception("docx2pdf conversion failed - output file not created or empty")
+            
+    except Exception as e:
+        print(f"docx2pdf conversion failed: {e}")
+    
+    # Method 3: Fallback to reportlab (basic text-only conversion)
+    print("Falling back to reportlab for basic text-only PDF conversion...")
+    record_engine("reportlab")
+    
+    doc = Document(docx_path)
+    pdf_canvas = canvas.Canvas(str(output_path), pagesize=letter)
+    width, height = letter
+    y_position = height - 50
+    
+    for para in doc.paragraphs:
+        if para.text.strip():
+            text = para.text
+            pdf_canvas.drawString(50, y_position, text[:100])
+            y_position -= 20
+            if y_position < 50:
+                pdf_canvas.showPage()
+                y_position = height - 50
+    
+    pdf_canvas.save()
+    return output_path
+
+
+def convert_doc_to_pdf(doc_path: Path) -> Path:
+    """Convert DOC to PDF with LibreOffice in one pass.
+
+    LibreOffice reads DOC natively, so there is no intermediate DOCX.
+    Command: libreoffice --headless --convert-to pdf --outdir /output /input.doc
+    """
+    try:
+        return convert_with_libreoffice(doc_path, "pdf")
+    except Exception as e:
+        raise Exception(f"LibreOffice conversion failed: {str(e)}")
+
+
+# ============== Excel Conversion Functions ==============
+
+def convert_excel_to_pdf_libreoffice(excel_path: Path) -> Path:
+    """Convert Excel to PDF using LibreOffice (best format preservation).
+    
+    This method provides the best quality PDF output with:
+    - Perfect table border preservation
+    - Cell colors and backgrounds maintained
+    - Column widths and row heights preserved
+    - Font formatting (bold, italic, colors)
+    - Merged cells and complex layouts
+    - Multiple sheets handled correctly
+    
+    Uses LibreOffice in headless mode which provides native Excel rendering.
+    """
+    try:
+        return convert_with_libreoffice(excel_path, "pdf")
+    except Exception as e:
+        raise Exception(f"LibreOffice conversion failed: {str(e)}")
+
+
+def _xlsx2pdf_conversion(excel_path: Path, output_path: Path) -> Path:
+    """Fallback conversion using xlsx2pdf when LibreOffice is not available."""
+    from openpyxl import load_workbook
+    from xlsx2pdf.transformator import Transformer
+    try:
+        # Find a suitable font for the Transformer
+        font_path = find_font_path()
+        
+        # Initialize the Transformer with the font path
+        transformer = Transformer(font_path)
+        
+        # Load the workbook using openpyxl
+        wb = load_workbook(excel_path)
+        ws = wb.active
+        
+        # Get the dimensions of the data
+        rows_n = ws.max_row
+        cols_n = ws.max_column
+        
+        print(f"Converting Excel file: {excel_path}")
+        print(f"Dimensions: {rows_n} rows x {cols_n} columns")
+        
+        # Call transform() which returns PDF bytes
+        pdf_bytes = transformer.transform(wb, rows_n, cols_n)
+        
+        # Write the PDF bytes to the output file
+        with open(output_path, "wb") as f:
+            f.write(pdf_bytes)
+        
+        # Verify the output was created
+        if output_path.exists() and output_path.stat().st_size > 0:
+            print(f"Excel to PDF conversion successful using xlsx2pdf: {output_path}")
+            return output_path
+        else:
+            raise Exception("xlsx2pdf conversion failed - output file not created or empty")
+            
+    except Exception as e:
+        raise Exception(f"xlsx2pdf conversion failed: {str(e)}")
+
+
+def convert_excel_to_pdf(excel_path: Path) -> Path:
+    """Convert Excel file to PDF with best format preservation.
+    
+    Conversion priority (best quality first):
+    1. LibreOffice - Best for format preservation (primary method)
+       - Preserves ALL Excel formatting
+       - Native Excel rendering through LibreOffice
+       - Perfect table borders, colors, fonts, column widths
+    
+    2. xlsx2pdf - Secondary fallback
+       - Basic formatting support
+       - Good for simple Excel files
+    
+    3. reportlab - Last resort fallback
+       - Basic text-only conversion
+       - No formatting preserved
+    
+    Returns:
+        Path: Path to the converted PDF file
+    """
+    output_path = temp_file_path(f"{uuid.uuid4()}.pdf")
+    
+    # Method 1: Try LibreOffice first (best format preservation)
+    try:
+        print("Attempting Excel to PDF conversion using LibreOffice...")
+        return convert_excel_to_pdf_libreoffice(excel_path)
+    except Exception as libreoffice_error:
+        print(f"LibreOffice conversion failed: {libreoffice_error}")
+    
+    # Method 2: Try xlsx2pdf as fallback
+    try:
+        print("Attempting Excel to PDF conversion using xlsx2pdf...")
+        record_engine("xlsx2pdf")
+        return _xlsx2pdf_conversion(excel_path, output_path)
+    except Exception as xlsx2pdf_error:
+        print(f"xlsx2pdf conversion failed: {xlsx2pdf_error}")
+    
+    # Method 3: Basic reportlab fallback (last resort)
+    print("Falling back to basic reportlab conversion...")
+    print("WARNING: This method does not preserve formatting!")
+    record_engine("reportlab")
+    return _fallback_excel_to_pdf(excel_path, output_path)
+
+
+def _fallback_excel_to_pdf(excel_path: Path, output_path: Path) -> Path:
+    """Fallback conversion using reportlab when xlsx2pdf fails."""
+    from openpyxl import load_workbook
+    wb = load_workbook(excel_path)
+    ws = wb.active
+    
+    c = canvas.Canvas(str(output_path), pagesize=letter)
+    width, height = letter
+    y_position = height - 50
+    line_height = 12
+    
+    max_row = ws.max_row
+    max_col = ws.max_column
+    
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(50, y_position, f"Excel Document: {ws.title}")
+    y_position -= 30
+    
+    c.setFont("Helvetica", 10)
+    
+    for row in range(1, max_row + 1):
+        row_text = []
+        for col in range(1, max_col + 1):
+            cell = ws.cell(row=row, column=col)
+            value = cell.value if cell.value is not None else ""
+            row_text.append(str(value))
+        
+        text = " | ".join(row_text)
+        
+        if y_position < 50:
+            c.showPage()
+            y_position = height - 50
+        
+        if len(text) > 100:
+            text = text[:97] + "..."
+        
+        c.drawString(50, y_position, text)
+        y_position -= line_height
+    
+    c.save()
+    print(f"Fallback conversion completed: {output_path}")
+    return output_path
+
+
+# ============== PowerPoint Conversion Functions ==============
+
+def _check_libreoffice():
+    """Ensure LibreOffice is installed"""
+    if not find_soffice_binary():
+        raise EnvironmentError(
+            "LibreOffice not found. Install it using:\n"
+            "sudo apt install libreoffice"
+        )
+
+
+def convert_pptx_to_pdf(pptx_path: Path) -> Path:
+    """
+    Convert PPTX to PDF while preserving layout, fonts, images, charts.
+    Uses LibreOffice headless rendering engine.
+    """
+    _check_libreoffice()
+
+    pptx_path = pptx_path.resolve()
+
+    if not pptx_path.exists():
+        raise FileNotFoundError(f"File not found: {pptx_path}")
+
+    if pptx_path.suffix.lower() != ".pptx":
+        raise ValueError("Expected a .pptx file")
+
+    try:
+        return convert_with_libreoffice(pptx_path, "pdf")
+    except LibreOfficeConversionError as e:
+        raise RuntimeError(f"PDF conversion failed: {e}")
+
+
+def convert_ppt_to_pdf(ppt_path: Path) -> Path:
+    """
+    Convert PPT to PDF.
+    LibreOffice automatically handles .ppt and .pptx.
+    """
+    _check_libreoffice()
+
+    ppt_path = ppt_path.resolve()
+
+    if not ppt_path.exists():
+        raise FileNotFoundError(f"File not found: {ppt_path}")
+
+    if ppt_path.suffix.lower() not in {".ppt", ".pptx"}:
+        raise ValueError("Only .ppt and .pptx files are supported")
+
+    try:
+        return convert_with_libreoffice(ppt_path, "pdf")
+    except LibreOfficeConversionError as e:
+        raise RuntimeError(f"PDF conversion failed: {e}")
+
+
+# ============== Batch Office Conversion Functions ==============
+
+# Maximum number of files accepted by the batch office endpoint
+OFFICE_BATCH_MAX_FILES = int(os.getenv("OFFICE_BATCH_MAX_FILES", "200"))
+
+# Office formats accepted for batch conversion, with their single-file PDF converters
+OFFICE_BATCH_PDF_FALLBACKS = {
+    "docx": convert_docx_to_pdf,
+    "doc": convert_doc_to_pdf,
+    "xlsx": convert_excel_to_pdf,
+    "xls": convert_excel_to_pdf,
+    "pptx": convert_pptx_to_pdf,
+    "ppt": convert_ppt_to_pdf,
+}
+
+
+def convert_office_batch(input_paths: List[Path], target_format: str = "pdf") -> Dict[Path, Path]:
+    """Convert many office documents while paying LibreOffice's startup cost once.
+
+    Documents are spread over the warm LibreOffice pool when it is running,
+    otherwise they are all passed to a single soffice invocation. Files that
+    LibreOffice could not convert to PDF are retried one by one with the
+    regular converters and their fallbacks.
+
+    Args:
+        input_paths: Paths to DOCX/DOC/XLSX/XLS/PPTX/PPT files
+        target_format: Target format passed to LibreOffice (default: pdf)
+
+    Returns:
+        Dict mapping each converted input path to its output path. Inputs that
+        could not be converted are left out.
+    """
+    results: Dict[Path, Path] = {}
+
+    if libreoffice_pool.is_running:
+        print(f"Converting {len(input_paths)} documents to {target_format} on warm LibreOffice pool")
+        results.update(libreoffice_pool.convert_many(input_paths, target_format, TEMP_DIR))
+
+    remaining = [path for path in input_paths if path not in results]
+    if remaining:
+        try:
+            results.update(run_libreoffice_batch_conversion(
+                remaining, target_format, TEMP_DIR, TEMP_DIR / "libreoffice"
+            ))
+        except LibreOfficeConversionError as e:
+            print(f"Batch LibreOffice conversion failed: {e}")
+
+    if target_format == "pdf":
+        for input_path in input_paths:
+            if input_path in results:
+                continue
+            fallback = OFFICE_BATCH_PDF_FALLBACKS.get(input_path.suffix.lower().lstrip("."))
+            if fallback is None:
+                continue
+            try:
+                results[input_path] = fallback(input_path)
+            except Exception as e:
+                print(f"Failed to convert {input_path.name}: {e}")
+
+    return results
+
+
+# ============== Text Conversion Functions ==============
+
+def convert_text_to_docx(text_path: Path) -> Path:
+    """Convert text file to DOCX"""
+    from docx import Document
+    text = text_path.read_text()
+    doc = Document()
+    doc.add_paragraph(text)
+    
+    output_path = temp_file_path(f"{uuid.uuid4()}.docx")
+    doc.save(output_path)
+    return output_path
+
+
+# ============== Format Graph ==============
+
+# Conversions offered to /convert/document (see engines/graph.py). Converters
+# with python fallbacks (docx, xlsx) do not require LibreOffice.
+CONVERSIONS = [
+    Conversion("docx", "pdf", convert_docx_to_pdf, 2.0),
+    Conversion("doc", "pdf", convert_doc_to_pdf, 2.0, requires=("libreoffice",)),
+    Conversion("docx", "doc", convert_docx_to_doc, 1.5, requires=("libreoffice",)),
+    Conversion("doc", "docx", convert_doc_to_docx, 1.5, requires=("libreoffice",)),
+    Conversion("xlsx", "pdf", convert_excel_to_pdf, 2.5),
+    Conversion("xls", "pdf", convert_excel_to_pdf, 2.5),
+    Conversion("pptx", "pdf", convert_pptx_to_pdf, 3.0, requires=("libreoffice",)),
+    Conversion("ppt", "pdf", convert_ppt_to_pdf, 3.0, requires=("libreoffice",)),
+    Conversion("txt", "docx", convert_text_to_docx, 0.2),
+]
@@ -0,0 +1,1153 @@
+"""
+PDF Engine
+
+Password protection, merging and splitting, and conversions from PDF to
+Word, text, Excel and PowerPoint (plus text to PDF). pdf2docx, pdfplumber,
+openpyxl, python-pptx and pdf2image are imported by the functions that use
+them; scanned pages are read with the OCR engine's Tesseract setup.
+"""
+
+import uuid
+from pathlib import Path
+from typing import List
+
+from pypdf import PdfReader, PdfWriter
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from engines.graph import Conversion
+from services.metrics_service import time_subprocess
+from services.table_extraction_service import TableExtractionService
+from services.temp_service import temp_file_path
+from services.timing_service import record_engine
+
+
+def lock_pdf(pdf_path: Path, password: str) -> Path:
+    """Encrypt PDF with password"""
+    reader = PdfReader(pdf_path)
+    writer = PdfWriter()
+    
+    for page in reader.pages:
+        writer.add_page(page)
+    
+    writer.encrypt(password)
+    output_path = temp_file_path(f"{uuid.uuid4()}_locked.pdf")
+    with open(output_path, "wb") as output_file:
+        writer.write(output_file)
+    
+    return output_path
+
+def unlock_pdf(pdf_path: Path, password: str) -> Path:
+    """Decrypt PDF with password"""
+    reader = PdfReader(pdf_path)
+    if reader.is_encrypted:
+        reader.decrypt(password)
+    
+    writer = PdfWriter()
+    for page in reader.pages:
+        writer.add_page(page)
+    
+    output_path = temp_file_path(f"{uuid.uuid4()}_unlocked.pdf")
+    with open(output_path, "wb") as output_file:
+        writer.write(output_file)
+    
+    return output_path
+
+def merge_pdfs(pdf_paths: List[Path]) -> Path:
+    """Merge multiple PDFs"""
+    writer = PdfWriter()
+    
+    for pdf_path in pdf_paths:
+        reader = PdfReader(pdf_path)
+        for page in reader.pages:
+            writer.add_page(page)
+    
+    output_path = temp_file_path(f"{uuid.uuid4()}_merged.pdf")
+    with open(output_path, "wb") as output_file:
+        writer.write(output_file)
+    
+    return output_path
+
+def split_pdf(pdf_path: Path, page_ranges: str) -> List[Path]:
+    """Split PDF into multiple files"""
+    reader = PdfReader(pdf_path)
+    output_paths = []
+    
+    ranges = page_ranges.split(',')
+    for idx, range_str in enumerate(ranges):
+        writer = PdfWriter()
+        if '-' in range_str:
+            start, end = map(int, range_str.split('-'))
+            for page_num in range(start - 1, min(end, len(reader.pages))):
+                writer.add_page(reader.pages[page_num])
+        else:
+            page_num = int(range_str) - 1
+            if page_num < len(reader.pages):
+                writer.add_page(reader.pages[page_num])
+        
+        output_path = temp_file_path(f"{uuid.uuid4()}_part{idx + 1}.pdf")
+        with open(output_path, "wb") as output_file:
+            writer.write(output_file)
+        output_paths.append(output_path)
+    
+    return output_paths
+
+
+# ============== PDF Conversion Functions ==============
+
+def convert_pdf_to_docx(pdf_path: Path) -> Path:
+    """Convert PDF to DOCX using pdf2docx for better format preservation"""
+    from docx import Document
+    from pdf2docx import Converter
+    output_path = temp_file_path(f"{uuid.uuid4()}.docx")
+
+    try:
+        # Use pdf2docx Converter for better format preservation
+        record_engine("pdf2docx")
+        cv = Converter(str(pdf_path))
+        cv.convert(str(output_path), start=0, end=None)
+        cv.close()
+    except Exception as e:
+        # Fallback to text extraction if pdf2docx fails
+        print(f"pdf2docx conversion failed: {e}, falling back to text extraction")
+        record_engine("pypdf-text")
+        reader = PdfReader(str(pdf_path))
+        doc = Document()
+
+        for page in reader.pages:
+            text = page.extract_text()
+            if text:
+                lines = text.split("\n")
+                for line in lines:
+                    if line.strip():
+                        doc.add_paragraph(line.strip())
+
+        doc.save(output_path)
+
+    return output_path
+
+
+def convert_pdf_to_doc(pdf_path: Path) -> Path:
+    """Convert PDF to DOC (via DOCX).
+
+    LibreOffice can only import PDFs as drawings, so pdf2docx does the layout
+    work and LibreOffice saves the result as DOC. Not a format graph edge:
+    /convert/document runs the two steps on their own engines instead.
+    """
+    from engines.office import convert_docx_to_doc
+    docx_path = convert_pdf_to_docx(pdf_path)
+    try:
+        return convert_docx_to_doc(docx_path)
+    finally:
+        docx_path.unlink(missing_ok=True)
+
+
+def convert_pdf_to_text(pdf_path: Path) -> Path:
+    """Extract text from PDF"""
+    reader = PdfReader(pdf_path)
+    text = ""
+    for page in reader.pages:
+        text += page.extract_text() + "\n"
+    
+    output_path = temp_file_path(f"{uuid.uuid4()}.txt")
+    output_path.write_text(text)
+    return output_path
+
+
+def convert_pdf_to_excel(pdf_path: Path, quality: str = "precise") -> Path:
+    """Convert PDF to Excel using TableExtractionService for precise table extraction.
+    
+    Uses advanced table extraction with Camelot, pdfplumber, and Tabula for best results.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        quality: Extraction quality - "precise" (uses Camelot, best accuracy) or "fast" (uses pdfplumber, faster)
+    
+    Returns:
+        Path to the converted Excel file
+    """
+    # Define border style for table cells
+    import pdfplumber
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment, Border, Font, Side
+    thin_border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+
+    wb = Workbook()
+    # XLImage reads its file only when the workbook is saved
+    image_paths = []
+    
+    # Initialize the table extraction service
+    # prefer_quality=True means accuracy over speed
+    extraction_service = TableExtractionService(prefer_quality=(quality == "precise"))
+    
+    # Extract all tables using the advanced service
+    print(f"Extracting tables from PDF with {quality} quality...")
+    all_tables = extraction_service.extract_all_tables(pdf_path)
+    
+    # Also extract text content for non-table areas
+    with pdfplumber.open(pdf_path) as pdf:
+        total_pages = len(pdf.pages)
+        
+        for page_num, page in enumerate(pdf.pages, start=1):
+            if page_num == 1:
+                ws = wb.active
+                ws.title = f"Page {page_num}"
+            else:
+                ws = wb.create_sheet(f"Page {page_num}")
+            
+            current_row = 1
+            
+            # Extract and embed images first
+            try:
+                images = page.images
+                if images:
+                    for img_idx, img in enumerate(images):
+                        try:
+                            # Extract image data
+                            img_bbox = (img['x0'], img['top'], img['x1'], img['bottom'])
+                            img_data = page.within_bbox(img_bbox).to_image(resolution=150)
+                            
+                            # Save image to temporary file
+                            img_temp_path = temp_file_path(f"temp_img_{uuid.uuid4()}.png")
+                            img_data.save(img_temp_path)
+                            image_paths.append(img_temp_path)
+                            
+                            # Embed image in Excel
+                            from openpyxl.drawing.image import Image as XLImage
+                            xl_img = XLImage(img_temp_path)
+                            
+                            # Resize image to fit reasonably in Excel (max 200x200 pixels)
+                            xl_img.width = min(xl_img.width, 200)
+                            xl_img.height = min(xl_img.height, 200)
+                            
+                            # Add image to worksheet
+                            ws.add_image(xl_img, f"A{current_row}")
+                            
+                            # Add label for the image
+                            ws.cell(row=current_row, column=2, value=f"Image {img_idx + 1} from Page {page_num}")
+                            ws.cell(row=current_row, column=2).font = Font(italic=True)
+                            
+                            current_row += max(15, int(xl_img.height / 15) + 2)
+                            
+                        except Exception as e:
+                            print(f"Failed to extract image {img_idx} from page {page_num}: {e}")
+                            continue
+            except Exception as e:
+                print(f"Failed to extract images from page {page_num}: {e}")
+            
+            # Process tables extracted by TableExtractionService
+            if page_num in all_tables and all_tables[page_num]:
+                tables_on_page = all_tables[page_num]
+                
+                for table_idx, table_data in enumerate(tables_on_page):
+                    if table_idx > 0 or current_row > 1:
+                        ws.cell(row=current_row, column=1, value="")
+                        current_row += 1
+                    
+                    # Add table metadata header
+                    metadata = table_data.metadata
+                    if metadata.table_title:
+                        ws.cell(row=current_row, column=1, value=metadata.table_title)
+                        ws.cell(row=current_row, column=1).font = Font(bold=True, size=12)
+                        current_row += 1
+                    
+                    # Add confidence score info
+                    confidence_pct = metadata.confidence_score * 100
+                    ws.cell(row=current_row, column=1, value=f"Confidence: {confidence_pct:.1f}% | Method: {metadata.method_used.value}")
+                    ws.cell(row=current_row, column=1).font = Font(italic=True, size=10)
+                    current_row += 1
+                    
+                    # Add extraction warnings if any
+                    if metadata.extraction_warnings:
+                        ws.cell(row=current_row, column=1, value=f"Warnings: {', '.join(metadata.extraction_warnings)}")
+                        ws.cell(row=current_row, column=1).font = Font(italic=True, size=9, color="FFA500")
+                        current_row += 1
+                    
+                    # Get the table data
+                    table_cells = table_data.cells
+                    
+                    if table_cells:
+                        table_start_row = current_row
+                        
+                        for row_idx, row in enumerate(table_cells):
+                            for col_idx, cell in enumerate(row, start=1):
+                                excel_cell = ws.cell(row=current_row, column=col_idx, value=cell.formatted_value)
+                                
+                                # Apply border
+                                excel_cell.border = thin_border
+                                
+                                # Center align
+                                excel_cell.alignment = Alignment(horizontal='center', vertical='center')
+                                
+                                # Make header row bold
+                                if cell.is_header or (row_idx == 0 and metadata.has_header):
+                                    excel_cell.font = Font(bold=True)
+                                
+                                # Apply data type specific formatting
+                                if cell.data_type == "currency":
+                                    excel_cell.number_format = '"$"#,##0.00'
+                                elif cell.data_type == "percentage":
+                                    excel_cell.number_format = '0.00%'
+                                elif cell.data_type == "number":
+                                    excel_cell.number_format = '#,##0.00'
+                            
+                            current_row += 1
+                        
+                        # Adjust column widths based on content
+                        for col in range(1, len(table_cells[0]) + 1):
+                            max_width = 0
+                            for row in range(table_start_row, current_row):
+                                cell = ws.cell(row=row, column=col)
+                                if cell.value:
+                                    cell_width = len(str(cell.value)) + 2
+                                    if cell_width > max_width:
+                                        max_width = cell_width
+                            if max_width > 50:
+                                max_width = 50
+                            if max_width < 8:
+                                max_width = 8
+                            col_letter = ws.cell(row=table_start_row, column=col).column_letter
+                            ws.column_dimensions[col_letter].width = max_width
+            
+            # Fallback: use basic pdfplumber extraction if no tables found
+            if page_num not in all_tables or not all_tables[page_num]:
+                tables = page.extract_tables()
+                
+                if tables:
+                    if current_row > 1:
+                        ws.cell(row=current_row, column=1, value="")
+                        current_row += 1
+                    
+                    for table_idx, table in enumerate(tables):
+                        if table_idx > 0 or current_row > 1:
+                            ws.cell(row=current_row, column=1, value="")
+                            current_row += 1
+                        
+                        ws.cell(row=current_row, column=1, value=f"Table {table_idx + 1} (basic extraction)")
+                        ws.cell(row=current_row, column=1).font = Font(bold=True, size=12)
+                        current_row += 1
+                        
+                        table_start_row = current_row
+                        
+                        for row_idx, row in enumerate(table):
+                            if row is None:
+                                continue
+                            
+                            for col_idx, cell_value in enumerate(row, start=1):
+                                cell = ws.cell(row=current_row, column=col_idx, value=cell_value.strip() if cell_value else "")
+                                cell.border = thin_border
+                                cell.alignment = Alignment(horizontal='center', vertical='center')
+                                if row_idx == 0:
+                                    cell.font = Font(bold=True)
+                            
+                            current_row += 1
+                        
+                        for col in range(1, ws.max_column + 1):
+                            max_width = 0
+                            for row in range(table_start_row, current_row):
+                                cell = ws.cell(row=row, column=col)
+                                if cell.value:
+                                    cell_width = len(str(cell.value)) + 2
+                                    if cell_width > max_width:
+                                        max_width = cell_width
+                            if max_width > 50:
+                                max_width = 50
+                            col_letter = ws.cell(row=table_start_row, column=col).column_letter
+                            ws.column_dimensions[col_letter].width = max_width
+            
+            # Extract text content for non-table areas
+            text = page.extract_text()
+            if text and current_row > 1:
+                ws.cell(row=current_row, column=1, value="")
+                current_row += 1
+            
+            if text:
+                ws.cell(row=current_row, column=1, value=f"Page {page_num} - Text Content:")
+                ws.cell(row=current_row, column=1).font = Font(bold=True, size=12)
+                current_row += 1
+                
+                lines = text.split('\n')
+                for line in lines:
+                    if line.strip():
+                        ws.cell(row=current_row, column=1, value=line.strip())
+                        current_row += 1
+            
+            # If page has no content at all
+            if current_row == 1:
+                ws.cell(row=1, column=1, value=f"Page {page_num} - No extractable content found")
+                ws.cell(row=1, column=1).font = Font(italic=True)
+            
+            print(f"Processed page {page_num}/{total_pages}")
+    
+    output_path = temp_file_path(f"{uuid.uuid4()}.xlsx")
+    try:
+        wb.save(output_path)
+    finally:
+        for img_temp_path in image_paths:
+            img_temp_path.unlink(missing_ok=True)
+    print(f"Excel file saved to: {output_path}")
+    return output_path
+
+
+# ============== PDF to PPTX Conversion Helper Functions ==============
+
+    wb = Workbook()
+
+    # Open PDF with pdfplumber for comprehensive extraction
+    with pdfplumber.open(pdf_path) as pdf:
+        # Create a sheet for each page
+        for page_num, page in enumerate(pdf.pages, start=1):
+            if page_num == 1:
+                ws = wb.active
+                ws.title = f"Page {page_num}"
+            else:
+                ws = wb.create_sheet(f"Page {page_num}")
+
+            current_row = 1
+
+            # Extract and embed images first
+            try:
+                images = page.images
+                if images:
+                    for img_idx, img in enumerate(images):
+                        try:
+                            # Extract image data
+                            img_bbox = (img['x0'], img['top'], img['x1'], img['bottom'])
+                            img_data = page.within_bbox(img_bbox).to_image(resolution=150)
+
+                            # Save image to temporary file
+                            img_temp_path = temp_file_path(f"temp_img_{uuid.uuid4()}.png")
+                            img_data.save(img_temp_path)
+                            image_paths.append(img_temp_path)
+
+                            # Embed image in Excel
+                            from openpyxl.drawing.image import Image as XLImage
+                            xl_img = XLImage(img_temp_path)
+
+                            # Resize image to fit reasonably in Excel (max 200x200 pixels)
+                            xl_img.width = min(xl_img.width, 200)
+                            xl_img.height = min(xl_img.height, 200)
+
+                            # Add image to worksheet
+                            ws.add_image(xl_img, f"A{current_row}")
+
+                            # Add label for the image
+                            ws.cell(row=current_row, column=2, value=f"Image {img_idx + 1} from Page {page_num}")
+                            ws.cell(row=current_row, column=2).font = Font(italic=True)
+
+                            current_row += max(15, int(xl_img.height / 15) + 2)  # Space for image + label
+
+                        except Exception as e:
+                            print(f"Failed to extract image {img_idx} from page {page_num}: {e}")
+                            continue
+            except Exception as e:
+                print(f"Failed to extract images from page {page_num}: {e}")
+
+            # Extract tables from the page
+            tables = page.extract_tables()
+
+            if tables:
+                # Process each table found on the page
+                for table_idx, table in enumerate(tables):
+                    if table_idx > 0 or current_row > 1:
+                        # Add a blank row between tables/content
+                        ws.cell(row=current_row, column=1, value="")
+                        current_row += 1
+
+                    # Add table header
+                    ws.cell(row=current_row, column=1, value=f"Table {table_idx + 1}")
+                    ws.cell(row=current_row, column=1).font = Font(bold=True, size=12)
+                    current_row += 1
+
+                    table_start_row = current_row
+
+                    for row_idx, row in enumerate(table):
+                        if row is None:
+                            continue
+
+                        for col_idx, cell_value in enumerate(row, start=1):
+                            cell = ws.cell(row=current_row, column=col_idx, value=cell_value.strip() if cell_value else "")
+
+                            # Apply border to all cells
+                            cell.border = thin_border
+
+                            # Center align cells
+                            cell.alignment = Alignment(horizontal='center', vertical='center')
+
+                            # Make header row bold (first row of each table)
+                            if row_idx == 0:
+                                cell.font = Font(bold=True)
+
+                        current_row += 1
+
+                    # Adjust column widths based on content for this table
+                    for col in range(1, ws.max_column + 1):
+                        max_width = 0
+                        for row in range(table_start_row, current_row):
+                            cell = ws.cell(row=row, column=col)
+                            if cell.value:
+                                cell_width = len(str(cell.value)) + 2
+                                if cell_width > max_width:
+                                    max_width = cell_width
+                        # Limit column width to reasonable values
+                        if max_width > 50:
+                            max_width = 50
+                        col_letter = ws.cell(row=table_start_row, column=col).column_letter
+                        current_width = ws.column_dimensions.get(col_letter, None)
+                        current_width = current_width.width if current_width else 0
+                        ws.column_dimensions[col_letter].width = max(current_width, min(max_width, 50))
+
+            # Extract text content if no tables found or as additional content
+            text = page.extract_text()
+            if text and (not tables or current_row > 1):
+                # Add a blank row before text section
+                if current_row > 1:
+                    ws.cell(row=current_row, column=1, value="")
+                    current_row += 1
+
+                # Add text header
+                ws.cell(row=current_row, column=1, value=f"Page {page_num} - Text Content:")
+                ws.cell(row=current_row, column=1).font = Font(bold=True, size=12)
+                current_row += 1
+
+                lines = text.split('\n')
+                for line in lines:
+                    if line.strip():
+                        ws.cell(row=current_row, column=1, value=line.strip())
+                        current_row += 1
+
+            # If page has no content at all
+            if current_row == 1:
+                ws.cell(row=1, column=1, value=f"Page {page_num} - No extractable content found")
+                ws.cell(row=1, column=1).font = Font(italic=True)
+
+
+def ocr_page(page):
+    from engines.ocr import load_pytesseract
+    pytesseract = load_pytesseract()
+    image = page.to_image(resolution=300).original
+    with time_subprocess("tesseract"):
+        return pytesseract.image_to_string(image)
+
+def detect_columns(words, tolerance=30):
+    columns = {}
+    for w in words:
+        x = round(w["x0"] / tolerance) * tolerance
+        columns.setdefault(x, []).append(w)
+    return list(columns.values())
+
+def overlay_text(slide, words):
+    from pptx.util import Inches, Pt
+    lines = {}
+    for w in words:
+        y = round(w["top"], 1)
+        lines.setdefault(y, []).append(w)
+
+    for y, line_words in lines.items():
+        line_words.sort(key=lambda x: x["x0"])
+        text = " ".join(w["text"] for w in line_words)
+
+        left = Inches(min(w["x0"] for w in line_words) / 72)
+        top = Inches(y / 72)
+        width = Inches(
+            (max(w["x1"] for w in line_words) -
+             min(w["x0"] for w in line_words)) / 72
+        )
+
+        box = slide.shapes.add_textbox(left, top, width, Inches(0.4))
+        tf = box.text_frame
+        tf.word_wrap = True
+        p = tf.paragraphs[0]
+        p.text = text
+        p.font.size = Pt(12)
+        p.font.name = "Calibri"
+
+def add_background_image(slide, pdf_path, page_num, slide_width, slide_height):
+    from pdf2image import convert_from_path
+    from pptx.util import Inches
+    images = convert_from_path(
+        str(pdf_path),
+        dpi=300,
+        first_page=page_num,
+        last_page=page_num
+    )
+    img_path = temp_file_path(f"bg_{uuid.uuid4()}.png")
+    images[0].save(img_path)
+
+    slide.shapes.add_picture(
+        str(img_path), Inches(0), Inches(0),
+        width=slide_width, height=slide_height
+    )
+    img_path.unlink(missing_ok=True)
+
+def compute_quality_score(used_ocr, detected_tables, detected_columns, word_count):
+    score = 100
+    if used_ocr:
+        score -= 30
+    if detected_tables:
+        score += 10
+    if not detected_columns:
+        score -= 10
+    if word_count < 20:
+        score -= 20
+    return max(0, min(score, 100))
+
+
+# ===================== MAIN CONVERTER  PDF TO PPTX=====================
+
+# def convert_pdf_to_pptx(pdf_path: Path) -> Path:
+#     """
+#     Adobe-like PDF → PPTX converter:
+#     - Two-layer rendering
+#     - OCR fallback
+#     - Column detection
+#     - Table detection
+#     - Quality scoring
+#     """
+
+#     reader = PdfReader(str(pdf_path))
+#     first_page = reader.pages[0]
+
+#     pdf_w = float(first_page.mediabox.width) / 72
+#     pdf_h = float(first_page.mediabox.height) / 72
+
+#     prs = Presentation()
+#     prs.slide_width = Inches(pdf_w)
+#     prs.slide_height = Inches(pdf_h)
+
+#     quality_scores = []
+
+#     with pdfplumber.open(pdf_path) as pdf:
+#         for idx, page in enumerate(pdf.pages, start=1):
+#             slide = prs.slides.add_slide(prs.slide_layouts[6])
+
+#             # ---------- Layer 0 (Background Image) ----------
+#             add_background_image(
+#                 slide, pdf_path, idx,
+#                 prs.slide_width, prs.slide_height
+#             )
+
+#             words = page.extract_words(use_text_flow=True)
+#             used_ocr = False
+
+#             if not words:
+#                 text = ocr_page(page)
+#                 used_ocr = True
+#                 words = [
+#                     {"text": t, "x0": 50, "x1": 500, "top": i * 14}
+#                     for i, t in enumerate(text.splitlines())
+#                     if t.strip()
+#                 ]
+
+#             # ---------- Column Detection ----------
+#             columns = detect_columns(words)
+
+#             # ---------- Editable Overlay ----------
+#             overlay_text(slide, words)
+
+#             # ---------- Table Detection ----------
+#             tables = []
+#             try:
+#                 tables = camelot.read_pdf(
+#                     str(pdf_path),
+#                     pages=str(idx),
+#                     flavor="stream"
+#                 )
+#             except Exception:
+#                 pass
+
+#             for table in tables:
+#                 rows, cols = table.df.shape
+#                 ppt_table = slide.shapes.add_table(
+#                     rows, cols,
+#                     Inches(0.5), Inches(0.5),
+#                     Inches(6), Inches(3)
+#                 ).table
+
+#                 for r in range(rows):
+#                     for c in range(cols):
+#                         ppt_table.cell(r, c).text = table.df.iloc[r, c]
+
+#             # ---------- Quality Score ----------
+#             score = compute_quality_score(
+#                 used_ocr=used_ocr,
+#                 detected_tables=bool(tables),
+#                 detected_columns=len(columns) > 1,
+#                 word_count=len(words)
+#             )
+#             quality_scores.append(score)
+
+#     output_path = temp_file_path(f"{uuid.uuid4()}.pptx")
+#     prs.save(output_path)
+
+#     print("Average quality score:", sum(quality_scores) // len(quality_scores))
+#     return output_path
+
+
+def convert_pdf_to_pptx(pdf_path: Path) -> Path:
+    """Convert PDF to PowerPoint with enhanced layout and media preservation.
+    
+    This function provides two conversion methods:
+    1. Hybrid-based (enhanced): Extracts text with layout AND embedded media
+       - Preserves visual elements (images, charts, formatting, layout)
+       - Editable text with proper formatting
+       - Best balance of visual fidelity and editability
+    2. Image-based: Converts each PDF page to an image and adds as slide
+       - Preserves all visual elements exactly as shown
+       - Best for visual fidelity when editability is not needed
+    3. Text-based: Extracts text with basic layout information
+       - Editable text output
+       - Works without external dependencies
+       - Good for text-heavy documents
+    
+    Returns:
+        Path: Path to the converted PowerPoint file
+    """
+    from pptx.util import Inches, Pt, Emu
+    from pptx.enum.shapes import MSO_SHAPE
+    from pptx.dml.color import RGBColor
+    
+    # Try hybrid-based conversion first (best balance of quality and editability)
+    try:
+        print("Attempting image-based PDF to PPTX conversion...")
+        return _convert_pdf_to_pptx_image_based(pdf_path)
+
+    except Exception as image_error:
+        print(f"Image-based conversion failed: {image_error}, trying hybrid conversion...")
+
+        try:
+            return _convert_pdf_to_pptx_hybrid(pdf_path)
+
+        except ImportError as e:
+            print(f"pdfplumber not available: {e}, falling back to text-based conversion")
+            return _convert_pdf_to_pptx_text_based(pdf_path)
+
+        except Exception as hybrid_error:
+            print(f"Hybrid conversion failed: {hybrid_error}, falling back to text-based conversion")
+            return _convert_pdf_to_pptx_text_based(pdf_path)
+
+
+def _convert_pdf_to_pptx_hybrid(pdf_path: Path) -> Path:
+    """Convert PDF to PowerPoint using hybrid approach.
+    
+    This method extracts text with layout preservation AND preserves embedded media.
+    It provides the best balance of visual fidelity and editability.
+    """
+    record_engine("pptx-hybrid")
+    import pdfplumber
+    from pptx import Presentation
+    from pptx.util import Inches, Pt, Emu
+    from pptx.enum.text import PP_ALIGN
+    from pptx.dml.color import RGBColor
+    
+    # Open PDF with pdfplumber for comprehensive extraction
+    with pdfplumber.open(pdf_path) as pdf:
+        prs = Presentation()
+        
+        # Get source PDF page dimensions and calculate appropriate slide size
+        first_page = pdf.pages[0]
+        pdf_width_pt = first_page.width
+        pdf_height_pt = first_page.height
+        
+        # Convert PDF points to inches (72 points per inch)
+        pdf_width_inches = pdf_width_pt / 72
+        pdf_height_inches = pdf_height_pt / 72
+        
+        # Set slide dimensions to match source PDF (maintain aspect ratio)
+        # Use 16:9 as baseline but adjust based on source
+        prs.slide_width = Inches(pdf_width_inches)
+        prs.slide_height = Inches(pdf_height_inches)
+        
+        # Process each page
+        for page_num, page in enumerate(pdf.pages, start=1):
+            print(f"Processing page {page_num}/{len(pdf.pages)}...")
+            
+            # Create a blank slide
+            blank_slide_layout = prs.slide_layouts[6]  # Blank layout
+            slide = prs.slides.add_slide(blank_slide_layout)
+            
+            current_y = Inches(0.5)  # Start with margin from top
+            left_margin = Inches(0.5)
+            max_width = prs.slide_width - Inches(1)  # Left and right margins
+            
+            # 1. First, extract and add images from the page
+            try:
+                if page.images:
+                    print(f"  Found {len(page.images)} images on page {page_num}")
+                    for img_idx, img in enumerate(page.images):
+                        try:
+                            # Extract image data
+                            img_bbox = (img['x0'], img['top'], img['x1'], img['bottom'])
+                            img_data = page.within_bbox(img_bbox).to_image(resolution=300)
+                            
+                            # Calculate image dimensions
+                            img_width_inches = (img['x1'] - img['x0']) / 72
+                            img_height_inches = (img['bottom'] - img['top']) / 72
+                            
+                            # Scale down if image is wider than slide
+                            if img_width_inches > max_width:
+                                scale = max_width / Inches(img_width_inches)
+                                img_width_inches = max_width
+                                img_height_inches = Inches(float(img_height_inches) * float(scale))
+                            
+                            # Add image to slide
+                            img_left = left_margin
+                            img_top = current_y
+                            
+                            # Save image to temporary file, removed once the slide has read it
+                            img_temp_path = temp_file_path(f"temp_pptx_img_{uuid.uuid4()}.png")
+                            try:
+                                img_data.save(str(img_temp_path))
+                                slide.shapes.add_picture(
+                                    str(img_temp_path), 
+                                    img_left, 
+                                    img_top, 
+                                    width=img_width_inches
+                                )
+                            finally:
+                                img_temp_path.unlink(missing_ok=True)
+                            
+                            # Update Y position for next element
+                            current_y = img_top + img_height_inches + Inches(0.3)
+                            
+                        except Exception as e:
+                            print(f"  Failed to extract image {img_idx}: {e}")
+                            continue
+            except Exception as e:
+                print(f"  Failed to extract images from page {page_num}: {e}")
+            
+            # 2. Extract and add text content
+            text = page.extract_text()
+            if text:
+                # Clean up text
+                lines = text.split('\n')
+                cleaned_lines = []
+                for line in lines:
+                    line = line.strip()
+                    if line:
+                        cleaned_lines.append(line)
+                
+                if cleaned_lines:
+                    # Create text box for content
+                    text_box_height = prs.slide_height - current_y - Inches(0.5)
+                    
+                    if text_box_height > Inches(0.5):
+                        text_box = slide.shapes.add_textbox(
+                            left_margin,
+                            current_y,
+                            max_width,
+                            text_box_height
+                        )
+                        tf = text_box.text_frame
+                        tf.word_wrap = True
+                        
+                        # Process lines and add to text frame
+                        for i, line in enumerate(cleaned_lines):
+                            # Detect headers (lines that are short and followed by longer content)
+                            is_header = (
+                                len(line) < 50 and 
+                                i < len(cleaned_lines) - 1 and 
+                                len(cleaned_lines[i + 1]) > len(line)
+                            )
+                            
+                            # Detect bullet points
+                            is_bullet = (
+                                line.startswith('•') or 
+                                line.startswith('·') or
+                                line.startswith('- ') or
+                                line.startswith('* ') or
+                                (len(line) > 2 and line[0].isdigit() and line[1] in '.)')
+                            )
+                            
+                            # Clean bullet prefix
+                            if is_bullet:
+                                for prefix in ['• ', '· ', '- ', '* ', '1. ', '2. ', '3. ', '1) ', '2) ', '3) ']:
+                                    if line.startswith(prefix):
+                                        line = line[len(prefix):]
+                                        break
+                            
+                            if i == 0:
+                                p = tf.paragraphs[0]
+                            else:
+                                p = tf.add_paragraph()
+                            
+                            p.text = line
+                            p.font.size = Pt(12)
+                            
+                            # Apply formatting based on content type
+                            if is_header:
+                                p.font.size = Pt(18)
+                                p.font.bold = True
+                                p.font.color.rgb = RGBColor(0, 51, 102)  # Dark blue
+                                p.space_before = Pt(12)
+                                p.space_after = Pt(6)
+                            elif is_bullet:
+                                p.level = 0
+                                p.space_before = Pt(6)
+                            else:
+                                p.space_before = Pt(4)
+                        
+                        print(f"  Added text content with {len(cleaned_lines)} lines")
+            
+            print(f"  Completed page {page_num}")
+        
+        output_path = temp_file_path(f"{uuid.uuid4()}.pptx")
+        prs.save(output_path)
+        print(f"PPTX saved to: {output_path}")
+        return output_path
+
+
+def _convert_pdf_to_pptx_image_based(pdf_path: Path) -> Path:
+    """Convert PDF to PowerPoint using image-based approach.
+    
+    Each PDF page is converted to a high-quality image and added as a slide.
+    This preserves visual layout, images, and formatting perfectly.
+    Uses 300 DPI for high-quality output.
+    
+    Key improvements:
+    - Slide dimensions match the source PDF page dimensions exactly
+    - Images are scaled to fit while maintaining aspect ratio
+    - High-quality image conversion with proper temp file cleanup
+    """
+    record_engine("pptx-image")
+    from pdf2image import convert_from_path
+    from pptx import Presentation
+    from pptx.util import Inches
+    from PIL import Image as PILImage
+    
+    # Get PDF page dimensions first
+    from pypdf import PdfReader
+    reader = PdfReader(str(pdf_path))
+    first_page = reader.pages[0]
+    
+    # Get PDF page dimensions in points (72 points per inch)
+    pdf_width_pt = float(first_page.mediabox.width)
+    pdf_height_pt = float(first_page.mediabox.height)
+    
+    # Convert to inches for PPTX
+    pdf_width_inches = pdf_width_pt / 72
+    pdf_height_inches = pdf_height_pt / 72
+    
+    print(f"PDF page dimensions: {pdf_width_pt}pt x {pdf_height_pt}pt ({pdf_width_inches:.2f}\" x {pdf_height_inches:.2f}\")")
+    
+    # Convert PDF pages to images at 300 DPI for high quality
+    print(f"Converting PDF to images (300 DPI): {pdf_path}")
+    images = convert_from_path(str(pdf_path), dpi=300, thread_count=2)
+    
+    prs = Presentation()
+    
+    # Set slide dimensions to match the source PDF page dimensions exactly
+    # This preserves the aspect ratio of the original document
+    prs.slide_width = Inches(pdf_width_inches)
+    prs.slide_height = Inches(pdf_height_inches)
+    
+    print(f"Slide dimensions set to: {prs.slide_width.inches:.2f}\" x {prs.slide_height.inches:.2f}\"")
+    
+    temp_images = []  # Track temp files for cleanup
+    
+    for page_num, image in enumerate(images):
+        try:
+            # Create blank slide
+            blank_slide_layout = prs.slide_layouts[6]  # Blank layout
+            slide = prs.slides.add_slide(blank_slide_layout)
+            
+            # Get image dimensions
+            img_width_px, img_height_px = image.size
+            
+            # Calculate scaling to fit image on slide while maintaining aspect ratio
+            # The image should fill the entire slide
+            slide_width_px = int(prs.slide_width.inches * 300)  # 300 DPI
+            slide_height_px = int(prs.slide_height.inches * 300)
+            
+            # Calculate the scale factors
+            scale_w = slide_width_px / img_width_px
+            scale_h = slide_height_px / img_height_px
+            
+            # Use the larger scale to fill the slide completely (cover mode)
+            # This ensures no white space around the image
+            scale = max(scale_w, scale_h)
+            
+            # Calculate scaled dimensions
+            scaled_width = int(img_width_px * scale)
+            scaled_height = int(img_height_px * scale)
+            
+            # Calculate position to center the image
+            left_px = (slide_width_px - scaled_width) // 2
+            top_px = (slide_height_px - scaled_height) // 2
+            
+            # Convert pixels back to inches for PPTX
+            left = Inches(left_px / 300)
+            top = Inches(top_px / 300)
+            width = Inches(scaled_width / 300)
+            
+            # Save image temporarily at high quality
+            img_path = temp_file_path(f"temp_pptx_img_{uuid.uuid4()}.png")
+            temp_images.append(img_path)
+            image.save(str(img_path), "PNG", quality=95)
+            
+            # Add image to slide
+            slide.shapes.add_picture(str(img_path), left, top, width=width)
+            
+            print(f"Added slide {page_num + 1}/{len(images)}: {img_width_px}x{img_height_px}px -> {scaled_width}x{scaled_height}px")
+            
+        except Exception as e:
+            print(f"Error processing page {page_num + 1}: {e}")
+            continue
+    
+    # Clean up temp images
+    for img_path in temp_images:
+        try:
+            if img_path.exists():
+                img_path.unlink()
+        except Exception as e:
+            print(f"Warning: Failed to clean up temp file {img_path}: {e}")
+    
+    output_path = temp_file_path(f"{uuid.uuid4()}.pptx")
+    prs.save(output_path)
+    print(f"PPTX saved to: {output_path}")
+    return output_path
+
+
+def _convert_pdf_to_pptx_text_based(pdf_path: Path) -> Path:
+    """Convert PDF to PowerPoint using text extraction with layout preservation.
+    
+    Extracts text from PDF while preserving some layout information.
+    Creates editable slides with extracted text.
+    """
+    record_engine("pptx-text")
+    from pptx import Presentation
+    from pptx.util import Inches, Pt
+    from pptx.enum.text import PP_ALIGN
+    
+    reader = PdfReader(str(pdf_path))
+    prs = Presentation()
+    
+    # Use widescreen (16:9) format
+    prs.slide_width = Inches(13.333)
+    prs.slide_height = Inches(7.5)
+    
+    for page_num, page in enumerate(reader.pages):
+        # Create a slide with title layout
+        slide_layout = prs.slide_layouts[1]  # Title and Content layout
+        slide = prs.slides.add_slide(slide_layout)
+        
+        # Get page dimensions
+        page_width_pt = float(page.mediabox.width)
+        page_height_pt = float(page.mediabox.height)
+        
+        # Extract text from page
+        text = page.extract_text()
+        
+        # Add page title
+        title = slide.shapes.title
+        title.text = f"Page {page_num + 1}"
+        if title.text_frame:
+            title.text_frame.paragraphs[0].font.size = Pt(32)
+            title.text_frame.paragraphs[0].font.bold = True
+        
+        # Get content placeholder
+        content_shape = slide.placeholders[1] if len(slide.placeholders) > 1 else None
+        
+        if content_shape and text:
+            text_frame = content_shape.text_frame
+            text_frame.clear()
+            text_frame.word_wrap = True
+            
+            # Split text into paragraphs and add to slide
+            paragraphs = text.split('\n')
+            
+            for i, para in enumerate(paragraphs):
+                para = para.strip()
+                if not para:
+                    continue
+                
+                # Truncate very long paragraphs
+                if len(para) > 500:
+                    para = para[:497] + "..."
+                
+                if i == 0:
+                    p = text_frame.paragraphs[0]
+                else:
+                    p = text_frame.add_paragraph()
+                
+                p.text = para
+                p.font.size = Pt(14)
+                p.space_before = Pt(6)
+                
+                # Add bullet points for shorter items (likely list items)
+                if len(para) < 100 and (para.startswith("•") or para.startswith("-") or para.startswith("·") or para[0:2].replace(".", "").isdigit()):
+                    p.level = 0
+        elif text:
+            # If no content placeholder, create a text box
+            left = Inches(0.5)
+            top = Inches(1.5)
+            width = Inches(12.333)
+            height = Inches(5.5)
+            
+            text_box = slide.shapes.add_textbox(left, top, width, height)
+            tf = text_box.text_frame
+            tf.word_wrap = True
+            
+            paragraphs = text.split('\n')
+            for i, para in enumerate(paragraphs):
+                para = para.strip()
+                if not para:
+                    continue
+                
+                if len(para) > 500:
+                    para = para[:497] + "..."
+                
+                if i == 0:
+                    p = tf.paragraphs[0]
+                else:
+                    p = tf.add_paragraph()
+                
+                p.text = para
+                p.font.size = Pt(14)
+                p.space_before = Pt(6)
+        
+        print(f"Processed page {page_num + 1}/{len(reader.pages)}")
+    
+    output_path = temp_file_path(f"{uuid.uuid4()}.pptx")
+    prs.save(output_path)
+    print(f"PPTX saved to: {output_path}")
+    return output_path
+
+
+def convert_text_to_pdf(text_path: Path) -> Path:
+    """Convert text file to PDF"""
+    text = text_path.read_text()
+    output_path = temp_file_path(f"{uuid.uuid4()}.pdf")
+    
+    pdf_canvas = canvas.Canvas(str(output_path), pagesize=letter)
+    width, height = letter
+    y_position = height - 50
+    
+    for line in text.split('\n'):
+        if line.strip():
+            pdf_canvas.drawString(50, y_position, line[:100])
+            y_position -= 15
+            if y_position < 50:
+                pdf_canvas.showPage()
+                y_position = height - 50
+    
+    pdf_canvas.save()
+    return output_path
+
+
+# ============== Format Graph ==============
+
+# Conversions offered to /convert/document (see engines/graph.py)
+CONVERSIONS = [
+    Conversion("pdf", "docx", convert_pdf_to_docx, 4.0),
+    # Plain text has no layout left to convert further, so it only ends a route
+    Conversion("pdf", "txt", convert_pdf_to_text, 0.5, chainable=False),
+    Conversion("pdf", "xlsx", convert_pdf_to_excel, 5.0),
+    Conversion("pdf", "pptx", convert_pdf_to_pptx, 6.0, requires=("pdftoppm",)),
+    Conversion("txt", "pdf", convert_text_to_pdf, 0.3),
+]
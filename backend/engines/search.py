@@ -0,0 +1,52 @@
+"""
+Search Engine
+
+Full-text search in the text layer of a PDF, with context around each match.
+"""
+
+from pathlib import Path
+
+from pypdf import PdfReader
+
+
+def search_in_pdf(pdf_path: Path, search_term: str) -> dict:
+    """Search for text in PDF and return results with page numbers and context"""
+    reader = PdfReader(str(pdf_path))
+    results = []
+    search_lower = search_term.lower()
+
+    for page_num, page in enumerate(reader.pages):
+        text = page.extract_text()
+        if text and search_lower in text.lower():
+            # Find all occurrences with context
+            text_lower = text.lower()
+            start = 0
+            while True:
+                pos = text_lower.find(search_lower, start)
+                if pos == -1:
+                    break
+
+                # Extract context around the match (100 chars before and after)
+                context_start = max(0, pos - 100)
+                context_end = min(len(text), pos + len(search_term) + 100)
+                context = text[context_start:context_end]
+
+                # Highlight the search term in context
+                highlighted_context = context.replace(
+                    text[pos:pos + len(search_term)],
+                    f"**{text[pos:pos + len(search_term)]}**"
+                )
+
+                results.append({
+                    "page": page_num + 1,
+                    "context": highlighted_context,
+                    "position": pos
+                })
+
+                start = pos + 1
+
+    return {
+        "total_matches": len(results),
+        "search_term": search_term,
+        "results": results
+    }
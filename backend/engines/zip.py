@@ -0,0 +1,43 @@
+"""
+ZIP Engine
+
+Creating and extracting ZIP archives in the temp directory.
+"""
+
+import uuid
+import zipfile
+from pathlib import Path
+from typing import List
+
+from services.temp_service import temp_file_path
+
+
+def create_zip(file_paths: List[Path], zip_name: str, base_dir: Path = None) -> Path:
+    """Create ZIP archive preserving folder structure"""
+    output_path = temp_file_path(f"{uuid.uuid4()}_{zip_name}.zip")
+    with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        if base_dir:
+            # Preserve folder structure relative to base_dir
+            for file_path in file_paths:
+                arcname = str(file_path.relative_to(base_dir.parent))
+                zipf.write(file_path, arcname)
+        else:
+            for file_path in file_paths:
+                zipf.write(file_path, file_path.name)
+    return output_path
+
+def extract_zip(zip_path: Path) -> List[Path]:
+    """Extract ZIP archive"""
+    extract_dir = temp_file_path(f"{uuid.uuid4()}_extracted")
+    extract_dir.mkdir(exist_ok=True)
+    
+    with zipfile.ZipFile(zip_path, 'r') as zipf:
+        zipf.extractall(extract_dir)
+    
+    return list(extract_dir.glob('*'))
+
+def extract_zip_to_dir(zip_path: Path, extract_dir: Path) -> Path:
+    """Extract ZIP archive into an existing directory, preserving folder structure"""
+    with zipfile.ZipFile(zip_path, 'r') as zipf:
+        zipf.extractall(extract_dir)
+    return extract_dir
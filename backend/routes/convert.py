@@ -0,0 +1,92 @@
+"""
+Generic Conversion Routes
+
+/convert/document converts along the cheapest route of the format graph
+(engines/graph.py) built from the enabled engines; /convert/formats lists
+what that graph offers. Both are served whatever engines are enabled.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+
+from core import convert_format, save_conversion_history, save_upload_file_tmp, MEDIA_TYPES
+from engines import ENABLED_ENGINES, ENGINES, conversion_graph, declared_conversions, requirement_met
+from engines.graph import NoConversionRouteError, normalize_format
+from services.temp_service import TempFileResponse
+
+router = APIRouter(prefix="/api")
+
+
+def unsupported_conversion_status() -> int:
+    """400 when no engine can do it; 503 when the engine may just be disabled on this server"""
+    return 400 if len(ENABLED_ENGINES) == len(ENGINES) else 503
+
+
+@router.get("/convert/formats")
+async def get_conversion_formats(source: Optional[str] = None, target: Optional[str] = None):
+    """Conversions this server can run.
+
+    Lists the format graph edges of the enabled engines (with unavailable
+    ones and the tools they are missing). With source, also lists every
+    reachable target format and its estimated cost; with source and target,
+    the route /convert/document would take.
+    """
+    graph = conversion_graph()
+    conversions = []
+    for conversion in declared_conversions():
+        missing = [tool for tool in conversion.requires if not requirement_met(tool)]
+        conversions.append({**conversion.to_dict(), "available": not missing, "missing": missing})
+    response = {
+        "engines": list(ENABLED_ENGINES),
+        "formats": graph.formats,
+        "conversions": conversions,
+    }
+    if source:
+        response["reachable"] = graph.reachable(source)
+    if source and target:
+        route = graph.plan(source, target)
+        if route is None:
+            raise HTTPException(
+                status_code=unsupported_conversion_status(),
+                detail=f"Conversion from {source} to {target} is not supported"
+            )
+        response["route"] = [step.to_dict() for step in route]
+        response["cost"] = round(sum(step.cost for step in route), 2)
+    return response
+
+
+@router.post("/convert/document")
+async def convert_document(
+    file: UploadFile = File(...),
+    target_format: str = Form(...)
+):
+    """Generic document conversion endpoint"""
+    try:
+        input_path = await save_upload_file_tmp(file)
+        source_format = input_path.suffix.lower().replace('.', '')
+
+        # Normalize formats
+        normalized_source = normalize_format(source_format)
+        normalized_target = normalize_format(target_format)
+
+        # Cheapest route through the format graph, direct when an engine converts in one step
+        try:
+            output_path = await convert_format(input_path, normalized_source, normalized_target)
+        except NoConversionRouteError as e:
+            raise HTTPException(status_code=unsupported_conversion_status(), detail=str(e))
+
+        media_type = MEDIA_TYPES.get(normalized_target, "application/octet-stream")
+
+        # Save to history
+        await save_conversion_history("document", source_format, target_format, file.filename)
+
+        return TempFileResponse(
+            path=output_path,
+            filename=f"converted.{target_format.lower()}",
+            media_type=media_type
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,111 @@
+"""
+History Routes
+
+Conversion history listing (cursor paginated) and aggregated statistics
+(services/history_service.py). Served whatever engines are enabled.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Response
+
+from core import ConversionHistory, db
+from services.history_service import (
+    HISTORY_PROJECTION,
+    STATS_BUCKETS,
+    STATS_DIMENSIONS,
+    InvalidCursorError,
+    build_history_query,
+    encode_cursor,
+    query_history_stats,
+)
+
+router = APIRouter(prefix="/api")
+
+HISTORY_PAGE_MAX = 500
+
+
+@router.get("/history", response_model=List[ConversionHistory])
+async def get_conversion_history(
+    response: Response,
+    limit: int = Query(100, ge=1, le=HISTORY_PAGE_MAX),
+    cursor: Optional[str] = None,
+    conversion_type: Optional[str] = None,
+    source_format: Optional[str] = None,
+    target_format: Optional[str] = None,
+    status: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+):
+    """
+    Get conversion history, newest first.
+
+    Results are paginated with an opaque cursor: when more records exist,
+    the X-Next-Cursor response header holds the value to pass as ?cursor=
+    for the next page. start/end filter by timestamp (ISO 8601, end exclusive).
+    """
+    try:
+        query = build_history_query(
+            conversion_type=conversion_type,
+            source_format=source_format,
+            target_format=target_format,
+            status=status,
+            start=start,
+            end=end,
+            cursor=cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Fetch one extra record to know whether another page exists
+    history = await db.conversion_history.find(query, HISTORY_PROJECTION) \
+        .sort([("timestamp", -1), ("id", -1)]) \
+        .limit(limit + 1) \
+        .to_list(limit + 1)
+
+    for item in history:
+        if isinstance(item['timestamp'], str):
+            item['timestamp'] = datetime.fromisoformat(item['timestamp'])
+
+    if len(history) > limit:
+        history = history[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(history[-1])
+
+    return history
+
+@router.get("/history/stats")
+async def get_conversion_stats(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    bucket: str = Query("hour", description=f"Time bucket: {', '.join(STATS_BUCKETS)}"),
+    group_by: str = Query(",".join(STATS_DIMENSIONS), description="Comma-separated dimensions"),
+    conversion_type: Optional[str] = None,
+    source_format: Optional[str] = None,
+    target_format: Optional[str] = None
+):
+    """
+    Conversion statistics: counts, success ratios and latency percentiles
+    per time bucket and per group, computed from hourly rollups.
+
+    Defaults to the last 24 hours for hour buckets and the last 30 days for
+    day buckets. Percentiles are estimated from a fixed latency histogram.
+    """
+    end = end or datetime.now(timezone.utc)
+    if start is None:
+        start = end - (timedelta(days=30) if bucket == "day" else timedelta(hours=24))
+    dimensions = [dimension.strip() for dimension in group_by.split(",") if dimension.strip()]
+
+    try:
+        return await query_history_stats(
+            db.conversion_stats,
+            start=start,
+            end=end,
+            bucket=bucket,
+            group_by=dimensions,
+            conversion_type=conversion_type,
+            source_format=source_format,
+            target_format=target_format
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,469 @@
+"""
+Image Routes
+
+Endpoints and background job operations of the image engine
+(engines/image.py): image to PDF, format conversion and resizing.
+"""
+
+from pathlib import Path
+from typing import List
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from PIL import Image
+
+from core import run_cached_engine, save_conversion_history, save_upload_file_tmp, MEDIA_TYPE_PDF
+from engines.image import (
+    convert_image_format,
+    convert_image_to_pdf,
+    convert_multiple_images_to_pdf,
+    convert_images_to_pdf_zip,
+    resize_image,
+    resize_multiple_images,
+    is_supported_image,
+    SUPPORTED_IMAGE_FORMATS,
+    PDF_PAGE_SIZES,
+    QUALITY_PRESETS,
+)
+from services.executor_service import ENGINE_IMAGE
+from services.job_service import JobOperation
+from services.temp_service import TempFileResponse
+
+router = APIRouter(prefix="/api")
+
+# Conversions that can be submitted through the job API (see routes/jobs.py)
+JOB_OPERATIONS = [
+    JobOperation(
+        "image-to-pdf", ENGINE_IMAGE, convert_image_to_pdf, "image", "pdf", MEDIA_TYPE_PDF,
+        ("page_size", "quality", "margin")
+    ),
+]
+
+
+# ============== Image Conversions ==============
+
+@router.post("/image-to-pdf")
+async def image_to_pdf(
+    file: UploadFile = File(...),
+    target_format: str = Form("pdf")
+):
+    """Convert Image (JPG, PNG) to PDF"""
+    input_path = await save_upload_file_tmp(file)
+    output_path = await run_cached_engine(ENGINE_IMAGE, convert_image_to_pdf, input_path)
+
+    # Save to history
+    await save_conversion_history(
+        conversion_type="image",
+        source_format=input_path.suffix.lower().replace('.', ''),
+        target_format="pdf",
+        filename=file.filename,
+        status="success"
+    )
+
+    return TempFileResponse(
+        path=output_path,
+        filename="converted.pdf",
+        media_type="application/pdf"
+    )
+
+
+@router.post("/images-to-pdf")
+async def images_to_pdf(
+    files: List[UploadFile] = File(...),
+    page_size: str = Form("auto"),
+    quality: str = Form("high"),
+    margin: float = Form(0)
+):
+    """Convert multiple images to a single PDF.
+    
+    Each image becomes one page in the PDF.
+    Supports JPG, PNG, WEBP, BMP, TIFF, GIF, and more.
+    """
+    try:
+        if not files:
+            raise HTTPException(status_code=400, detail="No files uploaded")
+        
+        if len(files) > 50:
+            raise HTTPException(status_code=400, detail="Maximum 50 images allowed")
+        
+        # Validate page_size
+        if page_size not in PDF_PAGE_SIZES:
+            page_size = 'auto'
+        
+        # Validate quality
+        if quality not in QUALITY_PRESETS:
+            quality = 'high'
+        
+        # Save all uploaded files
+        image_paths = []
+        for file in files:
+            if not is_supported_image(file.filename):
+                continue
+            try:
+                input_path = await save_upload_file_tmp(file)
+                image_paths.append(input_path)
+            except Exception as e:
+                print(f"Failed to save {file.filename}: {e}")
+                continue
+        
+        if not image_paths:
+            raise HTTPException(status_code=400, detail="No supported image files found")
+        
+        # Convert images to PDF
+        output_path = await run_cached_engine(
+            ENGINE_IMAGE,
+            convert_multiple_images_to_pdf,
+            image_paths,
+            page_size=page_size,
+            quality=quality,
+            margin=margin
+        )
+        
+        # Generate filename from first image
+        first_image_name = files[0].filename
+        base_name = Path(first_image_name).stem
+        
+        # Save to history
+        await save_conversion_history(
+            conversion_type="image",
+            source_format="multiple",
+            target_format="pdf",
+            filename=f"{len(files)} images",
+            status="success"
+        )
+        
+        return TempFileResponse(
+            path=output_path,
+            filename=f"{base_name}_and_{len(files)-1}_more.pdf",
+            media_type="application/pdf"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/images-to-pdf-individual")
+async def images_to_pdf_individual(
+    files: List[UploadFile] = File(...),
+    page_size: str = Form("auto"),
+    quality: str = Form("high"),
+    margin: float = Form(0)
+):
+    """Convert multiple images to individual PDFs and return as ZIP.
+    
+    Each image is converted to a separate PDF file.
+    """
+    try:
+        if not files:
+            raise HTTPException(status_code=400, detail="No files uploaded")
+        
+        if len(files) > 50:
+            raise HTTPException(status_code=400, detail="Maximum 50 images allowed")
+        
+        # Validate page_size
+        if page_size not in PDF_PAGE_SIZES:
+            page_size = 'auto'
+        
+        # Validate quality
+        if quality not in QUALITY_PRESETS:
+            quality = 'high'
+        
+        # Save all uploaded files
+        image_paths = []
+        filenames = []
+        for file in files:
+            if not is_supported_image(file.filename):
+                continue
+            try:
+                input_path = await save_upload_file_tmp(file)
+                image_paths.append(input_path)
+                filenames.append(Path(file.filename).stem)
+            except Exception as e:
+                print(f"Failed to save {file.filename}: {e}")
+                continue
+        
+        if not image_paths:
+            raise HTTPException(status_code=400, detail="No supported image files found")
+        
+        # Convert images to individual PDFs
+        output_path = await run_cached_engine(
+            ENGINE_IMAGE,
+            convert_images_to_pdf_zip,
+            image_paths,
+            page_size=page_size,
+            quality=quality,
+            margin=margin
+        )
+        
+        # Save to history
+        await save_conversion_history(
+            conversion_type="image",
+            source_format="multiple",
+            target_format="pdf-zip",
+            filename=f"{len(files)} images to individual PDFs",
+            status="success"
+        )
+        
+        return TempFileResponse(
+            path=output_path,
+            filename="individual_pdfs.zip",
+            media_type="application/zip"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/images/formats")
+async def get_supported_image_formats():
+    """Get list of supported image formats for Image to PDF conversion"""
+    formats = []
+    for ext, name in SUPPORTED_IMAGE_FORMATS.items():
+        formats.append({
+            "extension": f".{ext}",
+            "name": name,
+            "supported": True
+        })
+    return {
+        "formats": formats,
+        "page_sizes": list(PDF_PAGE_SIZES.keys()),
+        "quality_presets": list(QUALITY_PRESETS.keys())
+    }
+
+@router.post("/convert/image")
+async def convert_image(
+    file: UploadFile = File(...),
+    target_format: str = Form(...)
+):
+    """Convert image between formats (JPG, PNG, WEBP, BMP)"""
+    try:
+        input_path = await save_upload_file_tmp(file)
+        source_format = input_path.suffix.lower().replace('.', '')
+
+        # 🔧 FIX: Normalize JPG → JPEG for Pillow
+        normalized_format = target_format.lower()
+        if normalized_format == "jpg":
+            normalized_format = "jpeg"
+
+        output_path = await run_cached_engine(ENGINE_IMAGE, convert_image_format, input_path, normalized_format)
+
+        # Save to history
+        await save_conversion_history(
+            conversion_type="image",
+            source_format=source_format,
+            target_format=target_format.lower(),
+            filename=file.filename,
+            status="success"
+        )
+
+        return TempFileResponse(
+            path=output_path,
+            filename=f"converted.{target_format.lower()}",
+            media_type="application/octet-stream"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/image/resize")
+async def resize_image_endpoint(
+    file: UploadFile = File(...),
+    target_width: int = Form(...),
+    target_height: int = Form(...),
+    maintain_aspect_ratio: bool = Form(True),
+    output_format: str = Form("jpeg"),
+    quality: str = Form("high")
+):
+    """Resize an image to specified dimensions.
+    
+    Args:
+        file: The image file to resize
+        target_width: Target width in pixels
+        target_height: Target height in pixels
+        maintain_aspect_ratio: If True, maintains aspect ratio (default: True)
+        output_format: Output format (jpeg, png, webp, bmp)
+        quality: Quality preset (low, medium, high, maximum)
+    """
+    try:
+        # Validate inputs
+        if target_width < 1 or target_width > 10000:
+            raise HTTPException(status_code=400, detail="Width must be between 1 and 10000 pixels")
+        
+        if target_height < 1 or target_height > 10000:
+            raise HTTPException(status_code=400, detail="Height must be between 1 and 10000 pixels")
+        
+        # Validate output format
+        valid_formats = ['jpeg', 'jpg', 'png', 'webp', 'bmp']
+        if output_format.lower() not in valid_formats:
+            raise HTTPException(status_code=400, detail=f"Invalid output format. Must be one of: {', '.join(valid_formats)}")
+        
+        # Normalize JPG to JPEG
+        normalized_format = output_format.lower()
+        if normalized_format == "jpg":
+            normalized_format = "jpeg"
+        
+        # Validate quality
+        valid_qualities = ['low', 'medium', 'high', 'maximum']
+        if quality.lower() not in valid_qualities:
+            quality = 'high'
+        
+        # Save uploaded file
+        input_path = await save_upload_file_tmp(file)
+        
+        # Get original dimensions for response
+        with Image.open(input_path) as img:
+            original_width, original_height = img.size
+        
+        # Resize the image
+        output_path = await run_cached_engine(
+            ENGINE_IMAGE,
+            resize_image,
+            image_path=input_path,
+            target_width=target_width,
+            target_height=target_height,
+            maintain_aspect_ratio=maintain_aspect_ratio,
+            output_format=normalized_format,
+            quality=quality.lower()
+        )
+        
+        # Get new dimensions
+        with Image.open(output_path) as resized_img:
+            new_width, new_height = resized_img.size
+        
+        # Save to history
+        await save_conversion_history(
+            conversion_type="image_resize",
+            source_format=input_path.suffix.lower().replace('.', ''),
+            target_format=normalized_format,
+            filename=file.filename,
+            status="success"
+        )
+        
+        # Determine media type
+        media_types = {
+            'jpeg': 'image/jpeg',
+            'jpg': 'image/jpeg',
+            'png': 'image/png',
+            'webp': 'image/webp',
+            'bmp': 'image/bmp',
+        }
+        media_type = media_types.get(normalized_format, 'application/octet-stream')
+        
+        # Generate output filename
+        original_name = Path(file.filename).stem
+        output_filename = f"{original_name}_resized.{normalized_format}"
+        
+        return TempFileResponse(
+            path=output_path,
+            filename=output_filename,
+            media_type=media_type
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        # Save failed history
+        await save_conversion_history(
+            conversion_type="image_resize",
+            source_format="unknown",
+            target_format=output_format.lower(),
+            filename=file.filename if 'file' in locals() else "unknown",
+            status="failed",
+            error=str(e)
+        )
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/images/resize")
+async def resize_images_endpoint(
+    files: List[UploadFile] = File(...),
+    target_width: int = Form(...),
+    target_height: int = Form(...),
+    maintain_aspect_ratio: bool = Form(True),
+    output_format: str = Form("jpeg"),
+    quality: str = Form("high")
+):
+    """Resize multiple images and return as ZIP.
+    
+    Args:
+        files: List of image files to resize
+        target_width: Target width in pixels
+        target_height: Target height in pixels
+        maintain_aspect_ratio: If True, maintains aspect ratio
+        output_format: Output format (jpeg, png, webp, bmp)
+        quality: Quality preset (low, medium, high, maximum)
+    """
+    try:
+        if not files:
+            raise HTTPException(status_code=400, detail="No files uploaded")
+        
+        if len(files) > 20:
+            raise HTTPException(status_code=400, detail="Maximum 20 images allowed for batch resize")
+        
+        # Validate inputs
+        if target_width < 1 or target_width > 10000:
+            raise HTTPException(status_code=400, detail="Width must be between 1 and 10000 pixels")
+        
+        if target_height < 1 or target_height > 10000:
+            raise HTTPException(status_code=400, detail="Height must be between 1 and 10000 pixels")
+        
+        # Validate output format
+        valid_formats = ['jpeg', 'jpg', 'png', 'webp', 'bmp']
+        if output_format.lower() not in valid_formats:
+            raise HTTPException(status_code=400, detail=f"Invalid output format. Must be one of: {', '.join(valid_formats)}")
+        
+        # Normalize JPG to JPEG
+        normalized_format = output_format.lower()
+        if normalized_format == "jpg":
+            normalized_format = "jpeg"
+        
+        # Validate quality
+        valid_qualities = ['low', 'medium', 'high', 'maximum']
+        if quality.lower() not in valid_qualities:
+            quality = 'high'
+        
+        # Save all uploaded files
+        image_paths = []
+        for file in files:
+            if not is_supported_image(file.filename):
+                continue
+            try:
+                input_path = await save_upload_file_tmp(file)
+                image_paths.append(input_path)
+            except Exception as e:
+                print(f"Failed to save {file.filename}: {e}")
+                continue
+        
+        if not image_paths:
+            raise HTTPException(status_code=400, detail="No supported image files found")
+        
+        # Resize images
+        output_path = await run_cached_engine(
+            ENGINE_IMAGE,
+            resize_multiple_images,
+            image_paths=image_paths,
+            target_width=target_width,
+            target_height=target_height,
+            maintain_aspect_ratio=maintain_aspect_ratio,
+            output_format=normalized_format,
+            quality=quality.lower()
+        )
+        
+        # Save to history
+        await save_conversion_history(
+            conversion_type="image_resize",
+            source_format="multiple",
+            target_format=f"{normalized_format}-zip",
+            filename=f"{len(files)} images",
+            status="success"
+        )
+        
+        return TempFileResponse(
+            path=output_path,
+            filename="resized_images.zip",
+            media_type="application/zip"
+        )
+    except HTTPException:
+        raise
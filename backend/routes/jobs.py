@@ -0,0 +1,135 @@
+"""
+Background Job Routes
+
+Submit long-running conversions as background jobs (services/job_service.py),
+poll their status, download the result or cancel them. The operations on
+offer are the JOB_OPERATIONS declared by the route modules of the enabled
+engines.
+"""
+
+import json
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, File, Form, HTTPException, Response, UploadFile
+from fastapi.responses import FileResponse
+
+from core import ConversionJob, job_manager, save_upload_file_tmp
+from engines import load_engine_routes
+from services.job_service import ACTIVE_JOB_STATUSES, JOB_COMPLETED
+from services.temp_service import untrack_request_file
+
+router = APIRouter(prefix="/api")
+
+# Conversions that can be submitted through the job API
+JOB_OPERATIONS = {
+    op.name: op
+    for module in load_engine_routes()
+    for op in getattr(module, "JOB_OPERATIONS", [])
+}
+
+
+@router.get("/jobs/operations")
+async def list_job_operations():
+    """List conversions that can be submitted as background jobs"""
+    return {"operations": [op.to_dict() for op in JOB_OPERATIONS.values()]}
+
+
+@router.post("/jobs", response_model=ConversionJob, status_code=202)
+async def submit_job(
+    file: UploadFile = File(...),
+    operation: str = Form(...),
+    options: Optional[str] = Form(None)
+):
+    """Submit a long-running conversion as a background job.
+
+    Returns immediately with the job id; poll GET /api/jobs/{job_id} for status
+    and download the output from GET /api/jobs/{job_id}/result.
+    """
+    job_operation = JOB_OPERATIONS.get(operation)
+    if job_operation is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown operation '{operation}'. Must be one of: {', '.join(JOB_OPERATIONS)}"
+        )
+
+    job_options = {}
+    if options:
+        try:
+            job_options = json.loads(options)
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="Options must be a JSON object")
+        if not isinstance(job_options, dict):
+            raise HTTPException(status_code=400, detail="Options must be a JSON object")
+
+        unknown_options = set(job_options) - set(job_operation.allowed_options)
+        if unknown_options:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported options for {operation}: {', '.join(sorted(unknown_options))}"
+            )
+
+    try:
+        input_path = await save_upload_file_tmp(file, count_pages=job_operation.source_format == "pdf")
+        # The job manager takes ownership of the upload
+        untrack_request_file(input_path)
+        job = await job_manager.submit(job_operation, input_path, file.filename, job_options)
+        return job
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to submit job: {str(e)}")
+
+
+@router.get("/jobs/{job_id}", response_model=ConversionJob)
+async def get_job_status(job_id: str):
+    """Get status and progress of a background job"""
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Download the output of a completed background job"""
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if job["status"] != JOB_COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job is not completed (status: {job['status']})")
+
+    result_path = Path(job["result_path"])
+    if not result_path.exists():
+        raise HTTPException(status_code=410, detail="Job result has expired")
+
+    return FileResponse(
+        path=result_path,
+        filename=job["result_filename"],
+        media_type=job["media_type"]
+    )
+
+
+@router.delete("/jobs/{job_id}", response_model=ConversionJob)
+async def cancel_job(job_id: str, response: Response):
+    """Cancel a queued or running background job.
+
+    The conversion is stopped in its worker, together with any LibreOffice,
+    Tesseract or pdftoppm process it started, and its partial output is
+    deleted. Returns the job with status "cancelled", or 202 with the job
+    still running when a worker process (JOB_EXECUTION_MODE=worker) is yet
+    to stop it.
+    """
+    cancelled = await job_manager.cancel(job_id)
+    if cancelled is not None:
+        if cancelled["status"] in ACTIVE_JOB_STATUSES:
+            response.status_code = 202
+        return cancelled
+
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] in ACTIVE_JOB_STATUSES:
+        raise HTTPException(status_code=409, detail="Job is running on another server process")
+    raise HTTPException(status_code=409, detail=f"Job has already finished (status: {job['status']})")
@@ -0,0 +1,124 @@
+"""
+OCR Routes
+
+Endpoints of the OCR engine (engines/ocr.py): installed languages, script
+detection and text extraction from images.
+"""
+
+import asyncio
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+
+from core import save_conversion_history, save_upload_file_tmp
+from engines import ocr as ocr_engine
+from engines.ocr import (
+    detect_language_from_image,
+    get_available_ocr_languages,
+    get_tesseract_languages,
+    ocr_image,
+    LANGUAGE_NAMES,
+)
+from services.executor_service import run_engine, ENGINE_OCR
+
+router = APIRouter(prefix="/api")
+
+
+@router.get("/ocr/languages")
+async def get_ocr_languages():
+    """Get list of available OCR languages with their names"""
+    # Return all languages from LANGUAGE_NAMES dictionary
+    # This includes both installed and available Tesseract languages
+    languages = []
+    
+    # First, get available Tesseract languages
+    try:
+        available_langs = await run_engine(ENGINE_OCR, get_tesseract_languages)
+        ocr_engine.AVAILABLE_OCR_LANGUAGES = available_langs
+    except Exception as e:
+        print(f"Failed to refresh Tesseract languages: {e}")
+        available_langs = ocr_engine.AVAILABLE_OCR_LANGUAGES
+    
+    # Build response with all languages from LANGUAGE_NAMES
+    for lang_code, lang_name in LANGUAGE_NAMES.items():
+        if isinstance(lang_name, str):
+            languages.append({
+                "code": lang_code,
+                "name": lang_name,
+                "installed": lang_code in available_langs or lang_code.lower() in [l.lower() for l in available_langs]
+            })
+    
+    # Sort by name for better UX
+    languages.sort(key=lambda x: x['name'])
+    
+    return {
+        "languages": languages,
+        "count": len(languages)
+    }
+
+@router.post("/ocr/detect-language")
+async def detect_ocr_language(file: UploadFile = File(...)):
+    """Detect language/script from image using Tesseract OSD"""
+    try:
+        input_path = await save_upload_file_tmp(file)
+        result = await run_engine(ENGINE_OCR, detect_language_from_image, input_path)
+        
+        # Get full language info for suggested languages
+        suggested_languages_info = []
+        for lang_code in result["suggested_languages"]:
+            lang_info = {
+                "code": lang_code,
+                "name": LANGUAGE_NAMES.get(lang_code, lang_code.title())
+            }
+            suggested_languages_info.append(lang_info)
+        
+        return {
+            "detected_script": result["detected_script"],
+            "orientation": result["orientation"],
+            "confidence": result["confidence"],
+            "suggested_languages": suggested_languages_info,
+            "primary_language": suggested_languages_info[0] if suggested_languages_info else None
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Language detection failed: {str(e)}")
+
+@router.post("/ocr/extract")
+async def extract_text_ocr(
+    file: UploadFile = File(...),
+    language: str = Form("eng")
+):
+    """Extract text from image using OCR"""
+    try:
+        # Check if language is available (listed by the startup warm-up, or now)
+        available_languages = await asyncio.to_thread(get_available_ocr_languages)
+        if language not in available_languages:
+            available = ", ".join(available_languages[:10])
+            if len(available_languages) > 10:
+                available += f" and {len(available_languages) - 10} more"
+            raise HTTPException(
+                status_code=400,
+                detail=f"Language '{language}' is not installed. Available languages: {available}. Please install missing language packs for Tesseract."
+            )
+
+        input_path = await save_upload_file_tmp(file)
+        text = await run_engine(ENGINE_OCR, ocr_image, input_path, language)
+
+        # Check if OCR returned an error message
+        if text.startswith("OCR Error:"):
+            raise HTTPException(status_code=500, detail=text)
+
+        # Save to history
+        await save_conversion_history(
+            conversion_type="ocr",
+            source_format=input_path.suffix.lower().replace('.', ''),
+            target_format="text",
+            filename=file.filename,
+            status="success"
+        )
+
+        return {"text": text, "filename": file.filename, "language": language}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
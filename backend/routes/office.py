@@ -0,0 +1,416 @@
+"""
+Office Routes
+
+Endpoints and background job operations of the office engine
+(engines/office.py): Word, Excel, PowerPoint and text conversions.
+"""
+
+import shutil
+import uuid
+from pathlib import Path
+from typing import List
+from urllib.parse import quote
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+
+from core import (
+    run_cached_engine,
+    save_conversion_history,
+    save_upload_file_tmp,
+    MEDIA_TYPE_PDF,
+    MEDIA_TYPE_DOCX,
+    MEDIA_TYPE_DOC,
+)
+from engines.office import (
+    convert_docx_to_pdf,
+    convert_docx_to_doc,
+    convert_doc_to_docx,
+    convert_doc_to_pdf,
+    convert_excel_to_pdf,
+    convert_pptx_to_pdf,
+    convert_ppt_to_pdf,
+    convert_text_to_docx,
+    convert_office_batch,
+    OFFICE_BATCH_MAX_FILES,
+    OFFICE_BATCH_PDF_FALLBACKS,
+)
+from engines.zip import create_zip
+from services.executor_service import run_engine, ENGINE_OFFICE, ENGINE_ZIP
+from services.job_service import JobOperation
+from services.temp_service import TempFileResponse, temp_file_path
+
+router = APIRouter(prefix="/api")
+
+# Conversions that can be submitted through the job API (see routes/jobs.py)
+JOB_OPERATIONS = [
+    JobOperation("docx-to-pdf", ENGINE_OFFICE, convert_docx_to_pdf, "docx", "pdf", MEDIA_TYPE_PDF),
+    JobOperation("docx-to-doc", ENGINE_OFFICE, convert_docx_to_doc, "docx", "doc", MEDIA_TYPE_DOC),
+    JobOperation("doc-to-docx", ENGINE_OFFICE, convert_doc_to_docx, "doc", "docx", MEDIA_TYPE_DOCX),
+    JobOperation("doc-to-pdf", ENGINE_OFFICE, convert_doc_to_pdf, "doc", "pdf", MEDIA_TYPE_PDF),
+    JobOperation("xlsx-to-pdf", ENGINE_OFFICE, convert_excel_to_pdf, "xlsx", "pdf", MEDIA_TYPE_PDF),
+    JobOperation("xls-to-pdf", ENGINE_OFFICE, convert_excel_to_pdf, "xls", "pdf", MEDIA_TYPE_PDF),
+    JobOperation("pptx-to-pdf", ENGINE_OFFICE, convert_pptx_to_pdf, "pptx", "pdf", MEDIA_TYPE_PDF),
+    JobOperation("ppt-to-pdf", ENGINE_OFFICE, convert_ppt_to_pdf, "ppt", "pdf", MEDIA_TYPE_PDF),
+    JobOperation("txt-to-docx", ENGINE_OFFICE, convert_text_to_docx, "txt", "docx", MEDIA_TYPE_DOCX),
+]
+
+
+# ============== DOCX Conversions ==============
+
+@router.post("/docx-to-pdf")
+async def docx_to_pdf(
+    file: UploadFile = File(...),
+    target_format: str = Form("pdf")
+):
+    """Convert DOCX to PDF"""
+    try:
+        input_path = await save_upload_file_tmp(file)
+        output_path = await run_cached_engine(ENGINE_OFFICE, convert_docx_to_pdf, input_path)
+
+        # Save to history
+        await save_conversion_history(
+            conversion_type="document",
+            source_format="docx",
+            target_format="pdf",
+            filename=file.filename,
+            status="success"
+        )
+
+        return TempFileResponse(
+            path=output_path,
+            filename=file.filename.replace(".docx", ".pdf"),
+            media_type="application/pdf"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        # Save failed history
+        await save_conversion_history(
+            conversion_type="document",
+            source_format="docx",
+            target_format="pdf",
+            filename=file.filename,
+            status="failed",
+            error=str(e)
+        )
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("convert/docx-to-doc")
+async def docx_to_doc(
+    file: UploadFile = File(...),
+    target_format: str = Form("doc")
+):
+    """Convert DOCX to DOC"""
+    try:
+        input_path = await save_upload_file_tmp(file)
+        output_path = await run_cached_engine(ENGINE_OFFICE, convert_docx_to_doc, input_path)
+
+        # Save to history
+        await save_conversion_history(
+            conversion_type="document",
+            source_format="docx",
+            target_format="doc",
+            filename=file.filename,
+            status="success"
+        )
+
+        return TempFileResponse(
+            path=output_path,
+            filename=file.filename.replace(".docx", ".doc"),
+            media_type="application/msword"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        # Save failed history
+        await save_conversion_history(
+            conversion_type="document",
+            source_format="docx",
+            target_format="doc",
+            filename=file.filename,
+            status="failed",
+            error=str(e)
+        )
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/docx-to-txt")
+async def docx_to_txt(
+    file: UploadFile = File(...),
+    target_format: str = Form("txt")
+):
+    """Convert DOCX to Text"""
+    input_path = await save_upload_file_tmp(file)
+    output_path = await run_engine(ENGINE_OFFICE, convert_docx_to_txt, input_path)
+    
+    await save_conversion_history("document", "docx", "txt", file.filename)
+    
+    return TempFileResponse(
+        path=output_path,
+        filename="converted.txt",
+        media_type="text/plain"
+    )
+
+
+# ============== DOC Conversions ==============
+
+@router.post("/doc-to-docx")
+async def doc_to_docx(
+    file: UploadFile = File(...),
+    target_format: str = Form("docx")
+):
+    """Convert DOC to DOCX"""
+    input_path = await save_upload_file_tmp(file)
+    output_path = await run_cached_engine(ENGINE_OFFICE, convert_doc_to_docx, input_path)
+    
+    await save_conversion_history("document", "doc", "docx", file.filename)
+    
+    return TempFileResponse(
+        path=output_path,
+        filename="converted.docx",
+        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    )
+
+
+@router.post("/doc-to-pdf")
+async def doc_to_pdf(
+    file: UploadFile = File(...),
+    target_format: str = Form("pdf")
+):
+    """Convert DOC to PDF (via DOCX)"""
+    input_path = await save_upload_file_tmp(file)
+    output_path = await run_cached_engine(ENGINE_OFFICE, convert_doc_to_pdf, input_path)
+    
+    await save_conversion_history("document", "doc", "pdf", file.filename)
+    
+    return TempFileResponse(
+        path=output_path,
+        filename="converted.pdf",
+        media_type="application/pdf"
+    )
+
+
+# ============== Excel Conversions ==============
+
+@router.post("/xlsx-to-pdf")
+async def xlsx_to_pdf(
+    file: UploadFile = File(...),
+    target_format: str = Form("pdf")
+):
+    """Convert Excel XLSX to PDF"""
+    try:
+        input_path = await save_upload_file_tmp(file)
+        output_path = await run_cached_engine(ENGINE_OFFICE, convert_excel_to_pdf, input_path)
+
+        # Save to history (success)
+        await save_conversion_history(
+            conversion_type="document",
+            source_format="xlsx",
+            target_format="pdf",
+            filename=file.filename,
+            status="success"
+        )
+
+        return TempFileResponse(
+            path=output_path,
+            filename=file.filename.replace(".xlsx", ".pdf"),
+            media_type="application/pdf"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        # Save failed history
+        await save_conversion_history(
+            conversion_type="document",
+            source_format="xlsx",
+            target_format="pdf",
+            filename=file.filename,
+            status="failed",
+            error=str(e)
+        )
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/xls-to-pdf")
+async def xls_to_pdf(
+    file: UploadFile = File(...),
+    target_format: str = Form("pdf")
+):
+    """Convert Excel XLS to PDF"""
+    try:
+        input_path = await save_upload_file_tmp(file)
+        output_path = await run_cached_engine(ENGINE_OFFICE, convert_excel_to_pdf, input_path)
+
+        # Save to history (success)
+        await save_conversion_history(
+            conversion_type="document",
+            source_format="xls",
+            target_format="pdf",
+            filename=file.filename,
+            status="success"
+        )
+
+        return TempFileResponse(
+            path=output_path,
+            filename=file.filename.replace(".xls", ".pdf"),
+            media_type="application/pdf"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        # Save failed history
+        await save_conversion_history(
+            conversion_type="document",
+            source_format="xls",
+            target_format="pdf",
+            filename=file.filename,
+            status="failed",
+            error=str(e)
+        )
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ============== PowerPoint Conversions ==============
+
+@router.post("/pptx-to-pdf")
+async def pptx_to_pdf(
+    file: UploadFile = File(...),
+    target_format: str = Form("pdf")
+):
+    """Convert PowerPoint PPTX to PDF"""
+    input_path = await save_upload_file_tmp(file)
+    output_path = await run_cached_engine(ENGINE_OFFICE, convert_pptx_to_pdf, input_path)
+    
+    await save_conversion_history("document", "pptx", "pdf", file.filename)
+    
+    return TempFileResponse(
+        path=output_path,
+        filename="converted.pdf",
+        media_type="application/pdf"
+    )
+
+@router.post("/ppt-to-pdf")
+async def ppt_to_pdf(
+    file: UploadFile = File(...),
+    target_format: str = Form("pdf")
+):
+    input_path = await save_upload_file_tmp(file)
+
+    try:
+        output_path = await run_cached_engine(ENGINE_OFFICE, convert_ppt_to_pdf, input_path)
+    finally:
+        input_path.unlink(missing_ok=True)
+
+    return TempFileResponse(
+        path=str(output_path),
+        media_type="application/pdf",
+        filename=f"{Path(file.filename).stem}.pdf"
+    )
+
+# ============== Batch Office Conversions ==============
+
+@router.post("/convert/office/batch")
+async def convert_office_batch_endpoint(files: List[UploadFile] = File(...)):
+    """Convert many DOCX/DOC/XLSX/XLS/PPTX/PPT files to PDF and return them as a ZIP.
+
+    All documents go through one LibreOffice start (or the warm pool) instead of
+    one soffice process per file. PDFs keep the original file names; files that
+    could not be converted are listed in the X-Failed-Files response header.
+    """
+    try:
+        if not files:
+            raise HTTPException(status_code=400, detail="No files uploaded")
+
+        if len(files) > OFFICE_BATCH_MAX_FILES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Maximum {OFFICE_BATCH_MAX_FILES} files allowed"
+            )
+
+        # Save all uploaded office files, remembering their original names
+        uploads = []
+        for file in files:
+            source_format = Path(file.filename).suffix.lower().lstrip(".")
+            if source_format not in OFFICE_BATCH_PDF_FALLBACKS:
+                continue
+            uploads.append((await save_upload_file_tmp(file), file.filename))
+
+        if not uploads:
+            raise HTTPException(status_code=400, detail="No supported office files found")
+
+        input_paths = [input_path for input_path, _ in uploads]
+        try:
+            results = await run_engine(ENGINE_OFFICE, convert_office_batch, input_paths, "pdf")
+        finally:
+            for input_path in input_paths:
+                input_path.unlink(missing_ok=True)
+
+        if not results:
+            raise HTTPException(status_code=500, detail="None of the files could be converted")
+
+        # Give every PDF its original name, de-duplicating repeated names
+        batch_dir = temp_file_path(f"{uuid.uuid4()}_batch")
+        batch_dir.mkdir()
+        pdf_paths = []
+        failed = []
+        used_names = set()
+        for input_path, filename in uploads:
+            output_path = results.get(input_path)
+            if output_path is None:
+                failed.append(filename)
+                continue
+            stem = Path(filename).stem
+            pdf_name = f"{stem}.pdf"
+            counter = 1
+            while pdf_name in used_names:
+                pdf_name = f"{stem} ({counter}).pdf"
+                counter += 1
+            used_names.add(pdf_name)
+            pdf_path = batch_dir / pdf_name
+            shutil.move(str(output_path), str(pdf_path))
+            pdf_paths.append(pdf_path)
+
+        zip_path = await run_engine(ENGINE_ZIP, create_zip, pdf_paths, "converted_documents")
+        shutil.rmtree(batch_dir, ignore_errors=True)
+
+        # Save to history
+        await save_conversion_history(
+            conversion_type="document",
+            source_format="multiple",
+            target_format="pdf",
+            filename=f"{len(uploads)} documents",
+            status="success" if not failed else "partial"
+        )
+
+        # Header values must be latin-1, so file names are percent-encoded
+        headers = {"X-Failed-Files": ", ".join(quote(name) for name in failed)} if failed else None
+        return TempFileResponse(
+            path=zip_path,
+            filename="converted_documents.zip",
+            media_type="application/zip",
+            headers=headers
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# ============== Text Conversions ==============
+
+@router.post("/txt-to-docx")
+async def txt_to_docx(
+    file: UploadFile = File(...),
+    target_format: str = Form("docx")
+):
+    """Convert Text to DOCX"""
+    input_path = await save_upload_file_tmp(file)
+    output_path = await run_cached_engine(ENGINE_OFFICE, convert_text_to_docx, input_path)
+    
+    await save_conversion_history("document", "txt", "docx", file.filename)
+    
+    return TempFileResponse(
+        path=output_path,
+        filename="converted.docx",
+        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    )
@@ -0,0 +1,519 @@
+"""
+PDF Routes
+
+Endpoints and background job operations of the PDF engine (engines/pdf.py):
+conversions from PDF, text to PDF, and lock/unlock/merge/split.
+"""
+
+from typing import List
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+
+from core import (
+    ingest_upload_file,
+    run_cached_engine,
+    save_conversion_history,
+    save_upload_file_tmp,
+    MERGE_MAX_FILE_SIZE,
+    MEDIA_TYPE_PDF,
+    MEDIA_TYPE_DOCX,
+    MEDIA_TYPE_DOC,
+    MEDIA_TYPE_XLSX,
+    MEDIA_TYPE_PPTX,
+)
+from engines.pdf import (
+    convert_pdf_to_docx,
+    convert_pdf_to_doc,
+    convert_pdf_to_text,
+    convert_pdf_to_excel,
+    convert_pdf_to_pptx,
+    convert_text_to_pdf,
+    lock_pdf,
+    unlock_pdf,
+    merge_pdfs,
+    split_pdf,
+)
+from engines.zip import create_zip
+from services.executor_service import run_engine, ENGINE_PDF, ENGINE_ZIP
+from services.job_service import JobOperation
+from services.temp_service import TempFileResponse
+
+router = APIRouter(prefix="/api")
+
+# Conversions that can be submitted through the job API (see routes/jobs.py)
+JOB_OPERATIONS = [
+    JobOperation("pdf-to-docx", ENGINE_PDF, convert_pdf_to_docx, "pdf", "docx", MEDIA_TYPE_DOCX),
+    JobOperation("pdf-to-doc", ENGINE_PDF, convert_pdf_to_doc, "pdf", "doc", MEDIA_TYPE_DOC),
+    JobOperation("pdf-to-txt", ENGINE_PDF, convert_pdf_to_text, "pdf", "txt", "text/plain"),
+    JobOperation("pdf-to-xlsx", ENGINE_PDF, convert_pdf_to_excel, "pdf", "xlsx", MEDIA_TYPE_XLSX, ("quality",)),
+    JobOperation("pdf-to-pptx", ENGINE_PDF, convert_pdf_to_pptx, "pdf", "pptx", MEDIA_TYPE_PPTX),
+    JobOperation("txt-to-pdf", ENGINE_PDF, convert_text_to_pdf, "txt", "pdf", MEDIA_TYPE_PDF),
+]
+
+# Steps offered only to /api/pipeline (see routes/pipeline.py); as background
+# jobs, their passwords would be persisted with the job
+PIPELINE_OPERATIONS = [
+    JobOperation("lock-pdf", ENGINE_PDF, lock_pdf, "pdf", "pdf", MEDIA_TYPE_PDF, ("password",)),
+    JobOperation("unlock-pdf", ENGINE_PDF, unlock_pdf, "pdf", "pdf", MEDIA_TYPE_PDF, ("password",)),
+]
+
+
+# ============== PDF Conversions ==============
+
+@router.post("/convert/pdf-to-docx")
+async def pdf_to_docx(
+    file: UploadFile = File(...),
+    target_format: str = Form("docx")
+):
+    """Convert PDF to DOCX"""
+    try:
+        # 1️⃣ Save uploaded PDF
+        input_path = await save_upload_file_tmp(file, count_pages=True)
+
+        # 2️⃣ Convert PDF → DOCX
+        output_path = await run_cached_engine(ENGINE_PDF, convert_pdf_to_docx, input_path)
+
+        # 3️⃣ SAVE HISTORY (SUCCESS)
+        await save_conversion_history(
+            conversion_type="document",
+            source_format="pdf",
+            target_format="docx",
+            filename=file.filename,
+            status="success"
+        )
+
+        # 4️⃣ Return converted file
+        return TempFileResponse(
+            path=output_path,
+            filename=file.filename.replace(".pdf", ".docx"),
+            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        )
+
+    except HTTPException:
+        raise
+
+    except Exception as e:
+        # 5️⃣ SAVE HISTORY (FAILED)
+        await save_conversion_history(
+            conversion_type="document",
+            source_format="pdf",
+            target_format="docx",
+            filename=file.filename,
+            status="failed",
+            error=str(e)
+        )
+
+        raise HTTPException(
+            status_code=500,
+            detail=f"PDF to DOCX conversion failed: {str(e)}"
+        )
+
+
+@router.post("/convert/pdf-to-doc")
+async def pdf_to_doc(
+    file: UploadFile = File(...),
+    target_format: str = Form("doc")
+):
+    """Convert PDF to DOC (via DOCX)"""
+    try:
+        input_path = await save_upload_file_tmp(file, count_pages=True)
+        output_path = await run_cached_engine(ENGINE_PDF, convert_pdf_to_doc, input_path)
+
+        # Save to history
+        await save_conversion_history(
+            conversion_type="document",
+            source_format="pdf",
+            target_format="doc",
+            filename=file.filename,
+            status="success"
+        )
+
+        return TempFileResponse(
+            path=output_path,
+            filename=file.filename.replace(".pdf", ".doc"),
+            media_type="application/msword"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        # Save failed history
+        await save_conversion_history(
+            conversion_type="document",
+            source_format="pdf",
+            target_format="doc",
+            filename=file.filename,
+            status="failed",
+            error=str(e)
+        )
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/pdf-to-txt")
+async def pdf_to_txt(
+    file: UploadFile = File(...),
+    target_format: str = Form("txt")
+):
+    """Convert PDF to Text"""
+    try:
+        print(f"Received PDF to Text conversion request: {file.filename}")
+        
+        # Validate file type
+        if not file.filename.lower().endswith('.pdf'):
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid file type. Please upload a PDF file."
+            )
+        
+        # Save uploaded PDF
+        input_path = await save_upload_file_tmp(file, count_pages=True)
+        print(f"Saved temporary file: {input_path}")
+        
+        # Convert PDF to text
+        output_path = await run_cached_engine(ENGINE_PDF, convert_pdf_to_text, input_path)
+        print(f"Converted to text: {output_path}")
+        
+        # Verify output file exists and has content
+        if not output_path.exists() or output_path.stat().st_size == 0:
+            raise HTTPException(
+                status_code=500,
+                detail="Text extraction failed. The PDF may not contain extractable text."
+            )
+
+        # Read extracted text for logging
+        extracted_text = output_path.read_text()
+        print(f"Extracted {len(extracted_text)} characters from PDF")
+
+        # Save to history
+        await save_conversion_history(
+            conversion_type="document",
+            source_format="pdf",
+            target_format="txt",
+            filename=file.filename,
+            status="success"
+        )
+
+        return TempFileResponse(
+            path=output_path,
+            filename=file.filename.replace(".pdf", ".txt"),
+            media_type="text/plain"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"PDF to Text conversion error: {str(e)}")
+        # Save failed history
+        await save_conversion_history(
+            conversion_type="document",
+            source_format="pdf",
+            target_format="txt",
+            filename=file.filename if 'file' in locals() else "unknown",
+            status="failed",
+            error=str(e)
+        )
+        raise HTTPException(
+            status_code=500,
+            detail=f"PDF to Text conversion failed: {str(e)}"
+        )
+
+
+@router.post("convert/pdf-to-xlsx")
+async def pdf_to_xlsx(
+    file: UploadFile = File(...),
+    target_format: str = Form("xlsx")
+):
+    """Convert PDF to Excel"""
+    try:
+        input_path = await save_upload_file_tmp(file, count_pages=True)
+        output_path = await run_cached_engine(ENGINE_PDF, convert_pdf_to_excel, input_path)
+
+        # Save to history
+        await save_conversion_history(
+            conversion_type="document",
+            source_format="pdf",
+            target_format="xlsx",
+            filename=file.filename,
+            status="success"
+        )
+
+        return TempFileResponse(
+            path=output_path,
+            filename=file.filename.replace(".pdf", ".xlsx"),
+            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        # Save failed history
+        await save_conversion_history(
+            conversion_type="document",
+            source_format="pdf",
+            target_format="xlsx",
+            filename=file.filename,
+            status="failed",
+            error=str(e)
+        )
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/pdf-to-pptx")
+async def pdf_to_pptx(
+    file: UploadFile = File(...),
+    target_format: str = Form("pptx")
+):
+    """Convert PDF to PowerPoint"""
+    try:
+        input_path = await save_upload_file_tmp(file, count_pages=True)
+        output_path = await run_cached_engine(ENGINE_PDF, convert_pdf_to_pptx, input_path)
+
+        # Save to history
+        await save_conversion_history(
+            conversion_type="document",
+            source_format="pdf",
+            target_format="pptx",
+            filename=file.filename,
+            status="success"
+        )
+
+        return TempFileResponse(
+            path=output_path,
+            filename=file.filename.replace(".pdf", ".pptx"),
+            media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        # Save failed history
+        await save_conversion_history(
+            conversion_type="document",
+            source_format="pdf",
+            target_format="pptx",
+            filename=file.filename,
+            status="failed",
+            error=str(e)
+        )
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("convert/text-to-pdf")
+async def text_to_pdf(
+    file: UploadFile = File(...),
+    target_format: str = Form("pdf")
+):
+    """Convert Text to PDF"""
+    try:
+        # 1️⃣ Save uploaded text file
+        input_path = await save_upload_file_tmp(file)
+
+        # 2️⃣ Convert TXT → PDF
+        output_path = await run_cached_engine(ENGINE_PDF, convert_text_to_pdf, input_path)
+
+        # 3️⃣ Save to history (SUCCESS)
+        await save_conversion_history(
+            conversion_type="document",
+            source_format="txt",
+            target_format="pdf",
+            filename=file.filename,
+            status="success"
+        )
+
+        # 4️⃣ Return PDF
+        return TempFileResponse(
+            path=output_path,
+            filename=file.filename.replace(".txt", ".pdf"),
+            media_type="application/pdf"
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        # 5️⃣ Save to history (FAILED)
+        await save_conversion_history(
+            conversion_type="document",
+            source_format="txt",
+            target_format="pdf",
+            filename=file.filename,
+            status="failed",
+            error=str(e)
+        )
+
+        raise HTTPException(
+            status_code=500,
+            detail=str(e)
+        )
+
+
+@router.post("/txt-to-pdf")
+async def txt_to_pdf(
+    file: UploadFile = File(...),
+    target_format: str = Form("pdf")
+):
+    """Convert Text to PDF"""
+    input_path = await save_upload_file_tmp(file)
+    output_path = await run_cached_engine(ENGINE_PDF, convert_text_to_pdf, input_path)
+    
+    await save_conversion_history("document", "txt", "pdf", file.filename)
+    
+    return TempFileResponse(
+        path=output_path,
+        filename="converted.pdf",
+        media_type="application/pdf"
+    )
+
+
+# ============== PDF Tools ==============
+
+@router.post("/pdf/lock")
+async def lock_pdf_endpoint(
+    file: UploadFile = File(...),
+    password: str = Form(...)
+):
+    """Lock/encrypt PDF with password"""
+    try:
+        input_path = await save_upload_file_tmp(file)
+        output_path = await run_engine(ENGINE_PDF, lock_pdf, input_path, password)
+        
+        return TempFileResponse(
+            path=output_path,
+            filename="locked.pdf",
+            media_type="application/pdf"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/pdf/unlock")
+async def unlock_pdf_endpoint(
+    file: UploadFile = File(...),
+    password: str = Form(...)
+):
+    """Unlock/decrypt PDF with password"""
+    try:
+        input_path = await save_upload_file_tmp(file)
+        output_path = await run_engine(ENGINE_PDF, unlock_pdf, input_path, password)
+        
+        return TempFileResponse(
+            path=output_path,
+            filename="unlocked.pdf",
+            media_type="application/pdf"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/pdf/merge")
+async def merge_pdfs_endpoint(files: List[UploadFile] = File(...)):
+    """Merge multiple PDFs"""
+    try:
+        # Validate file count
+        MAX_FILES = 20
+        
+        if len(files) > MAX_FILES:
+            raise HTTPException(
+                status_code=400, 
+                detail=f"Maximum {MAX_FILES} PDF files allowed for merge. You provided {len(files)} files."
+            )
+        
+        if len(files) < 2:
+            raise HTTPException(
+                status_code=400,
+                detail="At least 2 PDF files are required for merge"
+            )
+        
+        valid_pdf_paths = []
+        
+        # Process each file
+        for file in files:
+            if file is None:
+                continue
+            
+            filename = getattr(file, 'filename', None) or 'unknown'
+            
+            # Check if filename indicates PDF
+            if not filename.lower().endswith('.pdf'):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid file type: {filename}. Only PDF files are allowed for merge."
+                )
+            
+            # Save to temp directory (this handles reading the file content)
+            try:
+                ingested = await ingest_upload_file(file, max_size=MERGE_MAX_FILE_SIZE, count_pages=True)
+                pdf_path = ingested.path
+                
+                # Validate the saved file
+                if not pdf_path.exists():
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Failed to save file: {filename}"
+                    )
+                
+                file_size = pdf_path.stat().st_size
+                
+                if file_size == 0:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"File is empty: {filename}"
+                    )
+                
+                # Verify it's a valid PDF by its header, sniffed while saving
+                if ingested.detected_format != "pdf":
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Invalid PDF file: {filename}"
+                    )
+                
+                valid_pdf_paths.append(pdf_path)
+                
+            except HTTPException:
+                raise
+            except Exception as save_error:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Error processing file {filename}: {str(save_error)}"
+                )
+        
+        if len(valid_pdf_paths) < 2:
+            raise HTTPException(
+                status_code=400,
+                detail="At least 2 valid PDF files are required for merge"
+            )
+        
+        output_path = await run_engine(ENGINE_PDF, merge_pdfs, valid_pdf_paths)
+        
+        return TempFileResponse(
+            path=output_path,
+            filename="merged.pdf",
+            media_type="application/pdf"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        # Log the error for debugging
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/pdf/split")
+async def split_pdf_endpoint(
+    file: UploadFile = File(...),
+    page_ranges: str = Form(...)
+):
+    """Split PDF (e.g., page_ranges='1-3,4-6' or '1,3,5')"""
+    try:
+        input_path = await save_upload_file_tmp(file, count_pages=True)
+        output_paths = await run_engine(ENGINE_PDF, split_pdf, input_path, page_ranges)
+        
+        # Create ZIP with all split PDFs
+        zip_path = await run_engine(ENGINE_ZIP, create_zip, output_paths, "split_pdfs")
+        
+        return TempFileResponse(
+            path=zip_path,
+            filename="split_pdfs.zip",
+            media_type="application/zip"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,314 @@
+"""
+Pipeline Routes
+
+/pipeline runs several operations on uploaded files in one request, e.g.
+DOCX -> PDF -> watermark -> lock, instead of downloading and re-uploading
+the file between endpoints. Intermediate files stay in TEMP_DIR and each is
+deleted as soon as the next step has read it.
+
+Steps are a JSON list of {"operation": ..., "options": {...}}. An operation
+is one of:
+
+- a background job operation (GET /api/jobs/operations), or a pipeline-only
+  one declared in a route module's PIPELINE_OPERATIONS (lock-pdf, unlock-pdf),
+  applied to every current file
+- "convert" with options {"target_format": ...}, converting every current
+  file along the format graph like /convert/document
+- "merge", combining the current PDFs into one, in upload order
+
+The whole pipeline is validated (formats, options) before anything runs. A
+single result is returned as is; several are returned as a ZIP archive.
+"""
+
+import asyncio
+import inspect
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Set, Tuple
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+
+from core import (
+    convert_format,
+    run_cached_engine,
+    save_conversion_history,
+    save_upload_file_tmp,
+    MEDIA_TYPES,
+)
+from engines import conversion_graph, engine_enabled, load_engine, load_engine_routes
+from engines.graph import normalize_format
+from services.executor_service import engine_call_limit, run_engine, ENGINE_PDF, ENGINE_ZIP
+from services.job_service import JobOperation
+from services.temp_service import TempFileResponse, remove_path, temp_file_path, track_request_file
+
+router = APIRouter(prefix="/api")
+
+# Longest pipeline accepted, and most files one pipeline may start with
+PIPELINE_MAX_STEPS = int(os.getenv("PIPELINE_MAX_STEPS", "10"))
+PIPELINE_MAX_FILES = 20
+
+CONVERT_STEP = "convert"
+MERGE_STEP = "merge"
+
+# Operations applied to each file: the enabled engines' job operations plus
+# their pipeline-only ones
+PIPELINE_OPERATIONS = {
+    op.name: op
+    for module in load_engine_routes()
+    for op in [*getattr(module, "JOB_OPERATIONS", []), *getattr(module, "PIPELINE_OPERATIONS", [])]
+}
+
+# A file between steps: its path and (normalized) format
+PipelineFile = Tuple[Path, str]
+
+
+def _required_options(operation: JobOperation) -> List[str]:
+    """Keyword arguments the operation's function cannot do without"""
+    parameters = list(inspect.signature(operation.func).parameters.values())[1:]
+    return [
+        parameter.name for parameter in parameters
+        if parameter.default is inspect.Parameter.empty and parameter.name in operation.allowed_options
+    ]
+
+
+def parse_pipeline(raw_steps: str, formats: List[str]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Validate the steps against the upload formats; returns (operation, options) pairs.
+
+    Raises HTTPException(400) naming the first invalid step, so nothing is
+    converted for a pipeline that cannot finish.
+    """
+    try:
+        steps = json.loads(raw_steps)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Steps must be a JSON list")
+    if not isinstance(steps, list) or not steps:
+        raise HTTPException(status_code=400, detail="Steps must be a non-empty JSON list")
+    if len(steps) > PIPELINE_MAX_STEPS:
+        raise HTTPException(status_code=400, detail=f"Maximum {PIPELINE_MAX_STEPS} pipeline steps allowed")
+
+    parsed = []
+    for number, step in enumerate(steps, start=1):
+        if not isinstance(step, dict) or not isinstance(step.get("operation"), str):
+            raise HTTPException(status_code=400, detail=f"Step {number} must be an object with an operation")
+        name = step["operation"]
+        options = step.get("options") or {}
+        if not isinstance(options, dict):
+            raise HTTPException(status_code=400, detail=f"Step {number} ({name}): options must be a JSON object")
+
+        def invalid(detail: str) -> HTTPException:
+            return HTTPException(status_code=400, detail=f"Step {number} ({name}): {detail}")
+
+        if name == CONVERT_STEP:
+            if set(options) != {"target_format"}:
+                raise invalid("options must be exactly {\"target_format\": ...}")
+            target = normalize_format(str(options["target_format"]))
+            for source in set(formats):
+                if source != target and conversion_graph().plan(source, target) is None:
+                    raise invalid(f"conversion from {source} to {target} is not supported")
+            formats = [target] * len(formats)
+        elif name == MERGE_STEP:
+            if not engine_enabled(ENGINE_PDF):
+                raise HTTPException(status_code=503, detail="The pdf engine is not enabled on this server")
+            if options:
+                raise invalid("merge takes no options")
+            if any(fmt != "pdf" for fmt in formats):
+                raise invalid(f"merge needs PDF files, got {', '.join(sorted(set(formats)))}")
+            formats = ["pdf"]
+        else:
+            operation = PIPELINE_OPERATIONS.get(name)
+            if operation is None:
+                raise invalid(
+                    f"unknown operation. Must be one of: "
+                    f"{', '.join([CONVERT_STEP, MERGE_STEP, *PIPELINE_OPERATIONS])}"
+                )
+            unknown_options = set(options) - set(operation.allowed_options)
+            if unknown_options:
+                raise invalid(f"unsupported options: {', '.join(sorted(unknown_options))}")
+            missing_options = [option for option in _required_options(operation) if option not in options]
+            if missing_options:
+                raise invalid(f"missing options: {', '.join(missing_options)}")
+            source = normalize_format(operation.source_format)
+            wrong_formats = sorted(set(fmt for fmt in formats if fmt != source))
+            if wrong_formats:
+                raise invalid(f"expects {source} files, got {', '.join(wrong_formats)}")
+            formats = [normalize_format(operation.target_format)] * len(formats)
+        parsed.append((name, options))
+    return parsed
+
+
+async def _gather_outputs(calls, inputs: List[PipelineFile], limit: int) -> List[Path]:
+    """Await the per-file calls of a step, at most limit at a time; returns their output paths.
+
+    Keeping to the engine's call limit means a large upload is not rejected
+    with 429 for filling the engine's wait queue by itself. Once a call
+    fails, the calls not yet started are skipped and the running ones are
+    awaited, so no sibling is left writing its output unseen; their outputs
+    are handed to the request's temp file tracking and the first error is
+    raised.
+    """
+    slots = asyncio.Semaphore(max(1, limit))
+    errors = []
+
+    async def run_call(call):
+        async with slots:
+            if errors:
+                call.close()
+                return None
+            try:
+                return await call
+            except BaseException as e:
+                errors.append(e)
+                raise
+
+    results = await asyncio.gather(*(run_call(call) for call in calls), return_exceptions=True)
+    if errors:
+        input_paths = {path for path, _ in inputs}
+        for result in results:
+            if isinstance(result, Path) and result not in input_paths:
+                track_request_file(result)
+        raise errors[0]
+    return results
+
+
+def _route_engines(formats: Set[str], target: str) -> Set[str]:
+    """Engines on the planned routes from formats to target"""
+    graph = conversion_graph()
+    return {
+        step.engine
+        for source in formats if source != target
+        for step in graph.plan(source, target) or []
+    }
+
+
+async def run_pipeline_step(name: str, options: Dict[str, Any], files: List[PipelineFile]) -> List[PipelineFile]:
+    """Run one validated step on every current file"""
+    if name == MERGE_STEP:
+        if len(files) == 1:
+            return files
+        merge_pdfs = load_engine(ENGINE_PDF).merge_pdfs
+        output_path = await run_engine(ENGINE_PDF, merge_pdfs, [path for path, _ in files])
+        return [(output_path, "pdf")]
+
+    if name == CONVERT_STEP:
+        target = normalize_format(str(options["target_format"]))
+
+        async def convert(path: Path, fmt: str) -> Path:
+            if fmt == target:
+                return path
+            return await convert_format(path, fmt, target)
+
+        # Fallback routes may use other engines; the planned ones set the pace
+        engines = _route_engines({fmt for _, fmt in files}, target)
+        limit = min((engine_call_limit(engine) for engine in engines), default=len(files))
+        outputs = await _gather_outputs((convert(path, fmt) for path, fmt in files), files, limit)
+        return [(output_path, target) for output_path in outputs]
+
+    operation = PIPELINE_OPERATIONS[name]
+    outputs = await _gather_outputs((
+        run_cached_engine(operation.engine, operation.func, path, **options) for path, _ in files
+    ), files, engine_call_limit(operation.engine))
+    return [(output_path, normalize_format(operation.target_format)) for output_path in outputs]
+
+
+def _remove_intermediates(files: List[PipelineFile], keep: set):
+    for path, _ in files:
+        if path not in keep:
+            path.unlink(missing_ok=True)
+
+
+async def run_pipeline(steps: List[Tuple[str, Dict[str, Any]]], files: List[PipelineFile]) -> List[PipelineFile]:
+    """Run the steps in order, deleting each intermediate once the next step has read it.
+
+    The uploads themselves are left to the request's temp file tracking.
+    """
+    uploads = {path for path, _ in files}
+    for number, (name, options) in enumerate(steps, start=1):
+        try:
+            outputs = await run_pipeline_step(name, options, files)
+        except HTTPException:
+            # e.g. 429 from a busy engine, passed on as is
+            _remove_intermediates(files, keep=uploads)
+            raise
+        except Exception as e:
+            _remove_intermediates(files, keep=uploads)
+            raise RuntimeError(f"Step {number} ({name}) failed: {e}") from e
+        # Steps with nothing to do (merging one file) pass their input on
+        _remove_intermediates(files, keep=uploads | {path for path, _ in outputs})
+        files = outputs
+    return files
+
+
+@router.get("/pipeline/operations")
+async def list_pipeline_operations():
+    """List the operations a pipeline step can use"""
+    return {
+        "operations": [
+            {"name": CONVERT_STEP, "options": ["target_format"], "formats": conversion_graph().formats},
+            *([{"name": MERGE_STEP, "source_format": "pdf", "target_format": "pdf", "options": []}]
+              if engine_enabled(ENGINE_PDF) else []),
+            *(op.to_dict() for op in PIPELINE_OPERATIONS.values()),
+        ],
+        "max_steps": PIPELINE_MAX_STEPS,
+    }
+
+
+@router.post("/pipeline")
+async def run_pipeline_endpoint(
+    files: List[UploadFile] = File(...),
+    steps: str = Form(...)
+):
+    """Run a list of operations on the uploaded files in one request.
+
+    Example steps: [{"operation": "docx-to-pdf"},
+    {"operation": "watermark-text", "options": {"text": "DRAFT"}},
+    {"operation": "lock-pdf", "options": {"password": "secret"}}]
+    """
+    if len(files) > PIPELINE_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {PIPELINE_MAX_FILES} files allowed per pipeline. You provided {len(files)} files."
+        )
+    try:
+        uploads = []
+        for file in files:
+            input_path = await save_upload_file_tmp(file)
+            uploads.append((input_path, normalize_format(input_path.suffix or "bin")))
+        pipeline = parse_pipeline(steps, [fmt for _, fmt in uploads])
+
+        outputs = await run_pipeline(pipeline, uploads)
+
+        source_format = ",".join(sorted(set(fmt for _, fmt in uploads)))
+        target_format = outputs[0][1]
+        filename = files[0].filename if len(files) == 1 else f"{len(files)} files"
+        await save_conversion_history("pipeline", source_format, target_format, filename)
+
+        if len(outputs) == 1:
+            output_path, output_format = outputs[0]
+            return TempFileResponse(
+                path=output_path,
+                filename=f"{Path(files[0].filename or 'output').stem}.{output_format}",
+                media_type=MEDIA_TYPES.get(output_format, "application/octet-stream")
+            )
+
+        # Several results: name them after their uploads and send them as one archive
+        if not engine_enabled(ENGINE_ZIP):
+            raise HTTPException(status_code=503, detail="Returning several files needs the zip engine")
+        bundle_dir = temp_file_path(f"{uuid.uuid4()}_pipeline")
+        bundle_dir.mkdir()
+        try:
+            named_paths = []
+            for index, ((output_path, output_format), file) in enumerate(zip(outputs, files), start=1):
+                named_path = bundle_dir / f"{index:02d}_{Path(file.filename or 'output').stem}.{output_format}"
+                output_path.replace(named_path)
+                named_paths.append(named_path)
+            create_zip = load_engine(ENGINE_ZIP).create_zip
+            zip_path = await run_engine(ENGINE_ZIP, create_zip, named_paths, "pipeline")
+        finally:
+            remove_path(bundle_dir)
+        return TempFileResponse(path=zip_path, filename="pipeline.zip", media_type="application/zip")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
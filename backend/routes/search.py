@@ -0,0 +1,42 @@
+"""
+Search Routes
+
+Endpoint of the search engine (engines/search.py): full-text search in PDFs.
+"""
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+
+from core import save_conversion_history, save_upload_file_tmp
+from engines.search import search_in_pdf
+from services.executor_service import run_engine, ENGINE_SEARCH
+
+router = APIRouter(prefix="/api")
+
+
+@router.post("/search/pdf")
+async def search_in_pdf_endpoint(
+    file: UploadFile = File(...),
+    search_term: str = Form(...)
+):
+    """Search for text within PDF document"""
+    try:
+        if not search_term or not search_term.strip():
+            raise HTTPException(status_code=400, detail="Search term cannot be empty")
+
+        input_path = await save_upload_file_tmp(file)
+        results = await run_engine(ENGINE_SEARCH, search_in_pdf, input_path, search_term.strip())
+
+        # Save to history
+        await save_conversion_history(
+            conversion_type="search",
+            source_format="pdf",
+            target_format="results",
+            filename=file.filename,
+            status="success"
+        )
+
+        return results
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
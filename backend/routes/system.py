@@ -0,0 +1,75 @@
+"""
+System Routes
+
+Root and health check, Prometheus metrics and the profiling admin endpoints.
+Served whatever engines are enabled; the health check lists them.
+"""
+
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import FileResponse
+
+from engines import ENABLED_ENGINES
+from services.metrics_service import CONTENT_TYPE as METRICS_CONTENT_TYPE, metrics
+from services.profiling_service import (
+    PROFILING_ENABLED,
+    check_admin_token,
+    list_profiles,
+    profile_file_path,
+    profile_summary,
+)
+
+router = APIRouter(prefix="/api")
+
+
+@router.get("/")
+async def root():
+    return {"message": "File Conversion API"}
+
+@router.get("/health")
+async def health_check():
+    """Health check endpoint for Docker container monitoring"""
+    return {"status": "healthy", "service": "file-conversion-api", "engines": list(ENABLED_ENGINES)}
+
+# ============== Profiling Admin Routes ==============
+
+def require_profiling_admin(x_admin_token: Optional[str] = Header(None)):
+    """Profiling endpoints exist only when enabled and, if configured, need the admin token"""
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if not check_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.get("/admin/profiles", dependencies=[Depends(require_profiling_admin)])
+async def get_profiles():
+    """List stored request profiles, newest first"""
+    return await asyncio.to_thread(list_profiles)
+
+
+@router.get("/admin/profiles/{profile_id}", dependencies=[Depends(require_profiling_admin)])
+async def get_profile(profile_id: str, sort: str = "cumulative", top: int = Query(40, ge=1, le=500)):
+    """pstats summary of every engine call made by a profiled request"""
+    try:
+        summary = await asyncio.to_thread(profile_summary, profile_id, sort, top)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return summary
+
+
+@router.get("/admin/profiles/{profile_id}/{filename}", dependencies=[Depends(require_profiling_admin)])
+async def download_profile(profile_id: str, filename: str):
+    """Download a raw cProfile stats file (open with pstats or snakeviz)"""
+    path = profile_file_path(profile_id, filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile file not found")
+    return FileResponse(path=path, filename=f"{profile_id}_{filename}", media_type="application/octet-stream")
+
+@router.get("/metrics")
+async def get_metrics():
+    """Metrics in the Prometheus text exposition format (per worker process)"""
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
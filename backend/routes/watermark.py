@@ -0,0 +1,399 @@
+"""
+Watermark Routes
+
+Endpoints and background job operations of the watermark engine
+(services/watermark_service.py): text and image watermarks and previews.
+"""
+
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+
+from core import run_cached_engine, save_conversion_history, save_upload_file_tmp, MEDIA_TYPE_PDF
+from services.executor_service import ENGINE_WATERMARK
+from services.job_service import JobOperation
+from services.temp_service import TempFileResponse
+from services.watermark_service import (
+    add_text_watermark,
+    add_image_watermark,
+    POSITION_CENTER,
+    POSITION_TOP_LEFT,
+    POSITION_TOP_RIGHT,
+    POSITION_BOTTOM_LEFT,
+    POSITION_BOTTOM_RIGHT,
+    POSITION_TILED
+)
+
+router = APIRouter(prefix="/api")
+
+# Conversions that can be submitted through the job API (see routes/jobs.py)
+JOB_OPERATIONS = [
+    JobOperation(
+        "watermark-text", ENGINE_WATERMARK, add_text_watermark, "pdf", "pdf", MEDIA_TYPE_PDF,
+        ("text", "font_name", "font_size", "color", "opacity", "rotation", "position",
+         "first_page_only", "page_ranges", "margin_x", "margin_y", "outline", "outline_color")
+    ),
+]
+
+
+# ============== Watermark PDF Routes ==============
+
+@router.post("/watermark/pdf/text")
+async def add_text_watermark_endpoint(
+    file: UploadFile = File(...),
+    text: str = Form(...),
+    font_name: str = Form("Helvetica-Bold"),
+    font_size: int = Form(48),
+    color: str = Form("#808080"),
+    opacity: float = Form(0.3),
+    rotation: float = Form(45),
+    position: str = Form("center"),
+    first_page_only: bool = Form(False),
+    page_ranges: Optional[str] = Form(None),
+    margin_x: float = Form(50),
+    margin_y: float = Form(50),
+    outline: bool = Form(False),
+    outline_color: str = Form("#FFFFFF")
+):
+    """Add text watermark to PDF"""
+    try:
+        # Validate inputs
+        if not text or not text.strip():
+            raise HTTPException(status_code=400, detail="Watermark text cannot be empty")
+        
+        # Validate font_size
+        if font_size < 8 or font_size > 200:
+            raise HTTPException(status_code=400, detail="Font size must be between 8 and 200")
+        
+        # Validate opacity
+        if opacity < 0 or opacity > 1:
+            raise HTTPException(status_code=400, detail="Opacity must be between 0 and 1")
+        
+        # Validate rotation
+        if rotation < -360 or rotation > 360:
+            raise HTTPException(status_code=400, detail="Rotation must be between -360 and 360 degrees")
+        
+        # Validate position
+        valid_positions = [POSITION_CENTER, POSITION_TOP_LEFT, POSITION_TOP_RIGHT, 
+                          POSITION_BOTTOM_LEFT, POSITION_BOTTOM_RIGHT, POSITION_TILED]
+        if position not in valid_positions:
+            raise HTTPException(status_code=400, detail=f"Invalid position. Must be one of: {', '.join(valid_positions)}")
+        
+        # Log watermark request
+        print(f"[WATERMARK] Processing text watermark request for file: {file.filename}")
+        print(f"[WATERMARK] Text: {text}, Font: {font_name}, Size: {font_size}, Color: {color}")
+        
+        # Save uploaded PDF
+        input_path = await save_upload_file_tmp(file)
+        print(f"[WATERMARK] Saved input file to: {input_path}")
+        
+        # Add watermark
+        output_path = await run_cached_engine(
+            ENGINE_WATERMARK,
+            add_text_watermark,
+            pdf_path=input_path,
+            text=text,
+            font_name=font_name,
+            font_size=font_size,
+            color=color,
+            opacity=opacity,
+            rotation=rotation,
+            position=position,
+            first_page_only=first_page_only,
+            page_ranges=page_ranges,
+            margin_x=margin_x,
+            margin_y=margin_y,
+            outline=outline,
+            outline_color=outline_color
+        )
+        print(f"[WATERMARK] Generated watermarked PDF: {output_path}")
+        
+        # Save to history
+        await save_conversion_history(
+            conversion_type="watermark",
+            source_format="pdf",
+            target_format="pdf",
+            filename=file.filename,
+            status="success"
+        )
+        
+        return TempFileResponse(
+            path=output_path,
+            filename=f"{Path(file.filename).stem}_watermarked.pdf",
+            media_type="application/pdf"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        # Enhanced error logging
+        error_msg = f"Text watermark failed: {str(e)}"
+        print(f"[WATERMARK ERROR] {error_msg}")
+        import traceback
+        traceback.print_exc()
+        
+        # Save failed history
+        await save_conversion_history(
+            conversion_type="watermark",
+            source_format="pdf",
+            target_format="pdf",
+            filename=file.filename if 'file' in locals() else "unknown",
+            status="failed",
+            error=error_msg
+        )
+        raise HTTPException(status_code=500, detail=error_msg)
+
+
+@router.post("/watermark/pdf/image")
+async def add_image_watermark_endpoint(
+    file: UploadFile = File(...),
+    watermark_file: UploadFile = File(...),
+    opacity: float = Form(0.3),
+    position: str = Form("center"),
+    scale: float = Form(0.5),
+    rotation: float = Form(0),
+    first_page_only: bool = Form(False),
+    page_ranges: Optional[str] = Form(None),
+    margin_x: float = Form(50),
+    margin_y: float = Form(50)
+):
+    """Add image/logo watermark to PDF"""
+    try:
+        # Validate opacity
+        if opacity < 0 or opacity > 1:
+            raise HTTPException(status_code=400, detail="Opacity must be between 0 and 1")
+        
+        # Validate scale
+        if scale < 0.1 or scale > 2.0:
+            raise HTTPException(status_code=400, detail="Scale must be between 0.1 and 2.0")
+        
+        # Validate rotation
+        if rotation < -360 or rotation > 360:
+            raise HTTPException(status_code=400, detail="Rotation must be between -360 and 360 degrees")
+        
+        # Validate position
+        valid_positions = [POSITION_CENTER, POSITION_TOP_LEFT, POSITION_TOP_RIGHT, 
+                          POSITION_BOTTOM_LEFT, POSITION_BOTTOM_RIGHT, POSITION_TILED]
+        if position not in valid_positions:
+            raise HTTPException(status_code=400, detail=f"Invalid position. Must be one of: {', '.join(valid_positions)}")
+        
+        # Log watermark request
+        print(f"[WATERMARK] Processing image watermark request for file: {file.filename}")
+        print(f"[WATERMARK] Watermark: {watermark_file.filename}, Opacity: {opacity}, Scale: {scale}")
+        
+        # Save uploaded PDF and watermark image
+        input_path = await save_upload_file_tmp(file)
+        watermark_path = await save_upload_file_tmp(watermark_file)
+        print(f"[WATERMARK] Saved files - PDF: {input_path}, Image: {watermark_path}")
+        
+        # Add watermark
+        output_path = await run_cached_engine(
+            ENGINE_WATERMARK,
+            add_image_watermark,
+            pdf_path=input_path,
+            image_path=watermark_path,
+            opacity=opacity,
+            position=position,
+            scale=scale,
+            rotation=rotation,
+            first_page_only=first_page_only,
+            page_ranges=page_ranges,
+            margin_x=margin_x,
+            margin_y=margin_y
+        )
+        print(f"[WATERMARK] Generated watermarked PDF: {output_path}")
+        
+        # Save to history
+        await save_conversion_history(
+            conversion_type="watermark",
+            source_format="pdf",
+            target_format="pdf",
+            filename=file.filename,
+            status="success"
+        )
+        
+        return TempFileResponse(
+            path=output_path,
+            filename=f"{Path(file.filename).stem}_watermarked.pdf",
+            media_type="application/pdf"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        # Enhanced error logging
+        error_msg = f"Image watermark failed: {str(e)}"
+        print(f"[WATERMARK ERROR] {error_msg}")
+        import traceback
+        traceback.print_exc()
+        
+        # Save failed history
+        await save_conversion_history(
+            conversion_type="watermark",
+            source_format="pdf",
+            target_format="pdf",
+            filename=file.filename if 'file' in locals() else "unknown",
+            status="failed",
+            error=error_msg
+        )
+        raise HTTPException(status_code=500, detail=error_msg)
+
+
+# ============== Watermark Preview Endpoint ==============
+
+@router.post("/watermark/pdf/preview")
+async def watermark_preview_endpoint(
+    file: UploadFile = File(...),
+    watermark_type: str = Form("text"),  # "text" or "image"
+    # Text watermark params
+    text: Optional[str] = Form(None),
+    font_name: str = Form("Helvetica-Bold"),
+    font_size: int = Form(48),
+    color: str = Form("#808080"),
+    opacity: float = Form(0.3),
+    rotation: float = Form(45),
+    position: str = Form("center"),
+    margin_x: float = Form(50),
+    margin_y: float = Form(50),
+    outline: bool = Form(False),
+    outline_color: str = Form("#FFFFFF"),
+    # Image watermark params
+    watermark_file: Optional[UploadFile] = Form(None),
+    scale: float = Form(0.5),
+    # Common params
+    page_number: int = Form(1)
+):
+    """Generate a preview of the watermark on a single PDF page.
+    
+    Returns a single-page PDF blob for real-time preview in the frontend.
+    """
+    try:
+        # Validate inputs
+        if watermark_type == "text":
+            if not text or not text.strip():
+                raise HTTPException(status_code=400, detail="Watermark text cannot be empty for text watermark")
+        elif watermark_type == "image":
+            if not watermark_file:
+                raise HTTPException(status_code=400, detail="Watermark image is required for image watermark")
+        else:
+            raise HTTPException(status_code=400, detail="Invalid watermark type. Must be 'text' or 'image'")
+        
+        # Validate opacity
+        if opacity < 0 or opacity > 1:
+            raise HTTPException(status_code=400, detail="Opacity must be between 0 and 1")
+        
+        # Validate rotation
+        if rotation < -360 or rotation > 360:
+            raise HTTPException(status_code=400, detail="Rotation must be between -360 and 360 degrees")
+        
+        # Validate position
+        valid_positions = [POSITION_CENTER, POSITION_TOP_LEFT, POSITION_TOP_RIGHT, 
+                          POSITION_BOTTOM_LEFT, POSITION_BOTTOM_RIGHT, POSITION_TILED]
+        if position not in valid_positions:
+            raise HTTPException(status_code=400, detail=f"Invalid position. Must be one of: {', '.join(valid_positions)}")
+        
+        # Save uploaded PDF
+        input_path = await save_upload_file_tmp(file)
+        
+        if watermark_type == "text":
+            # Add text watermark
+            output_path = await run_cached_engine(
+                ENGINE_WATERMARK,
+                add_text_watermark,
+                pdf_path=input_path,
+                text=text,
+                font_name=font_name,
+                font_size=font_size,
+                color=color,
+                opacity=opacity,
+                rotation=rotation,
+                position=position,
+                first_page_only=True,  # Only first page for preview
+                page_ranges=None,
+                margin_x=margin_x,
+                margin_y=margin_y,
+                outline=outline,
+                outline_color=outline_color
+            )
+        else:
+            # Save watermark image
+            watermark_path = await save_upload_file_tmp(watermark_file)
+            
+            # Add image watermark
+            output_path = await run_cached_engine(
+                ENGINE_WATERMARK,
+                add_image_watermark,
+                pdf_path=input_path,
+                image_path=watermark_path,
+                opacity=opacity,
+                position=position,
+                scale=scale,
+                rotation=rotation,
+                first_page_only=True,  # Only first page for preview
+                page_ranges=None,
+                margin_x=margin_x,
+                margin_y=margin_y
+            )
+        
+        print(f"[WATERMARK PREVIEW] Generated preview PDF: {output_path}")
+        
+        return TempFileResponse(
+            path=output_path,
+            filename="watermark_preview.pdf",
+            media_type="application/pdf"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_msg = f"Preview generation failed: {str(e)}"
+        print(f"[WATERMARK PREVIEW ERROR] {error_msg}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=error_msg)
+
+
+# ============== GET Available Options ==============
+
+@router.get("/watermark/options")
+async def get_watermark_options():
+    """Get available watermark options"""
+    return {
+        "fonts": [
+            "Helvetica",
+            "Helvetica-Bold",
+            "Helvetica-Oblique",
+            "Helvetica-BoldOblique",
+            "Times-Roman",
+            "Times-Bold",
+            "Times-Italic",
+            "Times-BoldItalic",
+            "Courier",
+            "Courier-Bold",
+            "Courier-Oblique",
+            "Courier-BoldOblique",
+            "Symbol",
+            "ZapfDingbats"
+        ],
+        "positions": [
+            {"value": "center", "label": "Center"},
+            {"value": "top_left", "label": "Top Left"},
+            {"value": "top_right", "label": "Top Right"},
+            {"value": "bottom_left", "label": "Bottom Left"},
+            {"value": "bottom_right", "label": "Bottom Right"},
+            {"value": "tiled", "label": "Tiled (Repeated)"}
+        ],
+        "default_text_watermark": {
+            "text": "CONFIDENTIAL",
+            "font_name": "Helvetica-Bold",
+            "font_size": 48,
+            "color": "#808080",
+            "opacity": 0.3,
+            "rotation": 45,
+            "position": "center"
+        },
+        "default_image_watermark": {
+            "opacity": 0.3,
+            "position": "center",
+            "scale": 0.5,
+            "rotation": 0
+        }
+    }
@@ -0,0 +1,113 @@
+"""
+ZIP Routes
+
+Endpoints of the ZIP engine (engines/zip.py): compress uploads, extract an
+archive and download the extracted files one by one.
+"""
+
+import uuid
+import zipfile
+from typing import List
+
+from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi.responses import FileResponse
+
+from core import save_upload_file_tmp
+from engines.zip import create_zip, extract_zip_to_dir
+from services.executor_service import run_engine, ENGINE_ZIP
+from services.temp_service import TempFileResponse, temp_file_path
+
+router = APIRouter(prefix="/api")
+
+
+@router.post("/zip/compress")
+async def compress_files(files: List[UploadFile] = File(...)):
+    """Compress multiple files into ZIP"""
+    try:
+        file_paths = [await save_upload_file_tmp(file) for file in files]
+        zip_path = await run_engine(ENGINE_ZIP, create_zip, file_paths, "compressed_files")
+        
+        return TempFileResponse(
+            path=zip_path,
+            filename="compressed.zip",
+            media_type="application/zip"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/zip/extract")
+async def extract_files(file: UploadFile = File(...)):
+    """Extract ZIP archive and return list of files for individual download"""
+    try:
+        input_path = await save_upload_file_tmp(file)
+
+        # Validate that the file is a valid ZIP
+        if not zipfile.is_zipfile(input_path):
+            raise HTTPException(status_code=400, detail="Invalid ZIP file")
+
+        # Create extraction directory
+        extracted_dir = temp_file_path(f"{uuid.uuid4()}_extracted")
+        extracted_dir.mkdir(exist_ok=True)
+
+        # Extract ZIP preserving structure
+        try:
+            await run_engine(ENGINE_ZIP, extract_zip_to_dir, input_path, extracted_dir)
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail="Corrupt ZIP file - unable to extract")
+
+        # Get all extracted files preserving folder structure
+        extracted_paths = list(extracted_dir.glob('**/*'))
+        extracted_files = [p for p in extracted_paths if p.is_file()]
+
+        if len(extracted_files) == 0:
+            raise HTTPException(status_code=400, detail="ZIP file is empty")
+
+        # Create file list with metadata
+        file_list = []
+        for file_path in extracted_files:
+            relative_path = file_path.relative_to(extracted_dir)
+            file_list.append({
+                "path": str(relative_path),
+                "size": file_path.stat().st_size,
+                "extraction_id": extracted_dir.name
+            })
+
+        return {
+            "files": file_list,
+            "extraction_id": extracted_dir.name,
+            "total_files": len(file_list)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/zip/download-file/{extraction_id}/{file_path:path}")
+async def download_file(extraction_id: str, file_path: str):
+    """Download individual file from extracted ZIP"""
+    try:
+        # Extraction ids are plain directory names, never paths
+        if "/" in extraction_id or "\\" in extraction_id or extraction_id.startswith("."):
+            raise HTTPException(status_code=404, detail="Extraction session expired")
+
+        extracted_dir = temp_file_path(extraction_id)
+
+        if not extracted_dir.exists():
+            raise HTTPException(status_code=404, detail="Extraction session expired")
+
+        file_path_obj = extracted_dir / file_path
+
+        if not file_path_obj.exists() or not file_path_obj.is_file():
+            raise HTTPException(status_code=404, detail="File not found")
+
+        return FileResponse(
+            path=file_path_obj,
+            filename=file_path_obj.name,
+            media_type="application/octet-stream"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,244 @@
+"""
+Admission Control Module
+
+Bounds how many calls each engine runs at once and how many may wait for a
+slot. Without it a burst of heavy requests (300 DPI rasterization for
+pdf-to-pptx, LibreOffice, Tesseract) queues without limit in front of the
+engine pools, holding uploads and memory until the container is OOM-killed.
+With it, a call that finds the engine's wait queue full is rejected at once
+with 429 Too Many Requests and a Retry-After estimated from recent call
+durations, so overload degrades into fast rejections instead of collapse.
+
+Limits are configured per engine through environment variables:
+- ADMISSION_CONTROL: "false" turns admission control off
+- ADMISSION_<ENGINE>_LIMIT: calls running at once (default: the pool's workers)
+- ADMISSION_<ENGINE>_QUEUE: calls waiting for a slot (default: 4 x the limit)
+
+Background jobs were already accepted (202) by the time they run, so they
+wait for a slot without counting towards the wait queue (see
+wait_without_queue_limit).
+
+Waiting calls are not served in arrival order but by weighted fair queuing
+(self-clocked) over (client, priority class) flows, weighted by the class
+weights of services/priority_service.py: every waiter is tagged with the
+virtual time its call would finish if each flow got its weighted share,
+and a freed slot goes to the smallest tag.
+Interactive requests therefore overtake queued bulk work, and within a
+class no client can starve the others by queueing many calls. Bulk calls
+may only fill BULK_QUEUE_SHARE of the wait queue, so room is left for
+interactive and standard requests when batches pile up.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from services.metrics_service import metrics
+from services.priority_service import (
+    current_client,
+    current_priority,
+    PRIORITY_BULK,
+    PRIORITY_CLASSES,
+    PRIORITY_WEIGHTS,
+)
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "true").lower() in ("1", "true", "yes", "on")
+
+# Multiple of the limit allowed to wait when ADMISSION_<ENGINE>_QUEUE is not set
+DEFAULT_QUEUE_FACTOR = 4
+
+# Retry-After bounds, and the call duration assumed before an engine has finished any call
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 300
+DEFAULT_CALL_SECONDS = 5.0
+
+# Part of the wait queue bulk calls may fill
+BULK_QUEUE_SHARE = 0.5
+
+# Weight of the newest call in the moving average of call durations
+DURATION_SMOOTHING = 0.2
+
+ADMISSION_REJECTED = metrics.counter(
+    "filelab_admission_rejected_total", "Engine calls rejected with 429 because the wait queue was full", ("engine", "priority")
+)
+
+# Set for background jobs, which wait for a slot however long the queue is
+_unbounded_wait: contextvars.ContextVar[bool] = contextvars.ContextVar("admission_unbounded_wait", default=False)
+
+
+class EngineBusyError(HTTPException):
+    """429 raised when an engine's wait queue is full.
+
+    An HTTPException, so routes re-raise it untouched past their generic
+    500 handlers.
+    """
+
+    def __init__(self, engine: str, retry_after: int):
+        super().__init__(
+            status_code=429,
+            detail=f"The {engine} engine is busy, retry in {retry_after} seconds",
+            headers={"Retry-After": str(retry_after)}
+        )
+        self.engine = engine
+        self.retry_after = retry_after
+
+
+def wait_without_queue_limit():
+    """Let engine calls of the current task wait for a slot even when the queue is full"""
+    _unbounded_wait.set(True)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, default)))
+    except ValueError:
+        logger.warning(f"Invalid {name} value, using {default}")
+        return default
+
+
+class EngineAdmission:
+    """Slots and wait queue of one engine"""
+
+    def __init__(self, engine: str, limit: int, queue_size: int):
+        self.engine = engine
+        self.limit = max(1, limit)
+        self.queue_size = queue_size
+        self.running = 0
+        self.rejected = 0
+        self.average_seconds: Optional[float] = None
+        # Waiting calls as (finish tag, arrival, future, priority), smallest tag served first
+        self._waiters: List[Tuple[float, int, asyncio.Future, str]] = []
+        self._arrivals = itertools.count()
+        # Finish tag of the call served last, and the last finish tag of each (client, priority) flow
+        self._virtual_time = 0.0
+        self._flow_tags: Dict[Tuple[str, str], float] = {}
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for _, _, waiter, _ in self._waiters if not waiter.done())
+
+    def waiting_by_priority(self) -> Dict[str, int]:
+        counts = dict.fromkeys(PRIORITY_CLASSES, 0)
+        for _, _, waiter, priority in self._waiters:
+            if not waiter.done():
+                counts[priority] += 1
+        return counts
+
+    def retry_after(self) -> int:
+        """Seconds until the calls queued ahead are likely done"""
+        call_seconds = self.average_seconds or DEFAULT_CALL_SECONDS
+        rounds = (self.waiting + self.running) / self.limit
+        return min(MAX_RETRY_AFTER, max(MIN_RETRY_AFTER, math.ceil(call_seconds * rounds)))
+
+    def _queue_full(self, priority: str) -> bool:
+        if _unbounded_wait.get():
+            return False
+        if priority == PRIORITY_BULK:
+            return self.waiting_by_priority()[PRIORITY_BULK] >= self.queue_size * BULK_QUEUE_SHARE
+        return self.waiting >= self.queue_size
+
+    def _finish_tag(self, priority: str) -> float:
+        """Virtual finish time of a new call of the current client, advancing its flow"""
+        flow = (current_client(), priority)
+        finish = max(self._virtual_time, self._flow_tags.get(flow, 0.0)) + 1 / PRIORITY_WEIGHTS[priority]
+        self._flow_tags[flow] = finish
+        # Flows whose last call is already behind the virtual time carry no state worth keeping
+        if len(self._flow_tags) > 1024:
+            self._flow_tags = {key: tag for key, tag in self._flow_tags.items() if tag > self._virtual_time}
+        return finish
+
+    async def acquire(self):
+        """Take a slot, waiting in the queue if all are in use; raises EngineBusyError when the queue is full"""
+        priority = current_priority()
+        if self.running < self.limit and not self.waiting:
+            self._virtual_time = self._finish_tag(priority)
+            self.running += 1
+            return
+        if self._queue_full(priority):
+            self.rejected += 1
+            ADMISSION_REJECTED.inc(engine=self.engine, priority=priority)
+            raise EngineBusyError(self.engine, self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (self._finish_tag(priority), next(self._arrivals), waiter, priority))
+        try:
+            # release() hands its slot over, so running is not touched here
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                # Left in the heap; release() skips it
+                waiter.cancel()
+            raise
+
+    def release(self):
+        """Hand the slot to the waiting call with the smallest finish tag, or free it"""
+        while self._waiters:
+            finish_tag, _, waiter, _ = heapq.heappop(self._waiters)
+            if not waiter.done():
+                self._virtual_time = finish_tag
+                waiter.set_result(None)
+                return
+        self.running -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of the engine's slots for the duration of a call"""
+        await self.acquire()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if self.average_seconds is None:
+                self.average_seconds = elapsed
+            else:
+                self.average_seconds += DURATION_SMOOTHING * (elapsed - self.average_seconds)
+            self.release()
+
+    def status(self) -> Dict[str, object]:
+        return {
+            "limit": self.limit,
+            "queue_size": self.queue_size,
+            "running": self.running,
+            "waiting": self.waiting,
+            "waiting_by_priority": self.waiting_by_priority(),
+            "rejected": self.rejected,
+        }
+
+
+class AdmissionController:
+    """Creates each engine's admission state on first use, from its environment limits"""
+
+    def __init__(self, enabled: bool = ADMISSION_CONTROL):
+        self.enabled = enabled
+        self._engines: Dict[str, EngineAdmission] = {}
+
+    def engine(self, engine: str, default_limit: int) -> EngineAdmission:
+        admission = self._engines.get(engine)
+        if admission is None:
+            prefix = f"ADMISSION_{engine.upper()}"
+            limit = _env_int(f"{prefix}_LIMIT", default_limit) or default_limit
+            queue_size = _env_int(f"{prefix}_QUEUE", limit * DEFAULT_QUEUE_FACTOR)
+            admission = EngineAdmission(engine, limit, queue_size)
+            self._engines[engine] = admission
+        return admission
+
+    def status(self) -> Dict[str, Dict[str, object]]:
+        return {engine: admission.status() for engine, admission in self._engines.items()}
+
+
+# Shared controller used by the executor service
+admission_controller = AdmissionController()
@@ -0,0 +1,321 @@
+"""
+Conversion Cache Service Module
+
+This module provides a content-addressed cache for conversion results, so
+identical uploads (templates, letterheads, re-uploaded invoices) are served
+from disk instead of being converted again.
+
+Cache keys are the SHA-256 of:
+1. The conversion name (e.g. "convert_pdf_to_excel")
+2. The content hash of every file argument
+3. Every other argument (quality, watermark options, ...)
+
+Results are stored under TEMP_DIR/cache and evicted least-recently-used first
+once the cache grows past its size limit. Hit/miss metadata can optionally be
+recorded in MongoDB.
+
+Configuration (environment variables):
+- CONVERSION_CACHE_ENABLED: turn the cache on or off (default: on)
+- CONVERSION_CACHE_MAX_MB: maximum size of cached results on disk
+- CONVERSION_CACHE_METADATA: record cache entries in MongoDB (default: off)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONVERSION_CACHE_ENABLED = os.getenv("CONVERSION_CACHE_ENABLED", "true").strip().lower() in ("1", "true", "yes", "on")
+CONVERSION_CACHE_MAX_MB = int(os.getenv("CONVERSION_CACHE_MAX_MB", "1024"))
+CONVERSION_CACHE_METADATA = os.getenv("CONVERSION_CACHE_METADATA", "false").strip().lower() in ("1", "true", "yes", "on")
+
+# Bump to invalidate every cached result, e.g. after a converter upgrade
+CACHE_KEY_VERSION = "1"
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Hashes computed while uploads were written: (path, size, mtime_ns) -> sha256
+KNOWN_HASHES_LIMIT = 10000
+_known_hashes: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_known_hashes_lock = threading.Lock()
+
+
+def _file_identity(path: Path) -> Tuple[str, int, int]:
+    stat = path.stat()
+    return (str(path), stat.st_size, stat.st_mtime_ns)
+
+
+def remember_file_hash(path: Path, digest: str):
+    """Record a hash computed elsewhere (e.g. during upload) so hash_file can skip the read"""
+    identity = _file_identity(path)
+    with _known_hashes_lock:
+        _known_hashes[identity] = digest
+        while len(_known_hashes) > KNOWN_HASHES_LIMIT:
+            _known_hashes.popitem(last=False)
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 of a file's content, read in chunks"""
+    identity = _file_identity(path)
+    with _known_hashes_lock:
+        known = _known_hashes.get(identity)
+    if known is not None:
+        return known
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link_or_copy(source: Path, destination: Path):
+    """Hard-link source to destination, copying when linking is not possible"""
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+class ConversionCache:
+    """
+    Size-bounded, content-addressed store of conversion results.
+
+    Entries are files named by their cache key. Lookups hand out a hard link
+    (or copy) in the caller's output directory, so eviction never removes a
+    file that is still being sent to a client.
+
+    The LRU index is kept per process; entries written by other workers are
+    picked up the next time the index is rebuilt from disk.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: int = CONVERSION_CACHE_MAX_MB * 1024 * 1024,
+        enabled: bool = CONVERSION_CACHE_ENABLED,
+        metadata_collection=None
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled and max_bytes > 0
+        self.metadata_collection = metadata_collection
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[Path, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    # ----- key computation -----
+
+    def make_key(self, conversion: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+        """Build the cache key for a conversion call (hashes every file argument)"""
+        def normalize(value: Any) -> Any:
+            if isinstance(value, Path):
+                return {"file_sha256": hash_file(value)}
+            if isinstance(value, (list, tuple)):
+                return [normalize(item) for item in value]
+            if isinstance(value, dict):
+                return {str(k): normalize(v) for k, v in value.items()}
+            return value
+
+        material = {
+            "version": CACHE_KEY_VERSION,
+            "conversion": conversion,
+            "args": normalize(list(args)),
+            "kwargs": normalize(kwargs),
+        }
+        encoded = json.dumps(material, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    # ----- blocking disk operations -----
+
+    def _load_index(self):
+        """Build the LRU index from the files on disk, oldest access first"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for path in self.cache_dir.iterdir():
+            if not path.is_file() or path.name.startswith("."):
+                continue
+            stat = path.stat()
+            entries.append((stat.st_mtime, path.stem, path, stat.st_size))
+        entries.sort()
+
+        self._entries.clear()
+        self._total_bytes = 0
+        for _, key, path, size in entries:
+            self._entries[key] = (path, size)
+            self._total_bytes += size
+        self._loaded = True
+
+    def get(self, key: str, output_dir: Path) -> Optional[Path]:
+        """Return a private copy of the cached result for key, or None"""
+        with self._lock:
+            if not self._loaded:
+                self._load_index()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            cached_path, _ = entry
+            output_path = output_dir / f"{uuid.uuid4()}{cached_path.suffix}"
+            try:
+                _link_or_copy(cached_path, output_path)
+                # mtime doubles as the last-access time used to rebuild the LRU order
+                os.utime(cached_path)
+            except OSError:
+                # Removed behind our back (another worker evicted it)
+                self._forget(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return output_path
+
+    def put(self, key: str, output_path: Path) -> List[str]:
+        """Store a conversion result under key.
+
+        Returns:
+            Keys evicted to make room for the new entry
+        """
+        size = output_path.stat().st_size
+        if size == 0 or size > self.max_bytes:
+            return []
+
+        with self._lock:
+            if not self._loaded:
+                self._load_index()
+            if key in self._entries:
+                return []
+
+            cached_path = self.cache_dir / f"{key}{output_path.suffix}"
+            # Write under a temporary name so readers never see a partial file
+            partial_path = self.cache_dir / f".{key}.{uuid.uuid4().hex}"
+            _link_or_copy(output_path, partial_path)
+            os.replace(partial_path, cached_path)
+
+            self._entries[key] = (cached_path, size)
+            self._total_bytes += size
+            return self._evict()
+
+    def _forget(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry[1]
+
+    def _evict(self) -> List[str]:
+        """Drop least-recently-used entries until the cache fits its size limit"""
+        evicted = []
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, (path, size) = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            path.unlink(missing_ok=True)
+            evicted.append(key)
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} cached conversion results")
+        return evicted
+
+    def clear(self):
+        """Remove every cached result"""
+        with self._lock:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            self._entries.clear()
+            self._total_bytes = 0
+            self._loaded = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Summary of cache state for diagnostics"""
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "size_bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    # ----- async API used by the routes -----
+
+    async def lookup(
+        self,
+        conversion: str,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        output_dir: Path
+    ) -> Tuple[Optional[str], Optional[Path]]:
+        """Look up a conversion call.
+
+        Returns:
+            Tuple of (cache key, path to a copy of the cached result). The key is
+            None when the cache is disabled; the path is None on a miss.
+        """
+        if not self.enabled:
+            return None, None
+        try:
+            key = await asyncio.to_thread(self.make_key, conversion, args, kwargs)
+            cached_path = await asyncio.to_thread(self.get, key, output_dir)
+        except Exception as e:
+            logger.warning(f"Conversion cache lookup failed: {e}")
+            return None, None
+
+        if cached_path is not None:
+            await self._record_hit(key)
+        return key, cached_path
+
+    async def store(self, key: Optional[str], conversion: str, output_path: Any):
+        """Store a conversion result returned by a converter (ignored unless it is a file)"""
+        if key is None or not isinstance(output_path, Path) or not output_path.is_file():
+            return
+        try:
+            evicted = await asyncio.to_thread(self.put, key, output_path)
+        except Exception as e:
+            logger.warning(f"Conversion cache store failed: {e}")
+            return
+        await self._record_store(key, conversion, output_path, evicted)
+
+    # ----- optional MongoDB metadata -----
+
+    async def _record_hit(self, key: str):
+        if self.metadata_collection is None:
+            return
+        try:
+            await self.metadata_collection.update_one(
+                {"key": key},
+                {"$inc": {"hits": 1}, "$set": {"last_hit_at": datetime.now(timezone.utc)}}
+            )
+        except Exception as e:
+            logger.warning(f"Failed to record cache hit: {e}")
+
+    async def _record_store(self, key: str, conversion: str, output_path: Path, evicted: List[str]):
+        if self.metadata_collection is None:
+            return
+        try:
+            await self.metadata_collection.update_one(
+                {"key": key},
+                {
+                    "$set": {
+                        "conversion": conversion,
+                        "size": output_path.stat().st_size,
+                        "created_at": datetime.now(timezone.utc),
+                    },
+                    "$setOnInsert": {"hits": 0},
+                },
+                upsert=True
+            )
+            if evicted:
+                await self.metadata_collection.delete_many({"key": {"$in": evicted}})
+        except Exception as e:
+            logger.warning(f"Failed to record cache entry: {e}")
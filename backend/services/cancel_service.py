@@ -0,0 +1,283 @@
+"""
+Cancellation Service Module
+
+Stops conversions nobody is waiting for any more, instead of letting them
+burn CPU for minutes and leave an orphaned output in TEMP_DIR:
+
+1. CancelOnDisconnectMiddleware cancels a request's handler when the client
+   disconnects (closed tab) before the response has started
+2. The cancelled await in ExecutorManager.run calls cancel_call(), which
+   reaches the engine call in its worker:
+   - thread pools (office, ocr, zip): the callbacks the call registered with
+     on_cancel() run, e.g. killing its soffice process group
+   - process pools (pdf, image, ...): the workers get SIGUSR1; the one
+     running the call kills its child processes (pdftoppm, tesseract) and
+     raises CallCancelledError into the running Python code
+3. run_cancellable(), which wraps every engine call in its worker, deletes
+   the temp files the cancelled call created. Outputs of calls that finish
+   anyway (pure C code cannot be interrupted) are deleted by the executor
+   when they arrive.
+
+Background jobs are cancelled the same way through DELETE /api/jobs/{id}.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from services.metrics_service import metrics
+from services.temp_service import TEMP_DIR, CANCELLED_DIR_NAME, collect_temp_paths, remove_path
+
+logger = logging.getLogger(__name__)
+
+# Signal telling process pool workers to check for a cancelled call
+CANCEL_SIGNAL = getattr(signal, "SIGUSR1", None)
+
+# Marker files naming cancelled calls, visible to process pool workers
+CANCELLED_DIR = TEMP_DIR / CANCELLED_DIR_NAME
+
+# Status reported for requests whose client went away (nginx's convention)
+CLIENT_CLOSED_REQUEST = 499
+
+REQUESTS_CANCELLED = metrics.counter(
+    "filelab_requests_cancelled_total", "Requests cancelled because the client disconnected"
+)
+
+
+class CallCancelledError(BaseException):
+    """Raised inside an engine call that was cancelled.
+
+    A BaseException, like KeyboardInterrupt, so the converters' generic
+    `except Exception` fallbacks do not swallow it and start the next
+    strategy.
+    """
+
+
+# Call running in the current worker thread
+_local = threading.local()
+
+# Reentrant: a worker's signal handler may interrupt code holding the lock
+_lock = threading.RLock()
+_callbacks: Dict[str, List[Callable[[], None]]] = {}
+_cancelled: Set[str] = set()
+
+
+def current_call_id() -> Optional[str]:
+    return getattr(_local, "call_id", None)
+
+
+def call_cancelled() -> bool:
+    """Whether the engine call running in this thread has been cancelled"""
+    call_id = current_call_id()
+    if call_id is None:
+        return False
+    return call_id in _cancelled or (CANCELLED_DIR / call_id).exists()
+
+
+@contextmanager
+def bind_call(call_id: Optional[str]) -> Iterator[None]:
+    """Run the block as part of engine call call_id (in a helper thread the call started)"""
+    previous = current_call_id()
+    _local.call_id = call_id
+    try:
+        yield
+    finally:
+        _local.call_id = previous
+
+
+def raise_if_cancelled():
+    """Checkpoint for long engine functions, e.g. before starting a fallback strategy"""
+    if call_cancelled():
+        raise CallCancelledError(f"Engine call {current_call_id()} was cancelled")
+
+
+@contextmanager
+def on_cancel(callback: Callable[[], None]) -> Iterator[None]:
+    """Run callback if the current engine call is cancelled while the block runs.
+
+    Used to kill subprocesses (callback runs on another thread or in a
+    signal handler). Runs it at once if the call was cancelled already.
+    """
+    call_id = current_call_id()
+    if call_id is None:
+        yield
+        return
+    with _lock:
+        _callbacks.setdefault(call_id, []).append(callback)
+    try:
+        if call_cancelled():
+            callback()
+        yield
+    finally:
+        with _lock:
+            callbacks = _callbacks.get(call_id, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+            if not callbacks:
+                _callbacks.pop(call_id, None)
+
+
+def _run_callbacks(call_id: str):
+    with _lock:
+        callbacks = list(_callbacks.get(call_id, []))
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            logger.warning(f"Cancel callback of engine call {call_id} failed: {e}")
+
+
+# ============== Worker Side ==============
+
+def run_cancellable(call_id: str, func: Callable, *args, **kwargs):
+    """Run an engine call so it can be cancelled (executed in the worker).
+
+    When the call is cancelled, whatever it raised becomes CallCancelledError
+    and the temp files it created are deleted.
+    """
+    _local.call_id = call_id
+    try:
+        with collect_temp_paths() as created_paths:
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                if not call_cancelled():
+                    raise
+                for path in created_paths:
+                    remove_path(path)
+                raise CallCancelledError(f"Engine call {call_id} was cancelled")
+    finally:
+        _local.call_id = None
+
+
+def descendant_pids(pid: int) -> List[int]:
+    """Every process below pid, read from /proc (empty where there is none)"""
+    children: Dict[int, List[int]] = {}
+    for stat_path in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            # The command name may contain spaces; state and ppid follow its closing parenthesis
+            fields = stat_path.read_text().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        children.setdefault(int(fields[1]), []).append(int(stat_path.parent.name))
+
+    descendants = []
+    pending = list(children.get(pid, []))
+    while pending:
+        child = pending.pop()
+        descendants.append(child)
+        pending.extend(children.get(child, []))
+    return descendants
+
+
+def _handle_cancel_signal(signum, frame):
+    call_id = current_call_id()
+    if call_id is None or not (CANCELLED_DIR / call_id).exists():
+        # Another call of this pool was cancelled; interrupted system calls are retried
+        return
+    _run_callbacks(call_id)
+    for pid in descendant_pids(os.getpid()):
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+    raise CallCancelledError(f"Engine call {call_id} was cancelled")
+
+
+def install_cancel_handler():
+    """Process pool initializer: handle cancel signals instead of dying from them"""
+    if CANCEL_SIGNAL is not None:
+        signal.signal(CANCEL_SIGNAL, _handle_cancel_signal)
+
+
+# ============== Server Side ==============
+
+def cancel_call(call_id: str, worker_pids: Iterable[int] = ()):
+    """Cancel an engine call running on a thread pool of this process or in one of worker_pids"""
+    with _lock:
+        _cancelled.add(call_id)
+    _run_callbacks(call_id)
+
+    worker_pids = list(worker_pids)
+    if worker_pids and CANCEL_SIGNAL is not None:
+        CANCELLED_DIR.mkdir(parents=True, exist_ok=True)
+        (CANCELLED_DIR / call_id).touch()
+        for pid in worker_pids:
+            try:
+                os.kill(pid, CANCEL_SIGNAL)
+            except (ProcessLookupError, PermissionError):
+                pass
+
+
+def forget_call(call_id: str):
+    """Drop the cancellation state of a call that has ended"""
+    with _lock:
+        _cancelled.discard(call_id)
+    (CANCELLED_DIR / call_id).unlink(missing_ok=True)
+
+
+class CancelOnDisconnectMiddleware:
+    """
+    ASGI middleware that cancels a request's handler when the client
+    disconnects after sending its body and before the response starts.
+
+    Cancellation propagates into the awaited engine call (see cancel_call);
+    the request is then answered with 499, which the server drops but the
+    outer middlewares record.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        body_received = asyncio.Event()
+        disconnect_message = None
+        response_started = False
+
+        async def receive_request():
+            if disconnect_message is not None:
+                return disconnect_message
+            message = await receive()
+            if message["type"] == "http.request" and not message.get("more_body", False):
+                body_received.set()
+            return message
+
+        async def send_response(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                # The response may listen for disconnects itself from here on
+                watcher.cancel()
+            await send(message)
+
+        handler = asyncio.create_task(self.app(scope, receive_request, send_response))
+
+        async def watch_for_disconnect():
+            nonlocal disconnect_message
+            await body_received.wait()
+            message = await receive()
+            if message["type"] == "http.disconnect" and not response_started:
+                disconnect_message = message
+                handler.cancel()
+
+        watcher = asyncio.create_task(watch_for_disconnect())
+        try:
+            await handler
+        except asyncio.CancelledError:
+            if disconnect_message is None:
+                raise
+            REQUESTS_CANCELLED.inc()
+            logger.info(f"Client disconnected, cancelled {scope['method']} {scope['path']}")
+            await send({"type": "http.response.start", "status": CLIENT_CLOSED_REQUEST, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            watcher.cancel()
@@ -0,0 +1,289 @@
+"""
+Executor Service Module
+
+This module provides the dispatch layer that runs blocking conversion engines
+off the asyncio event loop. Each engine is bound to its own executor pool:
+
+1. Thread pools for I/O- and subprocess-bound engines (LibreOffice, Tesseract, ZIP)
+2. Process pools for CPU-bound engines (pypdf, pdfplumber, PIL, reportlab)
+
+Pool type and size can be configured per engine through environment variables:
+- EXECUTOR_<ENGINE>_WORKERS: number of workers for the engine pool
+- EXECUTOR_<ENGINE>_MODE: "thread" or "process"
+- EXECUTOR_DISABLE_PROCESS_POOLS: force every engine onto a thread pool
+- EXECUTOR_START_METHOD: multiprocessing start method for process pools
+
+Calls are admitted to a pool through services/admission_service.py, which
+caps the calls waiting per engine and rejects the rest with 429. A call
+whose caller is cancelled (client disconnect, cancelled job) is stopped in
+its worker through services/cancel_service.py. Process pool calls run under
+the per-call resource limits of services/limits_service.py, and every call
+reports its CPU time and peak memory.
+"""
+
+import asyncio
+import contextlib
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+from services.admission_service import admission_controller
+from services.cancel_service import cancel_call, forget_call, install_cancel_handler, run_cancellable
+from services.limits_service import (
+    engine_limits,
+    install_limit_handler,
+    run_limited,
+    run_measured,
+    ResourceLimitError,
+    RESOURCE_LIMIT_EXCEEDED,
+)
+from services.metrics_service import (
+    ENGINE_CALLS,
+    ENGINE_DURATION,
+    ENGINE_IN_FLIGHT,
+    ENGINE_QUEUE_WAIT,
+    SUBPROCESS_EVENT,
+    observe_worker_subprocesses,
+)
+from services.profiling_service import next_profile_path, run_profiled
+from services.temp_service import remove_path
+from services.timing_service import merge_timings, record, run_instrumented
+
+logger = logging.getLogger(__name__)
+
+# Pool kinds
+POOL_THREAD = "thread"
+POOL_PROCESS = "process"
+
+# Engine names
+ENGINE_OFFICE = "office"        # LibreOffice / python-docx based conversions
+ENGINE_PDF = "pdf"              # pypdf, pdfplumber, pdf2docx, pdf2image, reportlab
+ENGINE_IMAGE = "image"          # PIL based image conversions and resizing
+ENGINE_OCR = "ocr"              # Tesseract OCR and language detection
+ENGINE_WATERMARK = "watermark"  # Watermark rendering (reportlab + pypdf)
+ENGINE_SEARCH = "search"        # Full-text PDF search
+ENGINE_ZIP = "zip"              # ZIP compression and extraction
+
+_CPU_COUNT = os.cpu_count() or 2
+
+# Warm LibreOffice workers (services/libreoffice_service.py). Office calls beyond
+# them would only wait for a free worker while holding an admission slot.
+_LIBREOFFICE_POOL_SIZE = int(os.getenv("LIBREOFFICE_POOL_SIZE", "2"))
+
+# Default pool kind and size for every engine
+DEFAULT_ENGINE_POOLS: Dict[str, Tuple[str, int]] = {
+    ENGINE_OFFICE: (POOL_THREAD, _LIBREOFFICE_POOL_SIZE if _LIBREOFFICE_POOL_SIZE > 0 else max(2, _CPU_COUNT)),
+    ENGINE_PDF: (POOL_PROCESS, _CPU_COUNT),
+    ENGINE_IMAGE: (POOL_PROCESS, _CPU_COUNT),
+    ENGINE_OCR: (POOL_THREAD, 2),
+    ENGINE_WATERMARK: (POOL_PROCESS, max(1, _CPU_COUNT // 2)),
+    ENGINE_SEARCH: (POOL_PROCESS, max(1, _CPU_COUNT // 2)),
+    ENGINE_ZIP: (POOL_THREAD, 4),
+}
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    """Read a boolean flag from the environment."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_engine_pool_config(engine: str) -> Tuple[str, int]:
+    """Get the (pool kind, worker count) configured for an engine.
+
+    Args:
+        engine: Engine name (e.g. "office", "pdf")
+
+    Returns:
+        Tuple of pool kind ("thread" or "process") and worker count
+    """
+    default_kind, default_workers = DEFAULT_ENGINE_POOLS.get(engine, (POOL_THREAD, 2))
+    prefix = f"EXECUTOR_{engine.upper()}"
+
+    kind = os.getenv(f"{prefix}_MODE", default_kind).strip().lower()
+    if kind not in (POOL_THREAD, POOL_PROCESS):
+        logger.warning(f"Invalid {prefix}_MODE '{kind}', using '{default_kind}'")
+        kind = default_kind
+    if kind == POOL_PROCESS and _env_flag("EXECUTOR_DISABLE_PROCESS_POOLS"):
+        kind = POOL_THREAD
+
+    try:
+        workers = int(os.getenv(f"{prefix}_WORKERS", default_workers))
+    except ValueError:
+        logger.warning(f"Invalid {prefix}_WORKERS value, using {default_workers}")
+        workers = default_workers
+
+    return kind, max(1, workers)
+
+
+def engine_call_limit(engine: str) -> int:
+    """Calls the engine runs at once: its admission limit, or its pool's workers without admission control.
+
+    Callers fanning out over many files keep to this many calls at a time,
+    so they do not fill the engine's wait queue on their own.
+    """
+    workers = get_engine_pool_config(engine)[1]
+    if not admission_controller.enabled:
+        return workers
+    return admission_controller.engine(engine, workers).limit
+
+
+class ExecutorManager:
+    """
+    Owns one executor pool per engine.
+
+    Pools are created lazily on first use so that engines which are never
+    called by a worker do not spawn threads or processes.
+    """
+
+    def __init__(self):
+        self._executors: Dict[str, Executor] = {}
+        self._lock = threading.Lock()
+
+    def get_executor(self, engine: str) -> Executor:
+        """Get (creating if needed) the executor for an engine."""
+        executor = self._executors.get(engine)
+        if executor is not None:
+            return executor
+
+        with self._lock:
+            executor = self._executors.get(engine)
+            if executor is None:
+                executor = self._create_executor(engine)
+                self._executors[engine] = executor
+            return executor
+
+    def _create_executor(self, engine: str) -> Executor:
+        kind, workers = get_engine_pool_config(engine)
+        logger.info(f"Creating {kind} pool for engine '{engine}' with {workers} workers")
+
+        if kind == POOL_PROCESS:
+            start_method = os.getenv("EXECUTOR_START_METHOD")
+            mp_context = multiprocessing.get_context(start_method) if start_method else None
+            return ProcessPoolExecutor(
+                max_workers=workers, mp_context=mp_context, initializer=_initialize_worker
+            )
+
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"engine-{engine}")
+
+    async def run(self, engine: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking engine function on the engine's pool and await the result.
+
+        Functions dispatched to process pools must be picklable, i.e. defined at
+        module level, and take picklable arguments.
+
+        Measurements the function records (engine_used, ...) are merged into
+        the caller's timing context together with conversion_ms, queue_ms
+        and output_size. Calls made for a profiled request run under cProfile.
+        When the caller is cancelled, the call is cancelled in its worker too.
+        """
+        loop = asyncio.get_running_loop()
+        function = getattr(func, "__name__", "unknown")
+        # Process pool workers can be held to per-call rlimits; threads share the API process
+        if get_engine_pool_config(engine)[0] == POOL_PROCESS:
+            func = functools.partial(run_limited, engine_limits(engine), func)
+        else:
+            func = functools.partial(run_measured, func)
+        profile_path = next_profile_path(function)
+        if profile_path is not None:
+            call = functools.partial(run_profiled, str(profile_path), func, *args, **kwargs)
+        else:
+            call = functools.partial(run_instrumented, func, *args, **kwargs)
+        call_id = uuid.uuid4().hex
+        submitted = time.perf_counter()
+        ENGINE_IN_FLIGHT.inc(engine=engine)
+        try:
+            async with self._admit(engine):
+                executor = self.get_executor(engine)
+                future = executor.submit(run_cancellable, call_id, call)
+                try:
+                    result, timings = await asyncio.wrap_future(future, loop=loop)
+                except asyncio.CancelledError:
+                    self._cancel(executor, future, call_id)
+                    raise
+        except asyncio.CancelledError:
+            ENGINE_CALLS.inc(engine=engine, function=function, status="cancelled")
+            raise
+        except Exception as e:
+            ENGINE_CALLS.inc(engine=engine, function=function, status="error")
+            if isinstance(e, ResourceLimitError):
+                RESOURCE_LIMIT_EXCEEDED.inc(engine=engine, resource=e.resource)
+            observe_worker_subprocesses(getattr(e, "worker_timings", {}).get(SUBPROCESS_EVENT))
+            raise
+        finally:
+            ENGINE_IN_FLIGHT.dec(engine=engine)
+        elapsed_ms = (time.perf_counter() - submitted) * 1000
+        # Time spent waiting for an admission slot and a free worker (plus pickling for process pools)
+        queue_ms = max(0.0, elapsed_ms - timings["conversion_ms"])
+
+        ENGINE_CALLS.inc(engine=engine, function=function, status="success")
+        ENGINE_DURATION.observe(timings["conversion_ms"] / 1000, engine=engine, function=function)
+        ENGINE_QUEUE_WAIT.observe(queue_ms / 1000, engine=engine)
+        observe_worker_subprocesses(timings.get(SUBPROCESS_EVENT))
+
+        # Converters without fallbacks do not name an engine; report the pool's
+        timings.setdefault("engine_used", engine)
+        merge_timings(timings)
+        record("queue_ms", round(queue_ms, 1))
+        return result
+
+    def _admit(self, engine: str):
+        """Admission slot for a call; raises EngineBusyError (429) when the engine's queue is full"""
+        if not admission_controller.enabled:
+            return contextlib.nullcontext()
+        return admission_controller.engine(engine, get_engine_pool_config(engine)[1]).slot()
+
+    def _cancel(self, executor: Executor, future: Future, call_id: str):
+        """Stop a call whose caller has gone; its output is deleted if it still arrives"""
+        if future.cancel():
+            return
+        # ProcessPoolExecutor keeps its worker processes by pid; thread pools have none
+        worker_pids = list(getattr(executor, "_processes", None) or {})
+        cancel_call(call_id, worker_pids)
+        future.add_done_callback(functools.partial(_discard_cancelled_result, call_id))
+
+    def shutdown(self, wait: bool = True):
+        """Shut down every engine pool."""
+        with self._lock:
+            executors = list(self._executors.items())
+            self._executors.clear()
+
+        for engine, executor in executors:
+            logger.info(f"Shutting down pool for engine '{engine}'")
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def _initialize_worker():
+    """Process pool initializer: handle the cancel and CPU time limit signals"""
+    install_cancel_handler()
+    install_limit_handler()
+
+
+def _discard_cancelled_result(call_id: str, future: Future):
+    """Done callback of a cancelled call: forget it and delete the output nobody will collect"""
+    forget_call(call_id)
+    if future.cancelled() or future.exception() is not None:
+        return
+    result, _ = future.result()
+    outputs = result if isinstance(result, (list, tuple)) else [result]
+    for output in outputs:
+        if isinstance(output, Path):
+            remove_path(output)
+
+
+# Shared manager used by the API server
+executor_manager = ExecutorManager()
+
+
+async def run_engine(engine: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking conversion function on the pool configured for the engine."""
+    return await executor_manager.run(engine, func, *args, **kwargs)
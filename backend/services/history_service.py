@@ -0,0 +1,587 @@
+"""
+History Service Module
+
+This module provides a buffered writer for conversion history records, so
+routes never wait on MongoDB:
+
+1. Routes enqueue history documents on a bounded in-memory queue
+2. A background task flushes them with insert_many once a batch is full or
+   the flush interval has passed
+3. When the queue is full, producers wait briefly (backpressure) and the
+   record is dropped with a warning if MongoDB still cannot keep up
+4. On shutdown every queued record is flushed before the client is closed
+
+It also owns the history collection layout: indexes for the filters the
+history API supports, a TTL index for retention, migration of legacy ISO
+string timestamps to native dates, and cursor-based pagination helpers.
+
+Statistics are kept as hourly rollup documents (one per hour and
+conversion_type/source_format/target_format) that the writer updates with
+$inc after every flushed batch. Each rollup holds counts and a fixed-bucket
+latency histogram, so /history/stats merges a few small documents instead
+of scanning the history collection, and percentiles can be estimated for
+any range.
+
+Configuration (environment variables):
+- HISTORY_BATCH_SIZE: maximum documents per insert_many
+- HISTORY_FLUSH_INTERVAL_SECONDS: maximum time a record waits in the buffer
+- HISTORY_QUEUE_SIZE: maximum number of buffered records
+- HISTORY_ENQUEUE_TIMEOUT_SECONDS: how long a route waits when the queue is full
+- HISTORY_RETENTION_DAYS: delete history older than this (0 keeps it forever)
+- HISTORY_STATS_RETENTION_DAYS: delete hourly rollups older than this (0 keeps them)
+"""
+
+import asyncio
+import base64
+import bisect
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+
+logger = logging.getLogger(__name__)
+
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "100"))
+HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL_SECONDS", "1.0"))
+HISTORY_QUEUE_SIZE = int(os.getenv("HISTORY_QUEUE_SIZE", "10000"))
+HISTORY_ENQUEUE_TIMEOUT = float(os.getenv("HISTORY_ENQUEUE_TIMEOUT_SECONDS", "0.05"))
+HISTORY_RETENTION_DAYS = float(os.getenv("HISTORY_RETENTION_DAYS", "90"))
+HISTORY_STATS_RETENTION_DAYS = float(os.getenv("HISTORY_STATS_RETENTION_DAYS", "400"))
+
+# Fields returned by the history API; everything else (errors, internals) stays in Mongo
+HISTORY_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "conversion_type": 1,
+    "source_format": 1,
+    "target_format": 1,
+    "filename": 1,
+    "timestamp": 1,
+    "status": 1,
+    "duration_ms": 1,
+    "input_size": 1,
+    "page_count": 1,
+    "upload_ms": 1,
+    "queue_ms": 1,
+    "conversion_ms": 1,
+    "output_size": 1,
+    "engine_used": 1,
+    "cpu_ms": 1,
+    "peak_memory_mb": 1,
+}
+
+HISTORY_TTL_INDEX_NAME = "timestamp_ttl"
+STATS_TTL_INDEX_NAME = "bucket_start_ttl"
+
+# Upper bounds (ms) of the rollup latency histogram; one extra open-ended bucket follows
+LATENCY_BUCKETS_MS = [
+    25, 50, 100, 250, 500, 750, 1000, 1500, 2000, 3000, 5000, 7500,
+    10000, 15000, 30000, 60000, 120000, 300000,
+]
+
+STATS_DIMENSIONS = ("conversion_type", "source_format", "target_format")
+STATS_BUCKETS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+# Refuse stats queries that would return more time buckets than this
+STATS_MAX_BUCKETS = 2000
+
+# Retry delay after a failed insert_many
+FLUSH_RETRY_DELAY = 1.0
+FLUSH_MAX_ATTEMPTS = 3
+# insert_many stamps _id on each document, so a retried record that already
+# reached MongoDB fails with this code instead of being written twice
+DUPLICATE_KEY_ERROR = 11000
+
+
+class HistoryWriter:
+    """
+    Buffers history documents and writes them to MongoDB in batches.
+
+    write() never touches MongoDB; it only waits when the buffer is full.
+    """
+
+    def __init__(
+        self,
+        collection,
+        stats_collection=None,
+        batch_size: int = HISTORY_BATCH_SIZE,
+        flush_interval: float = HISTORY_FLUSH_INTERVAL,
+        max_queue: int = HISTORY_QUEUE_SIZE,
+        enqueue_timeout: float = HISTORY_ENQUEUE_TIMEOUT
+    ):
+        self.collection = collection
+        self.stats_collection = stats_collection
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.enqueue_timeout = enqueue_timeout
+        self.written = 0
+        self.dropped = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Records taken off the queue but not yet written
+        self._batch: List[Dict[str, Any]] = []
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        """Start the flush task on the running event loop"""
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+
+    async def write(self, doc: Dict[str, Any]) -> bool:
+        """Queue a history document.
+
+        Returns:
+            False if the document was dropped because the buffer stayed full
+        """
+        if self._queue is None:
+            # Not started (e.g. scripts importing the app): write directly
+            try:
+                await self.collection.insert_one(doc)
+                self.written += 1
+                await self._update_rollups([doc])
+                return True
+            except Exception as e:
+                logger.warning(f"Failed to save conversion history: {e}")
+                return False
+
+        try:
+            self._queue.put_nowait(doc)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        # Backpressure: give the flusher a moment before giving up on the record
+        try:
+            await asyncio.wait_for(self._queue.put(doc), timeout=self.enqueue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            self.dropped += 1
+            logger.warning(f"History buffer full, dropped record ({self.dropped} dropped so far)")
+            return False
+
+    async def _collect_batch(self):
+        """Wait for the first record, then collect until the batch is full or the interval ends"""
+        self._batch.append(await self._queue.get())
+        deadline = time.monotonic() + self.flush_interval
+        while len(self._batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                self._batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def _insert(self, docs: List[Dict[str, Any]], timeout: Optional[float] = None):
+        """Run one unordered insert_many.
+
+        Returns:
+            (written, failed, error): the records now stored, the records still
+            to write, and the exception raised (None on full success)
+        """
+        try:
+            await asyncio.wait_for(self.collection.insert_many(docs, ordered=False), timeout=timeout)
+            return docs, [], None
+        except BulkWriteError as e:
+            retry = {
+                error["index"] for error in e.details.get("writeErrors", [])
+                if error.get("code") != DUPLICATE_KEY_ERROR
+            }
+            # Duplicates were stored by an earlier attempt; nInserted covers the rest
+            written = [doc for index, doc in enumerate(docs) if index not in retry]
+            logger.debug(
+                f"Partial history insert: {e.details.get('nInserted', 0)} inserted, "
+                f"{len(written)} stored, {len(retry)} to retry"
+            )
+            return written, [docs[index] for index in sorted(retry)], e
+        except Exception as e:
+            # Unknown outcome; a retry reports stored records as duplicates
+            return [], docs, e
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        written: List[Dict[str, Any]] = []
+        pending = batch
+        for attempt in range(1, FLUSH_MAX_ATTEMPTS + 1):
+            stored, pending, error = await self._insert(pending)
+            written.extend(stored)
+            if not pending:
+                break
+            if attempt == FLUSH_MAX_ATTEMPTS:
+                self.dropped += len(pending)
+                logger.warning(f"Failed to save {len(pending)} history records: {error}")
+                break
+            await asyncio.sleep(FLUSH_RETRY_DELAY * attempt)
+        self.written += len(written)
+        await self._update_rollups(written)
+
+    async def _update_rollups(self, batch: List[Dict[str, Any]]):
+        """Fold a written batch into the hourly statistics rollups"""
+        if self.stats_collection is None:
+            return
+        operations = [
+            UpdateOne(dict(zip(("bucket_start",) + STATS_DIMENSIONS, key)), {"$inc": increments}, upsert=True)
+            for key, increments in rollup_increments(batch).items()
+        ]
+        if not operations:
+            return
+        try:
+            await self.stats_collection.bulk_write(operations, ordered=False)
+        except Exception as e:
+            logger.warning(f"Failed to update history rollups: {e}")
+
+    async def _run(self):
+        # On cancellation self._batch keeps its records for shutdown() to flush
+        while True:
+            await self._collect_batch()
+            await self._flush(self._batch)
+            self._batch = []
+
+    async def shutdown(self, timeout: float = 10.0):
+        """Stop the flush task and write every buffered record"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+        remaining = self._batch
+        self._batch = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        self._queue = None
+
+        for start in range(0, len(remaining), self.batch_size):
+            batch = remaining[start:start + self.batch_size]
+            written, failed, error = await self._insert(batch, timeout=timeout)
+            self.written += len(written)
+            if failed:
+                self.dropped += len(failed)
+                logger.warning(f"Failed to flush {len(failed)} history records on shutdown: {error}")
+            await self._update_rollups(written)
+
+    def status(self) -> Dict[str, Any]:
+        """Summary of writer state for diagnostics"""
+        return {
+            "pending": self.pending,
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+
+# ============== Collection Layout ==============
+
+async def ensure_history_indexes(collection, retention_days: float = HISTORY_RETENTION_DAYS):
+    """Create the indexes used by the history API and the retention TTL index"""
+    # Newest-first listing; id breaks ties between equal timestamps for cursors
+    await collection.create_index([("timestamp", DESCENDING), ("id", DESCENDING)], name="timestamp_id")
+    await collection.create_index(
+        [("conversion_type", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)],
+        name="type_timestamp"
+    )
+    await collection.create_index(
+        [("status", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)],
+        name="status_timestamp"
+    )
+    await collection.create_index(
+        [("source_format", ASCENDING), ("target_format", ASCENDING), ("timestamp", DESCENDING)],
+        name="formats_timestamp"
+    )
+
+    if retention_days <= 0:
+        try:
+            await collection.drop_index(HISTORY_TTL_INDEX_NAME)
+        except OperationFailure:
+            pass
+        return
+
+    expire_after = int(retention_days * 86400)
+    try:
+        await collection.create_index(
+            [("timestamp", ASCENDING)],
+            name=HISTORY_TTL_INDEX_NAME,
+            expireAfterSeconds=expire_after
+        )
+    except OperationFailure:
+        # The TTL index exists with another retention; update it in place
+        await collection.database.command(
+            "collMod",
+            collection.name,
+            index={"name": HISTORY_TTL_INDEX_NAME, "expireAfterSeconds": expire_after}
+        )
+
+
+async def migrate_string_timestamps(collection) -> int:
+    """Convert legacy ISO string timestamps to native dates (needed for sorting and TTL).
+
+    Returns:
+        Number of migrated documents
+    """
+    result = await collection.update_many(
+        {"timestamp": {"$type": "string"}},
+        [{"$set": {"timestamp": {"$toDate": "$timestamp"}}}]
+    )
+    return result.modified_count
+
+
+# ============== Pagination ==============
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(doc: Dict[str, Any]) -> str:
+    """Opaque cursor pointing just past doc in newest-first order"""
+    timestamp = doc["timestamp"]
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    raw = f"{timestamp.isoformat()}|{doc['id']}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        timestamp, doc_id = raw.split("|", 1)
+        return datetime.fromisoformat(timestamp), doc_id
+    except Exception:
+        raise InvalidCursorError("Invalid history cursor")
+
+
+def build_history_query(
+    conversion_type: Optional[str] = None,
+    source_format: Optional[str] = None,
+    target_format: Optional[str] = None,
+    status: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build the MongoDB filter for a history page"""
+    query: Dict[str, Any] = {}
+    if conversion_type:
+        query["conversion_type"] = conversion_type
+    if source_format:
+        query["source_format"] = source_format.lower()
+    if target_format:
+        query["target_format"] = target_format.lower()
+    if status:
+        query["status"] = status
+
+    timestamp_range: Dict[str, Any] = {}
+    if start is not None:
+        timestamp_range["$gte"] = start
+    if end is not None:
+        timestamp_range["$lt"] = end
+    if timestamp_range:
+        query["timestamp"] = timestamp_range
+
+    if cursor:
+        cursor_timestamp, cursor_id = decode_cursor(cursor)
+        query["$or"] = [
+            {"timestamp": {"$lt": cursor_timestamp}},
+            {"timestamp": cursor_timestamp, "id": {"$lt": cursor_id}},
+        ]
+    return query
+
+
+# ============== Statistics Rollups ==============
+
+def _as_utc(timestamp: datetime) -> datetime:
+    # MongoDB returns naive datetimes in UTC
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc)
+
+
+def _truncate(timestamp: datetime, bucket: timedelta) -> datetime:
+    timestamp = _as_utc(timestamp)
+    if bucket >= timedelta(days=1):
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def latency_bucket(duration_ms: float) -> int:
+    """Index of the histogram bucket a latency falls into"""
+    return bisect.bisect_left(LATENCY_BUCKETS_MS, duration_ms)
+
+
+def rollup_increments(docs: List[Dict[str, Any]]) -> Dict[Tuple[Any, ...], Dict[str, Any]]:
+    """Group history documents into $inc updates keyed by (hour, type, source, target)"""
+    rollups: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    for doc in docs:
+        timestamp = doc.get("timestamp")
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        if not isinstance(timestamp, datetime):
+            continue
+        key = (_truncate(timestamp, STATS_BUCKETS["hour"]),) + tuple(
+            doc.get(dimension) or "unknown" for dimension in STATS_DIMENSIONS
+        )
+        increments = rollups.setdefault(key, {"count": 0, "success": 0, "failed": 0})
+        increments["count"] += 1
+        if doc.get("status") == "success":
+            increments["success"] += 1
+        else:
+            increments["failed"] += 1
+
+        duration_ms = doc.get("duration_ms")
+        if duration_ms is not None:
+            increments["latency_count"] = increments.get("latency_count", 0) + 1
+            increments["latency_sum_ms"] = increments.get("latency_sum_ms", 0) + duration_ms
+            field = f"latency.{latency_bucket(duration_ms)}"
+            increments[field] = increments.get(field, 0) + 1
+    return rollups
+
+
+def latency_percentile(histogram: Sequence[int], quantile: float) -> Optional[float]:
+    """Estimate a latency percentile from histogram counts by interpolating inside its bucket"""
+    total = sum(histogram)
+    if total == 0:
+        return None
+    rank = quantile * total
+    cumulative = 0
+    for index, count in enumerate(histogram):
+        if count and cumulative + count >= rank:
+            lower = LATENCY_BUCKETS_MS[index - 1] if index > 0 else 0
+            if index >= len(LATENCY_BUCKETS_MS):
+                # Open-ended bucket: all we know is the lower bound
+                return float(lower)
+            upper = LATENCY_BUCKETS_MS[index]
+            return round(lower + (upper - lower) * (rank - cumulative) / count, 1)
+        cumulative += count
+    return float(LATENCY_BUCKETS_MS[-1])
+
+
+async def ensure_stats_indexes(stats_collection, retention_days: float = HISTORY_STATS_RETENTION_DAYS):
+    """Create the unique rollup key index and the rollup retention TTL index"""
+    await stats_collection.create_index(
+        [("bucket_start", ASCENDING)] + [(dimension, ASCENDING) for dimension in STATS_DIMENSIONS],
+        name="rollup_key",
+        unique=True
+    )
+
+    if retention_days <= 0:
+        try:
+            await stats_collection.drop_index(STATS_TTL_INDEX_NAME)
+        except OperationFailure:
+            pass
+        return
+
+    expire_after = int(retention_days * 86400)
+    try:
+        await stats_collection.create_index(
+            [("bucket_start", DESCENDING)],
+            name=STATS_TTL_INDEX_NAME,
+            expireAfterSeconds=expire_after
+        )
+    except OperationFailure:
+        await stats_collection.database.command(
+            "collMod",
+            stats_collection.name,
+            index={"name": STATS_TTL_INDEX_NAME, "expireAfterSeconds": expire_after}
+        )
+
+
+def _summarize(row: Dict[str, Any]) -> Dict[str, Any]:
+    histogram = row.pop("_histogram")
+    latency_count = row.pop("_latency_count")
+    latency_sum = row.pop("_latency_sum_ms")
+    row["success_ratio"] = round(row["success"] / row["count"], 4) if row["count"] else None
+    row["avg_ms"] = round(latency_sum / latency_count, 1) if latency_count else None
+    row["p50_ms"] = latency_percentile(histogram, 0.50)
+    row["p95_ms"] = latency_percentile(histogram, 0.95)
+    row["p99_ms"] = latency_percentile(histogram, 0.99)
+    return row
+
+
+async def query_history_stats(
+    stats_collection,
+    start: datetime,
+    end: datetime,
+    bucket: str = "hour",
+    group_by: Sequence[str] = STATS_DIMENSIONS,
+    conversion_type: Optional[str] = None,
+    source_format: Optional[str] = None,
+    target_format: Optional[str] = None
+) -> Dict[str, Any]:
+    """Merge hourly rollups into per-bucket and per-group statistics.
+
+    Raises:
+        ValueError: for an unknown bucket or dimension, or a range with too many buckets
+    """
+    if bucket not in STATS_BUCKETS:
+        raise ValueError(f"bucket must be one of: {', '.join(STATS_BUCKETS)}")
+    unknown = [dimension for dimension in group_by if dimension not in STATS_DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Cannot group by {', '.join(unknown)}; use {', '.join(STATS_DIMENSIONS)}")
+    start, end = _as_utc(start), _as_utc(end)
+    if end <= start:
+        raise ValueError("end must be after start")
+    bucket_size = STATS_BUCKETS[bucket]
+    if (end - start) / bucket_size > STATS_MAX_BUCKETS:
+        raise ValueError(f"Range too large for {bucket} buckets (max {STATS_MAX_BUCKETS} buckets)")
+
+    # Rollups are hourly, so widen the start to include the hour it falls in
+    query: Dict[str, Any] = {
+        "bucket_start": {"$gte": _truncate(start, STATS_BUCKETS["hour"]), "$lt": end}
+    }
+    filters = {
+        "conversion_type": conversion_type,
+        "source_format": source_format.lower() if source_format else None,
+        "target_format": target_format.lower() if target_format else None,
+    }
+    query.update({field: value for field, value in filters.items() if value})
+
+    def empty_row(fields: Dict[str, Any]) -> Dict[str, Any]:
+        return dict(
+            fields, count=0, success=0, failed=0,
+            _histogram=[0] * (len(LATENCY_BUCKETS_MS) + 1), _latency_count=0, _latency_sum_ms=0.0
+        )
+
+    def add(row: Dict[str, Any], rollup: Dict[str, Any]):
+        for field in ("count", "success", "failed"):
+            row[field] += rollup.get(field, 0)
+        row["_latency_count"] += rollup.get("latency_count", 0)
+        row["_latency_sum_ms"] += rollup.get("latency_sum_ms", 0)
+        for index, count in (rollup.get("latency") or {}).items():
+            row["_histogram"][int(index)] += count
+
+    series: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    totals: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    cursor = stats_collection.find(query, {"_id": 0}).sort("bucket_start", ASCENDING)
+    async for rollup in cursor:
+        group = {dimension: rollup.get(dimension) for dimension in group_by}
+        group_key = tuple(group.values())
+        bucket_start = _truncate(rollup["bucket_start"], bucket_size)
+
+        series_key = (bucket_start,) + group_key
+        if series_key not in series:
+            series[series_key] = empty_row(dict(bucket_start=bucket_start, **group))
+        add(series[series_key], rollup)
+
+        if group_key not in totals:
+            totals[group_key] = empty_row(group)
+        add(totals[group_key], rollup)
+
+    return {
+        "bucket": bucket,
+        "start": start,
+        "end": end,
+        "group_by": list(group_by),
+        "latency_buckets_ms": LATENCY_BUCKETS_MS,
+        "series": [_summarize(row) for row in series.values()],
+        "totals": sorted(
+            (_summarize(row) for row in totals.values()),
+            key=lambda row: row["count"],
+            reverse=True
+        ),
+    }
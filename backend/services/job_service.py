@@ -0,0 +1,764 @@
+"""
+Job Service Module
+
+This module provides the background job subsystem used for long-running
+conversions. Clients submit a job, poll its status and download the result
+later instead of holding the HTTP connection open for the whole conversion.
+
+Components:
+1. JobOperation - describes a conversion that can be run as a job
+2. JobStore - persistence for job documents (MongoDB, SQLite or in-process),
+   doubling as the job queue: workers claim queued jobs atomically
+3. JobManager - schedules jobs on the executor pools and tracks their state
+4. JobWorker - runs jobs claimed from a shared store in a separate process
+   (worker.py), so the API tier only ingests uploads and serves results
+
+Configuration (environment variables):
+- JOB_EXECUTION_MODE: "local" runs jobs in the API process that accepted
+  them, "worker" leaves them queued for worker.py processes
+- JOB_WORKER_CONCURRENCY: jobs one worker runs at once
+- JOB_POLL_INTERVAL_SECONDS: how often an idle worker looks for queued jobs
+- JOB_HEARTBEAT_SECONDS: how often a worker (or an API process running jobs
+  locally) marks its jobs as alive; workers also check them for cancel
+  requests
+- JOB_STALE_SECONDS: heartbeat age after which the process running a job is
+  presumed dead and the job failed
+- JOB_WORKER_DRAIN_SECONDS: time a stopping worker gives its running jobs
+  before putting them back in the queue
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import socket
+import sqlite3
+import uuid
+from contextlib import closing, contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from pymongo import ASCENDING, ReturnDocument
+
+from services.admission_service import wait_without_queue_limit
+from services.executor_service import run_engine
+from services.priority_service import set_priority, PRIORITY_BULK
+from services.timing_service import timing_context
+
+logger = logging.getLogger(__name__)
+
+# Job status constants
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+ACTIVE_JOB_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+JOB_CANCELLED_ERROR = "Job was cancelled"
+
+# Job execution modes
+JOB_EXECUTION_LOCAL = "local"
+JOB_EXECUTION_WORKER = "worker"
+JOB_EXECUTION_MODE = os.getenv("JOB_EXECUTION_MODE", JOB_EXECUTION_LOCAL).strip().lower()
+
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "4"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1"))
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_SECONDS", "5"))
+JOB_STALE_AFTER = float(os.getenv("JOB_STALE_SECONDS", "60"))
+JOB_DRAIN_TIMEOUT = float(os.getenv("JOB_WORKER_DRAIN_SECONDS", "30"))
+
+
+@dataclass
+class JobOperation:
+    """A conversion that can be submitted as a background job"""
+    name: str
+    engine: str
+    func: Callable[..., Path]
+    source_format: str
+    target_format: str
+    media_type: str
+    allowed_options: Tuple[str, ...] = field(default_factory=tuple)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "source_format": self.source_format,
+            "target_format": self.target_format,
+            "options": list(self.allowed_options),
+        }
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """MongoDB returns naive UTC datetimes; make them comparable with aware ones"""
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _process_id() -> str:
+    """Owner recorded on the jobs this process runs"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# ============== Job Stores ==============
+
+class JobStore:
+    """Base class for job persistence"""
+
+    async def ensure_indexes(self) -> None:
+        """Create the indexes the store's queries need (run at startup)"""
+
+    async def create(self, job: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def update(self, job_id: str, fields: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    async def find_active(self) -> List[Dict[str, Any]]:
+        """Return jobs that are still queued or running"""
+        raise NotImplementedError
+
+    async def claim(self, operations: Iterable[str], fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest queued job of one of operations, updating it with fields.
+
+        Returns:
+            The claimed job document, or None when no such job is queued
+        """
+        raise NotImplementedError
+
+    async def transition(self, job_id: str, statuses: Tuple[str, ...], fields: Dict[str, Any]) -> bool:
+        """Update a job only if its status is one of statuses; returns whether it was updated"""
+        raise NotImplementedError
+
+
+class MongoJobStore(JobStore):
+    """Job store backed by a MongoDB collection (via Motor)"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def ensure_indexes(self) -> None:
+        # Claims filter queued jobs by operation and take the oldest
+        await self.collection.create_index(
+            [("status", ASCENDING), ("operation", ASCENDING), ("created_at", ASCENDING)],
+            name="status_operation_created"
+        )
+        await self.collection.create_index([("id", ASCENDING)], name="id", unique=True)
+
+    async def create(self, job: Dict[str, Any]) -> None:
+        # insert_one adds an ObjectId to the dict it is given
+        await self.collection.insert_one(dict(job))
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"id": job_id}, {"_id": 0})
+
+    async def update(self, job_id: str, fields: Dict[str, Any]) -> None:
+        await self.collection.update_one({"id": job_id}, {"$set": fields})
+
+    async def find_active(self) -> List[Dict[str, Any]]:
+        cursor = self.collection.find({"status": {"$in": list(ACTIVE_JOB_STATUSES)}}, {"_id": 0})
+        return await cursor.to_list(None)
+
+    async def claim(self, operations: Iterable[str], fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one_and_update(
+            {"status": JOB_QUEUED, "operation": {"$in": list(operations)}},
+            {"$set": fields},
+            projection={"_id": 0},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def transition(self, job_id: str, statuses: Tuple[str, ...], fields: Dict[str, Any]) -> bool:
+        result = await self.collection.update_one({"id": job_id, "status": {"$in": list(statuses)}}, {"$set": fields})
+        return result.matched_count > 0
+
+
+class InMemoryJobStore(JobStore):
+    """In-process job store, used when MongoDB is not wanted (tests, single worker)"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+
+    async def create(self, job: Dict[str, Any]) -> None:
+        self._jobs[job["id"]] = dict(job)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    async def update(self, job_id: str, fields: Dict[str, Any]) -> None:
+        if job_id in self._jobs:
+            self._jobs[job_id].update(fields)
+
+    async def find_active(self) -> List[Dict[str, Any]]:
+        return [dict(job) for job in self._jobs.values() if job["status"] in ACTIVE_JOB_STATUSES]
+
+    async def claim(self, operations: Iterable[str], fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        operations = set(operations)
+        queued = [job for job in self._jobs.values() if job["status"] == JOB_QUEUED and job["operation"] in operations]
+        if not queued:
+            return None
+        job = min(queued, key=lambda job: job["created_at"])
+        job.update(fields)
+        return dict(job)
+
+    async def transition(self, job_id: str, statuses: Tuple[str, ...], fields: Dict[str, Any]) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None or job["status"] not in statuses:
+            return False
+        job.update(fields)
+        return True
+
+
+def _encode_datetime(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _decode_datetime(value: Dict[str, Any]) -> Any:
+    if set(value) == {"$date"}:
+        return datetime.fromisoformat(value["$date"])
+    return value
+
+
+def _load_job(document: str) -> Dict[str, Any]:
+    return json.loads(document, object_hook=_decode_datetime)
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Job store in a SQLite file, for API and worker processes sharing one host
+    without a MongoDB server (and for tests).
+
+    Documents are stored as JSON next to the columns that are queried. Claims
+    and transitions run under SQLite's write lock (BEGIN IMMEDIATE), so a
+    queued job goes to exactly one worker. The file must stay on a local
+    disk; SQLite locking is unreliable on network filesystems.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, operation TEXT NOT NULL, "
+                "created_at TEXT NOT NULL, document TEXT NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit; write transactions are opened explicitly
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    async def _run(self, func: Callable[[sqlite3.Connection], Any]) -> Any:
+        def run_in_connection():
+            with closing(self._connect()) as connection:
+                return func(connection)
+        return await asyncio.to_thread(run_in_connection)
+
+    @staticmethod
+    @contextmanager
+    def _write_transaction(connection: sqlite3.Connection) -> Iterator[None]:
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    @staticmethod
+    def _save(connection: sqlite3.Connection, job: Dict[str, Any]):
+        connection.execute(
+            "UPDATE jobs SET status = ?, document = ? WHERE id = ?",
+            (job["status"], json.dumps(job, default=_encode_datetime), job["id"])
+        )
+
+    async def create(self, job: Dict[str, Any]) -> None:
+        def create(connection: sqlite3.Connection):
+            connection.execute(
+                "INSERT INTO jobs (id, status, operation, created_at, document) VALUES (?, ?, ?, ?, ?)",
+                (job["id"], job["status"], job["operation"], job["created_at"].isoformat(),
+                 json.dumps(job, default=_encode_datetime))
+            )
+        await self._run(create)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        def get(connection: sqlite3.Connection):
+            row = connection.execute("SELECT document FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return _load_job(row[0]) if row else None
+        return await self._run(get)
+
+    async def update(self, job_id: str, fields: Dict[str, Any]) -> None:
+        await self._modify(job_id, None, fields)
+
+    async def find_active(self) -> List[Dict[str, Any]]:
+        def find_active(connection: sqlite3.Connection):
+            rows = connection.execute(
+                "SELECT document FROM jobs WHERE status IN (?, ?)", ACTIVE_JOB_STATUSES
+            ).fetchall()
+            return [_load_job(row[0]) for row in rows]
+        return await self._run(find_active)
+
+    async def claim(self, operations: Iterable[str], fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        operations = list(operations)
+        if not operations:
+            return None
+        placeholders = ", ".join("?" * len(operations))
+
+        def claim(connection: sqlite3.Connection):
+            with self._write_transaction(connection):
+                row = connection.execute(
+                    f"SELECT document FROM jobs WHERE status = ? AND operation IN ({placeholders}) "
+                    "ORDER BY created_at LIMIT 1",
+                    (JOB_QUEUED, *operations)
+                ).fetchone()
+                if row is None:
+                    return None
+                job = _load_job(row[0])
+                job.update(fields)
+                self._save(connection, job)
+                return job
+        return await self._run(claim)
+
+    async def transition(self, job_id: str, statuses: Tuple[str, ...], fields: Dict[str, Any]) -> bool:
+        return await self._modify(job_id, statuses, fields)
+
+    async def _modify(self, job_id: str, statuses: Optional[Tuple[str, ...]], fields: Dict[str, Any]) -> bool:
+        """Read-modify-write of one document, if its status is one of statuses (None: any)"""
+        def modify(connection: sqlite3.Connection):
+            with self._write_transaction(connection):
+                row = connection.execute("SELECT document FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                if row is None:
+                    return False
+                job = _load_job(row[0])
+                if statuses is not None and job["status"] not in statuses:
+                    return False
+                job.update(fields)
+                self._save(connection, job)
+                return True
+        return await self._run(modify)
+
+
+# ============== Job Manager ==============
+
+# Callback invoked when a job finishes: (job document, error message or None)
+JobFinishedCallback = Callable[[Dict[str, Any], Optional[str]], Awaitable[None]]
+
+# Coroutine that runs a conversion: (engine, func, *args, **kwargs) -> result
+JobRunner = Callable[..., Awaitable[Any]]
+
+
+class JobManager:
+    """
+    Runs submitted jobs in the background on the engine executor pools.
+
+    Job state is written to the job store so that any API worker sharing the
+    store can answer status and result requests. With execute_locally=False
+    submitted jobs are only stored, for JobWorker processes to claim.
+
+    Jobs run locally record owner_id as their worker and get a heartbeat
+    every heartbeat_interval, so recover() in another process sharing the
+    store leaves them alone.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        on_finished: Optional[JobFinishedCallback] = None,
+        runner: JobRunner = run_engine,
+        artifact_dir: Optional[Path] = None,
+        execute_locally: bool = True,
+        owner_id: Optional[str] = None,
+        heartbeat_interval: float = JOB_HEARTBEAT_INTERVAL,
+        stale_after: float = JOB_STALE_AFTER
+    ):
+        self.store = store
+        self.on_finished = on_finished
+        self.runner = runner
+        self.execute_locally = execute_locally
+        self.owner_id = owner_id or _process_id()
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        # When set, job inputs and results are kept here under the job id,
+        # away from the short-lived request temp files
+        self.artifact_dir = artifact_dir
+        if artifact_dir is not None:
+            artifact_dir.mkdir(parents=True, exist_ok=True)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # Jobs cancelled through cancel(), as opposed to tasks cancelled by shutdown()
+        self._cancel_requested: set = set()
+        # Refreshes heartbeat_at of local jobs while any are running
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    async def submit(
+        self,
+        operation: JobOperation,
+        input_path: Path,
+        filename: str,
+        options: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Create a job and schedule it for background execution.
+
+        Args:
+            operation: The conversion to run
+            input_path: Path to the uploaded input file
+            filename: Original filename of the upload
+            options: Extra keyword arguments for the conversion function
+
+        Returns:
+            The created job document
+        """
+        job_id = str(uuid.uuid4())
+        now = _utcnow()
+        if self.artifact_dir is not None:
+            stored_input = self.artifact_dir / f"{job_id}_input{Path(input_path).suffix}"
+            shutil.move(str(input_path), str(stored_input))
+            input_path = stored_input
+
+        job = {
+            "id": job_id,
+            "operation": operation.name,
+            "status": JOB_QUEUED,
+            "progress": 0,
+            "filename": filename,
+            "source_format": operation.source_format,
+            "target_format": operation.target_format,
+            "options": options or {},
+            "input_path": str(input_path),
+            "result_path": None,
+            "result_filename": f"{Path(filename).stem}.{operation.target_format}",
+            "media_type": operation.media_type,
+            "error": None,
+            "worker": self.owner_id if self.execute_locally else None,
+            "heartbeat_at": now if self.execute_locally else None,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+        }
+        await self.store.create(job)
+
+        if self.execute_locally:
+            self._start(job, operation)
+        return job
+
+    def run_claimed(self, job: Dict[str, Any], operation: JobOperation) -> None:
+        """Run a job a worker has claimed from the store (and marked running) in the background"""
+        self._start(job, operation, claimed=True)
+
+    def _start(self, job: Dict[str, Any], operation: JobOperation, claimed: bool = False):
+        task = asyncio.create_task(self._run(job, operation, claimed))
+        self._tasks[job["id"]] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job["id"], None))
+        # Workers send the heartbeats of the jobs they claimed (see JobWorker)
+        if not claimed and self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def _heartbeat(self):
+        """Mark the jobs running here as alive until none are left"""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if not self._tasks:
+                self._heartbeat_task = None
+                return
+            for job_id in list(self._tasks):
+                try:
+                    await self.store.transition(job_id, ACTIVE_JOB_STATUSES, {"heartbeat_at": _utcnow()})
+                except Exception as e:
+                    logger.warning(f"Job {job_id} heartbeat failed: {e}")
+
+    async def _run(self, job: Dict[str, Any], operation: JobOperation, claimed: bool = False) -> None:
+        job_id = job["id"]
+        error = None
+        # Accepted jobs queue for their engine however busy it is, instead of failing with
+        # 429, behind the interactive requests of their client and everyone else's
+        wait_without_queue_limit()
+        set_priority(PRIORITY_BULK)
+        try:
+            if not claimed:
+                started = {"status": JOB_RUNNING, "progress": 10, "started_at": _utcnow()}
+                await self.store.update(job_id, started)
+                job.update(started)
+
+            result_path = await self.runner(
+                operation.engine,
+                operation.func,
+                Path(job["input_path"]),
+                **job["options"]
+            )
+            if self.artifact_dir is not None:
+                stored_result = self.artifact_dir / f"{job_id}_result{Path(result_path).suffix}"
+                shutil.move(str(result_path), str(stored_result))
+                result_path = stored_result
+
+            finished = {
+                "status": JOB_COMPLETED,
+                "progress": 100,
+                "result_path": str(result_path),
+                "finished_at": _utcnow(),
+            }
+        except asyncio.CancelledError:
+            if job_id not in self._cancel_requested:
+                raise
+            # The engine call was stopped in its worker (see services/cancel_service.py)
+            error = JOB_CANCELLED_ERROR
+            finished = {"status": JOB_CANCELLED, "error": error, "finished_at": _utcnow()}
+        except Exception as e:
+            logger.exception(f"Job {job_id} ({operation.name}) failed")
+            error = str(e)
+            finished = {"status": JOB_FAILED, "error": error, "finished_at": _utcnow()}
+
+        # A claimed job may have been failed as stale or put back in the queue by now;
+        # its outcome then belongs to whoever took it over
+        expected = (JOB_RUNNING,) if claimed else ACTIVE_JOB_STATUSES
+        if not await self.store.transition(job_id, expected, finished):
+            logger.warning(f"Job {job_id} is no longer running here, discarding its outcome")
+            if finished.get("result_path"):
+                Path(finished["result_path"]).unlink(missing_ok=True)
+            return
+        job.update(finished)
+        await self.report_finished(job, error)
+
+    async def report_finished(self, job: Dict[str, Any], error: Optional[str]) -> None:
+        """Clean up after a job that reached a final status and report it"""
+        # The input is no longer needed once the job has finished
+        if self.artifact_dir is not None:
+            Path(job["input_path"]).unlink(missing_ok=True)
+
+        if self.on_finished is not None:
+            try:
+                await self.on_finished(job, error)
+            except Exception as e:
+                logger.warning(f"Job {job['id']} finished callback failed: {e}")
+
+    @property
+    def running(self) -> int:
+        """Jobs queued or running in this process"""
+        return len(self._tasks)
+
+    def task(self, job_id: str) -> Optional[asyncio.Task]:
+        """The task running a job in this process, or None"""
+        return self._tasks.get(job_id)
+
+    def tasks(self) -> Dict[str, asyncio.Task]:
+        """Snapshot of the tasks running jobs in this process, by job id"""
+        return dict(self._tasks)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.store.get(job_id)
+
+    async def active_job_ids(self) -> Set[str]:
+        """Ids of the jobs queued or running in any process sharing the store"""
+        return {job["id"] for job in await self.store.find_active()}
+
+    async def recover(self) -> int:
+        """Mark jobs left queued/running by a previous process as failed.
+
+        Only jobs owned by this process, or whose owner stopped sending
+        heartbeats (older than stale_after), are failed; jobs of other live
+        API processes sharing the store keep running. Jobs executed by
+        workers are left to them (see JobWorker), so nothing is recovered
+        when jobs do not run locally.
+
+        Returns:
+            Number of jobs that were marked as interrupted
+        """
+        if not self.execute_locally:
+            return 0
+        stale_before = _utcnow() - timedelta(seconds=self.stale_after)
+        interrupted = 0
+        for job in await self.store.find_active():
+            if job["id"] in self._tasks:
+                continue
+            heartbeat_at = job.get("heartbeat_at")
+            alive = heartbeat_at is not None and _as_utc(heartbeat_at) >= stale_before
+            if alive and job.get("worker") != self.owner_id:
+                # Running in another API process sharing the store
+                continue
+            failed = {
+                "status": JOB_FAILED,
+                "error": "Job was interrupted by a server restart",
+                "finished_at": _utcnow(),
+            }
+            if await self.store.transition(job["id"], ACTIVE_JOB_STATUSES, failed):
+                interrupted += 1
+        return interrupted
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a job queued or running in this process and wait until it has stopped.
+
+        When jobs run on workers, a job no worker has claimed yet is cancelled
+        at once; a running one is flagged with cancel_requested and stopped by
+        its worker at the next heartbeat, so it is returned still running.
+
+        Returns:
+            The updated job document, or None if the job cannot be cancelled from here
+        """
+        task = self._tasks.get(job_id)
+        if task is not None:
+            self._cancel_requested.add(job_id)
+            task.cancel()
+            try:
+                await asyncio.gather(task, return_exceptions=True)
+            finally:
+                self._cancel_requested.discard(job_id)
+            return await self.store.get(job_id)
+
+        if self.execute_locally:
+            return None
+        cancelled = {"status": JOB_CANCELLED, "error": JOB_CANCELLED_ERROR, "finished_at": _utcnow()}
+        if await self.store.transition(job_id, (JOB_QUEUED,), cancelled):
+            job = await self.store.get(job_id)
+            await self.report_finished(job, JOB_CANCELLED_ERROR)
+            return job
+        if await self.store.transition(job_id, (JOB_RUNNING,), {"cancel_requested": True}):
+            return await self.store.get(job_id)
+        return None
+
+    async def shutdown(self) -> None:
+        """Cancel jobs that are still running in this process"""
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# ============== Job Worker ==============
+
+class JobWorker:
+    """
+    Runs jobs claimed from a shared job store, in a process other than the
+    API process that accepted them (see worker.py).
+
+    Every heartbeat the worker refreshes heartbeat_at of its running jobs,
+    stops those flagged cancel_requested, and fails running jobs of other
+    workers whose heartbeat is older than stale_after (their worker died).
+    Jobs still running when the worker stops are given drain_timeout to
+    finish, then put back in the queue.
+    """
+
+    def __init__(
+        self,
+        manager: JobManager,
+        operations: Dict[str, JobOperation],
+        concurrency: int = JOB_WORKER_CONCURRENCY,
+        poll_interval: float = JOB_POLL_INTERVAL,
+        heartbeat_interval: float = JOB_HEARTBEAT_INTERVAL,
+        stale_after: float = JOB_STALE_AFTER,
+        drain_timeout: float = JOB_DRAIN_TIMEOUT,
+        worker_id: Optional[str] = None
+    ):
+        self.manager = manager
+        self.store = manager.store
+        # Only operations of the engines enabled here are claimed
+        self.operations = operations
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.drain_timeout = drain_timeout
+        self.worker_id = worker_id or _process_id()
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        """Stop claiming jobs; run() returns once the running ones are drained"""
+        self._stopping.set()
+
+    async def run(self) -> None:
+        """Claim and run jobs until stop() is called"""
+        logger.info(f"Job worker {self.worker_id} running {', '.join(self.operations)}")
+        maintenance = asyncio.create_task(self._maintain())
+        try:
+            while not self._stopping.is_set():
+                if self.manager.running >= self.concurrency or not await self._claim_next():
+                    await self._wait(self.poll_interval)
+        finally:
+            maintenance.cancel()
+            await asyncio.gather(maintenance, return_exceptions=True)
+            await self._drain()
+
+    async def _wait(self, seconds: float):
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _claim_next(self) -> bool:
+        now = _utcnow()
+        claimed = {"status": JOB_RUNNING, "progress": 10, "worker": self.worker_id, "started_at": now, "heartbeat_at": now}
+        job = await self.store.claim(self.operations, claimed)
+        if job is None:
+            return False
+        # MongoDB hands back naive datetimes; keep the aware ones for the history duration
+        job.update(claimed)
+        logger.info(f"Job worker {self.worker_id} claimed job {job['id']} ({job['operation']})")
+        # Each job gets its own timing context, so its history entry carries its own measurements
+        with timing_context():
+            self.manager.run_claimed(job, self.operations[job["operation"]])
+        return True
+
+    async def _maintain(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self._heartbeat()
+                await self._fail_stale_jobs()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Job worker {self.worker_id} heartbeat failed: {e}")
+
+    async def _heartbeat(self):
+        """Mark the jobs running here as alive and stop those with a cancel request"""
+        for job_id in self.manager.tasks():
+            await self.store.transition(job_id, (JOB_RUNNING,), {"heartbeat_at": _utcnow()})
+            job = await self.store.get(job_id)
+            if job is not None and job.get("cancel_requested"):
+                logger.info(f"Cancelling job {job_id} on request")
+                await self.manager.cancel(job_id)
+
+    async def _fail_stale_jobs(self):
+        """Fail running jobs whose worker stopped sending heartbeats"""
+        stale_before = _utcnow() - timedelta(seconds=self.stale_after)
+        for job in await self.store.find_active():
+            heartbeat_at = job.get("heartbeat_at")
+            # Jobs without a heartbeat predate heartbeats; recover() in the API handles them
+            if job["status"] != JOB_RUNNING or heartbeat_at is None or self.manager.task(job["id"]):
+                continue
+            if _as_utc(heartbeat_at) >= stale_before:
+                continue
+            error = f"Job was interrupted: worker {job.get('worker')} stopped responding"
+            failed = {"status": JOB_FAILED, "error": error, "finished_at": _utcnow()}
+            if await self.store.transition(job["id"], (JOB_RUNNING,), failed):
+                logger.warning(f"Job {job['id']} failed: worker {job.get('worker')} stopped responding")
+                job.update(failed)
+                await self.manager.report_finished(job, error)
+
+    async def _drain(self):
+        """Let running jobs finish within the drain timeout, then put the rest back in the queue"""
+        tasks = list(self.manager.tasks().values())
+        if tasks:
+            logger.info(f"Job worker {self.worker_id} waiting up to {self.drain_timeout:.0f}s for {len(tasks)} jobs")
+            await asyncio.wait(tasks, timeout=self.drain_timeout)
+        unfinished = list(self.manager.tasks())
+        await self.manager.shutdown()
+        requeued = {"status": JOB_QUEUED, "progress": 0, "worker": None, "started_at": None, "heartbeat_at": None}
+        for job_id in unfinished:
+            if await self.store.transition(job_id, (JOB_RUNNING,), requeued):
+                logger.info(f"Job {job_id} put back in the queue")
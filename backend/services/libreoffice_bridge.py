@@ -0,0 +1,113 @@
+"""
+LibreOffice UNO Bridge
+
+Standalone helper run by the LibreOffice worker pool under a Python interpreter
+that can import the ``uno`` module (usually the system python3 with the
+python3-uno package). It connects to one running soffice instance over a UNO
+pipe and serves conversion requests as JSON lines on stdin/stdout:
+
+    {"cmd": "ping"}
+    {"cmd": "convert", "input": "/in.docx", "output": "/out.pdf", "filter": "writer_pdf_Export"}
+
+Every request is answered with a single line: {"ok": true} or {"ok": false, "error": "..."}.
+
+This file must not import anything from the application, since it runs in a
+different interpreter.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import uno
+from com.sun.star.beans import PropertyValue
+
+
+def _props(**kwargs):
+    """Build a tuple of UNO PropertyValues from keyword arguments."""
+    props = []
+    for name, value in kwargs.items():
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        props.append(prop)
+    return tuple(props)
+
+
+def connect(pipe_name, timeout):
+    """Connect to soffice and return its Desktop, retrying until soffice is up."""
+    local_context = uno.getComponentContext()
+    resolver = local_context.ServiceManager.createInstanceWithContext(
+        "com.sun.star.bridge.UnoUrlResolver", local_context
+    )
+    deadline = time.time() + timeout
+    while True:
+        try:
+            context = resolver.resolve(f"uno:pipe,name={pipe_name};urp;StarOffice.ComponentContext")
+            return context.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", context)
+        except Exception:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.25)
+
+
+def convert(desktop, input_path, output_path, filter_name):
+    """Load a document hidden and store it with the given export filter."""
+    document = desktop.loadComponentFromURL(
+        uno.systemPathToFileUrl(input_path),
+        "_blank",
+        0,
+        _props(Hidden=True, ReadOnly=True)
+    )
+    if document is None:
+        raise RuntimeError("LibreOffice could not open the document")
+    try:
+        document.storeToURL(
+            uno.systemPathToFileUrl(output_path),
+            _props(FilterName=filter_name, Overwrite=True)
+        )
+    finally:
+        document.close(True)
+
+
+def _reply(**payload):
+    sys.stdout.write(json.dumps(payload) + "\n")
+    sys.stdout.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LibreOffice UNO conversion bridge")
+    parser.add_argument("--pipe", required=True, help="UNO pipe name soffice accepts on")
+    parser.add_argument("--connect-timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    try:
+        desktop = connect(args.pipe, args.connect_timeout)
+    except Exception as e:
+        _reply(ok=False, error=f"Could not connect to LibreOffice: {e}")
+        return 1
+    _reply(ok=True, ready=True)
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+            if request.get("cmd") == "ping":
+                # Touch the desktop so a dead soffice is reported as an error
+                desktop.getComponents()
+            elif request.get("cmd") == "convert":
+                convert(desktop, request["input"], request["output"], request["filter"])
+            else:
+                raise ValueError(f"Unknown command: {request.get('cmd')}")
+            _reply(ok=True)
+        except Exception as e:
+            _reply(ok=False, error=str(e))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
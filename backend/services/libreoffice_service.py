@@ -0,0 +1,719 @@
+"""
+LibreOffice Worker Pool Service
+
+This module keeps a pool of long-lived headless soffice instances so office
+conversions do not pay LibreOffice's cold start (2-5 seconds) on every call.
+
+Each worker consists of:
+1. A soffice process with its own -env:UserInstallation profile, accepting
+   UNO connections on a private pipe
+2. A bridge process (libreoffice_bridge.py) running under a Python interpreter
+   that can import ``uno``, which receives conversion requests as JSON lines
+
+Workers are health-checked before use, restarted after a configurable number
+of jobs, and restarted automatically when soffice crashes or hangs. Every
+soffice process runs under the office engine's resource limits
+(services/limits_service.py).
+
+When the pool is unavailable, run_libreoffice_conversion() launches a one-off
+soffice process in an isolated job directory with its own output folder and
+user profile, so any number of cold conversions can run in parallel.
+
+Configuration (environment variables):
+- LIBREOFFICE_POOL_SIZE: number of warm workers (0 disables the pool)
+- LIBREOFFICE_MAX_JOBS_PER_WORKER: restart a worker after this many conversions
+- LIBREOFFICE_CONVERSION_TIMEOUT: seconds before a conversion is considered hung
+- LIBREOFFICE_HEALTH_CHECK_INTERVAL: idle seconds after which a worker is pinged
+- LIBREOFFICE_PYTHON: interpreter used for the UNO bridge
+"""
+
+import contextvars
+import importlib.util
+import json
+import logging
+import os
+import queue
+import select
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from services.cancel_service import bind_call, current_call_id, on_cancel, raise_if_cancelled
+from services.executor_service import ENGINE_OFFICE
+from services.limits_service import measure_process_tree, subprocess_limits
+from services.metrics_service import time_subprocess
+
+logger = logging.getLogger(__name__)
+
+BRIDGE_SCRIPT = Path(__file__).parent / "libreoffice_bridge.py"
+
+LIBREOFFICE_POOL_SIZE = int(os.getenv("LIBREOFFICE_POOL_SIZE", "2"))
+LIBREOFFICE_MAX_JOBS_PER_WORKER = int(os.getenv("LIBREOFFICE_MAX_JOBS_PER_WORKER", "200"))
+LIBREOFFICE_CONVERSION_TIMEOUT = float(os.getenv("LIBREOFFICE_CONVERSION_TIMEOUT", "120"))
+LIBREOFFICE_START_TIMEOUT = float(os.getenv("LIBREOFFICE_START_TIMEOUT", "60"))
+LIBREOFFICE_HEALTH_CHECK_INTERVAL = float(os.getenv("LIBREOFFICE_HEALTH_CHECK_INTERVAL", "30"))
+
+# soffice gets a session (process group) of its own where there are any (POSIX), so a
+# hung conversion is killed together with soffice.bin and its helpers
+NEW_SESSION = os.name == "posix"
+
+# Document families, used to pick the right export filter
+WRITER_FORMATS = {"doc", "docx", "odt", "rtf", "txt"}
+CALC_FORMATS = {"xls", "xlsx", "ods", "csv"}
+IMPRESS_FORMATS = {"ppt", "pptx", "odp"}
+
+# (document family, target format) -> LibreOffice export filter
+EXPORT_FILTERS = {
+    ("writer", "pdf"): "writer_pdf_Export",
+    ("writer", "doc"): "MS Word 97",
+    ("writer", "docx"): "MS Word 2007 XML",
+    ("calc", "pdf"): "calc_pdf_Export",
+    ("impress", "pdf"): "impress_pdf_Export",
+}
+
+
+class LibreOfficePoolError(Exception):
+    """Raised when the warm pool cannot perform a conversion"""
+
+
+class LibreOfficeWorkerError(Exception):
+    """Raised when a worker is unusable and must be restarted"""
+
+
+class LibreOfficeConversionError(Exception):
+    """Raised when a one-off LibreOffice conversion fails"""
+
+
+def find_soffice_binary() -> Optional[str]:
+    """Find the soffice / libreoffice executable"""
+    configured = os.getenv("LIBREOFFICE_BINARY")
+    if configured:
+        return configured
+    return shutil.which("soffice") or shutil.which("libreoffice")
+
+
+def find_uno_python() -> Optional[str]:
+    """Find a Python interpreter that can import the ``uno`` module"""
+    configured = os.getenv("LIBREOFFICE_PYTHON")
+    if configured:
+        return configured
+
+    if importlib.util.find_spec("uno") is not None:
+        return sys.executable
+
+    candidates = [
+        "/usr/bin/python3",
+        "/usr/lib/libreoffice/program/python",
+        "/opt/libreoffice/program/python",
+    ]
+    for candidate in candidates:
+        if not Path(candidate).exists():
+            continue
+        try:
+            result = subprocess.run(
+                [candidate, "-c", "import uno"],
+                capture_output=True,
+                timeout=10
+            )
+            if result.returncode == 0:
+                return candidate
+        except (subprocess.SubprocessError, OSError):
+            continue
+    return None
+
+
+def get_export_filter(source_format: str, target_format: str) -> str:
+    """Get the LibreOffice export filter for a source/target format pair"""
+    source_format = source_format.lower().lstrip(".")
+    target_format = target_format.lower().lstrip(".")
+
+    if source_format in WRITER_FORMATS:
+        family = "writer"
+    elif source_format in CALC_FORMATS:
+        family = "calc"
+    elif source_format in IMPRESS_FORMATS:
+        family = "impress"
+    else:
+        raise LibreOfficePoolError(f"Unsupported source format for LibreOffice: {source_format}")
+
+    filter_name = EXPORT_FILTERS.get((family, target_format))
+    if filter_name is None:
+        raise LibreOfficePoolError(f"Unsupported conversion: {source_format} to {target_format}")
+    return filter_name
+
+
+def _kill_process_group(process: Optional[subprocess.Popen]):
+    """Kill a process started with start_new_session and everything it spawned"""
+    if process is None or process.poll() is not None:
+        return
+    if NEW_SESSION:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            process.kill()
+    else:
+        process.kill()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        pass
+
+
+def _run_soffice_convert(
+    input_paths: List[Path],
+    target_format: str,
+    output_dir: Path,
+    profile_dir: Path,
+    timeout: float,
+    cpu_calls: int = 1
+):
+    """Run one headless soffice process converting every input into output_dir.
+
+    cpu_calls scales the office engine's CPU time limit like timeout, for
+    batches doing the work of several conversions.
+    """
+    soffice = find_soffice_binary() or "libreoffice"
+
+    # LibreOffice requires a HOME directory to work properly
+    env = os.environ.copy()
+    if 'HOME' not in env:
+        env['HOME'] = '/tmp'
+
+    cmd = [
+        soffice,
+        "--headless",
+        "--invisible",
+        "--nologo",
+        "--norestore",
+        "--nodefault",
+        "--nofirststartwizard",
+        f"-env:UserInstallation={profile_dir.resolve().as_uri()}",
+        "--convert-to", target_format,
+        "--outdir", str(output_dir),
+    ] + [str(path) for path in input_paths]
+    logger.info(f"Running LibreOffice command: {' '.join(cmd)}")
+
+    try:
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            env=env,
+            start_new_session=NEW_SESSION,
+            preexec_fn=subprocess_limits(ENGINE_OFFICE, cpu_calls)
+        )
+    except FileNotFoundError:
+        raise LibreOfficeConversionError("LibreOffice is not installed or not found in PATH")
+
+    try:
+        # A cancelled conversion kills soffice the same way a hung one does
+        with time_subprocess("soffice"), on_cancel(lambda: _kill_process_group(process)):
+            _, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        # Kill soffice.bin and any helpers it spawned, not just the launcher
+        _kill_process_group(process)
+        raise LibreOfficeConversionError(f"LibreOffice conversion timed out after {timeout:.0f} seconds")
+
+    if process.returncode != 0:
+        logger.warning(f"LibreOffice stderr: {stderr}")
+        raise LibreOfficeConversionError(
+            f"LibreOffice conversion failed with return code {process.returncode}"
+        )
+
+
+def run_libreoffice_conversion(
+    input_path: Path,
+    target_format: str,
+    output_path: Path,
+    work_dir: Path
+) -> Path:
+    """Convert a document with a one-off headless soffice process.
+
+    Every call gets its own job directory under work_dir holding a private
+    output folder and user profile, so concurrent conversions of files with
+    the same name never collide and do not contend for the profile lock.
+
+    Args:
+        input_path: Path to the office document
+        target_format: LibreOffice --convert-to target (pdf, doc, docx)
+        output_path: Where the converted file is written
+        work_dir: Directory that receives the per-job scratch directory
+
+    Returns:
+        output_path
+
+    Raises:
+        LibreOfficeConversionError: if soffice is missing, fails or times out
+    """
+    input_path = Path(input_path).resolve()
+
+    job_dir = work_dir / "jobs" / uuid.uuid4().hex
+    output_dir = job_dir / "out"
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        _run_soffice_convert(
+            [input_path],
+            target_format,
+            output_dir,
+            job_dir / "profile",
+            LIBREOFFICE_CONVERSION_TIMEOUT
+        )
+
+        # The output dir is private to this job, so any file with the target suffix is ours
+        expected_path = output_dir / f"{input_path.stem}.{target_format}"
+        if not expected_path.exists():
+            candidates = list(output_dir.glob(f"*.{target_format}"))
+            expected_path = candidates[0] if candidates else expected_path
+        if not expected_path.exists() or expected_path.stat().st_size == 0:
+            raise LibreOfficeConversionError(
+                f"LibreOffice conversion failed - output {target_format.upper()} not found"
+            )
+
+        shutil.move(str(expected_path), str(output_path))
+        return output_path
+    finally:
+        shutil.rmtree(job_dir, ignore_errors=True)
+
+
+def run_libreoffice_batch_conversion(
+    input_paths: List[Path],
+    target_format: str,
+    output_dir: Path,
+    work_dir: Path
+) -> Dict[Path, Path]:
+    """Convert many documents with a single headless soffice process.
+
+    LibreOffice's startup cost is paid once for the whole batch. Inputs are
+    linked into the job directory under numbered names first, so uploads that
+    share a filename stem still produce distinct outputs.
+
+    Args:
+        input_paths: Paths to the office documents
+        target_format: LibreOffice --convert-to target (pdf, doc, docx)
+        output_dir: Directory that receives the converted files
+        work_dir: Directory that receives the per-job scratch directory
+
+    Returns:
+        Dict mapping each successfully converted input path to its output path.
+        Inputs LibreOffice could not convert are left out.
+
+    Raises:
+        LibreOfficeConversionError: if soffice is missing, fails or times out
+    """
+    job_dir = work_dir / "jobs" / uuid.uuid4().hex
+    staging_dir = job_dir / "in"
+    converted_dir = job_dir / "out"
+    staging_dir.mkdir(parents=True, exist_ok=True)
+    converted_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        staged: Dict[str, Path] = {}
+        for index, input_path in enumerate(input_paths):
+            input_path = Path(input_path).resolve()
+            staged_name = f"{index:05d}"
+            staged_path = staging_dir / f"{staged_name}{input_path.suffix.lower()}"
+            try:
+                os.symlink(input_path, staged_path)
+            except OSError:
+                shutil.copyfile(input_path, staged_path)
+            staged[staged_name] = Path(input_paths[index])
+
+        # Give the batch as much time as converting its files one by one would get
+        _run_soffice_convert(
+            sorted(staging_dir.iterdir()),
+            target_format,
+            converted_dir,
+            job_dir / "profile",
+            LIBREOFFICE_CONVERSION_TIMEOUT * max(1, len(staged)),
+            cpu_calls=max(1, len(staged))
+        )
+
+        results: Dict[Path, Path] = {}
+        for staged_name, input_path in staged.items():
+            converted_path = converted_dir / f"{staged_name}.{target_format}"
+            if not converted_path.exists() or converted_path.stat().st_size == 0:
+                logger.warning(f"LibreOffice did not convert {input_path.name} to {target_format}")
+                continue
+            output_path = output_dir / f"{uuid.uuid4()}.{target_format}"
+            shutil.move(str(converted_path), str(output_path))
+            results[input_path] = output_path
+        return results
+    finally:
+        shutil.rmtree(job_dir, ignore_errors=True)
+
+
+class LibreOfficeWorker:
+    """One warm soffice instance plus its UNO bridge"""
+
+    def __init__(self, index: int, work_dir: Path, soffice: str, uno_python: str):
+        self.index = index
+        self.work_dir = work_dir
+        self.soffice = soffice
+        self.uno_python = uno_python
+        self.profile_dir = work_dir / f"profile-{index}"
+        self.soffice_process: Optional[subprocess.Popen] = None
+        self.bridge_process: Optional[subprocess.Popen] = None
+        self.jobs_done = 0
+        self.restarts = 0
+        self.last_used = 0.0
+        self._buffer = b""
+
+    @property
+    def is_alive(self) -> bool:
+        return (
+            self.soffice_process is not None and self.soffice_process.poll() is None
+            and self.bridge_process is not None and self.bridge_process.poll() is None
+        )
+
+    def start(self):
+        """Start soffice and the bridge, and wait until the bridge is connected"""
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        pipe_name = f"filelab_lo_{os.getpid()}_{self.index}_{uuid.uuid4().hex[:8]}"
+
+        env = os.environ.copy()
+        if 'HOME' not in env:
+            env['HOME'] = '/tmp'
+
+        self.soffice_process = subprocess.Popen(
+            [
+                self.soffice,
+                "--headless",
+                "--invisible",
+                "--nologo",
+                "--norestore",
+                "--nodefault",
+                "--nofirststartwizard",
+                f"-env:UserInstallation={self.profile_dir.resolve().as_uri()}",
+                f"--accept=pipe,name={pipe_name};urp;StarOffice.ComponentContext",
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            start_new_session=NEW_SESSION,
+            # Serves many conversions: memory and open files only, LIBREOFFICE_CONVERSION_TIMEOUT bounds time
+            preexec_fn=subprocess_limits(ENGINE_OFFICE, cpu_calls=0)
+        )
+        # A worker that fails to start must not leave soffice or its bridge running
+        try:
+            self.bridge_process = subprocess.Popen(
+                [
+                    self.uno_python,
+                    str(BRIDGE_SCRIPT),
+                    "--pipe", pipe_name,
+                    "--connect-timeout", str(LIBREOFFICE_START_TIMEOUT),
+                ],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                env=env,
+                start_new_session=NEW_SESSION
+            )
+            self._buffer = b""
+            self.jobs_done = 0
+
+            response = self._read_response(LIBREOFFICE_START_TIMEOUT + 5)
+            if not response.get("ok"):
+                raise LibreOfficeWorkerError(response.get("error", "LibreOffice worker failed to start"))
+        except BaseException:
+            self.stop()
+            raise
+
+        self.last_used = time.monotonic()
+        logger.info(f"LibreOffice worker {self.index} started (pid {self.soffice_process.pid})")
+
+    def stop(self):
+        """Stop the bridge and soffice processes"""
+        if self.bridge_process is not None and self.bridge_process.stdin:
+            try:
+                self.bridge_process.stdin.close()
+            except OSError:
+                pass
+        _kill_process_group(self.bridge_process)
+        _kill_process_group(self.soffice_process)
+        self.bridge_process = None
+        self.soffice_process = None
+
+    def restart(self):
+        """Replace the worker's processes with fresh ones"""
+        self.stop()
+        self.restarts += 1
+        self.start()
+
+    def _read_response(self, timeout: float) -> Dict:
+        """Read one JSON line from the bridge, failing after timeout seconds"""
+        deadline = time.monotonic() + timeout
+        fd = self.bridge_process.stdout.fileno()
+
+        while b"\n" not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise LibreOfficeWorkerError(f"LibreOffice worker {self.index} timed out")
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise LibreOfficeWorkerError(f"LibreOffice worker {self.index} exited unexpectedly")
+            self._buffer += chunk
+
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        return json.loads(line.decode("utf-8"))
+
+    def request(self, payload: Dict, timeout: float) -> Dict:
+        """Send one request to the bridge and return its response"""
+        if not self.is_alive:
+            raise LibreOfficeWorkerError(f"LibreOffice worker {self.index} is not running")
+        try:
+            self.bridge_process.stdin.write((json.dumps(payload) + "\n").encode("utf-8"))
+            self.bridge_process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise LibreOfficeWorkerError(f"LibreOffice worker {self.index} is unreachable: {e}")
+        return self._read_response(timeout)
+
+    def ping(self) -> bool:
+        """Check that soffice still answers UNO calls"""
+        try:
+            return bool(self.request({"cmd": "ping"}, timeout=10).get("ok"))
+        except LibreOfficeWorkerError:
+            return False
+
+    def convert(self, input_path: Path, output_path: Path, filter_name: str):
+        """Convert one document; raises LibreOfficePoolError for bad documents"""
+        response = self.request(
+            {
+                "cmd": "convert",
+                "input": str(input_path),
+                "output": str(output_path),
+                "filter": filter_name,
+            },
+            timeout=LIBREOFFICE_CONVERSION_TIMEOUT
+        )
+        self.jobs_done += 1
+        self.last_used = time.monotonic()
+        if not response.get("ok"):
+            raise LibreOfficePoolError(response.get("error", "LibreOffice conversion failed"))
+
+
+class LibreOfficePool:
+    """
+    Pool of warm LibreOffice workers.
+
+    The pool is owned by the process that started it; forked children (e.g.
+    process-pool engine workers) see it as not running and fall back to
+    spawning soffice themselves.
+    """
+
+    def __init__(self, work_dir: Path, size: int = LIBREOFFICE_POOL_SIZE):
+        self.work_dir = work_dir
+        self.size = size
+        self.workers: List[LibreOfficeWorker] = []
+        self._idle: "queue.Queue[LibreOfficeWorker]" = queue.Queue()
+        self._owner_pid: Optional[int] = None
+        self._running = False
+        self._start_lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._running and self._owner_pid == os.getpid()
+
+    def start(self) -> bool:
+        """Start all workers. Returns False if the pool cannot run on this host."""
+        with self._start_lock:
+            if self.is_running:
+                return True
+            if self.size <= 0:
+                logger.info("LibreOffice pool disabled (LIBREOFFICE_POOL_SIZE=0)")
+                return False
+            if os.name != "posix":
+                logger.info("LibreOffice pool is only supported on POSIX systems")
+                return False
+
+            soffice = find_soffice_binary()
+            if soffice is None:
+                logger.info("LibreOffice not found, warm pool disabled")
+                return False
+            uno_python = find_uno_python()
+            if uno_python is None:
+                logger.info("No Python with the uno module found (install python3-uno), warm pool disabled")
+                return False
+
+            self.work_dir.mkdir(parents=True, exist_ok=True)
+            for index in range(self.size):
+                worker = LibreOfficeWorker(index, self.work_dir, soffice, uno_python)
+                try:
+                    worker.start()
+                except Exception as e:
+                    logger.warning(f"Failed to start LibreOffice worker {index}: {e}")
+                    worker.stop()
+                    continue
+                self.workers.append(worker)
+                self._idle.put(worker)
+
+            if not self.workers:
+                logger.warning("No LibreOffice workers could be started, warm pool disabled")
+                return False
+
+            self._owner_pid = os.getpid()
+            self._running = True
+            logger.info(f"LibreOffice pool running with {len(self.workers)} workers")
+            return True
+
+    def start_in_background(self):
+        """Start the pool without blocking application startup"""
+        threading.Thread(target=self.start, name="libreoffice-pool-start", daemon=True).start()
+
+    def _acquire(self) -> LibreOfficeWorker:
+        try:
+            worker = self._idle.get(timeout=LIBREOFFICE_CONVERSION_TIMEOUT)
+        except queue.Empty:
+            raise LibreOfficePoolError("Timed out waiting for a free LibreOffice worker")
+
+        # Health check: restart dead workers, ping workers that sat idle for a while
+        try:
+            if not worker.is_alive:
+                logger.warning(f"LibreOffice worker {worker.index} died, restarting")
+                worker.restart()
+            elif time.monotonic() - worker.last_used > LIBREOFFICE_HEALTH_CHECK_INTERVAL and not worker.ping():
+                logger.warning(f"LibreOffice worker {worker.index} failed health check, restarting")
+                worker.restart()
+        except Exception as e:
+            self._idle.put(worker)
+            raise LibreOfficePoolError(f"LibreOffice worker could not be restarted: {e}")
+        return worker
+
+    def _release(self, worker: LibreOfficeWorker):
+        if worker.jobs_done >= LIBREOFFICE_MAX_JOBS_PER_WORKER:
+            logger.info(f"Recycling LibreOffice worker {worker.index} after {worker.jobs_done} jobs")
+            try:
+                worker.restart()
+            except Exception as e:
+                logger.warning(f"Failed to recycle LibreOffice worker {worker.index}: {e}")
+        self._idle.put(worker)
+
+    def convert(self, input_path: Path, target_format: str, output_path: Path) -> Path:
+        """Convert a document on a warm worker.
+
+        Args:
+            input_path: Path to the office document
+            target_format: Target extension (pdf, doc, docx)
+            output_path: Where the converted file should be written
+
+        Returns:
+            output_path once the converted file exists
+
+        Raises:
+            LibreOfficePoolError: if the pool is not running or conversion fails
+        """
+        if not self.is_running:
+            raise LibreOfficePoolError("LibreOffice pool is not running")
+
+        input_path = Path(input_path).resolve()
+        output_path = Path(output_path).resolve()
+        filter_name = get_export_filter(input_path.suffix, target_format)
+
+        # One retry on a freshly restarted worker if soffice crashed mid-job
+        for attempt in range(2):
+            worker = self._acquire()
+            try:
+                with time_subprocess("soffice-pool"), measure_process_tree(worker.soffice_process.pid):
+                    # Cancelling kills the worker's soffice; it is restarted below like a crashed one
+                    with on_cancel(lambda: _kill_process_group(worker.soffice_process)):
+                        worker.convert(input_path, output_path, filter_name)
+                break
+            except LibreOfficeWorkerError as e:
+                logger.warning(f"LibreOffice worker {worker.index} failed: {e}")
+                try:
+                    worker.restart()
+                except Exception as restart_error:
+                    logger.warning(f"LibreOffice worker {worker.index} restart failed: {restart_error}")
+                raise_if_cancelled()
+                if attempt == 1:
+                    raise LibreOfficePoolError(str(e))
+            finally:
+                self._release(worker)
+
+        if not output_path.exists() or output_path.stat().st_size == 0:
+            raise LibreOfficePoolError("LibreOffice conversion produced no output")
+        return output_path
+
+    def convert_many(self, input_paths: List[Path], target_format: str, output_dir: Path) -> Dict[Path, Path]:
+        """Convert many documents, spreading them over every warm worker.
+
+        The conversions run as part of the calling engine call: cancelling it
+        kills their soffice processes, and their timings and resource usage
+        are recorded in its context.
+
+        Returns:
+            Dict mapping each successfully converted input path to its output path
+
+        Raises:
+            LibreOfficePoolError: if the pool is not running
+        """
+        if not self.is_running:
+            raise LibreOfficePoolError("LibreOffice pool is not running")
+
+        call_id = current_call_id()
+
+        def convert_one(input_path: Path) -> Optional[Path]:
+            with bind_call(call_id):
+                raise_if_cancelled()
+                output_path = output_dir / f"{uuid.uuid4()}.{target_format}"
+                try:
+                    return self.convert(input_path, target_format, output_path)
+                except LibreOfficePoolError as e:
+                    logger.warning(f"Warm LibreOffice pool could not convert {Path(input_path).name}: {e}")
+                    output_path.unlink(missing_ok=True)
+                    return None
+
+        with ThreadPoolExecutor(max_workers=max(1, len(self.workers))) as executor:
+            # One context copy per task: a context cannot be entered by two threads at once
+            futures = [
+                executor.submit(contextvars.copy_context().run, convert_one, input_path)
+                for input_path in input_paths
+            ]
+            outputs = [future.result() for future in futures]
+
+        return {
+            Path(input_path): output_path
+            for input_path, output_path in zip(input_paths, outputs)
+            if output_path is not None
+        }
+
+    def status(self) -> Dict:
+        """Summary of pool state for diagnostics"""
+        return {
+            "running": self.is_running,
+            "size": len(self.workers),
+            "idle": self._idle.qsize(),
+            "workers": [
+                {
+                    "index": worker.index,
+                    "alive": worker.is_alive,
+                    "jobs_done": worker.jobs_done,
+                    "restarts": worker.restarts,
+                }
+                for worker in self.workers
+            ],
+        }
+
+    def shutdown(self):
+        """Stop every worker"""
+        if self._owner_pid != os.getpid():
+            return
+        self._running = False
+        for worker in self.workers:
+            worker.stop()
+        self.workers.clear()
+        while not self._idle.empty():
+            self._idle.get_nowait()
@@ -0,0 +1,415 @@
+"""
+Resource Limits Service Module
+
+Bounds what a single conversion may consume, so one malicious or
+pathological document cannot degrade the whole node. External converters
+used to run with nothing but a wall-clock timeout.
+
+1. Process pool workers (pdf, image, ...) run every engine call under
+   rlimits: address space, CPU time (counted from the start of the call) and
+   open files. The pdftoppm and tesseract processes a call starts inherit
+   them.
+2. soffice processes get the office engine's limits before they exec, so
+   soffice.bin and the helpers it spawns inherit them. A batch gets the CPU
+   time of one call per file. Warm pool instances serve many conversions,
+   so they only get the memory and open file limits;
+   LIBREOFFICE_CONVERSION_TIMEOUT bounds their time.
+3. Thread pool engines (office, ocr, zip) run inside the API process, which
+   cannot be limited per call. Tesseract runs of the ocr engine are not
+   limited either.
+
+A call that runs out of CPU time, address space or file descriptors fails
+with ResourceLimitError, which routes report like any other failed
+conversion.
+
+Every call also reports its CPU time (cpu_ms) and peak memory
+(peak_memory_mb) to the conversion history. When RESOURCE_CGROUP_DIR names a
+cgroup v2 directory delegated to the backend, process pool calls run in a
+cgroup of their own, which accounts for the worker and all its children.
+Otherwise the numbers come from getrusage() and /proc: the worker's peak, or
+that of its largest finished child if higher.
+
+rlimits and getrusage() exist on POSIX systems only. On Windows engine calls
+run without limits and report no CPU time or peak memory.
+
+Configuration (environment variables):
+- RESOURCE_LIMITS: "false" turns the limits off (usage is still reported)
+- RESOURCE_MEMORY_MB: address space per worker or subprocess (default 8192)
+- RESOURCE_CPU_SECONDS: CPU time per engine call (default 300)
+- RESOURCE_OPEN_FILES: open files per worker or subprocess (default 1024)
+- RESOURCE_<ENGINE>_MEMORY_MB, _CPU_SECONDS, _OPEN_FILES: per engine overrides
+- RESOURCE_CGROUP_DIR: delegated cgroup v2 directory for per-call accounting
+"""
+
+import errno
+import itertools
+import logging
+import math
+import os
+import signal
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from services.cancel_service import descendant_pids
+from services.metrics_service import metrics
+from services.timing_service import record
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Whether rlimits and getrusage() are available (not on Windows)
+POSIX_LIMITS = os.name == "posix" and resource is not None
+
+RESOURCE_LIMITS = os.getenv("RESOURCE_LIMITS", "true").lower() in ("1", "true", "yes", "on")
+RESOURCE_CGROUP_DIR = os.getenv("RESOURCE_CGROUP_DIR", "")
+
+DEFAULT_MEMORY_MB = 8192
+DEFAULT_CPU_SECONDS = 300
+DEFAULT_OPEN_FILES = 1024
+
+RESOURCE_MEMORY = "memory"
+RESOURCE_CPU = "cpu"
+RESOURCE_OPEN_FILES = "open_files"
+
+# How each resource is named in error messages, with the unit of its limit
+RESOURCE_DESCRIPTIONS = {
+    RESOURCE_MEMORY: ("memory", "MB"),
+    RESOURCE_CPU: ("CPU time", "s"),
+    RESOURCE_OPEN_FILES: ("open files", "files"),
+}
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+RESOURCE_LIMIT_EXCEEDED = metrics.counter(
+    "filelab_resource_limit_exceeded_total", "Engine calls stopped by a resource limit", ("engine", "resource")
+)
+
+
+@dataclass(frozen=True)
+class ResourceLimits:
+    """Limits of one engine call; 0 means unlimited"""
+    memory_mb: int = 0
+    cpu_seconds: int = 0
+    open_files: int = 0
+
+
+class ResourceLimitError(RuntimeError):
+    """An engine call exceeded one of its resource limits.
+
+    Raised in the worker and pickled back to the API process, so it keeps
+    its constructor arguments as args.
+    """
+
+    def __init__(self, resource_name: str, limit: int):
+        super().__init__(resource_name, limit)
+        self.resource = resource_name
+        self.limit = limit
+
+    def __str__(self) -> str:
+        description, unit = RESOURCE_DESCRIPTIONS[self.resource]
+        return f"Conversion exceeded its {description} limit ({self.limit} {unit})"
+
+
+class _CpuTimeExceeded(BaseException):
+    """Raised by the SIGXCPU handler; a BaseException so converter fallbacks do not catch it"""
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, default)))
+    except ValueError:
+        logger.warning(f"Invalid {name} value, using {default}")
+        return default
+
+
+_engine_limits: Dict[str, ResourceLimits] = {}
+
+
+def engine_limits(engine: str) -> ResourceLimits:
+    """Limits of the engine's calls, from RESOURCE_<ENGINE>_* or the global defaults"""
+    limits = _engine_limits.get(engine)
+    if limits is None:
+        if RESOURCE_LIMITS:
+            prefix = f"RESOURCE_{engine.upper()}"
+            limits = ResourceLimits(
+                memory_mb=_env_int(f"{prefix}_MEMORY_MB", _env_int("RESOURCE_MEMORY_MB", DEFAULT_MEMORY_MB)),
+                cpu_seconds=_env_int(f"{prefix}_CPU_SECONDS", _env_int("RESOURCE_CPU_SECONDS", DEFAULT_CPU_SECONDS)),
+                open_files=_env_int(f"{prefix}_OPEN_FILES", _env_int("RESOURCE_OPEN_FILES", DEFAULT_OPEN_FILES)),
+            )
+        else:
+            limits = ResourceLimits()
+        _engine_limits[engine] = limits
+    return limits
+
+
+# ============== Limits ==============
+
+def _soft_limits(limits: ResourceLimits, cpu_used: float = 0.0) -> Dict[int, int]:
+    """Soft rlimits for limits, with the CPU budget counted from cpu_used seconds"""
+    soft = {}
+    if limits.memory_mb:
+        soft[resource.RLIMIT_AS] = limits.memory_mb * 1024 * 1024
+    if limits.cpu_seconds:
+        soft[resource.RLIMIT_CPU] = math.ceil(cpu_used) + limits.cpu_seconds
+    if limits.open_files:
+        soft[resource.RLIMIT_NOFILE] = limits.open_files
+    return soft
+
+
+def _set_soft_limits(pid: int, soft: Dict[int, int]) -> Dict[int, int]:
+    """Set soft rlimits of pid (0: this process) below its hard limits; returns the previous ones.
+
+    Hard limits are left alone so the previous soft limits can be restored.
+    """
+    previous = {}
+    for rlimit, value in soft.items():
+        current, hard = resource.prlimit(pid, rlimit)
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+        resource.prlimit(pid, rlimit, (value, hard))
+        previous[rlimit] = current
+    return previous
+
+
+def _address_space_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[0]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def subprocess_limits(engine: str, cpu_calls: int = 1) -> Optional[Callable[[], None]]:
+    """preexec_fn applying the engine's limits to a subprocess before it runs (None: nothing to limit).
+
+    The limits are set between fork and exec, so every process the
+    subprocess spawns inherits them; limiting it by pid once started races
+    with the children it forks right away (soffice starting soffice.bin).
+    The CPU time limit covers cpu_calls engine calls, for processes doing
+    the work of several; 0 leaves it out, for processes serving many calls.
+    """
+    if not POSIX_LIMITS:
+        return None
+    limits = engine_limits(engine)
+    limits = replace(limits, cpu_seconds=limits.cpu_seconds * max(0, cpu_calls))
+    # Worked out here: the child runs nothing but setrlimit() before exec
+    rlimits = {}
+    for rlimit, value in _soft_limits(limits).items():
+        _, hard = resource.getrlimit(rlimit)
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+        rlimits[rlimit] = (value, hard)
+    if not rlimits:
+        return None
+
+    def apply_limits():
+        for rlimit, value in rlimits.items():
+            resource.setrlimit(rlimit, value)
+
+    return apply_limits
+
+
+def _handle_cpu_limit_signal(signum, frame):
+    raise _CpuTimeExceeded()
+
+
+def install_limit_handler():
+    """Process pool initializer: fail the running call instead of dying when its CPU time is up"""
+    if POSIX_LIMITS:
+        signal.signal(signal.SIGXCPU, _handle_cpu_limit_signal)
+
+
+def run_limited(limits: ResourceLimits, func: Callable, *args, **kwargs):
+    """Run an engine call under limits and record its usage (executed in a process pool worker)"""
+    if not POSIX_LIMITS:
+        return func(*args, **kwargs)
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    soft = _soft_limits(limits, cpu_used=own.ru_utime + own.ru_stime)
+    if resource.RLIMIT_AS in soft and _address_space_bytes(os.getpid()) >= soft[resource.RLIMIT_AS]:
+        # Every allocation would fail; RESOURCE_MEMORY_MB is set too low for this worker
+        logger.warning(f"Worker already maps more than {limits.memory_mb} MB, not limiting its address space")
+        del soft[resource.RLIMIT_AS]
+    previous = _set_soft_limits(0, soft)
+    try:
+        with measure_process():
+            return func(*args, **kwargs)
+    except _CpuTimeExceeded:
+        raise ResourceLimitError(RESOURCE_CPU, limits.cpu_seconds) from None
+    except MemoryError:
+        if resource.RLIMIT_AS not in soft:
+            raise
+        raise ResourceLimitError(RESOURCE_MEMORY, limits.memory_mb) from None
+    except OSError as e:
+        if e.errno != errno.EMFILE or resource.RLIMIT_NOFILE not in soft:
+            raise
+        raise ResourceLimitError(RESOURCE_OPEN_FILES, limits.open_files) from None
+    finally:
+        _set_soft_limits(0, previous)
+
+
+def run_measured(func: Callable, *args, **kwargs):
+    """Run an engine call and record its CPU time (executed in a thread pool worker)"""
+    with measure_thread():
+        return func(*args, **kwargs)
+
+
+# ============== Accounting ==============
+
+def _record_usage(cpu_seconds: float, peak_bytes: Optional[int]):
+    record("cpu_ms", round(cpu_seconds * 1000, 1))
+    if peak_bytes:
+        record("peak_memory_mb", round(peak_bytes / (1024 * 1024), 1))
+
+
+def _cpu_seconds(usage: "resource.struct_rusage") -> float:
+    return usage.ru_utime + usage.ru_stime
+
+
+def _reset_peak_memory(pid: int):
+    """Restart the peak resident memory (VmHWM) of pid from its current size"""
+    try:
+        with open(f"/proc/{pid}/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_memory_bytes(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, IndexError, ValueError):
+        pass
+    return None
+
+
+def _process_cpu_seconds(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # utime and stime are the 12th and 13th fields after the parenthesized command name
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+class _CallCgroup:
+    """cgroup v2 holding this worker process, and the children it starts, for one engine call"""
+
+    _calls = itertools.count()
+    _unavailable = False
+
+    def __init__(self, path: Path, home: Path):
+        self.path = path
+        self.home = home
+
+    @classmethod
+    def enter(cls) -> Optional["_CallCgroup"]:
+        if not RESOURCE_CGROUP_DIR or cls._unavailable:
+            return None
+        base = Path(RESOURCE_CGROUP_DIR)
+        pid = os.getpid()
+        # Processes may only live in leaf cgroups, so workers wait between calls in one of their own
+        home = base / f"worker-{pid}"
+        path = base / f"call-{pid}-{next(cls._calls)}"
+        try:
+            if not home.exists():
+                (base / "cgroup.subtree_control").write_text("+memory +cpu")
+                home.mkdir()
+                (home / "cgroup.procs").write_text(str(pid))
+            path.mkdir()
+            (path / "cgroup.procs").write_text(str(pid))
+        except OSError as e:
+            logger.warning(f"cgroup accounting unavailable in {base}, using getrusage: {e}")
+            cls._unavailable = True
+            try:
+                path.rmdir()
+            except OSError:
+                pass
+            return None
+        return cls(path, home)
+
+    def leave(self) -> Optional[Tuple[float, int]]:
+        """Move the worker back home and return the call's (CPU seconds, peak memory bytes)"""
+        try:
+            peak = int((self.path / "memory.peak").read_text())
+            stat = dict(line.split() for line in (self.path / "cpu.stat").read_text().splitlines())
+            usage = (int(stat["usage_usec"]) / 1_000_000, peak)
+        except (OSError, KeyError, ValueError):
+            usage = None
+        try:
+            (self.home / "cgroup.procs").write_text(str(os.getpid()))
+            self.path.rmdir()
+        except OSError as e:
+            # Children still running keep the cgroup busy; it stays until they are gone
+            logger.debug(f"Could not remove cgroup {self.path}: {e}")
+        return usage
+
+
+@contextmanager
+def measure_process() -> Iterator[None]:
+    """Record the CPU time and peak memory of this process and its children during the block"""
+    cgroup = _CallCgroup.enter()
+    _reset_peak_memory(os.getpid())
+    before_self = resource.getrusage(resource.RUSAGE_SELF)
+    before_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    try:
+        yield
+    finally:
+        usage = cgroup.leave() if cgroup is not None else None
+        if usage is None:
+            after_self = resource.getrusage(resource.RUSAGE_SELF)
+            after_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+            cpu_seconds = (
+                _cpu_seconds(after_self) - _cpu_seconds(before_self)
+                + _cpu_seconds(after_children) - _cpu_seconds(before_children)
+            )
+            peak = _peak_memory_bytes(os.getpid()) or after_self.ru_maxrss * 1024
+            # ru_maxrss of children is their largest peak ever; it only tells about this call if it grew
+            if after_children.ru_maxrss > before_children.ru_maxrss:
+                peak = max(peak, after_children.ru_maxrss * 1024)
+            usage = (cpu_seconds, peak)
+        _record_usage(*usage)
+
+
+@contextmanager
+def measure_thread() -> Iterator[None]:
+    """Record the CPU time of the current thread during the block"""
+    if not POSIX_LIMITS or not hasattr(resource, "RUSAGE_THREAD"):
+        yield
+        return
+    before = resource.getrusage(resource.RUSAGE_THREAD)
+    try:
+        yield
+    finally:
+        _record_usage(_cpu_seconds(resource.getrusage(resource.RUSAGE_THREAD)) - _cpu_seconds(before), None)
+
+
+@contextmanager
+def measure_process_tree(pid: int) -> Iterator[None]:
+    """Record the CPU time and peak memory of a running process and its descendants during the block"""
+    pids = [pid, *descendant_pids(pid)]
+    cpu_before = {}
+    for tree_pid in pids:
+        _reset_peak_memory(tree_pid)
+        cpu_before[tree_pid] = _process_cpu_seconds(tree_pid) or 0.0
+    try:
+        yield
+    finally:
+        cpu_seconds = 0.0
+        peak = 0
+        for tree_pid in [pid, *descendant_pids(pid)]:
+            cpu_now = _process_cpu_seconds(tree_pid)
+            if cpu_now is not None:
+                cpu_seconds += max(0.0, cpu_now - cpu_before.get(tree_pid, 0.0))
+            peak = max(peak, _peak_memory_bytes(tree_pid) or 0)
+        _record_usage(cpu_seconds, peak)
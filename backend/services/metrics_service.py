@@ -0,0 +1,403 @@
+"""
+Metrics Service Module
+
+This module provides a small, dependency-free metrics registry rendered in
+the Prometheus text exposition format (served at /api/metrics):
+
+1. Counters, gauges and histograms with labels
+2. Collectors - callbacks evaluated at scrape time for state owned by other
+   services (cache, history writer, job queue, process RSS and open fds)
+3. MetricsMiddleware - request counts, latencies and in-flight requests per
+   route template
+4. EventLoopMonitor - measures how late the event loop wakes up a sleeping
+   task, i.e. how long callbacks are blocked by synchronous work
+5. time_subprocess() - durations of LibreOffice and Tesseract runs
+
+Metrics are kept per process. With several uvicorn workers every worker
+exposes its own values and the scraper aggregates them. Engine functions
+that run in process pools report their subprocess durations back through
+the timing context (see services/timing_service.py), so they are counted
+in the API process as well.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from services.timing_service import record_worker_event
+
+try:
+    import resource
+except ImportError:
+    # Windows: no getrusage(), so the process CPU and peak RSS metrics are left out
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets in seconds, from fast PDF operations to long LibreOffice runs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+EVENT_LOOP_MONITOR_INTERVAL = float(os.getenv("EVENT_LOOP_MONITOR_INTERVAL_SECONDS", "0.5"))
+
+SUBPROCESS_EVENT = "_subprocesses"
+
+LabelValues = Tuple[str, ...]
+# A collector returns (name, type, help, [(labels, value), ...]) for each metric family
+Sample = Tuple[Dict[str, str], float]
+Family = Tuple[str, str, str, List[Sample]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value"""
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}" for key, value in values]
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed buckets"""
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> (per-bucket counts, sum, count)
+        self._values: Dict[LabelValues, List] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(state[0]), state[1], state[2])) for key, state in self._values.items())
+        lines = []
+        for key, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every metric and collector and renders them for a scrape"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[Family]]):
+        """Register a callback returning metric families computed at scrape time"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+                continue
+            for name, metric_type, documentation, samples in families:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Shared registry used by the API server
+metrics = MetricsRegistry()
+
+HTTP_REQUESTS = metrics.counter(
+    "filelab_http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = metrics.histogram(
+    "filelab_http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+HTTP_IN_PROGRESS = metrics.gauge(
+    "filelab_http_requests_in_progress", "HTTP requests currently being handled", ("method",)
+)
+ENGINE_CALLS = metrics.counter(
+    "filelab_engine_calls_total", "Engine function calls by outcome", ("engine", "function", "status")
+)
+ENGINE_DURATION = metrics.histogram(
+    "filelab_engine_duration_seconds", "Time spent running engine functions in their pool", ("engine", "function")
+)
+ENGINE_QUEUE_WAIT = metrics.histogram(
+    "filelab_engine_queue_wait_seconds", "Time engine calls waited for a free pool worker", ("engine",)
+)
+ENGINE_IN_FLIGHT = metrics.gauge(
+    "filelab_engine_in_flight", "Engine calls submitted and not yet finished (running or queued)", ("engine",)
+)
+SUBPROCESS_DURATION = metrics.histogram(
+    "filelab_subprocess_duration_seconds", "Duration of external converter runs", ("program",)
+)
+EVENT_LOOP_LAG = metrics.histogram(
+    "filelab_event_loop_lag_seconds", "How late the event loop woke up a sleeping task",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+EVENT_LOOP_LAG_LAST = metrics.gauge(
+    "filelab_event_loop_lag_last_seconds", "Most recent event loop lag measurement"
+)
+
+
+# ============== Subprocess Timing ==============
+
+def observe_subprocess(program: str, seconds: float):
+    """Record an external program run (deferred to the API process when called in a pool worker)"""
+    if not record_worker_event(SUBPROCESS_EVENT, (program, seconds)):
+        SUBPROCESS_DURATION.observe(seconds, program=program)
+
+
+def observe_worker_subprocesses(events: Optional[List[Tuple[str, float]]]):
+    """Record subprocess runs reported back by an engine worker"""
+    for program, seconds in events or ():
+        SUBPROCESS_DURATION.observe(seconds, program=program)
+
+
+@contextmanager
+def time_subprocess(program: str) -> Iterator[None]:
+    """Time an external program run (soffice, tesseract, ...)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_subprocess(program, time.perf_counter() - started)
+
+
+# ============== HTTP Middleware ==============
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts and latencies per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+
+        async def tracking_send(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc(method=method)
+        try:
+            await self.app(scope, receive, tracking_send)
+        finally:
+            HTTP_IN_PROGRESS.dec(method=method)
+            # Route templates keep label cardinality bounded (no ids in paths)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUESTS.inc(method=method, route=route_path, status=str(status_code))
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, method=method, route=route_path)
+
+
+# ============== Event Loop Lag ==============
+
+class EventLoopMonitor:
+    """Background task measuring event loop lag"""
+
+    def __init__(self, interval: float = EVENT_LOOP_MONITOR_INTERVAL):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            EVENT_LOOP_LAG.observe(lag)
+            EVENT_LOOP_LAG_LAST.set(lag)
+
+    def start(self):
+        """Start the monitor on the running event loop"""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+# ============== Process Metrics ==============
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _resident_memory_bytes() -> Optional[float]:
+    try:
+        with open("/proc/self/statm") as f:
+            return float(int(f.read().split()[1]) * _PAGE_SIZE)
+    except (OSError, IndexError, ValueError):
+        if resource is None:
+            return None
+        # Not Linux: fall back to peak RSS (kilobytes on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return float(peak if os.uname().sysname == "Darwin" else peak * 1024)
+
+
+def _open_fds() -> Optional[float]:
+    for fd_dir in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return float(len(os.listdir(fd_dir)))
+        except OSError:
+            continue
+    return None
+
+
+_PROCESS_START_TIME = time.time()
+
+
+def collect_process_metrics() -> Iterable[Family]:
+    """RSS, open file descriptors, CPU time and start time of this process"""
+    families: List[Family] = [
+        ("process_start_time_seconds", "gauge", "Start time of this process since the Unix epoch",
+         [({}, _PROCESS_START_TIME)]),
+    ]
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        families.append(("process_cpu_seconds_total", "counter", "User and system CPU time of this process",
+                         [({}, usage.ru_utime + usage.ru_stime)]))
+    rss = _resident_memory_bytes()
+    if rss is not None:
+        families.append(("process_resident_memory_bytes", "gauge", "Resident memory size", [({}, rss)]))
+    fds = _open_fds()
+    if fds is not None:
+        families.append(("process_open_fds", "gauge", "Open file descriptors", [({}, fds)]))
+    return families
+
+
+metrics.add_collector(collect_process_metrics)
@@ -0,0 +1,160 @@
+"""
+Priority Service Module
+
+Classifies every request into a priority class and identifies its client,
+so the engine wait queues (services/admission_service.py) can serve small,
+latency-sensitive requests ahead of bulk work:
+
+1. interactive: previews and single-image operations a user waits on
+   (/watermark/pdf/preview, /image/resize, ...)
+2. standard: everything not listed otherwise
+3. bulk: multi-file batches, heavy conversions (pdf-to-pptx, pdf-to-xlsx),
+   pipelines, background jobs, and any request whose body is larger than
+   PRIORITY_BULK_MB
+
+Classes are weighted (PRIORITY_WEIGHT_<CLASS>): with the defaults an
+interactive request waiting next to bulk ones gets 8 of every 9 free slots,
+and bulk work still progresses. Within a class, clients share slots fairly,
+so one client's 50-image batch does not hold up another client's request.
+
+Clients are identified by the first X-Forwarded-For address (the nginx proxy
+in front of the backend sets it; PRIORITY_CLIENT_HEADER changes or, when
+empty, disables this) or else the peer address. Clients may ask for a lower
+class with "X-Priority: bulk"; asking for a higher one is ignored.
+"""
+
+import logging
+import os
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_STANDARD = "standard"
+PRIORITY_BULK = "bulk"
+
+# Highest priority first
+PRIORITY_CLASSES = (PRIORITY_INTERACTIVE, PRIORITY_STANDARD, PRIORITY_BULK)
+
+DEFAULT_PRIORITY_WEIGHTS = {PRIORITY_INTERACTIVE: 8, PRIORITY_STANDARD: 4, PRIORITY_BULK: 1}
+
+# Request paths (exact) of each class; anything else is standard
+DEFAULT_INTERACTIVE_PATHS = (
+    "/api/watermark/pdf/preview",
+    "/api/image/resize",
+    "/api/convert/image",
+    "/api/image-to-pdf",
+    "/api/ocr/detect-language",
+    "/api/search/pdf",
+    "/api/pdf/lock",
+    "/api/pdf/unlock",
+)
+DEFAULT_BULK_PATHS = (
+    "/api/images-to-pdf",
+    "/api/images-to-pdf-individual",
+    "/api/images/resize",
+    "/api/convert/office/batch",
+    "/api/pdf-to-pptx",
+    "/apiconvert/pdf-to-xlsx",
+    "/api/pipeline",
+    "/api/zip/compress",
+    "/api/zip/extract",
+)
+
+
+def _env_paths(name: str, default: Tuple[str, ...]) -> Tuple[str, ...]:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return tuple(path.strip() for path in value.split(",") if path.strip())
+
+
+def _env_weight(priority: str) -> int:
+    default = DEFAULT_PRIORITY_WEIGHTS[priority]
+    try:
+        return max(1, int(os.getenv(f"PRIORITY_WEIGHT_{priority.upper()}", default)))
+    except ValueError:
+        logger.warning(f"Invalid PRIORITY_WEIGHT_{priority.upper()} value, using {default}")
+        return default
+
+
+PRIORITY_WEIGHTS: Dict[str, int] = {priority: _env_weight(priority) for priority in PRIORITY_CLASSES}
+INTERACTIVE_PATHS = frozenset(_env_paths("PRIORITY_INTERACTIVE_PATHS", DEFAULT_INTERACTIVE_PATHS))
+BULK_PATHS = frozenset(_env_paths("PRIORITY_BULK_PATHS", DEFAULT_BULK_PATHS))
+
+# Request bodies larger than this are bulk whatever their route (default 20MB)
+PRIORITY_BULK_BYTES = int(os.getenv("PRIORITY_BULK_MB", "20")) * 1024 * 1024
+
+PRIORITY_CLIENT_HEADER = os.getenv("PRIORITY_CLIENT_HEADER", "X-Forwarded-For").strip().lower()
+
+_priority: ContextVar[str] = ContextVar("request_priority", default=PRIORITY_STANDARD)
+_client: ContextVar[str] = ContextVar("request_client", default="")
+
+
+def current_priority() -> str:
+    """Priority class of the current request (standard outside a request)"""
+    return _priority.get()
+
+
+def current_client() -> str:
+    """Client the current request is accounted to ("" outside a request)"""
+    return _client.get()
+
+
+def set_priority(priority: str):
+    """Change the priority class of the current task (e.g. background jobs run as bulk)"""
+    _priority.set(priority)
+
+
+def lower_priority(first: str, second: str) -> str:
+    return max(first, second, key=PRIORITY_CLASSES.index)
+
+
+def classify_request(path: str, headers: Dict[str, str]) -> str:
+    """Priority class for a request, from its path, body size and X-Priority header"""
+    if path in BULK_PATHS:
+        priority = PRIORITY_BULK
+    elif path in INTERACTIVE_PATHS:
+        priority = PRIORITY_INTERACTIVE
+    else:
+        priority = PRIORITY_STANDARD
+
+    try:
+        if int(headers.get("content-length", 0)) > PRIORITY_BULK_BYTES:
+            priority = PRIORITY_BULK
+    except ValueError:
+        pass
+
+    requested = headers.get("x-priority", "").strip().lower()
+    if requested in PRIORITY_CLASSES:
+        priority = lower_priority(priority, requested)
+    return priority
+
+
+def identify_client(headers: Dict[str, str], peer: Optional[Tuple[str, int]]) -> str:
+    if PRIORITY_CLIENT_HEADER:
+        forwarded = headers.get(PRIORITY_CLIENT_HEADER, "").split(",")[0].strip()
+        if forwarded:
+            return forwarded
+    return peer[0] if peer else ""
+
+
+class RequestPriorityMiddleware:
+    """ASGI middleware that sets the priority class and client of each HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+        priority_token = _priority.set(classify_request(scope["path"], headers))
+        client_token = _client.set(identify_client(headers, scope.get("client")))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _priority.reset(priority_token)
+            _client.reset(client_token)
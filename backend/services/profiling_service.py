@@ -0,0 +1,215 @@
+"""
+Profiling Service Module
+
+This module provides opt-in profiling of individual conversion requests:
+
+1. A client asks for a profile with the X-Profile: 1 header or ?profile=1
+2. ProfilingMiddleware assigns the request a profile id (returned in the
+   X-Profile-Id response header)
+3. Every engine call made for that request runs under cProfile inside its
+   pool worker (see run_profiled), and the stats are written to
+   TEMP_DIR/profiles/<profile id>/ - background jobs submitted with the flag
+   are profiled under the submitting request's id
+4. Admin endpoints list the stored profiles, render a pstats summary and
+   download the raw .prof files (for snakeviz, pstats, ...)
+
+Profiling is off unless PROFILING_ENABLED is set. When PROFILING_ADMIN_TOKEN
+is set, both requesting a profile and reading profiles require the token in
+the X-Admin-Token header.
+
+Configuration (environment variables):
+- PROFILING_ENABLED: allow profiled requests and the admin endpoints
+- PROFILING_ADMIN_TOKEN: shared secret for profiling (recommended in production)
+- PROFILING_TOP_N: functions listed in a profile summary
+"""
+
+import cProfile
+import hmac
+import io
+import logging
+import os
+import pstats
+import re
+import time
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from services.temp_service import PROFILES_DIR_NAME, TEMP_DIR
+from services.timing_service import run_instrumented
+
+logger = logging.getLogger(__name__)
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").strip().lower() in ("1", "true", "yes", "on")
+PROFILING_ADMIN_TOKEN = os.getenv("PROFILING_ADMIN_TOKEN", "")
+PROFILING_TOP_N = int(os.getenv("PROFILING_TOP_N", "40"))
+
+PROFILES_DIR = TEMP_DIR / PROFILES_DIR_NAME
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+PROFILE_FILE_PATTERN = re.compile(r"^[0-9]{3}_[A-Za-z0-9_]+\.prof$")
+SORT_KEYS = ("cumulative", "tottime", "calls")
+
+TRUE_VALUES = ("1", "true", "yes", "on")
+
+# Active profile for the current request: {"id": ..., "dir": Path, "calls": int}
+_active_profile: ContextVar[Optional[Dict[str, Any]]] = ContextVar("active_profile", default=None)
+
+
+def check_admin_token(token: Optional[str]) -> bool:
+    """True if token grants access to profiling (always true when no token is configured)"""
+    if not PROFILING_ADMIN_TOKEN:
+        return True
+    return token is not None and hmac.compare_digest(token, PROFILING_ADMIN_TOKEN)
+
+
+def profiling_active() -> bool:
+    """True while handling a request that asked to be profiled"""
+    return _active_profile.get() is not None
+
+
+def next_profile_path(function: str) -> Optional[Path]:
+    """Where to write the profile of the next engine call, or None when not profiling"""
+    profile = _active_profile.get()
+    if profile is None:
+        return None
+    profile["calls"] += 1
+    profile["dir"].mkdir(parents=True, exist_ok=True)
+    safe_function = re.sub(r"[^A-Za-z0-9_]", "_", function)
+    return profile["dir"] / f"{profile['calls']:03d}_{safe_function}.prof"
+
+
+def run_profiled(profile_path: str, func: Callable[..., Any], *args, **kwargs) -> Tuple[Any, Dict[str, Any]]:
+    """run_instrumented() under cProfile, writing the stats to profile_path (executed in the worker)"""
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # Python 3.12+ allows one active profiler per process (concurrent profiled calls)
+        logger.warning(f"Profiling skipped for {getattr(func, '__name__', func)}: {e}")
+        return run_instrumented(func, *args, **kwargs)
+    try:
+        return run_instrumented(func, *args, **kwargs)
+    finally:
+        profiler.disable()
+        try:
+            profiler.dump_stats(profile_path)
+        except OSError as e:
+            logger.warning(f"Failed to write profile {profile_path}: {e}")
+
+
+def _wants_profile(scope) -> bool:
+    for name, value in scope.get("headers", []):
+        if name == b"x-profile":
+            return value.decode("latin-1").strip().lower() in TRUE_VALUES
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return any(value.strip().lower() in TRUE_VALUES for value in query.get("profile", []))
+
+
+def _header(scope, wanted: bytes) -> Optional[str]:
+    for name, value in scope.get("headers", []):
+        if name == wanted:
+            return value.decode("latin-1")
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that turns on profiling for requests carrying the
+    profile flag and reports the profile id in the X-Profile-Id header.
+    """
+
+    def __init__(self, app, profiles_dir: Path = PROFILES_DIR, enabled: bool = PROFILING_ENABLED):
+        self.app = app
+        self.profiles_dir = profiles_dir
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not self.enabled
+            or not _wants_profile(scope)
+            or not check_admin_token(_header(scope, b"x-admin-token"))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        token = _active_profile.set({"id": profile_id, "dir": self.profiles_dir / profile_id, "calls": 0})
+
+        async def profile_send(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode()))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, profile_send)
+        finally:
+            _active_profile.reset(token)
+
+
+# ============== Reading Profiles ==============
+
+def list_profiles(profiles_dir: Path = PROFILES_DIR) -> List[Dict[str, Any]]:
+    """Stored profiles, newest first"""
+    profiles = []
+    try:
+        entries = list(profiles_dir.iterdir())
+    except FileNotFoundError:
+        return []
+    for entry in entries:
+        if not entry.is_dir() or not PROFILE_ID_PATTERN.match(entry.name):
+            continue
+        files = sorted(path.name for path in entry.iterdir() if PROFILE_FILE_PATTERN.match(path.name))
+        profiles.append({
+            "id": entry.name,
+            "created_at": entry.stat().st_mtime,
+            "files": files,
+        })
+    profiles.sort(key=lambda profile: profile["created_at"], reverse=True)
+    for profile in profiles:
+        profile["created_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(profile["created_at"]))
+    return profiles
+
+
+def profile_file_path(profile_id: str, filename: str, profiles_dir: Path = PROFILES_DIR) -> Optional[Path]:
+    """Validated path of a stored .prof file, or None"""
+    if not PROFILE_ID_PATTERN.match(profile_id) or not PROFILE_FILE_PATTERN.match(filename):
+        return None
+    path = profiles_dir / profile_id / filename
+    return path if path.is_file() else None
+
+
+def profile_summary(
+    profile_id: str,
+    sort: str = "cumulative",
+    top_n: int = PROFILING_TOP_N,
+    profiles_dir: Path = PROFILES_DIR
+) -> Optional[Dict[str, Any]]:
+    """pstats text report for every engine call of a profile, or None if it does not exist"""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    profile_dir = profiles_dir / profile_id
+    if not profile_dir.is_dir():
+        return None
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of: {', '.join(SORT_KEYS)}")
+
+    calls = []
+    for path in sorted(profile_dir.iterdir()):
+        if not PROFILE_FILE_PATTERN.match(path.name):
+            continue
+        output = io.StringIO()
+        stats = pstats.Stats(str(path), stream=output)
+        stats.strip_dirs().sort_stats(sort).print_stats(top_n)
+        calls.append({
+            "file": path.name,
+            "function": path.stem.split("_", 1)[1],
+            "total_seconds": round(stats.total_tt, 4),
+            "report": output.getvalue(),
+        })
+    return {"id": profile_id, "sort": sort, "calls": calls}
@@ -0,0 +1,419 @@
+"""
+Temp Storage Service Module
+
+This module manages the lifecycle of files under TEMP_DIR:
+
+1. Sharded layout - temp_file_path() spreads uploads and outputs over 256
+   subdirectories so no single directory grows to hundreds of thousands of
+   entries
+2. Request cleanup - uploads and FileResponse outputs are deleted once the
+   response has been sent (RequestTempFilesMiddleware, TempFileResponse)
+3. Janitor - a background task that removes artifacts older than their TTL
+   and evicts the oldest artifacts when TEMP_DIR exceeds its disk quota.
+   Files still in use are never removed: request files until their response
+   has been sent (touched regularly, so the janitors of other processes
+   sharing TEMP_DIR see them as fresh), job files until their job has
+   finished
+
+Reserved top-level directories have their own lifecycle: "cache" is
+size-bounded by the conversion cache and never touched here, "libreoffice"
+holds warm worker profiles (only leftover one-off job scratch is swept),
+"jobs" keeps background job inputs and results for a longer TTL,
+"profiles" holds opt-in request profiles, "cancelled" the short-lived
+markers of cancelled engine calls (services/cancel_service.py) and "queue"
+the SQLite job store (JOB_STORE=sqlite).
+
+Configuration (environment variables):
+- TEMP_FILE_TTL_MINUTES: uploads and conversion outputs
+- TEMP_EXTRACTION_TTL_MINUTES: /zip/extract sessions
+- TEMP_JOB_TTL_HOURS: background job inputs and results
+- TEMP_SCRATCH_TTL_MINUTES: leftover LibreOffice job directories
+- TEMP_PROFILE_TTL_HOURS: stored request profiles
+- TEMP_DIR_QUOTA_MB: disk quota for TEMP_DIR (0 disables the quota)
+- TEMP_JANITOR_INTERVAL_SECONDS: how often the janitor runs
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from starlette.background import BackgroundTask
+from starlette.responses import FileResponse
+
+logger = logging.getLogger(__name__)
+
+# Must match the TEMP_DIR used by server.py
+TEMP_DIR = Path(os.getenv("TEMP_DIR", Path.cwd() / "tmp" / "file_conversions"))
+
+TEMP_FILE_TTL = float(os.getenv("TEMP_FILE_TTL_MINUTES", "60")) * 60
+TEMP_EXTRACTION_TTL = float(os.getenv("TEMP_EXTRACTION_TTL_MINUTES", "120")) * 60
+TEMP_JOB_TTL = float(os.getenv("TEMP_JOB_TTL_HOURS", "24")) * 3600
+TEMP_SCRATCH_TTL = float(os.getenv("TEMP_SCRATCH_TTL_MINUTES", "60")) * 60
+TEMP_PROFILE_TTL = float(os.getenv("TEMP_PROFILE_TTL_HOURS", "24")) * 3600
+TEMP_DIR_QUOTA = int(os.getenv("TEMP_DIR_QUOTA_MB", "10240")) * 1024 * 1024
+TEMP_JANITOR_INTERVAL = float(os.getenv("TEMP_JANITOR_INTERVAL_SECONDS", "300"))
+
+# Never evict artifacts younger than this for quota reasons; they may be in use
+QUOTA_MIN_AGE = 300
+
+# How often files in use are touched, well within QUOTA_MIN_AGE
+IN_USE_TOUCH_INTERVAL = QUOTA_MIN_AGE / 3
+
+CACHE_DIR_NAME = "cache"
+LIBREOFFICE_DIR_NAME = "libreoffice"
+JOBS_DIR_NAME = "jobs"
+PROFILES_DIR_NAME = "profiles"
+CANCELLED_DIR_NAME = "cancelled"
+QUEUE_DIR_NAME = "queue"
+RESERVED_DIRS = {
+    CACHE_DIR_NAME, LIBREOFFICE_DIR_NAME, JOBS_DIR_NAME, PROFILES_DIR_NAME, CANCELLED_DIR_NAME, QUEUE_DIR_NAME
+}
+
+EXTRACTION_SUFFIX = "_extracted"
+
+
+def _shard_name(name: str) -> str:
+    return hashlib.md5(name.encode("utf-8")).hexdigest()[:2]
+
+
+def _is_shard_dir(path: Path) -> bool:
+    return len(path.name) == 2 and all(c in "0123456789abcdef" for c in path.name)
+
+
+# Paths handed out by temp_file_path() in this thread, while collect_temp_paths() is active
+_collected_paths = threading.local()
+
+
+def temp_file_path(name: str, base_dir: Path = TEMP_DIR) -> Path:
+    """Path for a temp artifact, placed in its shard subdirectory of base_dir.
+
+    The shard is derived from the name, so the same name always maps to the
+    same path (used to find /zip/extract sessions again).
+    """
+    shard_dir = base_dir / _shard_name(name)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    path = shard_dir / name
+    collected = getattr(_collected_paths, "paths", None)
+    if collected is not None:
+        collected.append(path)
+    return path
+
+
+@contextmanager
+def collect_temp_paths() -> Iterator[List[Path]]:
+    """Collect the temp paths created in this thread, e.g. to delete a cancelled call's partial output"""
+    paths: List[Path] = []
+    _collected_paths.paths = paths
+    try:
+        yield paths
+    finally:
+        _collected_paths.paths = None
+
+
+def remove_path(path: Path):
+    """Delete a temp file or directory, ignoring ones that are already gone"""
+    try:
+        if path.is_dir() and not path.is_symlink():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning(f"Failed to remove temp path {path}: {e}")
+
+
+# ============== Request Cleanup ==============
+
+_request_files: ContextVar[Optional[List[Path]]] = ContextVar("request_temp_files", default=None)
+
+# Files of the requests in flight in this process, with the number of requests using each
+_files_in_use: Dict[Path, int] = {}
+_files_in_use_lock = threading.Lock()
+
+
+def _use_file(path: Path):
+    with _files_in_use_lock:
+        _files_in_use[path] = _files_in_use.get(path, 0) + 1
+
+
+def _release_file(path: Path):
+    with _files_in_use_lock:
+        users = _files_in_use.get(path, 0) - 1
+        if users > 0:
+            _files_in_use[path] = users
+        else:
+            _files_in_use.pop(path, None)
+
+
+def files_in_use() -> Set[Path]:
+    """Request files of this process that the janitor must leave alone"""
+    with _files_in_use_lock:
+        return set(_files_in_use)
+
+
+def track_request_file(path: Path):
+    """Delete path once the current request's response has been sent"""
+    files = _request_files.get()
+    if files is not None:
+        files.append(path)
+        _use_file(path)
+
+
+def untrack_request_file(path: Path):
+    """Keep a file beyond the current request (e.g. handed to a background job)"""
+    files = _request_files.get()
+    if files is not None and path in files:
+        files.remove(path)
+        _release_file(path)
+
+
+class RequestTempFilesMiddleware:
+    """
+    ASGI middleware that deletes the files a request registered with
+    track_request_file() after the response has been fully sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        files: List[Path] = []
+        token = _request_files.set(files)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_files.reset(token)
+            for path in files:
+                remove_path(path)
+                _release_file(path)
+
+
+class TempFileResponse(FileResponse):
+    """FileResponse that deletes its file after it has been sent"""
+
+    def __init__(self, path, *args, **kwargs):
+        kwargs.setdefault("background", BackgroundTask(remove_path, Path(path)))
+        super().__init__(path, *args, **kwargs)
+
+
+# ============== Janitor ==============
+
+def _entry_size(path: Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _job_id(job_file: Path) -> str:
+    """Job id of a file in jobs/ (named <job id>_input.<ext> or <job id>_result.<ext>)"""
+    return job_file.name.split("_", 1)[0]
+
+
+class TempJanitor:
+    """
+    Removes expired temp artifacts and enforces the TEMP_DIR disk quota.
+
+    An artifact is a top-level file or directory inside a shard (or, for
+    files written before sharding, directly inside TEMP_DIR), a job file in
+    jobs/, a profile directory in profiles/, or a one-off LibreOffice job
+    directory.
+
+    active_job_ids returns the ids of the jobs still queued or running; their
+    files are kept whatever their age. When it is not given or fails, no job
+    file is evicted for quota reasons.
+    """
+
+    def __init__(
+        self,
+        base_dir: Path = TEMP_DIR,
+        file_ttl: float = TEMP_FILE_TTL,
+        extraction_ttl: float = TEMP_EXTRACTION_TTL,
+        job_ttl: float = TEMP_JOB_TTL,
+        scratch_ttl: float = TEMP_SCRATCH_TTL,
+        profile_ttl: float = TEMP_PROFILE_TTL,
+        quota_bytes: int = TEMP_DIR_QUOTA,
+        interval: float = TEMP_JANITOR_INTERVAL,
+        active_job_ids: Optional[Callable[[], Awaitable[Set[str]]]] = None
+    ):
+        self.base_dir = base_dir
+        self.file_ttl = file_ttl
+        self.extraction_ttl = extraction_ttl
+        self.job_ttl = job_ttl
+        self.scratch_ttl = scratch_ttl
+        self.profile_ttl = profile_ttl
+        self.quota_bytes = quota_bytes
+        self.interval = interval
+        self.active_job_ids = active_job_ids
+        # Size of quota-counted artifacts after the last sweep (None before the first one)
+        self.last_usage_bytes: Optional[int] = None
+        self.expired_total = 0
+        self.evicted_total = 0
+        self._task: Optional[asyncio.Task] = None
+        self._touch_task: Optional[asyncio.Task] = None
+
+    def _artifacts(self) -> List[Tuple[Path, float, bool]]:
+        """List (path, ttl, counts towards quota) for every artifact"""
+        artifacts = []
+
+        def add_children(directory: Path, ttl_for):
+            try:
+                entries = list(directory.iterdir())
+            except FileNotFoundError:
+                return
+            for entry in entries:
+                ttl, in_quota = ttl_for(entry)
+                artifacts.append((entry, ttl, in_quota))
+
+        def shard_entry_ttl(entry: Path):
+            if entry.name.endswith(EXTRACTION_SUFFIX):
+                return self.extraction_ttl, True
+            return self.file_ttl, True
+
+        for entry in list(self.base_dir.iterdir()):
+            if entry.name in RESERVED_DIRS:
+                continue
+            if entry.is_dir() and _is_shard_dir(entry):
+                add_children(entry, shard_entry_ttl)
+            else:
+                ttl, in_quota = shard_entry_ttl(entry)
+                artifacts.append((entry, ttl, in_quota))
+
+        add_children(self.base_dir / JOBS_DIR_NAME, lambda entry: (self.job_ttl, True))
+        add_children(self.base_dir / PROFILES_DIR_NAME, lambda entry: (self.profile_ttl, True))
+        add_children(
+            self.base_dir / LIBREOFFICE_DIR_NAME / "jobs",
+            lambda entry: (self.scratch_ttl, False)
+        )
+        return artifacts
+
+    def run_once(self, active_job_ids: Optional[Set[str]] = None) -> Dict[str, int]:
+        """Sweep TEMP_DIR once.
+
+        Args:
+            active_job_ids: Jobs still queued or running, whose files are kept
+                (None when unknown: then no job file is evicted for the quota)
+
+        Returns:
+            Counts of expired and evicted artifacts and bytes freed
+        """
+        now = time.time()
+        expired = 0
+        evicted = 0
+        freed = 0
+        survivors = []
+        in_use = files_in_use()
+        jobs_dir = self.base_dir / JOBS_DIR_NAME
+
+        for path, ttl, in_quota in self._artifacts():
+            try:
+                mtime = path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            is_job_file = path.parent == jobs_dir
+            if path in in_use or (is_job_file and active_job_ids is not None and _job_id(path) in active_job_ids):
+                # Counted towards the quota, but never removed
+                evictable = False
+            elif now - mtime > ttl:
+                freed += _entry_size(path)
+                remove_path(path)
+                expired += 1
+                continue
+            else:
+                evictable = not (is_job_file and active_job_ids is None)
+            if in_quota:
+                survivors.append((mtime, path, evictable))
+
+        sized = []
+        total = 0
+        for mtime, path, evictable in survivors:
+            try:
+                size = _entry_size(path)
+            except FileNotFoundError:
+                continue
+            sized.append((mtime, path, size, evictable))
+            total += size
+
+        if self.quota_bytes > 0:
+            # Oldest first, but never artifacts that may still be in use
+            for mtime, path, size, evictable in sorted(sized, key=lambda item: item[0]):
+                if total <= self.quota_bytes:
+                    break
+                if now - mtime < QUOTA_MIN_AGE:
+                    break
+                if not evictable:
+                    continue
+                remove_path(path)
+                total -= size
+                freed += size
+                evicted += 1
+
+        self.last_usage_bytes = total
+        self.expired_total += expired
+        self.evicted_total += evicted
+        if expired or evicted:
+            logger.info(
+                f"Temp janitor removed {expired} expired and {evicted} over-quota artifacts "
+                f"({freed // (1024 * 1024)} MB)"
+            )
+        return {"expired": expired, "evicted": evicted, "freed_bytes": freed}
+
+    async def sweep(self) -> Dict[str, int]:
+        """Look up the active jobs and sweep TEMP_DIR once off the event loop"""
+        active_job_ids = None
+        if self.active_job_ids is not None:
+            try:
+                active_job_ids = await self.active_job_ids()
+            except Exception as e:
+                logger.warning(f"Temp janitor could not look up active jobs, keeping every job file: {e}")
+        return await asyncio.to_thread(self.run_once, active_job_ids)
+
+    async def _run_forever(self):
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.warning(f"Temp janitor run failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def _touch_forever(self):
+        """Keep this process's files in use fresh for the janitors of other processes"""
+        while True:
+            await asyncio.sleep(IN_USE_TOUCH_INTERVAL)
+            for path in files_in_use():
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+
+    def start(self):
+        """Start the janitor on the running event loop"""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run_forever())
+            self._touch_task = asyncio.create_task(self._touch_forever())
+
+    async def stop(self):
+        """Stop the janitor task"""
+        tasks = [task for task in (self._task, self._touch_task) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._touch_task = None
@@ -0,0 +1,167 @@
+"""
+Timing Service Module
+
+This module collects per-request conversion measurements that end up in the
+conversion history:
+
+1. RequestTimingMiddleware opens a timing context for every request
+2. Stages are timed with stage("upload") / stage("conversion") blocks, and
+   facts such as input_size, page_count or engine_used are recorded with
+   record()
+3. Conversions run on thread or process pools, where the request's context
+   is not visible. run_instrumented() wraps the engine call in the worker,
+   collects what the converter recorded (e.g. which fallback engine ran) and
+   hands it back with the result, so the executor can merge it into the
+   request's context
+
+Everything recorded is a no-op outside a timing context, so converters can
+call record_engine() unconditionally.
+
+Keys starting with "_" are worker events for other services (e.g. the
+subprocess durations behind /api/metrics); they are handed back by
+run_instrumented() but never stored in the history.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+_request_started: ContextVar[Optional[float]] = ContextVar("request_started", default=None)
+_timings: ContextVar[Optional[Dict[str, Any]]] = ContextVar("conversion_timings", default=None)
+_in_worker: ContextVar[bool] = ContextVar("in_engine_worker", default=False)
+
+# Engine calls may record from helper threads that share their context (contextvars.copy_context)
+_record_lock = threading.Lock()
+
+# Measurements that add up when a request runs several conversions or uploads
+ADDITIVE_FIELDS = {"input_size", "output_size", "page_count", "queue_ms", "conversion_ms", "cpu_ms"}
+
+# Measurements of which a request keeps the largest (see services/limits_service.py)
+PEAK_FIELDS = {"peak_memory_mb"}
+
+
+def request_elapsed_ms() -> Optional[float]:
+    """Milliseconds since the current request started, or None outside a request"""
+    started = _request_started.get()
+    if started is None:
+        return None
+    return (time.perf_counter() - started) * 1000
+
+
+def current_timings() -> Dict[str, Any]:
+    """Measurements recorded so far in the current context"""
+    timings = _timings.get()
+    if not timings:
+        return {}
+    return {name: value for name, value in timings.items() if not name.startswith("_")}
+
+
+def record(name: str, value: Any):
+    """Record a measurement; additive fields are summed, peaks maximized, others overwritten"""
+    timings = _timings.get()
+    if timings is None:
+        return
+    with _record_lock:
+        if name in ADDITIVE_FIELDS and isinstance(value, (int, float)):
+            timings[name] = timings.get(name, 0) + value
+        elif name in PEAK_FIELDS and isinstance(value, (int, float)):
+            timings[name] = max(timings.get(name, value), value)
+        else:
+            timings[name] = value
+
+
+def record_engine(engine: str):
+    """Record which engine (or fallback strategy) produced the output"""
+    record("engine_used", engine)
+
+
+def merge_timings(measurements: Dict[str, Any]):
+    """Merge measurements returned by a worker into the current context"""
+    for name, value in measurements.items():
+        if not name.startswith("_"):
+            record(name, value)
+
+
+def record_worker_event(name: str, event: Any) -> bool:
+    """Queue an event to be handed back from an engine worker by run_instrumented().
+
+    Returns:
+        False when not running inside run_instrumented(); the caller should
+        handle the event itself
+    """
+    timings = _timings.get()
+    if not _in_worker.get() or timings is None:
+        return False
+    with _record_lock:
+        timings.setdefault(name, []).append(event)
+    return True
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block and record it as <name>_ms"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(f"{name}_ms", round((time.perf_counter() - started) * 1000, 1))
+
+
+@contextmanager
+def timing_context() -> Iterator[Dict[str, Any]]:
+    """Open a fresh timing context (one per request or background job)"""
+    timings: Dict[str, Any] = {}
+    timings_token = _timings.set(timings)
+    started_token = _request_started.set(time.perf_counter())
+    try:
+        yield timings
+    finally:
+        _request_started.reset(started_token)
+        _timings.reset(timings_token)
+
+
+def run_instrumented(func: Callable[..., Any], *args, **kwargs) -> Tuple[Any, Dict[str, Any]]:
+    """Run an engine function inside its own timing context (executed in the worker).
+
+    Returns:
+        Tuple of (result, measurements recorded by the function plus
+        conversion_ms and output_size). Exceptions carry the measurements
+        recorded before the failure as a worker_timings attribute.
+    """
+    timings: Dict[str, Any] = {}
+    token = _timings.set(timings)
+    worker_token = _in_worker.set(True)
+    started = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        # Failed runs still report their worker events (e.g. a timed-out soffice)
+        e.worker_timings = timings
+        raise
+    finally:
+        _in_worker.reset(worker_token)
+        _timings.reset(token)
+    timings["conversion_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    if isinstance(result, Path):
+        try:
+            timings["output_size"] = result.stat().st_size
+        except OSError:
+            pass
+    return result, timings
+
+
+class RequestTimingMiddleware:
+    """ASGI middleware that opens a timing context for each HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with timing_context():
+            await self.app(scope, receive, send)
@@ -0,0 +1,301 @@
+"""
+Upload Service Module
+
+This module provides streaming ingestion of uploaded files:
+
+1. Uploads are copied to disk in fixed-size chunks, never read whole into memory
+2. The SHA-256 of the content is computed while writing (reused by the
+   conversion cache, so files are not hashed twice)
+3. The leading bytes are sniffed to detect the real file type
+4. Writing stops as soon as the size limit is exceeded and the partial file
+   is removed
+
+UploadSizeLimitMiddleware rejects request bodies larger than the configured
+limit with 413 before the multipart parser has spooled them to disk. It also
+measures every part of a multipart body as it streams in, so a single file
+larger than the per-file limit is cut off at that limit instead of after the
+whole body has been received.
+"""
+
+import hashlib
+import json
+import logging
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+
+from services.cache_service import remember_file_hash
+from services.temp_service import temp_file_path
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+# Leading bytes -> detected format. OOXML files (docx/xlsx/pptx) are ZIP
+# containers and legacy Office files (doc/xls/ppt) are OLE compound files.
+MAGIC_SIGNATURES = [
+    (b"%PDF-", "pdf"),
+    (b"PK\x03\x04", "zip"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "ole"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"BM", "bmp"),
+    (b"II*\x00", "tiff"),
+    (b"MM\x00*", "tiff"),
+    (b"{\\rtf", "rtf"),
+]
+
+SNIFF_SIZE = 16
+
+# Room for a multipart part's headers on top of the file it carries
+PART_HEADER_ALLOWANCE = 64 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured size limit"""
+
+    def __init__(self, max_size: int, filename: Optional[str] = None):
+        self.max_size = max_size
+        self.filename = filename
+        name = f"{filename} " if filename else ""
+        super().__init__(f"File {name}exceeds the maximum size of {max_size // (1024 * 1024)} MB")
+
+
+@dataclass
+class IngestedFile:
+    """An upload written to disk"""
+    path: Path
+    size: int
+    sha256: str
+    detected_format: Optional[str]
+
+
+def sniff_format(header: bytes) -> Optional[str]:
+    """Detect a file format from its leading bytes"""
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    for signature, file_format in MAGIC_SIGNATURES:
+        if header.startswith(signature):
+            return file_format
+    return None
+
+
+def ingest_stream(
+    source: BinaryIO,
+    destination: Path,
+    max_size: Optional[int] = None,
+    filename: Optional[str] = None
+) -> IngestedFile:
+    """Copy a binary stream to disk in chunks, hashing and sniffing as it goes.
+
+    Args:
+        source: File-like object to read from
+        destination: Path to write the content to
+        max_size: Maximum number of bytes accepted (None for no limit)
+        filename: Original filename, used in error messages
+
+    Returns:
+        IngestedFile describing the written file
+
+    Raises:
+        UploadTooLargeError: if the content is larger than max_size
+    """
+    digest = hashlib.sha256()
+    header = b""
+    size = 0
+
+    try:
+        with destination.open("wb") as buffer:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise UploadTooLargeError(max_size, filename)
+                if len(header) < SNIFF_SIZE:
+                    header += chunk[:SNIFF_SIZE - len(header)]
+                digest.update(chunk)
+                buffer.write(chunk)
+    except BaseException:
+        destination.unlink(missing_ok=True)
+        raise
+
+    ingested = IngestedFile(
+        path=destination,
+        size=size,
+        sha256=digest.hexdigest(),
+        detected_format=sniff_format(header)
+    )
+    remember_file_hash(destination, ingested.sha256)
+    return ingested
+
+
+def ingest_upload(upload_file, dest_dir: Path, max_size: Optional[int] = None) -> IngestedFile:
+    """Stream a FastAPI UploadFile to a uniquely named file in a shard of dest_dir.
+
+    The upload's file handle is closed afterwards, as save_upload_file_tmp
+    always did.
+    """
+    filename = upload_file.filename or ""
+    suffix = Path(filename).suffix
+    destination = temp_file_path(f"{uuid.uuid4()}{suffix}", dest_dir)
+    try:
+        return ingest_stream(upload_file.file, destination, max_size, filename)
+    finally:
+        upload_file.file.close()
+
+
+def multipart_boundary(content_type: str) -> Optional[bytes]:
+    """Boundary of a multipart/form-data Content-Type header, or None for other bodies"""
+    media_type, _, params = content_type.partition(";")
+    if media_type.strip().lower() != "multipart/form-data":
+        return None
+    for param in params.split(";"):
+        name, _, value = param.strip().partition("=")
+        if name.lower() == "boundary" and value:
+            return value.strip('"').encode("latin-1")
+    return None
+
+
+class MultipartPartMeter:
+    """
+    Measures the parts of a multipart body while it is received.
+
+    Parts are delimited by CRLF "--" boundary; a delimiter may be split
+    across chunks, so the last few bytes of every chunk are kept to search
+    again together with the next one. Sizes include the part's headers.
+    """
+
+    def __init__(self, boundary: bytes):
+        self.delimiter = b"\r\n--" + boundary
+        # Size of the part being received so far
+        self.part_size = 0
+        self._tail = b""
+
+    def feed(self, chunk: bytes) -> int:
+        """Count a body chunk; returns the size of the largest part seen in it"""
+        data = self._tail + chunk
+        # The tail was counted with the previous chunk
+        counted = len(self._tail)
+        largest = 0
+        position = 0
+        while True:
+            index = data.find(self.delimiter, position)
+            if index < 0:
+                break
+            # Negative when the delimiter began in the tail, whose bytes were counted as part data
+            self.part_size += index - max(position, counted)
+            largest = max(largest, self.part_size)
+            self.part_size = 0
+            position = index + len(self.delimiter)
+
+        self.part_size += len(data) - max(position, counted)
+        largest = max(largest, self.part_size)
+        self._tail = data[max(position, len(data) - len(self.delimiter) + 1):]
+        return largest
+
+
+class UploadSizeLimitMiddleware:
+    """
+    ASGI middleware that caps the size of request bodies and of the files in them.
+
+    Requests announcing a larger Content-Length are rejected immediately;
+    chunked requests are counted as they are received and cut off with 413
+    as soon as they pass the limit. In multipart bodies, each part is
+    measured while it streams in and the request is cut off with 413 once a
+    part grows past max_part_size (or its path's entry in
+    part_size_overrides), plus room for the part headers.
+    """
+
+    def __init__(
+        self,
+        app,
+        max_body_size: int,
+        max_part_size: int = 0,
+        part_size_overrides: Optional[Dict[str, int]] = None
+    ):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.max_part_size = max_part_size
+        self.part_size_overrides = part_size_overrides or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (self.max_body_size <= 0 and self.max_part_size <= 0):
+            await self.app(scope, receive, send)
+            return
+
+        content_type = ""
+        for name, value in scope.get("headers", []):
+            if name == b"content-length" and self.max_body_size > 0:
+                try:
+                    if int(value) > self.max_body_size:
+                        await self._reject(send, self._body_limit_detail())
+                        return
+                except ValueError:
+                    pass
+            elif name == b"content-type":
+                content_type = value.decode("latin-1")
+
+        max_part_size = self.part_size_overrides.get(scope.get("path", ""), self.max_part_size)
+        boundary = multipart_boundary(content_type) if max_part_size > 0 else None
+        meter = MultipartPartMeter(boundary) if boundary else None
+
+        received = 0
+        rejection: Optional[str] = None
+        response_started = False
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejection
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                received += len(body)
+                if self.max_body_size > 0 and received > self.max_body_size:
+                    rejection = self._body_limit_detail()
+                    raise UploadTooLargeError(self.max_body_size)
+                if meter is not None and meter.feed(body) > max_part_size + PART_HEADER_ALLOWANCE:
+                    rejection = str(UploadTooLargeError(max_part_size))
+                    raise UploadTooLargeError(max_part_size)
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started, rejected
+            if rejection is not None:
+                # The body parser turns our error into its own 400 (or 500); answer 413 instead
+                if message["type"] == "http.response.start" and not response_started:
+                    response_started = True
+                    rejected = True
+                    await self._reject(send, rejection)
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except UploadTooLargeError:
+            if rejected:
+                return
+            if response_started:
+                raise
+            await self._reject(send, rejection or self._body_limit_detail())
+
+    def _body_limit_detail(self) -> str:
+        return f"Request body exceeds the maximum size of {self.max_body_size // (1024 * 1024)} MB"
+
+    async def _reject(self, send, detail: str):
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,52 @@
+"""
+Engine Warm-Up Module
+
+The conversion libraries (pdf2docx, pdfplumber, openpyxl, python-pptx,
+pytesseract/pandas, ...) are imported by the functions that use them rather
+than at module load, so the app imports in well under a second and health
+checks pass right away. Left alone, the first request for each engine pays
+the import instead.
+
+import_engine_modules() imports them ahead of time; the server runs it on a
+thread after startup when ENGINE_WARMUP is on, for the libraries of the
+engines it serves (engines.engine_libraries()). Turn it off to keep processes
+that never convert (e.g. extra API replicas) lean.
+
+Configuration (environment variables):
+- ENGINE_WARMUP: import conversion libraries in the background after startup
+- ENGINE_WARMUP_MODULES: comma separated modules to import instead of the enabled engines' libraries
+"""
+
+import importlib
+import logging
+import os
+import time
+from typing import Dict, Sequence
+
+logger = logging.getLogger(__name__)
+
+ENGINE_WARMUP = os.getenv("ENGINE_WARMUP", "true").strip().lower() in ("1", "true", "yes", "on")
+ENGINE_WARMUP_MODULES = tuple(
+    name.strip() for name in os.getenv("ENGINE_WARMUP_MODULES", "").split(",")
+    if name.strip()
+)
+
+
+def import_engine_modules(modules: Sequence[str]) -> Dict[str, float]:
+    """Import conversion libraries so the first request does not pay for it (blocking).
+
+    Returns:
+        Seconds spent importing each module that imported successfully
+    """
+    timings = {}
+    for name in modules:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            # The converter reports the missing library when it is used
+            logger.warning(f"Warm-up could not import {name}: {e}")
+            continue
+        timings[name] = round(time.perf_counter() - started, 3)
+    logger.info(f"Imported conversion libraries in {sum(timings.values()):.2f} s: {timings}")
+    return timings
@@ -0,0 +1,66 @@
+"""
+Conversion Worker
+
+Runs background jobs outside the API tier. With JOB_EXECUTION_MODE=worker
+the API only stores submitted jobs in the job store; any number of these
+processes, on this host or others, claim them, run them on the engines
+enabled here (ENABLED_ENGINES) and write the results to TEMP_DIR/jobs, from
+where the API serves them.
+
+    JOB_EXECUTION_MODE=worker JOB_STORE=mongo python worker.py
+
+Requirements:
+- the API's job store: JOB_STORE=mongo with the same MONGO_URL and DB_NAME
+  across hosts, or JOB_STORE=sqlite with the same JOB_STORE_PATH on one host
+- TEMP_DIR/jobs on storage shared with the API, mounted at the same path
+
+SIGTERM and SIGINT stop claiming jobs; running ones get
+JOB_WORKER_DRAIN_SECONDS to finish before they are put back in the queue.
+"""
+
+import asyncio
+import logging
+import signal
+
+from core import client, history_writer, job_manager, prepare_job_store, temp_janitor
+from engines import ENABLED_ENGINES, shutdown_engines, start_engines
+from routes.jobs import JOB_OPERATIONS
+from services.executor_service import executor_manager
+from services.job_service import JobWorker
+
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    if not JOB_OPERATIONS:
+        logger.error(f"No job operations for the enabled engines ({', '.join(ENABLED_ENGINES) or 'none'})")
+        return
+
+    worker = JobWorker(job_manager, JOB_OPERATIONS)
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, worker.stop)
+
+    print(f"Starting conversion worker {worker.worker_id} (engines: {', '.join(ENABLED_ENGINES)})...")
+    await prepare_job_store()
+    start_engines()
+    temp_janitor.start()
+    history_writer.start()
+    try:
+        await worker.run()
+    finally:
+        print(f"Shutting down conversion worker {worker.worker_id}...")
+        await temp_janitor.stop()
+        executor_manager.shutdown()
+        shutdown_engines()
+        # Flush buffered history before the MongoDB client goes away
+        await history_writer.shutdown()
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    asyncio.run(main())
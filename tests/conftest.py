@@ -0,0 +1,37 @@
+"""
+Shared test setup.
+
+The backend is not an installed package, so its directory is put on
+sys.path. Configuration is read from the environment at import time; the
+defaults below keep temp files out of the tree and avoid needing MongoDB or
+warm engine workers. Set the variables yourself to override them.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("TEMP_DIR", tempfile.mkdtemp(prefix="filelab-tests-"))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "filelab_test")
+os.environ.setdefault("JOB_STORE", "memory")
+os.environ.setdefault("ENGINE_WARMUP", "false")
+
+
+@pytest.fixture
+def temp_dir() -> Path:
+    """The TEMP_DIR the backend modules were imported with"""
+    return Path(os.environ["TEMP_DIR"])
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine to completion on a fresh event loop"""
+    return asyncio.run
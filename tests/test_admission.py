@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+
+from services import priority_service
+from services.admission_service import EngineAdmission, EngineBusyError, wait_without_queue_limit
+from services.priority_service import PRIORITY_BULK, PRIORITY_INTERACTIVE, PRIORITY_STANDARD, set_priority
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def queue_call(admission: EngineAdmission, served: list, name: str, priority=PRIORITY_STANDARD, client=""):
+    """Start a call that takes a slot, records its turn and gives the slot up"""
+    async def call():
+        set_priority(priority)
+        priority_service._client.set(client)
+        await admission.acquire()
+        served.append(name)
+        admission.release()
+    return asyncio.create_task(call())
+
+
+def test_full_queue_is_rejected_with_retry_after(run):
+    async def scenario():
+        admission = EngineAdmission("pdf", limit=1, queue_size=2)
+        await admission.acquire()
+        served = []
+        waiting = [queue_call(admission, served, name) for name in ("first", "second")]
+        await settle()
+        assert admission.waiting == 2
+
+        with pytest.raises(EngineBusyError) as rejected:
+            await admission.acquire()
+        assert rejected.value.status_code == 429
+        assert int(rejected.value.headers["Retry-After"]) >= 1
+        assert admission.rejected == 1
+
+        admission.release()
+        await asyncio.gather(*waiting)
+        assert served == ["first", "second"] and admission.running == 0
+
+    run(scenario())
+
+
+def test_accepted_jobs_wait_past_a_full_queue(run):
+    async def scenario():
+        admission = EngineAdmission("pdf", limit=1, queue_size=0)
+        await admission.acquire()
+        with pytest.raises(EngineBusyError):
+            await admission.acquire()
+
+        async def job():
+            wait_without_queue_limit()
+            await admission.acquire()
+            admission.release()
+        waiting = asyncio.create_task(job())
+        await settle()
+        assert admission.waiting == 1
+
+        admission.release()
+        await waiting
+        assert admission.running == 0
+
+    run(scenario())
+
+
+def test_cancelled_waiter_gives_its_place_up(run):
+    async def scenario():
+        admission = EngineAdmission("pdf", limit=1, queue_size=4)
+        await admission.acquire()
+        served = []
+        gone = queue_call(admission, served, "gone")
+        stays = queue_call(admission, served, "stays")
+        await settle()
+        gone.cancel()
+        await settle()
+        assert admission.waiting == 1
+
+        admission.release()
+        await stays
+        assert served == ["stays"] and admission.running == 0
+
+    run(scenario())
+
+
+def test_bulk_calls_fill_only_their_share_of_the_queue(run):
+    async def scenario():
+        admission = EngineAdmission("pdf", limit=1, queue_size=4)
+        await admission.acquire()
+        served = []
+        tasks = [queue_call(admission, served, f"bulk{index}", PRIORITY_BULK) for index in range(2)]
+        await settle()
+
+        set_priority(PRIORITY_BULK)
+        with pytest.raises(EngineBusyError):
+            await admission.acquire()
+        # Standard requests still find room, and jobs wait however full the queue is
+        tasks.append(queue_call(admission, served, "standard"))
+
+        async def job():
+            wait_without_queue_limit()
+            set_priority(PRIORITY_BULK)
+            await admission.acquire()
+            served.append("job")
+            admission.release()
+        tasks.append(asyncio.create_task(job()))
+        await settle()
+        assert admission.waiting == 4
+
+        admission.release()
+        await asyncio.gather(*tasks)
+        assert sorted(served) == ["bulk0", "bulk1", "job", "standard"]
+
+    run(scenario())
+
+
+def test_interactive_calls_overtake_queued_bulk_work(run):
+    async def scenario():
+        admission = EngineAdmission("pdf", limit=1, queue_size=16)
+        await admission.acquire()
+        served = []
+        tasks = [queue_call(admission, served, f"bulk{index}", PRIORITY_BULK) for index in range(3)]
+        await settle()
+        tasks.append(queue_call(admission, served, "standard", PRIORITY_STANDARD))
+        tasks.append(queue_call(admission, served, "interactive", PRIORITY_INTERACTIVE))
+        await settle()
+
+        admission.release()
+        await asyncio.gather(*tasks)
+        assert served[:2] == ["interactive", "standard"]
+        assert served[2:] == ["bulk0", "bulk1", "bulk2"]
+
+    run(scenario())
+
+
+def test_clients_of_one_class_take_turns(run):
+    async def scenario():
+        admission = EngineAdmission("pdf", limit=1, queue_size=16)
+        await admission.acquire()
+        served = []
+        tasks = [queue_call(admission, served, f"a{index}", client="a") for index in range(3)]
+        await settle()
+        tasks.append(queue_call(admission, served, "b0", client="b"))
+        await settle()
+
+        admission.release()
+        await asyncio.gather(*tasks)
+        # b queued last but is not made to wait for all of a's calls
+        assert served == ["a0", "b0", "a1", "a2"]
+
+    run(scenario())
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+
+from services.cancel_service import (
+    CLIENT_CLOSED_REQUEST,
+    CancelOnDisconnectMiddleware,
+    on_cancel,
+    raise_if_cancelled,
+)
+from services.executor_service import ENGINE_ZIP, ExecutorManager
+
+
+def wait_for_cancel(started: threading.Event, stopped: threading.Event) -> str:
+    """Engine call that runs until its cancel callback fires"""
+    with on_cancel(stopped.set):
+        started.set()
+        stopped.wait(timeout=5)
+        raise_if_cancelled()
+    return "finished"
+
+
+class Client:
+    """ASGI receive/send pair for one request whose client can hang up on cue"""
+
+    def __init__(self):
+        self.messages = []
+        self.hang_up = asyncio.Event()
+
+    async def receive(self):
+        if not self.messages:
+            self.messages.append("body")
+            return {"type": "http.request", "body": b"upload", "more_body": False}
+        await self.hang_up.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        self.messages.append(message)
+
+    @property
+    def status(self):
+        return next(m["status"] for m in self.messages if isinstance(m, dict) and m["type"] == "http.response.start")
+
+
+def request_scope():
+    return {"type": "http", "method": "POST", "path": "/api/convert", "headers": []}
+
+
+async def respond(send, body: bytes):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": body})
+
+
+def test_disconnect_cancels_the_engine_call(run):
+    manager = ExecutorManager()
+    started, stopped = threading.Event(), threading.Event()
+    outcome = {}
+
+    async def app(scope, receive, send):
+        await receive()
+        try:
+            result = await manager.run(ENGINE_ZIP, wait_for_cancel, started, stopped)
+        except asyncio.CancelledError:
+            outcome["cancelled"] = True
+            raise
+        await respond(send, result.encode())
+
+    async def scenario():
+        client = Client()
+        middleware = CancelOnDisconnectMiddleware(app)
+        request = asyncio.create_task(middleware(request_scope(), client.receive, client.send))
+        assert await asyncio.to_thread(started.wait, 5)
+        client.hang_up.set()
+        await asyncio.wait_for(request, timeout=5)
+        return client
+
+    try:
+        client = run(scenario())
+    finally:
+        manager.shutdown()
+
+    assert outcome == {"cancelled": True}
+    # The worker's cancel callback ran instead of the call waiting out its timeout
+    assert stopped.is_set()
+    assert client.status == CLIENT_CLOSED_REQUEST
+
+
+def test_requests_finish_normally_while_the_client_stays(run):
+    async def app(scope, receive, send):
+        await receive()
+        await asyncio.sleep(0.01)
+        await respond(send, b"done")
+
+    async def scenario():
+        client = Client()
+        await CancelOnDisconnectMiddleware(app)(request_scope(), client.receive, client.send)
+        return client
+
+    client = run(scenario())
+    assert client.status == 200
+    assert client.messages[-1]["body"] == b"done"
+
+
+def test_disconnect_after_the_response_started_is_left_to_the_response(run):
+    async def scenario():
+        client = Client()
+        finished = asyncio.Event()
+
+        async def app(scope, receive, send):
+            await receive()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            client.hang_up.set()
+            await asyncio.sleep(0.05)
+            await send({"type": "http.response.body", "body": b"streamed"})
+            finished.set()
+
+        await CancelOnDisconnectMiddleware(app)(request_scope(), client.receive, client.send)
+        return client, finished
+
+    client, finished = run(scenario())
+    assert finished.is_set()
+    assert client.status == 200
@@ -0,0 +1,71 @@
+import os
+from pathlib import Path
+
+from services.cache_service import ConversionCache
+
+
+def write(path: Path, content: bytes) -> Path:
+    path.write_bytes(content)
+    return path
+
+
+def test_key_covers_file_content_and_options(tmp_path):
+    cache = ConversionCache(tmp_path / "cache")
+    upload = write(tmp_path / "upload.pdf", b"same content")
+    reupload = write(tmp_path / "renamed.pdf", b"same content")
+    edited = write(tmp_path / "edited.pdf", b"other content")
+
+    key = cache.make_key("compress_pdf", (upload,), {"quality": "medium"})
+    assert cache.make_key("compress_pdf", (reupload,), {"quality": "medium"}) == key
+    assert cache.make_key("compress_pdf", (edited,), {"quality": "medium"}) != key
+    assert cache.make_key("compress_pdf", (upload,), {"quality": "high"}) != key
+    assert cache.make_key("rotate_pdf", (upload,), {"quality": "medium"}) != key
+    # Files inside lists (merges) are hashed too
+    assert cache.make_key("merge_pdfs", ([upload, edited],), {}) == cache.make_key("merge_pdfs", ([reupload, edited],), {})
+    assert cache.make_key("merge_pdfs", ([upload, edited],), {}) != cache.make_key("merge_pdfs", ([edited, upload],), {})
+
+
+def test_hits_are_private_copies(tmp_path):
+    cache = ConversionCache(tmp_path / "cache", max_bytes=1024)
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    assert cache.get("missing", output_dir) is None
+
+    cache.put("key", write(tmp_path / "result.pdf", b"converted"))
+    first = cache.get("key", output_dir)
+    second = cache.get("key", output_dir)
+    assert first != second and first.read_bytes() == second.read_bytes() == b"converted"
+    first.unlink()
+    assert cache.get("key", output_dir).read_bytes() == b"converted"
+    assert cache.stats()["hits"] == 3 and cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path):
+    cache = ConversionCache(tmp_path / "cache", max_bytes=30)
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    for name in ("a", "b", "c"):
+        assert cache.put(name, write(tmp_path / f"{name}.pdf", b"x" * 10)) == []
+
+    handed_out = cache.get("a", output_dir)
+    assert cache.put("d", write(tmp_path / "d.pdf", b"x" * 10)) == ["b"]
+    assert cache.put("e", write(tmp_path / "e.pdf", b"x" * 10)) == ["c"]
+    assert cache.get("b", output_dir) is None
+    assert cache.stats()["entries"] == 3 and cache.stats()["size_bytes"] == 30
+    # Results too large for the whole cache are not stored
+    assert cache.put("huge", write(tmp_path / "huge.pdf", b"x" * 31)) == []
+    assert cache.get("huge", output_dir) is None
+    # Eviction never removes a copy already handed out
+    cache.put("f", write(tmp_path / "f.pdf", b"x" * 10))
+    assert handed_out.read_bytes() == b"x" * 10
+
+
+def test_index_rebuilt_from_disk_keeps_the_access_order(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache = ConversionCache(cache_dir, max_bytes=30)
+    for age, name in enumerate(("old", "newer", "newest")):
+        cache.put(name, write(tmp_path / f"{name}.pdf", b"x" * 10))
+        os.utime(cache_dir / f"{name}.pdf", (1000 + age, 1000 + age))
+
+    restarted = ConversionCache(cache_dir, max_bytes=30)
+    assert restarted.put("next", write(tmp_path / "next.pdf", b"x" * 10)) == ["old"]
@@ -0,0 +1,120 @@
+import pytest
+
+import core
+from engines.graph import Conversion, FormatGraph, NoConversionRouteError
+
+
+def doc_to_pdf(path):
+    pass
+
+
+def doc_to_docx(path):
+    pass
+
+
+def docx_to_pdf(path):
+    pass
+
+
+def pdf_to_txt(path):
+    pass
+
+
+def pdf_to_png(path):
+    pass
+
+
+def png_to_txt(path):
+    pass
+
+
+EDGES = [
+    Conversion("doc", "pdf", doc_to_pdf, cost=2.0, engine="libreoffice"),
+    Conversion("doc", "docx", doc_to_docx, cost=1.0, engine="libreoffice"),
+    Conversion("docx", "pdf", docx_to_pdf, cost=1.5, engine="pdf"),
+    Conversion("pdf", "txt", pdf_to_txt, cost=0.5, engine="pdf", chainable=False),
+    Conversion("pdf", "png", pdf_to_png, cost=1.0, engine="pdf"),
+    Conversion("png", "txt", png_to_txt, cost=5.0, engine="image"),
+]
+
+
+def route_names(route):
+    return [step.function.__name__ for step in route]
+
+
+def test_plans_the_cheapest_route():
+    graph = FormatGraph(EDGES)
+    # The direct edge beats doc -> docx -> pdf (2.0 against 2.5)
+    assert route_names(graph.plan("doc", "pdf")) == ["doc_to_pdf"]
+    assert route_names(graph.plan(".DOC", "text")) == ["doc_to_pdf", "pdf_to_txt"]
+    assert route_names(graph.plan("docx", "png")) == ["docx_to_pdf", "pdf_to_png"]
+    assert graph.plan("pdf", "pdf") is None
+    assert graph.plan("txt", "pdf") is None
+
+
+def test_plans_around_excluded_steps():
+    graph = FormatGraph(EDGES)
+    assert route_names(graph.plan("doc", "pdf", exclude={EDGES[0]})) == ["doc_to_docx", "docx_to_pdf"]
+    assert route_names(graph.plan("pdf", "txt", exclude={EDGES[3]})) == ["pdf_to_png", "png_to_txt"]
+    # doc -> docx -> pdf -> txt would be longer than MAX_ROUTE_STEPS
+    assert graph.plan("doc", "txt", exclude={EDGES[0]}) is None
+
+
+class Calls(list):
+    failing: set
+
+    def __init__(self):
+        super().__init__()
+        self.failing = set()
+
+
+@pytest.fixture
+def engine_calls(monkeypatch, tmp_path):
+    """Run routes on the test graph; steps named in calls.failing raise"""
+    calls = Calls()
+
+    async def fake_run_cached_engine(engine, func, path, *args):
+        calls.append(func.__name__)
+        if func.__name__ in calls.failing:
+            raise RuntimeError(f"{func.__name__} crashed")
+        output_path = tmp_path / f"{func.__name__}.out"
+        output_path.write_bytes(path.read_bytes() + b"|" + func.__name__.encode())
+        return output_path
+
+    monkeypatch.setattr(core, "conversion_graph", lambda: FormatGraph(EDGES))
+    monkeypatch.setattr(core, "run_cached_engine", fake_run_cached_engine)
+    return calls
+
+
+@pytest.fixture
+def input_path(tmp_path):
+    path = tmp_path / "input.doc"
+    path.write_bytes(b"doc")
+    return path
+
+
+def test_failed_step_replans_without_it(engine_calls, input_path, run):
+    engine_calls.failing.add("doc_to_pdf")
+    output_path = run(core.convert_format(input_path, "doc", "pdf"))
+
+    assert engine_calls == ["doc_to_pdf", "doc_to_docx", "docx_to_pdf"]
+    assert output_path.read_bytes() == b"doc|doc_to_docx|docx_to_pdf"
+    # The intermediate docx was removed once the pdf step had read it
+    assert not (input_path.parent / "doc_to_docx.out").exists()
+    assert input_path.exists()
+
+
+def test_failure_in_a_later_step_replans_the_route(engine_calls, input_path, run):
+    engine_calls.failing.add("pdf_to_txt")
+    output_path = run(core.convert_format(input_path, "pdf", "txt"))
+
+    assert engine_calls == ["pdf_to_txt", "pdf_to_png", "png_to_txt"]
+    assert output_path.read_bytes() == b"doc|pdf_to_png|png_to_txt"
+
+
+def test_raises_the_last_step_error_when_every_route_fails(engine_calls, input_path, run):
+    engine_calls.failing.update({"doc_to_pdf", "docx_to_pdf"})
+    with pytest.raises(RuntimeError, match="docx_to_pdf crashed"):
+        run(core.convert_format(input_path, "doc", "pdf"))
+    with pytest.raises(NoConversionRouteError):
+        run(core.convert_format(input_path, "txt", "pdf"))
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from benchmarks.memory_motor import MemoryMotorClient
+from routes import history
+from services.history_service import InvalidCursorError, build_history_query, decode_cursor, encode_cursor
+
+START = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def test_cursor_round_trips():
+    timestamp = datetime(2026, 3, 1, 12, 30, 15, 123000, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor({"timestamp": timestamp, "id": "abc|def"})) == (timestamp, "abc|def")
+    # MongoDB hands back naive UTC datetimes
+    naive = timestamp.replace(tzinfo=None)
+    assert decode_cursor(encode_cursor({"timestamp": naive, "id": "x"})) == (timestamp, "x")
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", "bm8gc2VwYXJhdG9y", "bm90LWEtZGF0ZXx4"])
+def test_invalid_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursorError):
+        build_history_query(cursor=cursor)
+
+
+@pytest.fixture
+def client(monkeypatch, run):
+    """The history routes on an in-memory database holding 11 records, 3 per second"""
+    database = MemoryMotorClient().filelab
+    monkeypatch.setattr(history, "db", database)
+
+    async def fill():
+        for index in range(11):
+            await database.conversion_history.insert_one({
+                "id": f"{index:02d}",
+                "conversion_type": "pdf-to-txt",
+                "source_format": "pdf",
+                "target_format": "txt",
+                "filename": f"{index}.pdf",
+                "status": "success" if index % 3 else "failed",
+                # Batches write several records with the same timestamp
+                "timestamp": START + timedelta(seconds=index // 3),
+            })
+    run(fill())
+
+    app = FastAPI()
+    app.include_router(history.router)
+    return TestClient(app)
+
+
+def all_pages(client: TestClient, **params):
+    seen, cursor = [], None
+    for _ in range(10):
+        response = client.get("/api/history", params={"limit": 4, **params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        page = [item["id"] for item in response.json()]
+        assert len(page) <= 4
+        seen.extend(page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return seen
+    pytest.fail(f"Pagination did not finish, saw {seen}")
+
+
+def test_pages_visit_every_record_once_in_order(client):
+    newest_first = sorted((f"{index:02d}" for index in range(11)), key=lambda doc_id: (int(doc_id) // 3, doc_id), reverse=True)
+    assert all_pages(client) == newest_first
+    assert all_pages(client, status="failed") == [doc_id for doc_id in newest_first if int(doc_id) % 3 == 0]
+    window = {"start": (START + timedelta(seconds=1)).isoformat(), "end": (START + timedelta(seconds=3)).isoformat()}
+    assert all_pages(client, **window) == ["08", "07", "06", "05", "04", "03"]
+
+
+def test_invalid_cursor_is_a_bad_request(client):
+    response = client.get("/api/history", params={"cursor": "not base64!"})
+    assert response.status_code == 400
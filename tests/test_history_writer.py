@@ -0,0 +1,110 @@
+from datetime import datetime, timezone
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from services import history_service
+from services.history_service import DUPLICATE_KEY_ERROR, HistoryWriter
+
+
+class FlakyCollection:
+    """insert_many stand-in that stores documents by _id and fails on cue.
+
+    Each entry of `failures` is applied to one call: "timeout" stores the
+    documents and then raises (the client never saw the reply), a set of
+    positions rejects those documents with a non-duplicate write error.
+    """
+
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.stored = {}
+        self.calls = 0
+
+    async def insert_many(self, docs, ordered=True):
+        self.calls += 1
+        failure = self.failures.pop(0) if self.failures else None
+        errors = []
+        inserted = 0
+        for index, doc in enumerate(docs):
+            doc.setdefault("_id", f"oid-{id(doc)}")
+            if doc["_id"] in self.stored:
+                errors.append({"index": index, "code": DUPLICATE_KEY_ERROR, "errmsg": "duplicate key"})
+            elif isinstance(failure, set) and index in failure:
+                errors.append({"index": index, "code": 91, "errmsg": "shutdown in progress"})
+            else:
+                self.stored[doc["_id"]] = doc
+                inserted += 1
+        if failure == "timeout":
+            raise TimeoutError("no reply")
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": inserted})
+
+
+class StatsCollection:
+    def __init__(self):
+        self.counted = 0
+
+    async def bulk_write(self, operations, ordered=True):
+        self.counted += sum(op._doc["$inc"]["count"] for op in operations)
+
+
+def history(count):
+    timestamp = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {"id": str(n), "timestamp": timestamp, "conversion_type": "pdf", "status": "success"}
+        for n in range(count)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr(history_service, "FLUSH_RETRY_DELAY", 0)
+
+
+def make_writer(collection):
+    return HistoryWriter(collection, stats_collection=StatsCollection())
+
+
+def test_retries_only_records_that_failed(run):
+    collection = FlakyCollection([{1, 3}])
+    writer = make_writer(collection)
+    run(writer._flush(history(5)))
+
+    assert collection.calls == 2 and len(collection.stored) == 5
+    assert (writer.written, writer.dropped) == (5, 0)
+    assert writer.stats_collection.counted == 5
+
+
+def test_records_stored_before_a_timeout_count_as_written(run):
+    collection = FlakyCollection(["timeout"])
+    writer = make_writer(collection)
+    run(writer._flush(history(4)))
+
+    # The retry hits duplicate keys for everything; none of it is lost or double counted
+    assert collection.calls == 2 and len(collection.stored) == 4
+    assert (writer.written, writer.dropped) == (4, 0)
+    assert writer.stats_collection.counted == 4
+
+
+def test_partial_batch_reaches_rollups_when_retries_run_out(run):
+    collection = FlakyCollection([{0}, {0}, {0}])
+    writer = make_writer(collection)
+    run(writer._flush(history(3)))
+
+    assert collection.calls == history_service.FLUSH_MAX_ATTEMPTS
+    assert (writer.written, writer.dropped) == (2, 1)
+    assert writer.stats_collection.counted == 2
+
+
+def test_shutdown_keeps_partial_writes(run):
+    async def scenario():
+        writer = make_writer(FlakyCollection([{2}]))
+        writer.start()
+        for doc in history(3):
+            await writer.write(doc)
+        await writer.shutdown()
+        return writer
+
+    writer = run(scenario())
+    assert (writer.written, writer.dropped) == (2, 1)
+    assert writer.stats_collection.counted == 2
@@ -0,0 +1,23 @@
+from benchmarks import import_budget
+
+# Far above the CI budget: this only catches imports that hang or explode
+GENEROUS_IMPORT_SECONDS = 30
+
+
+def test_server_import_leaves_conversion_libraries_lazy():
+    result, importtime_log = import_budget.measure(runs=1)
+
+    assert [name for name in import_budget.LAZY_MODULES if name in result["modules"]] == []
+    assert result["seconds"] < GENEROUS_IMPORT_SECONDS
+    assert result["peak_rss_mb"] > 0
+    assert import_budget.slowest_imports(importtime_log, top=5)
+
+
+def test_probe_runs_without_the_resource_module(monkeypatch):
+    monkeypatch.setattr(
+        import_budget, "PROBE", "import sys; sys.modules['resource'] = None\n" + import_budget.PROBE
+    )
+    result, _ = import_budget.measure(runs=1)
+
+    assert result["peak_rss_mb"] is None
+    assert "server" in result["modules"]
@@ -0,0 +1,277 @@
+import asyncio
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from benchmarks.memory_motor import MemoryMotorClient
+from services.job_service import (
+    JobManager,
+    JobOperation,
+    JobWorker,
+    MongoJobStore,
+    SQLiteJobStore,
+    JOB_CANCELLED,
+    JOB_COMPLETED,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    _utcnow,
+)
+
+
+def convert(input_path: Path) -> Path:
+    """Never called: the tests' runners stand in for the engines"""
+
+
+TO_PDF = JobOperation("to-pdf", "pdf", convert, "txt", "pdf", "application/pdf")
+TO_PNG = JobOperation("to-png", "image", convert, "pdf", "png", "image/png")
+OPERATIONS = {TO_PDF.name: TO_PDF}
+
+
+class Runner:
+    """Engine runner whose calls finish when the test releases them"""
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = output_dir
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def __call__(self, engine, func, input_path, **options):
+        self.started.set()
+        await self.release.wait()
+        output_path = self.output_dir / f"{input_path.stem}.out"
+        output_path.write_text("converted")
+        return output_path
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    """A factory for managers sharing one SQLite store and artifact directory, as API and workers do"""
+    artifact_dir = tmp_path / "jobs"
+
+    def manager(runner=None, finished=None, **settings):
+        async def on_finished(job, error):
+            if finished is not None:
+                finished.append((job["id"], error))
+        kwargs = {"runner": runner} if runner is not None else {}
+        return JobManager(
+            SQLiteJobStore(tmp_path / "jobs.sqlite3"),
+            on_finished=on_finished,
+            artifact_dir=artifact_dir,
+            **{"execute_locally": False, **settings, **kwargs}
+        )
+    return manager
+
+
+async def submit(manager: JobManager, tmp_path: Path, name: str, operation: JobOperation = TO_PDF):
+    input_path = tmp_path / f"{name}.txt"
+    input_path.write_text(name)
+    return await manager.submit(operation, input_path, input_path.name)
+
+
+def worker(manager: JobManager, **kwargs) -> JobWorker:
+    settings = {"poll_interval": 0.01, "heartbeat_interval": 3600, "drain_timeout": 0.05}
+    return JobWorker(manager, OPERATIONS, **{**settings, **kwargs})
+
+
+def test_each_queued_job_is_claimed_once_oldest_first(jobs, tmp_path, run):
+    async def scenario():
+        api = jobs()
+        submitted = [await submit(api, tmp_path, f"doc{index}") for index in range(8)]
+        other = await submit(api, tmp_path, "image", TO_PNG)
+
+        # Several workers, each with its own connection, claiming at once
+        stores = [jobs().store for _ in range(4)]
+        claims = await asyncio.gather(*(
+            store.claim([TO_PDF.name], {"status": JOB_RUNNING, "worker": f"worker-{number}"})
+            for number in range(3) for store in stores
+        ))
+        claimed = [job["id"] for job in claims if job is not None]
+        assert sorted(claimed) == sorted(job["id"] for job in submitted)
+        assert (await api.get(other["id"]))["status"] == JOB_QUEUED
+
+        # Sequential claims follow submission order
+        await api.store.transition(submitted[0]["id"], (JOB_RUNNING,), {"status": JOB_QUEUED})
+        await api.store.transition(submitted[1]["id"], (JOB_RUNNING,), {"status": JOB_QUEUED})
+        first = await api.store.claim([TO_PDF.name], {"status": JOB_RUNNING})
+        second = await api.store.claim([TO_PDF.name], {"status": JOB_RUNNING})
+        assert [first["id"], second["id"]] == [submitted[0]["id"], submitted[1]["id"]]
+        assert await api.store.claim([TO_PDF.name], {"status": JOB_RUNNING}) is None
+
+    run(scenario())
+
+
+def test_stopping_worker_puts_unfinished_jobs_back_in_the_queue(jobs, tmp_path, run):
+    async def scenario():
+        api = jobs()
+        job = await submit(api, tmp_path, "doc")
+        runner = Runner(tmp_path)
+        job_worker = worker(jobs(runner))
+
+        running = asyncio.create_task(job_worker.run())
+        await asyncio.wait_for(runner.started.wait(), timeout=5)
+        assert (await api.get(job["id"]))["worker"] == job_worker.worker_id
+        job_worker.stop()
+        await asyncio.wait_for(running, timeout=5)
+
+        requeued = await api.get(job["id"])
+        assert requeued["status"] == JOB_QUEUED and requeued["worker"] is None
+        # The input stays for the worker that claims the job next
+        assert Path(requeued["input_path"]).exists()
+
+    run(scenario())
+
+
+def test_jobs_of_silent_workers_are_failed(jobs, tmp_path, run):
+    async def scenario():
+        api = jobs()
+        stale = await submit(api, tmp_path, "stale")
+        alive = await submit(api, tmp_path, "alive")
+        now = _utcnow()
+        await api.store.update(stale["id"], {
+            "status": JOB_RUNNING, "worker": "gone:1", "heartbeat_at": now - timedelta(seconds=120)
+        })
+        await api.store.update(alive["id"], {"status": JOB_RUNNING, "worker": "busy:2", "heartbeat_at": now})
+
+        finished = []
+        await worker(jobs(finished=finished), stale_after=60)._fail_stale_jobs()
+
+        failed = await api.get(stale["id"])
+        assert failed["status"] == JOB_FAILED and "gone:1 stopped responding" in failed["error"]
+        assert finished == [(stale["id"], failed["error"])]
+        assert not Path(failed["input_path"]).exists()
+        assert (await api.get(alive["id"]))["status"] == JOB_RUNNING
+
+    run(scenario())
+
+
+def test_outcome_of_a_job_taken_over_meanwhile_is_discarded(jobs, tmp_path, run):
+    async def scenario():
+        api = jobs()
+        job = await submit(api, tmp_path, "doc")
+        runner = Runner(tmp_path)
+        finished = []
+        job_worker = worker(jobs(runner, finished))
+
+        assert await job_worker._claim_next()
+        await asyncio.wait_for(runner.started.wait(), timeout=5)
+        # Another worker failed the job as stale while it was still converting here
+        taken_over = {"status": JOB_FAILED, "error": "stale", "finished_at": _utcnow()}
+        assert await api.store.transition(job["id"], (JOB_RUNNING,), taken_over)
+        runner.release.set()
+        await asyncio.gather(*job_worker.manager.tasks().values())
+
+        stored = await api.get(job["id"])
+        assert stored["status"] == JOB_FAILED and stored["result_path"] is None
+        assert finished == []
+        assert not list((tmp_path / "jobs").glob("*_result*"))
+
+    run(scenario())
+
+
+def test_completed_job_reports_its_result(jobs, tmp_path, run):
+    async def scenario():
+        api = jobs()
+        job = await submit(api, tmp_path, "doc")
+        runner = Runner(tmp_path)
+        runner.release.set()
+        finished = []
+        job_worker = worker(jobs(runner, finished))
+
+        assert await job_worker._claim_next()
+        await asyncio.gather(*job_worker.manager.tasks().values())
+
+        stored = await api.get(job["id"])
+        assert stored["status"] == JOB_COMPLETED and Path(stored["result_path"]).read_text() == "converted"
+        assert finished == [(job["id"], None)]
+
+    run(scenario())
+
+
+def test_cancel_queued_and_running_jobs(jobs, tmp_path, run):
+    async def scenario():
+        api = jobs()
+        queued = await submit(api, tmp_path, "queued")
+        cancelled = await api.cancel(queued["id"])
+        assert cancelled["status"] == JOB_CANCELLED
+        assert not Path(cancelled["input_path"]).exists()
+        assert await api.cancel(queued["id"]) is None
+
+        running = await submit(api, tmp_path, "running")
+        runner = Runner(tmp_path)
+        job_worker = worker(jobs(runner))
+        assert await job_worker._claim_next()
+        await asyncio.wait_for(runner.started.wait(), timeout=5)
+
+        assert job_worker.manager.task(running["id"]) is not None
+        assert api.task(running["id"]) is None
+        # The API only flags the job; its worker stops it at the next heartbeat
+        requested = await api.cancel(running["id"])
+        assert requested["status"] == JOB_RUNNING and requested["cancel_requested"]
+        await job_worker._heartbeat()
+
+        stopped = await api.get(running["id"])
+        assert stopped["status"] == JOB_CANCELLED
+        assert job_worker.manager.running == 0 and job_worker.manager.tasks() == {}
+
+    run(scenario())
+
+
+def test_recover_leaves_jobs_of_live_api_processes_alone(jobs, tmp_path, run):
+    async def scenario():
+        runner = Runner(tmp_path)
+        other_api = jobs(runner, execute_locally=True, owner_id="api:1")
+        running_elsewhere = await submit(other_api, tmp_path, "elsewhere")
+        await asyncio.wait_for(runner.started.wait(), timeout=5)
+
+        restarted = jobs(execute_locally=True, owner_id="api:2")
+        now = _utcnow()
+        own = await submit(jobs(), tmp_path, "own")
+        await restarted.store.update(own["id"], {"status": JOB_RUNNING, "worker": "api:2", "heartbeat_at": now})
+        silent = await submit(jobs(), tmp_path, "silent")
+        await restarted.store.update(silent["id"], {
+            "status": JOB_RUNNING, "worker": "api:3", "heartbeat_at": now - timedelta(seconds=120)
+        })
+        legacy = await submit(jobs(), tmp_path, "legacy")
+
+        assert await restarted.recover() == 3
+        assert (await restarted.get(running_elsewhere["id"]))["status"] == JOB_RUNNING
+        for job in (own, silent, legacy):
+            assert (await restarted.get(job["id"]))["status"] == JOB_FAILED
+
+        runner.release.set()
+        await asyncio.gather(*other_api.tasks().values())
+        assert (await other_api.get(running_elsewhere["id"]))["status"] == JOB_COMPLETED
+
+    run(scenario())
+
+
+def test_local_jobs_send_heartbeats_while_running(jobs, tmp_path, run):
+    async def scenario():
+        runner = Runner(tmp_path)
+        api = jobs(runner, execute_locally=True, owner_id="api:1", heartbeat_interval=0.01)
+        job = await submit(api, tmp_path, "doc")
+        assert job["worker"] == "api:1"
+        await asyncio.wait_for(runner.started.wait(), timeout=5)
+
+        old = _utcnow() - timedelta(seconds=120)
+        await api.store.update(job["id"], {"heartbeat_at": old})
+        await asyncio.sleep(0.1)
+        assert (await api.get(job["id"]))["heartbeat_at"] > old
+
+        runner.release.set()
+        await asyncio.gather(*api.tasks().values())
+        await asyncio.sleep(0.05)
+        # The heartbeat stops with the last local job
+        assert api._heartbeat_task is None
+
+    run(scenario())
+
+
+def test_mongo_store_indexes_its_claim_query(run):
+    collection = MemoryMotorClient().filelab.conversion_jobs
+    run(MongoJobStore(collection).ensure_indexes())
+    indexes = run(collection.index_information())
+    assert indexes["status_operation_created"]["key"] == [("status", 1), ("operation", 1), ("created_at", 1)]
+    assert indexes["id"]["unique"]
@@ -0,0 +1,113 @@
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from services.cancel_service import CallCancelledError, bind_call, cancel_call, current_call_id, forget_call, on_cancel
+from services.executor_service import ENGINE_OFFICE, get_engine_pool_config
+from services.libreoffice_service import (
+    LIBREOFFICE_POOL_SIZE,
+    LibreOfficePool,
+    LibreOfficeWorker,
+    LibreOfficeWorkerError,
+)
+from services.timing_service import record, timing_context
+
+
+class FakePool(LibreOfficePool):
+    """Warm pool whose workers are simulated by convert()"""
+
+    def __init__(self, work_dir: Path, size: int, convert):
+        super().__init__(work_dir, size)
+        self.workers = [object()] * size
+        self._convert = convert
+        self._running = True
+        self._owner_pid = os.getpid()
+
+    def convert(self, input_path, target_format, output_path):
+        return self._convert(Path(input_path), Path(output_path))
+
+
+def test_convert_many_runs_as_part_of_the_calling_engine_call(tmp_path):
+    seen = []
+
+    def convert(input_path, output_path):
+        seen.append(current_call_id())
+        record("cpu_ms", 5)
+        output_path.write_text(input_path.name)
+        return output_path
+
+    pool = FakePool(tmp_path, 2, convert)
+    inputs = [tmp_path / f"{i}.docx" for i in range(6)]
+    with timing_context() as timings, bind_call("batch-call"):
+        results = pool.convert_many(inputs, "pdf", tmp_path)
+
+    assert sorted(results) == sorted(inputs)
+    assert seen == ["batch-call"] * len(inputs)
+    assert timings["cpu_ms"] == 5 * len(inputs)
+
+
+def test_cancelling_a_batch_reaches_the_warm_workers(tmp_path):
+    started = threading.Event()
+    converted = []
+
+    def convert(input_path, output_path):
+        killed = threading.Event()
+        # The real pool kills the worker's soffice here
+        with on_cancel(killed.set):
+            started.set()
+            assert killed.wait(10)
+        converted.append(input_path)
+        raise CallCancelledError("soffice killed")
+
+    pool = FakePool(tmp_path, 1, convert)
+    inputs = [tmp_path / f"{i}.docx" for i in range(5)]
+
+    def cancel_once_started():
+        started.wait(10)
+        cancel_call("batch-call")
+
+    threading.Thread(target=cancel_once_started).start()
+    try:
+        with bind_call("batch-call"), pytest.raises(CallCancelledError):
+            pool.convert_many(inputs, "pdf", tmp_path)
+    finally:
+        forget_call("batch-call")
+    # The files still waiting for a worker were never started
+    assert converted == inputs[:1]
+
+
+def test_office_pool_is_sized_from_the_warm_workers(monkeypatch):
+    monkeypatch.delenv("EXECUTOR_OFFICE_WORKERS", raising=False)
+    monkeypatch.delenv("EXECUTOR_OFFICE_MODE", raising=False)
+    assert get_engine_pool_config(ENGINE_OFFICE)[1] == max(1, LIBREOFFICE_POOL_SIZE)
+
+
+
+def fake_program(path: Path, script: str) -> str:
+    path.write_text(f"#!/bin/sh\n{script}\n")
+    path.chmod(0o755)
+    return str(path)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="fake soffice is a shell script")
+@pytest.mark.parametrize("bridge_script, error", [
+    ("echo 'not json'; exec sleep 60", ValueError),
+    ("exit 1", LibreOfficeWorkerError),
+    ("echo '{\"ok\": false, \"error\": \"no connection\"}'; exec sleep 60", LibreOfficeWorkerError),
+])
+def test_failed_handshake_stops_soffice_and_the_bridge(tmp_path, bridge_script, error):
+    # soffice hangs, as it does when the bridge never connects
+    soffice = fake_program(tmp_path / "soffice", "exec sleep 60")
+    bridge = fake_program(tmp_path / "python", bridge_script)
+    worker = LibreOfficeWorker(0, tmp_path, soffice, bridge)
+    stopped = []
+    stop = worker.stop
+    worker.stop = lambda: stopped.extend([worker.soffice_process, worker.bridge_process]) or stop()
+
+    with pytest.raises(error):
+        worker.start()
+
+    assert len(stopped) == 2 and all(process.poll() is not None for process in stopped)
+    assert worker.soffice_process is None and worker.bridge_process is None
@@ -0,0 +1,101 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services.metrics_service import MetricsMiddleware, MetricsRegistry, metrics
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+
+def test_counters_and_gauges_render_in_text_format():
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls by engine", ("engine",))
+    queued = registry.gauge("queued", "Queued calls")
+    calls.inc(engine="pdf")
+    calls.inc(2.5, engine='we"ird\\name\n')
+    queued.set(3)
+    queued.dec()
+
+    assert registry.render() == (
+        "# HELP calls_total Calls by engine\n"
+        "# TYPE calls_total counter\n"
+        'calls_total{engine="pdf"} 1\n'
+        'calls_total{engine="we\\"ird\\\\name\\n"} 2.5\n'
+        "# HELP queued Queued calls\n"
+        "# TYPE queued gauge\n"
+        "queued 2\n"
+    )
+
+
+def test_histograms_render_cumulative_buckets():
+    registry = MetricsRegistry()
+    duration = registry.histogram("duration_seconds", "Call duration", ("engine",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.7, 3):
+        duration.observe(value, engine="ocr")
+
+    assert registry.render().splitlines()[2:] == [
+        'duration_seconds_bucket{engine="ocr",le="0.1"} 1',
+        'duration_seconds_bucket{engine="ocr",le="1"} 3',
+        'duration_seconds_bucket{engine="ocr",le="+Inf"} 4',
+        'duration_seconds_sum{engine="ocr"} 4.25',
+        'duration_seconds_count{engine="ocr"} 4',
+    ]
+
+
+def test_collectors_render_at_scrape_time_and_failures_are_skipped():
+    registry = MetricsRegistry()
+    pending = [7]
+
+    def broken():
+        raise RuntimeError("store unavailable")
+
+    registry.add_collector(broken)
+    registry.add_collector(lambda: [("pending", "gauge", "Pending writes", [({"store": "history"}, pending[0])])])
+    assert registry.render().splitlines()[-1] == 'pending{store="history"} 7'
+    pending[0] = 2
+    assert registry.render().splitlines()[-1] == 'pending{store="history"} 2'
+
+
+def sample(text: str, series: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_requests_are_counted_by_route_template():
+    by_template = 'filelab_http_requests_total{method="GET",route="/api/jobs/{job_id}",status="200"}'
+    unmatched = 'filelab_http_requests_total{method="GET",route="unmatched",status="404"}'
+    before = metrics.render()
+    app = FastAPI()
+
+    @app.get("/api/jobs/{job_id}")
+    async def get_job(job_id: str):
+        return {"id": job_id}
+
+    app.add_middleware(MetricsMiddleware)
+    client = TestClient(app)
+    for job_id in ("a", "b"):
+        assert client.get(f"/api/jobs/{job_id}").status_code == 200
+    assert client.get("/nowhere").status_code == 404
+
+    after = metrics.render()
+    # One series per route template, not per job id
+    assert sample(after, by_template) - sample(before, by_template) == 2
+    assert sample(after, unmatched) - sample(before, unmatched) == 1
+    assert "/api/jobs/a" not in after
+
+
+def test_metrics_render_without_the_resource_module():
+    # As on Windows, where the resource module does not exist
+    probe = (
+        "import sys; sys.modules['resource'] = None\n"
+        "from services.metrics_service import metrics\n"
+        "text = metrics.render()\n"
+        "assert 'process_start_time_seconds' in text and 'process_cpu_seconds_total' not in text, text\n"
+    )
+    result = subprocess.run([sys.executable, "-c", probe], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
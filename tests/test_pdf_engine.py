@@ -0,0 +1,43 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import openpyxl
+from PIL import Image
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from engines.pdf import convert_pdf_to_excel
+
+
+def _pdf_with_image(path: Path, color: str) -> Path:
+    image = Image.new("RGB", (60, 40), color)
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    buffer.seek(0)
+    pdf = canvas.Canvas(str(path))
+    pdf.drawImage(ImageReader(buffer), 100, 600, 60, 40)
+    pdf.drawString(100, 500, f"{color} page")
+    pdf.save()
+    return path
+
+
+def _embedded_color(xlsx_path: Path):
+    workbook = openpyxl.load_workbook(xlsx_path)
+    (image,) = workbook.active._images
+    embedded = Image.open(io.BytesIO(image._data())).convert("RGB")
+    return embedded.getpixel((embedded.width // 2, embedded.height // 2))
+
+
+def test_parallel_excel_conversions_keep_their_own_images(tmp_path, temp_dir):
+    colors = {"red": (255, 0, 0), "blue": (0, 0, 255)}
+    sources = [_pdf_with_image(tmp_path / f"{name}_{i}.pdf", name) for i in range(4) for name in colors]
+
+    with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+        outputs = list(pool.map(lambda path: convert_pdf_to_excel(path, "fast"), sources))
+
+    for source, output in zip(sources, outputs):
+        expected = colors[source.stem.split("_")[0]]
+        assert all(abs(a - b) < 40 for a, b in zip(_embedded_color(output), expected))
+        output.unlink()
+    assert not list(temp_dir.rglob("temp_img_*"))
@@ -0,0 +1,101 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from routes import pipeline
+from services import executor_service, temp_service
+from services.admission_service import AdmissionController
+from services.priority_service import PRIORITY_BULK, set_priority
+
+
+def stamp(path):
+    pass
+
+
+def test_failed_step_hands_sibling_outputs_to_request_cleanup(monkeypatch, temp_dir):
+    inputs = []
+    for index in range(4):
+        path = temp_dir / f"pipeline_input_{index}.pdf"
+        path.write_bytes(b"%PDF")
+        inputs.append((path, "pdf"))
+
+    async def fake_run_cached_engine(engine, func, path, **options):
+        if path == inputs[1][0]:
+            await asyncio.sleep(0.01)
+            raise RuntimeError("engine crashed")
+        # The first file is still converting when the second fails
+        await asyncio.sleep(0.05)
+        output_path = path.with_name(f"{path.stem}_out.pdf")
+        output_path.write_bytes(b"%PDF")
+        return output_path
+
+    monkeypatch.setattr(pipeline, "run_cached_engine", fake_run_cached_engine)
+    monkeypatch.setattr(pipeline, "engine_call_limit", lambda engine: 2)
+    monkeypatch.setitem(
+        pipeline.PIPELINE_OPERATIONS, "stamp",
+        SimpleNamespace(engine="pdf", func=stamp, target_format="pdf"),
+    )
+
+    async def run_step():
+        tracked = []
+        token = temp_service._request_files.set(tracked)
+        try:
+            with pytest.raises(RuntimeError, match="engine crashed"):
+                await pipeline.run_pipeline_step("stamp", {}, inputs)
+        finally:
+            temp_service._request_files.reset(token)
+        return tracked
+
+    tracked = asyncio.run(run_step())
+
+    outputs = [path.with_name(f"{path.stem}_out.pdf") for path, _ in inputs]
+    # The running sibling finished and is cleaned up with the request; the rest never started
+    assert tracked == [outputs[0]] and outputs[0].exists()
+    assert outputs[0] in temp_service.files_in_use()
+    assert not any(path.exists() for path in outputs[1:])
+    for path in tracked:
+        temp_service.remove_path(path)
+        temp_service._release_file(path)
+    for path, _ in inputs:
+        path.unlink()
+
+
+def test_full_pipeline_fits_an_idle_engine(monkeypatch, temp_dir):
+    # 20 bulk calls at once would overflow this engine's bulk share of the queue (8)
+    monkeypatch.setenv("ADMISSION_PDF_LIMIT", "4")
+    monkeypatch.setenv("ADMISSION_PDF_QUEUE", "16")
+    controller = AdmissionController(enabled=True)
+    monkeypatch.setattr(executor_service, "admission_controller", controller)
+    admission = controller.engine("pdf", 2)
+    most_running = []
+
+    async def fake_run_cached_engine(engine, func, path, **options):
+        async with controller.engine(engine, 2).slot():
+            most_running.append(admission.running)
+            await asyncio.sleep(0.01)
+        output_path = path.with_name(f"{path.stem}_out.pdf")
+        output_path.write_bytes(b"%PDF")
+        return output_path
+
+    monkeypatch.setattr(pipeline, "run_cached_engine", fake_run_cached_engine)
+    monkeypatch.setitem(
+        pipeline.PIPELINE_OPERATIONS, "stamp",
+        SimpleNamespace(engine="pdf", func=stamp, target_format="pdf"),
+    )
+    inputs = []
+    for index in range(pipeline.PIPELINE_MAX_FILES):
+        path = temp_dir / f"pipeline_bulk_{index}.pdf"
+        path.write_bytes(b"%PDF")
+        inputs.append((path, "pdf"))
+
+    async def run_step():
+        set_priority(PRIORITY_BULK)
+        return await pipeline.run_pipeline_step("stamp", {}, inputs)
+
+    outputs = asyncio.run(run_step())
+
+    assert len(outputs) == pipeline.PIPELINE_MAX_FILES
+    assert admission.rejected == 0 and max(most_running) == 4
+    for path, _ in [*outputs, *inputs]:
+        path.unlink()
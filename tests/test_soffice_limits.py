@@ -0,0 +1,100 @@
+import stat
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from services import libreoffice_service, limits_service
+from services.executor_service import ENGINE_OFFICE
+from services.libreoffice_service import run_libreoffice_batch_conversion, run_libreoffice_conversion
+from services.limits_service import ResourceLimits, run_limited, subprocess_limits
+
+# rlimits and the fake soffice shell script need a POSIX system
+resource = pytest.importorskip("resource")
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+# Stands in for soffice: the launcher forks soffice.bin right away, so every
+# output records the CPU time limit of a child of the started process
+FAKE_SOFFICE = """#!/bin/sh
+while [ $# -gt 0 ]; do
+    case "$1" in
+        --outdir) outdir="$2"; shift 2 ;;
+        --convert-to) target="$2"; shift 2 ;;
+        -*) shift ;;
+        *) name=$(basename "$1"); sh -c 'ulimit -St' > "$outdir/${name%.*}.$target"; shift ;;
+    esac
+done
+"""
+
+
+@pytest.fixture
+def office_limits(monkeypatch, tmp_path):
+    monkeypatch.setitem(
+        limits_service._engine_limits, ENGINE_OFFICE, ResourceLimits(cpu_seconds=7, open_files=256)
+    )
+    soffice = tmp_path / "soffice"
+    soffice.write_text(FAKE_SOFFICE)
+    soffice.chmod(soffice.stat().st_mode | stat.S_IXUSR)
+    monkeypatch.setattr(libreoffice_service, "find_soffice_binary", lambda: str(soffice))
+
+
+def test_children_of_soffice_inherit_the_limits(office_limits, tmp_path):
+    input_path = tmp_path / "report.docx"
+    input_path.write_bytes(b"docx")
+    output_path = run_libreoffice_conversion(input_path, "pdf", tmp_path / "report.pdf", tmp_path)
+    assert output_path.read_text().strip() == "7"
+
+
+def test_batches_get_the_cpu_time_of_one_call_per_file(office_limits, tmp_path):
+    inputs = []
+    for index in range(3):
+        input_path = tmp_path / f"doc{index}.docx"
+        input_path.write_bytes(b"docx")
+        inputs.append(input_path)
+    output_dir = tmp_path / "converted"
+    output_dir.mkdir()
+
+    results = run_libreoffice_batch_conversion(inputs, "pdf", output_dir, tmp_path)
+
+    assert sorted(results) == inputs
+    assert {path.read_text().strip() for path in results.values()} == {"21"}
+
+
+def test_processes_serving_many_calls_get_no_cpu_limit(monkeypatch):
+    monkeypatch.setitem(limits_service._engine_limits, ENGINE_OFFICE, ResourceLimits(cpu_seconds=7))
+    assert subprocess_limits(ENGINE_OFFICE, cpu_calls=0) is None
+    assert subprocess_limits(ENGINE_OFFICE) is not None
+    monkeypatch.setitem(limits_service._engine_limits, ENGINE_OFFICE, ResourceLimits())
+    assert subprocess_limits(ENGINE_OFFICE) is None
+
+
+def test_limits_stay_below_the_hard_limits(monkeypatch):
+    _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY:
+        pytest.skip("no hard open files limit")
+    monkeypatch.setitem(
+        limits_service._engine_limits, ENGINE_OFFICE, ResourceLimits(open_files=hard + 1000)
+    )
+    applied = []
+    monkeypatch.setattr(resource, "setrlimit", lambda rlimit, value: applied.append((rlimit, value)))
+    subprocess_limits(ENGINE_OFFICE)()
+    assert applied == [(resource.RLIMIT_NOFILE, (hard, hard))]
+
+
+def test_calls_run_unlimited_without_rlimits(monkeypatch):
+    # As on Windows, where Popen rejects a preexec_fn
+    monkeypatch.setattr(limits_service, "POSIX_LIMITS", False)
+    monkeypatch.setitem(limits_service._engine_limits, ENGINE_OFFICE, ResourceLimits(cpu_seconds=7))
+    assert subprocess_limits(ENGINE_OFFICE) is None
+    set_limits = []
+    monkeypatch.setattr(resource, "setrlimit", lambda *args: set_limits.append(args))
+    assert run_limited(ResourceLimits(cpu_seconds=1, open_files=64), sum, [1, 2]) == 3
+    assert set_limits == []
+
+
+def test_server_starts_without_the_resource_module():
+    probe = "import sys; sys.modules['resource'] = None\nimport server\n"
+    result = subprocess.run([sys.executable, "-c", probe], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,150 @@
+import asyncio
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from services import temp_service
+from services.temp_service import (
+    JOBS_DIR_NAME,
+    QUOTA_MIN_AGE,
+    RequestTempFilesMiddleware,
+    TempJanitor,
+    files_in_use,
+    temp_file_path,
+    track_request_file,
+)
+
+KB = 1024
+
+
+def artifact(base_dir: Path, name: str, size: int, age: float) -> Path:
+    path = temp_file_path(name, base_dir)
+    path.write_bytes(b"x" * size)
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+def job_file(base_dir: Path, name: str, size: int, age: float) -> Path:
+    jobs_dir = base_dir / JOBS_DIR_NAME
+    jobs_dir.mkdir(exist_ok=True)
+    path = jobs_dir / name
+    path.write_bytes(b"j" * size)
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+@pytest.fixture
+def janitor(tmp_path):
+    return TempJanitor(tmp_path, file_ttl=3600, job_ttl=86400, quota_bytes=0, interval=0)
+
+
+def test_expired_files_are_removed(tmp_path, janitor):
+    old = artifact(tmp_path, "old.pdf", KB, age=7200)
+    fresh = artifact(tmp_path, "fresh.pdf", KB, age=60)
+
+    assert janitor.run_once()["expired"] == 1
+    assert not old.exists() and fresh.exists()
+
+
+def test_quota_evicts_oldest_first_but_not_recent_files(tmp_path, janitor):
+    janitor.quota_bytes = 1
+    oldest = artifact(tmp_path, "a.pdf", 2 * KB, age=QUOTA_MIN_AGE + 300)
+    older = artifact(tmp_path, "b.pdf", 2 * KB, age=QUOTA_MIN_AGE + 200)
+    recent = artifact(tmp_path, "c.pdf", 2 * KB, age=10)
+
+    result = janitor.run_once()
+
+    # Still over the quota, but the last file is young enough to be in use
+    assert result["evicted"] == 2
+    assert not oldest.exists() and not older.exists() and recent.exists()
+    assert janitor.last_usage_bytes == 2 * KB
+
+
+def test_quota_stops_evicting_once_usage_fits(tmp_path, janitor):
+    janitor.quota_bytes = 3 * KB
+    oldest = artifact(tmp_path, "a.pdf", 2 * KB, age=QUOTA_MIN_AGE + 300)
+    newer = artifact(tmp_path, "b.pdf", 2 * KB, age=QUOTA_MIN_AGE + 200)
+
+    assert janitor.run_once()["evicted"] == 1
+    assert not oldest.exists() and newer.exists()
+
+
+def test_files_of_requests_in_flight_are_kept(tmp_path, janitor):
+    janitor.quota_bytes = 1
+    in_use = artifact(tmp_path, "upload.pdf", KB, age=7200)
+    idle = artifact(tmp_path, "left.pdf", KB, age=QUOTA_MIN_AGE + 60)
+    seen = {}
+
+    async def app(scope, receive, send):
+        track_request_file(in_use)
+        seen["result"] = janitor.run_once()
+        seen["in_use"] = files_in_use()
+
+    asyncio.run(RequestTempFilesMiddleware(app)({"type": "http"}, None, None))
+
+    assert seen["result"] == {"expired": 0, "evicted": 1, "freed_bytes": KB}
+    assert in_use in seen["in_use"] and not idle.exists()
+    # Deleted with the response, and released
+    assert not in_use.exists() and in_use not in files_in_use()
+
+
+def test_files_of_active_jobs_are_kept(tmp_path, janitor):
+    janitor.quota_bytes = 1
+    queued_input = job_file(tmp_path, "job1_input.pdf", KB, age=2 * 86400)
+    running_input = job_file(tmp_path, "job2_input.pdf", KB, age=QUOTA_MIN_AGE + 60)
+    finished_result = job_file(tmp_path, "job3_result.pdf", KB, age=QUOTA_MIN_AGE + 60)
+
+    janitor.run_once(active_job_ids={"job1", "job2"})
+
+    assert queued_input.exists() and running_input.exists()
+    assert not finished_result.exists()
+
+
+def test_job_files_are_not_evicted_when_the_active_jobs_are_unknown(tmp_path, janitor):
+    janitor.quota_bytes = 1
+    result = job_file(tmp_path, "job3_result.pdf", KB, age=QUOTA_MIN_AGE + 60)
+    expired = job_file(tmp_path, "job4_result.pdf", KB, age=2 * 86400)
+
+    janitor.run_once(active_job_ids=None)
+
+    assert result.exists() and not expired.exists()
+
+
+def test_sweep_asks_the_job_store_and_survives_its_failure(tmp_path, janitor):
+    janitor.quota_bytes = 1
+    input_file = job_file(tmp_path, "job1_input.pdf", KB, age=QUOTA_MIN_AGE + 60)
+
+    async def store_down():
+        raise ConnectionError("store down")
+
+    janitor.active_job_ids = store_down
+    asyncio.run(janitor.sweep())
+    assert input_file.exists()
+
+    async def none_active():
+        return set()
+
+    janitor.active_job_ids = none_active
+    asyncio.run(janitor.sweep())
+    assert not input_file.exists()
+
+
+def test_files_in_use_are_touched_for_other_processes(tmp_path, janitor, monkeypatch):
+    monkeypatch.setattr(temp_service, "IN_USE_TOUCH_INTERVAL", 0.01)
+    janitor.interval = 3600
+    in_use = artifact(tmp_path, "upload.pdf", KB, age=QUOTA_MIN_AGE + 60)
+
+    async def app(scope, receive, send):
+        track_request_file(in_use)
+        janitor.start()
+        await asyncio.sleep(0.1)
+        seen["age"] = time.time() - in_use.stat().st_mtime
+        await janitor.stop()
+
+    seen = {}
+    asyncio.run(RequestTempFilesMiddleware(app)({"type": "http"}, None, None))
+    assert seen["age"] < QUOTA_MIN_AGE
@@ -0,0 +1,66 @@
+import asyncio
+import io
+import threading
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from pypdf import PdfWriter
+
+import core
+from services.timing_service import timing_context
+
+
+def pdf_upload(pages: int = 3) -> UploadFile:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    buffer.seek(0)
+    return UploadFile(buffer, filename="doc.pdf")
+
+
+def ingest(upload, **kwargs):
+    async def run():
+        with timing_context() as timings:
+            ingested = await core.ingest_upload_file(upload, **kwargs)
+        return ingested, timings, threading.get_ident()
+    return asyncio.run(run())
+
+
+def test_ingestion_runs_off_the_event_loop(monkeypatch):
+    threads = []
+    original = core.ingest_upload
+
+    def recording_ingest(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(core, "ingest_upload", recording_ingest)
+    ingested, timings, loop_thread = ingest(pdf_upload())
+
+    assert threads and threads[0] != loop_thread
+    assert ingested.path.exists() and ingested.detected_format == "pdf"
+    assert timings["input_size"] == ingested.size
+    ingested.path.unlink()
+
+
+def test_pages_are_counted_only_on_request(monkeypatch):
+    counted = []
+    original = core.count_pdf_pages
+    monkeypatch.setattr(core, "count_pdf_pages", lambda path: counted.append(path) or original(path))
+
+    ingested, timings, _ = ingest(pdf_upload())
+    assert counted == [] and "page_count" not in timings
+    ingested.path.unlink()
+
+    ingested, timings, _ = ingest(pdf_upload(), count_pages=True)
+    assert counted == [ingested.path] and timings["page_count"] == 3
+    ingested.path.unlink()
+
+
+def test_oversized_upload_is_rejected():
+    upload = UploadFile(io.BytesIO(b"x" * 4096), filename="big.txt")
+    with pytest.raises(HTTPException) as raised:
+        ingest(upload, max_size=1024)
+    assert raised.value.status_code == 413
@@ -0,0 +1,104 @@
+import asyncio
+import random
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from services.upload_service import MultipartPartMeter, UploadSizeLimitMiddleware
+
+MB = 1024 * 1024
+BOUNDARY = "----filelabtestboundary"
+
+
+def multipart_body(files):
+    body = b""
+    for index, content in enumerate(files):
+        body += (
+            f"--{BOUNDARY}\r\n"
+            f'Content-Disposition: form-data; name="files"; filename="f{index}.bin"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode() + content + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+async def count_files(request: Request):
+    form = await request.form()
+    return JSONResponse({"files": len(form.getlist("files"))})
+
+
+def limited_app(**limits):
+    app = Starlette(routes=[Route("/upload", count_files, methods=["POST"]), Route("/big", count_files, methods=["POST"])])
+    return UploadSizeLimitMiddleware(app, **limits)
+
+
+def post(app, body, path="/upload", chunk_size=64 * 1024):
+    """Send body in chunks without a Content-Length; returns (status, bytes the app read)"""
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+    read = 0
+    status = None
+
+    async def receive():
+        nonlocal read
+        if not chunks:
+            return {"type": "http.disconnect"}
+        chunk = chunks.pop(0)
+        read += len(chunk)
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())],
+    }
+    asyncio.run(app(scope, receive, send))
+    return status, read
+
+
+def test_oversized_file_is_rejected_before_the_body_is_read():
+    body = multipart_body([b"x" * (10 * MB)])
+    status, read = post(limited_app(max_body_size=1024 * MB, max_part_size=1 * MB), body)
+    assert status == 413
+    assert read < 2 * MB
+
+
+def test_files_under_the_limit_pass_even_when_the_body_is_larger():
+    body = multipart_body([b"a" * (900 * 1024)] * 4)
+    assert post(limited_app(max_body_size=1024 * MB, max_part_size=1 * MB), body)[0] == 200
+
+
+def test_routes_can_accept_larger_files():
+    app = limited_app(max_body_size=1024 * MB, max_part_size=1 * MB, part_size_overrides={"/big": 4 * MB})
+    body = multipart_body([b"b" * (3 * MB)])
+    assert post(app, body, "/big")[0] == 200
+    assert post(app, body, "/upload")[0] == 413
+
+
+def test_body_limit_still_applies():
+    body = multipart_body([b"c" * (600 * 1024)] * 4)
+    assert post(limited_app(max_body_size=2 * MB, max_part_size=1 * MB), body)[0] == 413
+
+
+def test_part_meter_finds_delimiters_split_across_chunks():
+    sizes = [5000, 0, 123, 40000, 7]
+    body = multipart_body([b"z" * size for size in sizes])
+    rng = random.Random(7)
+    for _ in range(50):
+        meter = MultipartPartMeter(BOUNDARY.encode())
+        largest = 0
+        position = 0
+        while position < len(body):
+            step = rng.randint(1, 300)
+            largest = max(largest, meter.feed(body[position:position + step]))
+            position += step
+        # The largest part is its content plus ~120 bytes of part headers
+        assert 40000 < largest < 40000 + 200